@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+from importlib import import_module
+
+from benchmarks.harness import CALIBRATION, calibrate, dump, find_regressions, get_environment, load, merge
+
+GROUPS = ('models', 'decoding', 'batches', 'imports', 'client')
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Shipday SDK benchmarks')
+    parser.add_argument('--only', action='append', choices=GROUPS, help='run only these groups')
+    parser.add_argument('--quick', action='store_true',
+                        help='fewer samples, for smoke runs, the results are not compared with the baseline')
+    parser.add_argument('--output', default='-', help='where to write the JSON results, - for stdout')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown against the baseline, 0.25 means 25%%')
+    parser.add_argument('--confirm', type=int, default=2,
+                        help='times the groups with regressions are run again before they are reported, and the '
+                             'extra runs that measure the noise of a new baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    args = parser.parse_args(argv)
+    if args.quick and args.save_baseline:
+        parser.error('quick results are too noisy to be saved as the baseline')
+    return args
+
+
+def collect(groups, quick: bool) -> tuple:
+    results, names = {CALIBRATION: calibrate()}, {}
+    for group in groups:
+        sys.stderr.write('Running {} benchmarks\n'.format(group))
+        collected = import_module('benchmarks.' + group).collect(quick)
+        names[group] = set(collected)
+        results.update(collected)
+    return results, names
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results, names = collect(args.only or GROUPS, args.quick)
+    report = {'environment': get_environment(), 'results': results}
+    dump(report, args.output)
+
+    baseline = load(args.baseline) if os.path.exists(args.baseline) else None
+    if args.save_baseline:
+        for _ in range(args.confirm):
+            rerun, _ = collect(names, False)
+            results = merge(results, rerun)
+        # Budgets are hand written limits and survive a baseline refresh
+        report = {'environment': report['environment'], 'results': results,
+                  'budgets': baseline.get('budgets', {}) if baseline else {}}
+        dump(report, args.baseline)
+        return 0
+    if baseline is None:
+        return 0
+    if args.quick:
+        # A few samples can not tell a regression from a busy machine
+        sys.stderr.write('Quick results are not compared with the baseline\n')
+        return 0
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        # Another run of the groups is merged in, so a benchmark slowed down by other work on the machine in one run
+        # is not reported
+        regressed = {name for name, _ in regressions}
+        rerun, _ = collect([group for group in names if names[group] & regressed], False)
+        results = merge(results, rerun)
+        regressions = find_regressions(results, baseline, args.tolerance)
+    for _, message in regressions:
+        sys.stderr.write(message + '\n')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
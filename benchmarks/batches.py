@@ -0,0 +1,62 @@
+import io
+
+from benchmarks.fixtures import make_api_orders
+from benchmarks.harness import measure
+from shipday.exceptions import ShipdayException
+from shipday.loader import OrderLoader
+from shipday.order import OrderCodec
+
+BATCH_SIZE = 10000
+MAPPING = {
+    'order_number': 'number',
+    'customer.name': 'customer',
+    'customer.phone_number': 'phone',
+    'customer.address.street': 'street',
+    'customer.address.latitude': 'lat',
+    'customer.address.longitude': 'lng',
+    'pickup.name': 'pickup',
+    'pickup.address.street': 'pickup_street',
+    'cost.tips': 'tips',
+    'item.name': 'item',
+    'item.unit_price': 'price',
+    'item.quantity': 'quantity',
+}
+
+
+def _make_csv(count: int) -> str:
+    lines = [','.join(MAPPING.values())]
+    for number in range(count):
+        for index in range(3):
+            lines.append('{0},Customer {0},+1343523423,Jefferson St,23.5,90.25,Pickup,Hacker way,1,Item {1},2.5,{2}'
+                         .format(number, index, index + 1))
+    return '\n'.join(lines) + '\n'
+
+
+def _verify_objects(records: list) -> int:
+    invalid = 0
+    for order in OrderCodec().decode_many(records):
+        try:
+            order.verify()
+        except ShipdayException:
+            invalid += 1
+    return invalid
+
+
+def collect(quick: bool = False) -> dict:
+    try:
+        from shipday.order.order_batch import OrderBatch
+    except ImportError:
+        # numpy is not installed
+        return {}
+    repeat = 3 if quick else 7
+    records, text = make_api_orders(BATCH_SIZE), _make_csv(BATCH_SIZE)
+    prefix = 'batch.{}_orders.'.format(BATCH_SIZE)
+    return {
+        prefix + 'verify_objects': measure(lambda: _verify_objects(records), repeat),
+        prefix + 'from_records_validate': measure(lambda: OrderBatch.from_records(records).validate(), repeat),
+        prefix + 'load_objects': measure(
+            lambda: list(OrderLoader.iter_batches(OrderLoader(MAPPING).iter_csv(io.StringIO(text)), BATCH_SIZE)),
+            repeat),
+        prefix + 'load_batches': measure(
+            lambda: list(OrderLoader(MAPPING).iter_csv_batches(io.StringIO(text), BATCH_SIZE)), repeat),
+    }
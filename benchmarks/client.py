@@ -0,0 +1,40 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import make_api_orders, make_order
+from benchmarks.harness import summarize_latencies
+from shipday import Shipday
+from shipday.testing import StandInServer
+
+API_KEY = 'benchmark-api-key'
+
+
+def _run(func, count: int, workers: int = 1) -> dict:
+    def timed(_):
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
+
+    func()
+    started = time.perf_counter()
+    if workers == 1:
+        latencies = [timed(index) for index in range(count)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(timed, range(count)))
+    return summarize_latencies(latencies, time.perf_counter() - started)
+
+
+def collect(quick: bool = False) -> dict:
+    count = 100 if quick else 1000
+    order = make_order(3)
+    with StandInServer(orders=make_api_orders(50)) as server:
+        with Shipday(api_key=API_KEY, base_url=server.url) as shipday:
+            service = shipday.OrderService
+            return {
+                'client.get_orders': _run(service.get_orders, count),
+                'client.get_orders_lazy': _run(lambda: service.get_orders(lazy=True), count),
+                'client.get_orders_8_threads': _run(service.get_orders, count, workers=8),
+                # Inserts grow the stand-in state, so they run after the reads
+                'client.insert_order': _run(lambda: service.insert_order(order), count),
+            }
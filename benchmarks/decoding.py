@@ -0,0 +1,29 @@
+from benchmarks.fixtures import make_api_orders
+from benchmarks.harness import measure
+from shipday.httpclient.codec import get_codec
+from shipday.order import OrderCodec, OrderListView
+from shipday.utils.lazy_json import iter_stream
+
+RESPONSE_SIZES = (10, 1000)
+STREAM_FIELDS = ('orderId', 'orderNumber', 'orderStatus')
+
+
+def _chunks(body: bytes, size: int = 65536) -> list:
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+def collect(quick: bool = False) -> dict:
+    repeat = 3 if quick else 15
+    results = {}
+    json_codec, default_codec, order_codec = get_codec('json'), get_codec(), OrderCodec()
+    for size in RESPONSE_SIZES:
+        body = json_codec.encode(make_api_orders(size))
+        chunks = _chunks(body)
+        prefix = 'decode.{}_orders.'.format(size)
+        results[prefix + 'json'] = measure(lambda: json_codec.decode(body), repeat)
+        results[prefix + default_codec.name] = measure(lambda: default_codec.decode(body), repeat)
+        results[prefix + 'models'] = measure(lambda: order_codec.loads(body), repeat)
+        results[prefix + 'lazy_order_numbers'] = measure(
+            lambda: [order.order_number for order in OrderListView(body)], repeat)
+        results[prefix + 'stream_projected'] = measure(lambda: list(iter_stream(chunks, STREAM_FIELDS)), repeat)
+    return results
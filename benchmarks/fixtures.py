@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from shipday.order import Address, Customer, Order, OrderCost, OrderItem, Pickup
+
+ITEM_COUNTS = (1, 10, 100)
+
+
+def make_order(item_count: int, number: int = 1) -> Order:
+    customer_address = Address(street='Jefferson St', city='California', state='CA', country='USA',
+                               latitude=23.5, longitude=90.25)
+    pickup_address = Address(unit='4B', street='Hacker way', city='California', zip='94025')
+    return Order(
+        order_number=str(number),
+        customer=Customer(name='customer', address=customer_address, email='customer@shipday.com',
+                          phone_number='+1343523423'),
+        pickup=Pickup(name='pickup', address=pickup_address, phone_number='+134343534'),
+        order_items=[OrderItem(name='Item {}'.format(index), unit_price=2.5, quantity=index + 1,
+                               add_ons='Extra cheese', detail='Signature Item') for index in range(item_count)],
+        order_cost=OrderCost(tips=1.0, tax=2.0, discount=1.5, delivery_fee=5.0, total=20.0),
+        expected_delivery_time=datetime(2022, 5, 4, 13, 30),
+        delivery_instruction='Ring twice',
+    )
+
+
+def make_api_order(number: int, item_count: int = 3) -> dict:
+    # The shape returned by the orders endpoints
+    return {
+        'orderId': number,
+        'orderNumber': str(number),
+        'customer': {'name': 'Customer {}'.format(number), 'emailAddress': 'customer@shipday.com',
+                     'phoneNumber': '+1343523423', 'address': 'Jefferson St, California, CA, USA',
+                     'latitude': 23.5, 'longitude': 90.25},
+        'restaurant': {'name': 'Pickup', 'phoneNumber': '+134343534', 'address': '4B, Hacker way, California'},
+        'orderItem': [{'name': 'Item {}'.format(index), 'unitPrice': 2.5, 'quantity': index + 1}
+                      for index in range(item_count)],
+        'costing': {'totalCost': 20.0, 'tips': 1.0, 'tax': 2.0, 'discountAmount': 1.5, 'deliveryFee': 5.0},
+        'orderStatus': {'orderState': 'ACTIVE'},
+        'deliveryInstruction': 'Ring twice',
+    }
+
+
+def make_api_orders(count: int) -> list:
+    return [make_api_order(number) for number in range(count)]
@@ -0,0 +1,155 @@
+import json
+import platform
+import statistics
+import sys
+import time
+
+from shipday.version import VERSION
+
+CALIBRATION = 'calibration'
+
+
+def measure(func, repeat: int = 5, min_time: float = 0.02) -> dict:
+    # Calls func in a loop sized so that one repeat takes at least min_time, the result is the time of one call
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    # The fastest repeat is the least disturbed by other work on the machine, so it is what gets compared
+    return summarize(timings, number=number, metric='min')
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    index = fraction * (len(ordered) - 1)
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def summarize(timings: list, **extra) -> dict:
+    result = {
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'mean': statistics.fmean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'samples': len(timings),
+        'metric': 'median',
+    }
+    result.update(extra)
+    return result
+
+
+def summarize_latencies(latencies: list, elapsed: float) -> dict:
+    return summarize(latencies, p90=percentile(latencies, 0.9), p99=percentile(latencies, 0.99),
+                     requests_per_second=len(latencies) / elapsed)
+
+
+_CALIBRATION_DOCUMENT = [{'id': number, 'name': 'Item {}'.format(number), 'price': number / 4, 'tags': ['a', 'b']}
+                         for number in range(200)]
+
+
+def _calibration_workload():
+    total = 0
+    for number in range(10000):
+        total += number * number % 7
+    # Most benchmarks spend their time in C decoders and allocations, which a busy machine slows down more than
+    # pure Python arithmetic
+    json.loads(json.dumps(_CALIBRATION_DOCUMENT))
+    return sorted(str(number) for number in range(1000))
+
+
+def calibrate() -> dict:
+    # A fixed workload of Python code, JSON and allocations, results are compared relative to it so a slower or
+    # busier machine does not show up as a regression
+    return measure(_calibration_workload, repeat=15)
+
+
+def get_environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'shipday': VERSION,
+    }
+
+
+def get_spread(result: dict) -> float:
+    # How much slower the typical sample is than the fastest one, a wide spread means the run was noisy
+    if not result.get('min'):
+        return 0.0
+    return max(0.0, result['median'] / result['min'] - 1)
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float = 0.25) -> list:
+    # Returns the name and a message for each benchmark that got slower than the baseline allows or went over
+    # its budget
+    regressions = []
+    scale = 1.0
+    if CALIBRATION in results and CALIBRATION in baseline.get('results', {}):
+        scale = results[CALIBRATION]['min'] / baseline['results'][CALIBRATION]['min']
+    for name, expected in baseline.get('results', {}).items():
+        current = results.get(name)
+        if current is None or name == CALIBRATION:
+            continue
+        metric = expected.get('metric', 'median')
+        limit = expected[metric] * scale
+        # The tolerance is widened to the spread of either run and to the drift seen between the baseline runs, a
+        # difference within their noise is not a regression
+        allowed = max(tolerance, get_spread(current), get_spread(expected), expected.get('noise', 0.0))
+        if current[metric] > limit * (1 + allowed):
+            message = '{} {}: {:.3g}s is {:.0%} slower than the baseline {:.3g}s, {:.0%} allowed'.format(
+                name, metric, current[metric], current[metric] / limit - 1, limit, allowed)
+            regressions.append((name, message))
+    for name, budget in baseline.get('budgets', {}).items():
+        current = results.get(name)
+        if current is not None and current['median'] > budget:
+            regressions.append((name, '{}: {:.3g}s is over the budget of {:.3g}s'.format(
+                name, current['median'], budget)))
+    return regressions
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25) -> list:
+    return [message for name, message in find_regressions(results, baseline, tolerance)]
+
+
+def merge(results: dict, rerun: dict) -> dict:
+    # Keeps the faster of two runs of each benchmark, a slowdown has to show up in every run to be reported.
+    # noise is how much slower the slowest run was than the fastest, the drift between runs of the same code.
+    merged = dict(results)
+    for name, result in rerun.items():
+        current = merged.get(name)
+        if current is None:
+            merged[name] = result
+            continue
+        metric = result.get('metric', 'median')
+        fastest, slowest = (result, current) if result[metric] < current[metric] else (current, result)
+        noise = slowest[metric] / fastest[metric] - 1 if fastest[metric] else 0.0
+        merged[name] = dict(fastest, noise=max(noise, current.get('noise', 0.0), result.get('noise', 0.0)))
+    return merged
+
+
+def load(path: str) -> dict:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def dump(report: dict, path: str = None):
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path is None or path == '-':
+        sys.stdout.write(text + '\n')
+        return
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text + '\n')
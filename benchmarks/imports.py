@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Statement timed in a fresh interpreter for each sample
+IMPORTS = {
+    'import.shipday': 'from shipday import Shipday',
+    'import.order_service': 'from shipday.services import OrderService',
+    # The lazy service property is where a sync user first pays for the services and the transport
+    'import.first_service': "from shipday import Shipday; Shipday(api_key='1234567890').OrderService",
+}
+
+
+def time_import(statement: str) -> float:
+    code = 'import time; started = time.perf_counter(); {}; print(time.perf_counter() - started)'.format(statement)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return float(output.stdout)
+
+
+def collect(quick: bool = False) -> dict:
+    samples = 5 if quick else 15
+    return {name: summarize([time_import(statement) for _ in range(samples)])
+            for name, statement in IMPORTS.items()}
@@ -0,0 +1,21 @@
+import json
+
+from benchmarks.fixtures import ITEM_COUNTS, make_order
+from benchmarks.harness import measure
+from shipday.order import OrderCodec
+
+
+def collect(quick: bool = False) -> dict:
+    repeat = 3 if quick else 15
+    results = {}
+    codecs = {'json': OrderCodec(codec='json'), 'default': OrderCodec()}
+    for count in ITEM_COUNTS:
+        order = make_order(count)
+        prefix = 'order.{}_items.'.format(count)
+        results[prefix + 'construct'] = measure(lambda: make_order(count), repeat)
+        results[prefix + 'verify'] = measure(order.verify, repeat)
+        results[prefix + 'get_body'] = measure(order.get_body, repeat)
+        results[prefix + 'get_body_json'] = measure(lambda: json.dumps(order.get_body()), repeat)
+        for name, codec in codecs.items():
+            results[prefix + 'encode_' + name] = measure(lambda: codec.dumps(order), repeat)
+    return results
@@ -58,11 +58,18 @@ setup(
               "Dispatch Management",
               "Delivery Service Integration",
               "Local Delivery API"],
-    packages=find_packages(exclude=["tests", "tests.*"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks", "benchmarks.*"]),
     include_package_data=True,
     install_requires=[
         'requests >= 2.20; python_version >= "3.0"'
     ],
+    extras_require={
+        'async': ['aiohttp >= 3.7'],
+        'fast': ['orjson >= 3.6'],
+        'batch': ['numpy >= 1.23'],
+        'export': ['pyarrow >= 1.0'],
+        'otel': ['opentelemetry-api >= 1.0'],
+    },
     python_requires=">=3.6",
     setup_requires=["wheel"],
 )
@@ -1 +1,23 @@
-from shipday.shipday_object import Shipday
+from importlib import import_module
+
+# Public names are resolved on first access so `import shipday` only loads what is used
+_LAZY_ATTRIBUTES = {
+    'Shipday': 'shipday.shipday_object',
+    'AsyncShipday': 'shipday.async_shipday_object',
+    'ShipdayPool': 'shipday.shipday_pool',
+    'AsyncShipdayPool': 'shipday.async_shipday_pool',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,58 @@
+from typing import TYPE_CHECKING
+
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.async_shipdayclient import AsyncShipdayClient
+from shipday.utils.profiling import ProfiledService, get_profiler
+
+if TYPE_CHECKING:
+    from shipday.services import AsyncOrderService, AsyncCarrierService, AsyncOnDemandDeliveryService
+
+
+class AsyncShipday:
+    def __init__(self, *args, api_key, **kwargs):
+        self.__api_key__ = api_key
+        self.__verify_api_key()
+        # profiler=True creates one profiler shared by the client and the services
+        self.profiler = get_profiler(kwargs['profiler'] if 'profiler' in kwargs else None)
+        if self.profiler is not None:
+            kwargs['profiler'] = self.profiler
+        self.httpclient = AsyncShipdayClient(*args, api_key=api_key, **kwargs)
+        self.__kwargs = kwargs
+        self.__services = {}
+
+    def __verify_api_key(self):
+        if self.__api_key__ is None or len(self.__api_key__) < 10:
+            raise ShipdayException('Invalid API key')
+
+    def __get_service(self, service_class):
+        service = self.__services.get(service_class)
+        if service is None:
+            service = service_class(httpclient=self.httpclient, **self.__kwargs)
+            if self.profiler is not None:
+                service = ProfiledService(service, self.profiler)
+            service = self.__services.setdefault(service_class, service)
+        return service
+
+    @property
+    def OrderService(self) -> 'AsyncOrderService':
+        from shipday.services.async_order_service import AsyncOrderService
+        return self.__get_service(AsyncOrderService)
+
+    @property
+    def CarrierService(self) -> 'AsyncCarrierService':
+        from shipday.services.async_carrier_service import AsyncCarrierService
+        return self.__get_service(AsyncCarrierService)
+
+    @property
+    def OnDemandDeliveryService(self) -> 'AsyncOnDemandDeliveryService':
+        from shipday.services.async_on_demand_delivery_service import AsyncOnDemandDeliveryService
+        return self.__get_service(AsyncOnDemandDeliveryService)
+
+    async def close(self):
+        await self.httpclient.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,58 @@
+from shipday.async_shipday_object import AsyncShipday
+from shipday.httpclient.fair_scheduler import AsyncFairScheduler
+from shipday.shipday_pool import _verify_factory
+
+
+class AsyncShipdayPool:
+    def __init__(self, *args, max_in_flight: int = 20, weights: dict = None, rate_limiter=None,
+                 response_cache=None, **kwargs):
+        _verify_factory(rate_limiter, 'Rate limiter')
+        _verify_factory(response_cache, 'Response cache')
+        self.scheduler = AsyncFairScheduler(max_in_flight)
+        self.__rate_limiter = rate_limiter
+        self.__response_cache = response_cache
+        self.__weights = dict(weights or {})
+        self.__kwargs = kwargs
+        self.__tenants = {}
+
+    def get(self, api_key: str) -> AsyncShipday:
+        tenant = self.__tenants.get(api_key)
+        if tenant is None:
+            tenant = self.__tenants[api_key] = self.__create_tenant(api_key)
+        return tenant
+
+    def __create_tenant(self, api_key: str) -> AsyncShipday:
+        kwargs = dict(self.__kwargs)
+        if self.__rate_limiter is not None:
+            kwargs['rate_limiter'] = self.__rate_limiter()
+        if self.__response_cache is not None:
+            kwargs['response_cache'] = self.__response_cache()
+        flow = self.scheduler.get_flow(api_key, self.__weights.get(api_key))
+        return AsyncShipday(api_key=api_key, scheduler=flow, **kwargs)
+
+    def set_weight(self, api_key: str, weight: float):
+        self.scheduler.set_weight(api_key, weight)
+        self.__weights[api_key] = weight
+
+    async def remove(self, api_key: str):
+        tenant = self.__tenants.pop(api_key, None)
+        if tenant is not None:
+            await tenant.close()
+            self.scheduler.remove_flow(api_key)
+
+    def __contains__(self, api_key: str) -> bool:
+        return api_key in self.__tenants
+
+    def __len__(self) -> int:
+        return len(self.__tenants)
+
+    async def close(self):
+        tenants, self.__tenants = list(self.__tenants.values()), {}
+        for tenant in tenants:
+            await tenant.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
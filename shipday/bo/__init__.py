@@ -1 +1,4 @@
-from shipday.bo.pod_type import PodType
\ No newline at end of file
+from shipday.bo.pod_type import PodType
+from shipday.bo.insert_result import InsertResult
+from shipday.bo.row_error import RowError
+from shipday.bo.status_change import StatusChange
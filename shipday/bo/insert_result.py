@@ -0,0 +1,15 @@
+class InsertResult:
+    def __init__(self, index: int, order, response=None, exception: Exception = None):
+        self.index = index
+        self.order = order
+        self.response = response
+        self.exception = exception
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+    def __repr__(self):
+        if self.ok:
+            return 'InsertResult(index={}, response={})'.format(self.index, self.response)
+        return 'InsertResult(index={}, exception={!r})'.format(self.index, self.exception)
@@ -0,0 +1,13 @@
+class RowError:
+    def __init__(self, row: int, message: str):
+        self.row = row
+        self.message = message
+
+    def __eq__(self, other):
+        return isinstance(other, RowError) and (self.row, self.message) == (other.row, other.message)
+
+    def __hash__(self):
+        return hash((self.row, self.message))
+
+    def __repr__(self):
+        return 'RowError(row={}, message={!r})'.format(self.row, self.message)
@@ -0,0 +1,10 @@
+class StatusChange:
+    def __init__(self, order_id: int, status: str, previous_status: str = None, snapshot=None):
+        self.order_id = order_id
+        self.status = status
+        self.previous_status = previous_status
+        self.snapshot = snapshot
+
+    def __repr__(self):
+        return 'StatusChange(order_id={}, status={}, previous_status={})'.format(self.order_id, self.status,
+                                                                               self.previous_status)
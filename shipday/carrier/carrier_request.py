@@ -1,45 +1,23 @@
-from collections import defaultdict
-
 from shipday.exceptions.shipday_exception import ShipdayException
-from shipday.utils.verifiers import verify_instance_of
+from shipday.utils.fields import TypedField
+from shipday.utils.profiling import profiled
 
 
 class CarrierRequest:
+    __slots__ = ('_name', '_email', '_phone_number')
+
+    name = TypedField(str, "Carrier name is not a string")
+    email = TypedField(str, "Carrier email is not a string")
+    phone_number = TypedField(str, "Carrier phone number is not a string")
+
     def __init__(self,
                  name:str = None, email:str = None, phone_number:str = None
                  , **kwargs):
-        kwargs = defaultdict(lambda: None, **kwargs)
         self._name = name
         self._email = email
         self._phone_number = phone_number
 
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @name.setter
-    def name(self, value: str) -> None:
-        verify_instance_of(str, value, "Carrier name is not a string")
-        self._name = value
-
-    @property
-    def email(self) -> str:
-        return self._email
-
-    @email.setter
-    def email(self, value: str) -> None:
-        verify_instance_of(str, value, "Carrier email is not a string")
-        self._email = value
-
-    @property
-    def phone_number(self) -> str:
-        return self._phone_number
-
-    @phone_number.setter
-    def phone_number(self, value: str) -> None:
-        verify_instance_of(str, value, "Carrier phone number is not a string")
-        self._phone_number = value
-
+    @profiled('validate')
     def verify(self) -> None:
         if self.name is None:
             raise ShipdayException('Carrier must have a name')
@@ -48,6 +26,7 @@ class CarrierRequest:
         if self.phone_number is None:
             raise ShipdayException('Carrier must have a phone number')
 
+    @profiled('build')
     def get_body(self) -> dict:
         self.verify()
         return {
@@ -1,5 +1,10 @@
 from shipday.exceptions.shipday_exception import ShipdayException
 
 class ShipdayRateLimitException(ShipdayException):
-    def __init__(self, message):
+    def __init__(self, message, retry_after: float = None, limit: int = None, remaining: int = None,
+                 reset: float = None):
         super().__init__(message)
+        self.retry_after = retry_after
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
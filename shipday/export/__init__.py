@@ -0,0 +1 @@
+from shipday.export.order_exporter import OrderExporter
@@ -0,0 +1,227 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+from typing import Iterable
+
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.codec import get_codec
+from shipday.order import OrderQuery
+
+DEFAULT_FIELDS = {
+    'order_id': 'orderId',
+    'order_number': 'orderNumber',
+    'customer_name': 'customer.name',
+    'customer_address': 'customer.address',
+    'customer_phone_number': 'customer.phoneNumber',
+    'customer_email': 'customer.emailAddress',
+    'pickup_name': 'restaurant.name',
+    'pickup_address': 'restaurant.address',
+    'pickup_phone_number': 'restaurant.phoneNumber',
+    'total_cost': 'costing.totalCost',
+    'tips': 'costing.tips',
+    'delivery_fee': 'costing.deliveryFee',
+    'order_items': 'orderItem',
+}
+
+COMPRESSIONS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+}
+
+# Parquet compresses inside the file, only gzip has a parquet codec of the same name
+PARQUET_COMPRESSIONS = {
+    None: 'snappy',
+    'gzip': 'gzip',
+}
+
+# Parquet column types of the known paths, any other path is written as text
+PARQUET_TYPES = {
+    'orderId': 'int64',
+    'costing.totalCost': 'float64',
+    'costing.tips': 'float64',
+    'costing.deliveryFee': 'float64',
+    'costing.tax': 'float64',
+    'costing.discountAmount': 'float64',
+}
+
+
+def _compile_path(path: str) -> tuple:
+    return tuple(int(key) if key.isdigit() else key for key in path.split('.'))
+
+
+def _resolve(order, keys: tuple):
+    value = order
+    for key in keys:
+        if type(value) is dict:
+            value = value.get(key)
+        elif type(value) is list and type(key) is int and key < len(value):
+            value = value[key]
+        else:
+            return None
+        if value is None:
+            return None
+    return value
+
+
+class _Sink:
+    # Collects encoded output and flushes it to the destination whenever buffer_size bytes are pending
+    def __init__(self, destination, compression: str, buffer_size: int):
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ShipdayException('Unknown compression: {}'.format(compression))
+        self._owned = not hasattr(destination, 'write')
+        if self._owned:
+            self._file = COMPRESSIONS[compression](destination, 'wb') if compression else open(destination, 'wb')
+        elif compression:
+            self._file = COMPRESSIONS[compression](destination, 'wb')
+            self._owned = True
+        else:
+            self._file = destination
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self.flushes = 0
+
+    def write(self, data: bytes):
+        self._buffer += data
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+            self.flushes += 1
+
+    def close(self):
+        self.flush()
+        if self._owned:
+            self._file.close()
+        elif hasattr(self._file, 'flush'):
+            self._file.flush()
+
+
+class OrderExporter:
+    def __init__(self, order_service=None, fields=None, page_size: int = 100, buffer_size: int = 1 << 20,
+                 compression: str = None, codec=None):
+        if type(buffer_size) is not int or buffer_size < 1:
+            raise ShipdayException('Buffer size must be a positive integer')
+        if fields is None:
+            fields = DEFAULT_FIELDS
+        elif type(fields) in (list, tuple):
+            fields = {path: path for path in fields}
+        elif type(fields) is not dict:
+            raise ShipdayException('Fields must be a list of paths or a dict of column to path')
+        self._service = order_service
+        self._columns = list(fields)
+        self._paths = [_compile_path(path) for path in fields.values()]
+        self._types = [PARQUET_TYPES.get(path, 'string') for path in fields.values()]
+        self._page_size = page_size
+        self._buffer_size = buffer_size
+        self._compression = compression
+        self._codec = get_codec(codec)
+
+    def __iter_orders(self, query: OrderQuery) -> Iterable[dict]:
+        if self._service is None:
+            raise ShipdayException('OrderExporter needs an OrderService to run queries')
+        return self._service.iter_query(query, page_size=self._page_size)
+
+    def project(self, order: dict) -> list:
+        return [_resolve(order, keys) for keys in self._paths]
+
+    def to_ndjson(self, query: OrderQuery, destination) -> int:
+        return self.write_ndjson(self.__iter_orders(query), destination)
+
+    def to_csv(self, query: OrderQuery, destination) -> int:
+        return self.write_csv(self.__iter_orders(query), destination)
+
+    def to_parquet(self, query: OrderQuery, destination, row_group_size: int = 10000, schema=None) -> int:
+        return self.write_parquet(self.__iter_orders(query), destination, row_group_size, schema)
+
+    def write_ndjson(self, orders: Iterable[dict], destination) -> int:
+        sink = _Sink(destination, self._compression, self._buffer_size)
+        encode, columns, count = self._codec.encode, self._columns, 0
+        try:
+            for order in orders:
+                sink.write(encode(dict(zip(columns, self.project(order)))))
+                sink.write(b'\n')
+                count += 1
+        finally:
+            sink.close()
+        return count
+
+    def write_csv(self, orders: Iterable[dict], destination) -> int:
+        sink = _Sink(destination, self._compression, self._buffer_size)
+        text = io.StringIO()
+        writer = csv.writer(text)
+        writer.writerow(self._columns)
+        count = 0
+        try:
+            for order in orders:
+                writer.writerow([self.__to_cell(value) for value in self.project(order)])
+                count += 1
+                if text.tell() >= self._buffer_size:
+                    sink.write(text.getvalue().encode('utf-8'))
+                    text.seek(0)
+                    text.truncate()
+            sink.write(text.getvalue().encode('utf-8'))
+        finally:
+            sink.close()
+        return count
+
+    def __to_cell(self, value):
+        # Nested values such as the order items are written as JSON
+        if type(value) is dict or type(value) is list:
+            return self._codec.encode(value).decode('utf-8')
+        return value
+
+    def get_parquet_schema(self):
+        import pyarrow
+        return pyarrow.schema([(name, getattr(pyarrow, type_name)())
+                               for name, type_name in zip(self._columns, self._types)])
+
+    def write_parquet(self, orders: Iterable[dict], destination, row_group_size: int = 10000, schema=None) -> int:
+        # The schema is fixed up front, types inferred from the first row group break on a column that is empty
+        # there or holds other numbers later. Pass a pyarrow schema for columns of your own paths.
+        if self._compression not in PARQUET_COMPRESSIONS:
+            raise ShipdayException('Parquet export does not support {} compression, use gzip or none'
+                                   .format(self._compression))
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ShipdayException('Parquet export requires pyarrow, install shipday[export]') from e
+        if type(row_group_size) is not int or row_group_size < 1:
+            raise ShipdayException('Row group size must be a positive integer')
+        if schema is None:
+            schema = self.get_parquet_schema()
+        elif schema.names != self._columns:
+            raise ShipdayException('Parquet schema must have the exporter columns in order')
+        # Text columns also take numbers and nested values of paths without a known type
+        text = [pyarrow.types.is_string(field.type) or pyarrow.types.is_large_string(field.type)
+                for field in schema]
+        writer = pyarrow.parquet.ParquetWriter(destination, schema,
+                                               compression=PARQUET_COMPRESSIONS[self._compression])
+        columns = [[] for _ in self._columns]
+        count = 0
+
+        def write_row_group():
+            writer.write_table(pyarrow.table(dict(zip(self._columns, columns)), schema=schema))
+            for values in columns:
+                values.clear()
+
+        try:
+            for order in orders:
+                for values, value, is_text in zip(columns, self.project(order), text):
+                    value = self.__to_cell(value)
+                    values.append(str(value) if is_text and value is not None and type(value) is not str
+                                  else value)
+                count += 1
+                if count % row_group_size == 0:
+                    write_row_group()
+            if count % row_group_size or count == 0:
+                write_row_group()
+        finally:
+            writer.close()
+        return count
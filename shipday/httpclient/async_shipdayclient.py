@@ -0,0 +1,313 @@
+import asyncio
+import time
+from typing import Any
+
+from shipday.exceptions import ShipdayException, ShipdayRateLimitException
+from shipday.httpclient.codec import get_codec
+from shipday.httpclient.fair_scheduler import Flow
+from shipday.httpclient.instrumentation import RequestTrace, get_endpoint, get_hooks
+from shipday.httpclient.rate_limiter import RateLimiter, get_rate_limit_details
+from shipday.httpclient.response_cache import ResponseCache
+from shipday.httpclient.retry_policy import RetryPolicy
+from shipday.httpclient.shipdayclient import BASE_URL
+from shipday.httpclient.single_flight import AsyncSingleFlight
+from shipday.utils.profiling import NULL_PHASE, get_phase, get_profiler
+
+
+class AsyncShipdayClient:
+    def __init__(self, *args, api_key, **kwargs):
+        self._api_key = api_key
+        self._timeout = kwargs['timeout'] if 'timeout' in kwargs else 1000
+        self._base_url = self.__get_base_url_(kwargs['base_url'] if 'base_url' in kwargs else None)
+        self._pool_maxsize = kwargs['pool_maxsize'] if 'pool_maxsize' in kwargs else 100
+        self._keep_alive = kwargs['keep_alive'] if 'keep_alive' in kwargs else True
+        self._max_concurrency = kwargs['max_concurrency'] if 'max_concurrency' in kwargs else 100
+        self._rate_limiter: RateLimiter = kwargs['rate_limiter'] if 'rate_limiter' in kwargs else None
+        self._retry_policy: RetryPolicy = kwargs['retry_policy'] if 'retry_policy' in kwargs else None
+        self._response_cache: ResponseCache = kwargs['response_cache'] if 'response_cache' in kwargs else None
+        self._scheduler: Flow = kwargs['scheduler'] if 'scheduler' in kwargs else None
+        self._codec = get_codec(kwargs['codec'] if 'codec' in kwargs else None)
+        self._hooks = get_hooks(kwargs['hooks'] if 'hooks' in kwargs else None)
+        self._profiler = get_profiler(kwargs['profiler'] if 'profiler' in kwargs else None)
+        # Identical GETs in flight at the same time share one request
+        self._single_flight = AsyncSingleFlight() if (kwargs['coalesce'] if 'coalesce' in kwargs else True) else None
+        self._headers = self.__build_headers_()
+        self._session = None
+        self._semaphore = None
+
+    @staticmethod
+    def __get_base_url_(base_url: str) -> str:
+        if base_url is None:
+            return BASE_URL
+        if type(base_url) is not str or not base_url.startswith(('http://', 'https://')):
+            raise ShipdayException('Base url must be an http or https url')
+        return base_url if base_url.endswith('/') else base_url + '/'
+
+    def __get_headers_(self):
+        return self._headers
+
+    def __build_headers_(self):
+        return {
+            'Authorization': 'Basic {}'.format(self._api_key),
+            'Content-Type': 'application/json',
+        }
+
+    def __get_session_(self):
+        if self._session is None:
+            try:
+                import aiohttp
+            except ImportError as e:
+                raise ShipdayException('AsyncShipdayClient requires aiohttp, install shipday[async]') from e
+            connector = aiohttp.TCPConnector(limit=self._pool_maxsize, limit_per_host=self._pool_maxsize,
+                                             force_close=not self._keep_alive)
+            trace_configs = [self.__create_trace_config_(aiohttp)] if self._hooks is not None else None
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+        return self._session
+
+    @staticmethod
+    def __create_trace_config_(aiohttp):
+        # Times new connections for the request hooks, reused connections report no connect time
+        async def on_connection_create_start(session, context, params):
+            context.connect_started = time.perf_counter()
+
+        async def on_connection_create_end(session, context, params):
+            trace = context.trace_request_ctx
+            if trace is not None:
+                trace.connect_time += time.perf_counter() - context.connect_started
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    def __get_semaphore_(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    async def __acquire_slot_(self):
+        # Requests of all the clients sharing the scheduler take turns for its slots before the client's own limit
+        if self._scheduler is not None:
+            await self._scheduler.acquire()
+        try:
+            await self.__get_semaphore_().acquire()
+        except BaseException:
+            if self._scheduler is not None:
+                self._scheduler.release()
+            raise
+
+    def __release_slot_(self):
+        self.__get_semaphore_().release()
+        if self._scheduler is not None:
+            self._scheduler.release()
+
+    def __create_url_(self, suffix: str) -> str:
+        return self._base_url + suffix
+
+    def __check_status_(self, suffix: str, response: Any, body: bytes, trace: RequestTrace = None):
+        if self._rate_limiter is None and response.status != 429:
+            if trace is not None:
+                trace.response(response.status, len(body) if body is not None else response.content_length)
+            return
+        details = get_rate_limit_details(response.headers)
+        if trace is not None:
+            trace.response(response.status, len(body) if body is not None else response.content_length,
+                           details['retry_after'])
+        if self._rate_limiter is not None:
+            self._rate_limiter.update(suffix, response.status, details)
+        if response.status == 429:
+            raise ShipdayRateLimitException(body.decode('utf-8', 'replace'), **details)
+
+    async def __send_(self, method: str, suffix: str, data: dict = None, stream: bool = False,
+                      trace: RequestTrace = None):
+        session = self.__get_session_()
+        waited = 0.0
+        if self._rate_limiter is not None:
+            with get_phase('wait'):
+                waited = await self._rate_limiter.acquire_async(suffix)
+        payload = None
+        if data is not None:
+            with get_phase('encode'):
+                payload = self._codec.encode(data)
+        headers = self.__get_headers_()
+        queued = time.perf_counter()
+        with get_phase('wait'):
+            await self.__acquire_slot_()
+        try:
+            if trace is not None:
+                headers = trace.send(headers, len(payload) if payload is not None else 0,
+                                     waited + time.perf_counter() - queued)
+            try:
+                with get_phase('network'):
+                    if stream:
+                        # The caller reads a successful body, error bodies are read here for their message
+                        response = await session.request(method, self.__create_url_(suffix), data=payload,
+                                                         headers=headers, trace_request_ctx=trace)
+                        try:
+                            body = await response.read() if response.status >= 400 else None
+                        except BaseException:
+                            response.close()
+                            raise
+                    else:
+                        async with session.request(method, self.__create_url_(suffix), data=payload,
+                                                   headers=headers, trace_request_ctx=trace) as response:
+                            body = await response.read()
+            except Exception as e:
+                if trace is not None:
+                    trace.error(e)
+                raise
+        finally:
+            # A streamed request only holds the slot up to its headers, a caller that stops reading the body
+            # must not hold it until the generator is collected
+            self.__release_slot_()
+        self.__check_status_(suffix, response, body, trace)
+        return response, body
+
+    async def __request_(self, method: str, suffix: str, data: dict = None, decode: bool = True,
+                         idempotent: bool = None, dedupe=None, stream: bool = False):
+        policy = self._retry_policy
+        trace = RequestTrace(self._hooks, method, suffix) if self._hooks is not None else None
+        if policy is None:
+            return self.__finish_(await self.__send_(method, suffix, data, stream, trace), None, decode)
+
+        import aiohttp
+        if idempotent is None:
+            idempotent = method != 'POST'
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            result, error, retry_after = None, None, None
+            try:
+                result = await self.__send_(method, suffix, data, stream, trace)
+            except ShipdayRateLimitException as e:
+                if not policy.is_retryable_status(429):
+                    raise
+                error, retry_after = e, e.retry_after
+            except Exception as e:
+                if not policy.is_retryable_exception(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+                    raise
+                error = e
+            if result is not None and not policy.is_retryable_status(result[0].status):
+                return self.__finish_(result, None, decode)
+            if result is not None and stream:
+                result[0].close()
+
+            # A rate limited request was never processed, anything else may have reached the server
+            maybe_processed = not isinstance(error, (ShipdayRateLimitException, aiohttp.ClientConnectorError))
+            if self._rate_limiter is not None:
+                retry_after = None
+            delay = policy.next_delay(attempt, started, retry_after)
+            if delay is None or (maybe_processed and not idempotent and dedupe is None):
+                return self.__finish_(result, error, decode)
+
+            if trace is not None:
+                trace.retry(delay)
+            with get_phase('wait'):
+                await asyncio.sleep(delay)
+            if maybe_processed and not idempotent:
+                try:
+                    existing = await dedupe()
+                except Exception:
+                    # We can not tell whether the request went through, so it is not sent again
+                    return self.__finish_(result, error, decode)
+                if existing is not None:
+                    return existing
+
+    def __finish_(self, result, error: Exception, decode: bool):
+        if error is not None:
+            raise error
+        if not decode:
+            return result
+        with get_phase('decode'):
+            return self._codec.decode(result[1])
+
+    def __profile_(self, method: str, suffix: str):
+        # Requests made outside a profiled service method are reported per endpoint
+        if self._profiler is None:
+            return NULL_PHASE
+        return self._profiler.call('{} {}'.format(method, get_endpoint(method, suffix)))
+
+    def set_api_key(self, api_key: str):
+        self._api_key = api_key
+        self._headers = self.__build_headers_()
+        # Cached and in flight reads belong to the previous account
+        if self._single_flight is not None:
+            self._single_flight.forget(('',))
+        if self._response_cache is not None:
+            self._response_cache.clear()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def __invalidate_(self, invalidates):
+        if self._single_flight is not None and invalidates:
+            self._single_flight.forget(invalidates)
+        if self._response_cache is not None and invalidates:
+            self._response_cache.invalidate(invalidates)
+
+    async def get(self, suffix: str, raw: bool = False, fresh: bool = False):
+        # fresh reads skip the cache and in flight requests, for checks that must see the latest state
+        with self.__profile_('GET', suffix):
+            cache = self._response_cache
+            if fresh or (cache is None and self._single_flight is None):
+                if raw:
+                    response, body = await self.__request_('GET', suffix, decode=False)
+                    return body
+                return await self.__request_('GET', suffix)
+            body = cache.get(suffix) if cache is not None else None
+            if body is None:
+                body = await self.__fetch_(suffix) if self._single_flight is None \
+                    else await self._single_flight.do(suffix, self.__fetch_, suffix)
+            if raw:
+                return body
+            with get_phase('decode'):
+                return self._codec.decode(body)
+
+    async def __fetch_(self, suffix: str) -> bytes:
+        # Shared callers get the raw body and decode their own copy
+        cache = self._response_cache
+        generation = cache.get_generation() if cache is not None else None
+        response, body = await self.__request_('GET', suffix, decode=False)
+        if cache is not None and response.status == 200:
+            cache.set(suffix, body, generation)
+        return body
+
+    async def iter_get(self, suffix: str, chunk_size: int = 65536):
+        response, body = await self.__request_('GET', suffix, decode=False, stream=True)
+        try:
+            if response.status >= 400:
+                raise ShipdayException(body.decode('utf-8', 'replace'))
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+        finally:
+            response.close()
+
+    async def post(self, suffix: str, data: dict, idempotent: bool = False, dedupe=None, invalidates=(),
+                   raw: bool = False):
+        with self.__profile_('POST', suffix):
+            try:
+                if raw:
+                    response, body = await self.__request_('POST', suffix, data, decode=False,
+                                                           idempotent=idempotent)
+                    return body
+                return await self.__request_('POST', suffix, data, idempotent=idempotent, dedupe=dedupe)
+            finally:
+                self.__invalidate_(invalidates)
+
+    async def put(self, suffix: str, data: dict, invalidates=()):
+        with self.__profile_('PUT', suffix):
+            try:
+                return await self.__request_('PUT', suffix, data)
+            finally:
+                self.__invalidate_(invalidates)
+
+    async def delete(self, suffix: str, invalidates=()):
+        with self.__profile_('DELETE', suffix):
+            try:
+                response, body = await self.__request_('DELETE', suffix, decode=False)
+                return response
+            finally:
+                self.__invalidate_(invalidates)
@@ -0,0 +1,63 @@
+import json
+
+from shipday.exceptions import ShipdayException
+
+
+class JsonCodec:
+    name = 'json'
+    decode_errors = (ValueError,)
+
+    def encode(self, obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def decode(self, body: bytes):
+        return json.loads(body)
+
+
+class OrjsonCodec:
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.encode = orjson.dumps
+        self.decode = orjson.loads
+        self.decode_errors = (orjson.JSONDecodeError,)
+
+
+class MsgspecCodec:
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self.encode = msgspec.json.Encoder().encode
+        self.decode = msgspec.json.Decoder().decode
+        self.decode_errors = (msgspec.DecodeError,)
+
+
+CODECS = {
+    'orjson': OrjsonCodec,
+    'msgspec': MsgspecCodec,
+    'json': JsonCodec,
+}
+
+
+def get_decode_errors(codec) -> tuple:
+    # Custom codecs without decode_errors are expected to raise ValueError like json.loads
+    return getattr(codec, 'decode_errors', (ValueError,))
+
+
+def get_codec(codec=None):
+    if codec is None:
+        for codec_class in CODECS.values():
+            try:
+                return codec_class()
+            except ImportError:
+                continue
+    if type(codec) is str:
+        if codec not in CODECS:
+            raise ShipdayException('Unknown JSON codec: {}'.format(codec))
+        try:
+            return CODECS[codec]()
+        except ImportError as e:
+            raise ShipdayException('JSON codec {} is not installed'.format(codec)) from e
+    return codec
@@ -0,0 +1,146 @@
+import heapq
+import itertools
+import threading
+import time
+
+from shipday.exceptions import ShipdayException
+
+
+class Flow:
+    # The handle a client uses to take its turn in a scheduler
+    __slots__ = ('scheduler', 'name')
+
+    def __init__(self, scheduler, name):
+        self.scheduler = scheduler
+        self.name = name
+
+    @property
+    def weight(self) -> float:
+        return self.scheduler.get_weight(self.name)
+
+    @weight.setter
+    def weight(self, weight: float):
+        self.scheduler.set_weight(self.name, weight)
+
+    def acquire(self, cost: float = 1.0):
+        return self.scheduler.acquire(self.name, cost)
+
+    def release(self):
+        self.scheduler.release()
+
+
+class _FairQueue:
+    # Self clocked weighted fair queueing: each request gets a finish tag of
+    # max(virtual time, previous tag of its flow) + cost / weight and free slots go to the smallest tag.
+    # A flow that queues a thousand requests only pushes its own tags out, the next request of an idle flow
+    # starts at the current virtual time and is sent before most of them.
+    def __init__(self, max_in_flight: int = 10):
+        if type(max_in_flight) is not int or max_in_flight < 1:
+            raise ShipdayException('Max in flight must be a positive integer')
+        self._max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._weights = {}
+        self._finish = {}
+        self._waiting = []
+        self._sequence = itertools.count()
+
+    def get_flow(self, name, weight: float = None) -> Flow:
+        if weight is not None:
+            self.set_weight(name, weight)
+        return Flow(self, name)
+
+    def get_weight(self, name) -> float:
+        return self._weights.get(name, 1.0)
+
+    def set_weight(self, name, weight: float):
+        if type(weight) not in (int, float) or weight <= 0:
+            raise ShipdayException('Weight must be a positive number')
+        self._weights[name] = float(weight)
+
+    def remove_flow(self, name):
+        self._weights.pop(name, None)
+        self._finish.pop(name, None)
+
+    def _get_tag(self, name, cost: float) -> float:
+        tag = max(self._virtual_time, self._finish.get(name, 0.0)) + cost / self._weights.get(name, 1.0)
+        self._finish[name] = tag
+        return tag
+
+    def _is_free(self) -> bool:
+        return self._in_flight < self._max_in_flight and not self._waiting
+
+    def get_stats(self) -> dict:
+        return {'in_flight': self._in_flight, 'waiting': len(self._waiting), 'flows': len(self._finish),
+                'virtual_time': self._virtual_time}
+
+
+class FairScheduler(_FairQueue):
+    def __init__(self, max_in_flight: int = 10):
+        super().__init__(max_in_flight)
+        self._lock = threading.Lock()
+
+    def acquire(self, name, cost: float = 1.0) -> float:
+        with self._lock:
+            tag = self._get_tag(name, cost)
+            if self._is_free():
+                self._in_flight += 1
+                self._virtual_time = tag
+                return 0.0
+            turn = threading.Event()
+            heapq.heappush(self._waiting, (tag, next(self._sequence), turn))
+        started = time.perf_counter()
+        turn.wait()
+        return time.perf_counter() - started
+
+    def release(self):
+        with self._lock:
+            if not self._waiting:
+                self._in_flight -= 1
+                return
+            # The slot is handed straight to the next request
+            tag, _, turn = heapq.heappop(self._waiting)
+            self._virtual_time = tag
+            turn.set()
+
+    def set_weight(self, name, weight: float):
+        with self._lock:
+            super().set_weight(name, weight)
+
+    def remove_flow(self, name):
+        with self._lock:
+            super().remove_flow(name)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return super().get_stats()
+
+
+class AsyncFairScheduler(_FairQueue):
+    async def acquire(self, name, cost: float = 1.0) -> float:
+        import asyncio
+        tag = self._get_tag(name, cost)
+        if self._is_free():
+            self._in_flight += 1
+            self._virtual_time = tag
+            return 0.0
+        turn = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (tag, next(self._sequence), turn))
+        started = time.perf_counter()
+        try:
+            await turn
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation
+            if turn.done() and not turn.cancelled():
+                self.release()
+            raise
+        return time.perf_counter() - started
+
+    def release(self):
+        while self._waiting:
+            tag, _, turn = heapq.heappop(self._waiting)
+            if not turn.done():
+                self._virtual_time = tag
+                turn.set_result(None)
+                return
+        self._in_flight -= 1
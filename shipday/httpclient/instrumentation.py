@@ -0,0 +1,308 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from shipday.exceptions import ShipdayException
+
+# Endpoint templates reported instead of raw urls, a None method matches any method
+ENDPOINTS = (
+    (None, 'orders/'),
+    (None, 'orders/query/'),
+    (None, 'orders/assign/{order_id}/{carrier_id}'),
+    ('DELETE', 'orders/{order_id}'),
+    (None, 'orders/{order_number}'),
+    (None, 'order/edit/{order_id}'),
+    (None, 'carriers/'),
+    (None, 'carriers/{carrier_id}'),
+    (None, 'on-demand/services'),
+    (None, 'on-demand/estimate/{order_id}'),
+    (None, 'on-demand/assign'),
+    (None, 'on-demand/cancel/{order_id}'),
+    (None, 'on-demand/details/{order_id}'),
+    (None, 'third-party/availability'),
+)
+HOOK_NAMES = ('before_send', 'after_response', 'on_error', 'on_retry', 'on_rate_limit')
+
+logger = logging.getLogger(__name__)
+
+
+def _compile_template(template: str):
+    return re.compile(re.sub(r'\\{\w+\\}', '[^/]+', re.escape(template)))
+
+
+_PATTERNS = tuple((method, _compile_template(template), template) for method, template in ENDPOINTS)
+
+
+@lru_cache(maxsize=1024)
+def get_endpoint(method: str, suffix: str) -> str:
+    path = suffix.split('?', 1)[0]
+    for endpoint_method, pattern, template in _PATTERNS:
+        if (endpoint_method is None or endpoint_method == method) and pattern.fullmatch(path):
+            return template
+    # Unknown paths keep their shape with the ids taken out
+    return re.sub(r'(?<=/)\d+(?=/|$)', '{id}', path)
+
+
+class RequestEvent:
+    __slots__ = ('method', 'endpoint', 'attempt', 'headers', 'status', 'bytes_out', 'bytes_in', 'queue_wait',
+                 'connect_time', 'latency', 'total', 'backoff', 'error', 'retry_delay', 'retry_after', 'context')
+
+    def __init__(self, method: str, endpoint: str, attempt: int):
+        self.method = method
+        self.endpoint = endpoint
+        self.attempt = attempt
+        self.headers = None
+        self.status = None
+        self.bytes_out = 0
+        self.bytes_in = None
+        self.queue_wait = 0.0
+        self.connect_time = 0.0
+        self.latency = None
+        self.total = None
+        self.backoff = 0.0
+        self.error = None
+        self.retry_delay = None
+        self.retry_after = None
+        # Per attempt storage for hooks, for example an open span
+        self.context = {}
+
+    def __repr__(self):
+        return 'RequestEvent({} {} attempt={} status={})'.format(self.method, self.endpoint, self.attempt,
+                                                                 self.status)
+
+
+class RequestHooks:
+    # Subclasses override the callbacks they need, before_send may add headers to event.headers
+    def before_send(self, event: RequestEvent):
+        pass
+
+    def after_response(self, event: RequestEvent):
+        pass
+
+    def on_error(self, event: RequestEvent):
+        pass
+
+    def on_retry(self, event: RequestEvent):
+        pass
+
+    def on_rate_limit(self, event: RequestEvent):
+        pass
+
+
+class HookChain:
+    def __init__(self, hooks):
+        hooks = list(hooks) if type(hooks) in (list, tuple) else [hooks]
+        if not hooks:
+            raise ShipdayException('At least one hook is required')
+        for name in HOOK_NAMES:
+            callbacks = [getattr(hook, name) for hook in hooks if callable(getattr(hook, name, None))]
+            setattr(self, name, self.__chain(name, callbacks))
+
+    @staticmethod
+    def __chain(name: str, callbacks: list):
+        def call(event: RequestEvent):
+            for callback in callbacks:
+                try:
+                    callback(event)
+                except Exception:
+                    # Hooks only observe the request, one that fails is logged and the request and the other
+                    # hooks carry on
+                    logger.exception('Request hook %s failed for %s %s', getattr(callback, '__qualname__', name),
+                                     event.method, event.endpoint)
+        return call
+
+
+def get_hooks(hooks):
+    return HookChain(hooks) if hooks is not None else None
+
+
+# Time spent opening connections on the current thread, filled in by the timed connections of the sync client
+_connect_time = threading.local()
+
+
+def add_connect_time(seconds: float):
+    _connect_time.value = getattr(_connect_time, 'value', 0.0) + seconds
+
+
+def pop_connect_time() -> float:
+    value = getattr(_connect_time, 'value', 0.0)
+    _connect_time.value = 0.0
+    return value
+
+
+class RequestTrace:
+    # Follows one client call across its attempts and reports each of them to the hooks
+    def __init__(self, hooks: HookChain, method: str, suffix: str):
+        self.hooks = hooks
+        self.method = method
+        self.endpoint = get_endpoint(method, suffix)
+        self.started = time.perf_counter()
+        self.attempt = 0
+        self.backoff = 0.0
+        self.connect_time = 0.0
+        self.event = None
+        self._sent = None
+
+    def send(self, headers: dict, bytes_out: int, queue_wait: float) -> dict:
+        self.attempt += 1
+        event = self.event = RequestEvent(self.method, self.endpoint, self.attempt)
+        event.headers = dict(headers)
+        event.bytes_out = bytes_out
+        event.queue_wait = queue_wait
+        event.backoff = self.backoff
+        self.hooks.before_send(event)
+        pop_connect_time()
+        self.connect_time = 0.0
+        self._sent = time.perf_counter()
+        return event.headers
+
+    def __finish(self) -> RequestEvent:
+        event = self.event
+        now = time.perf_counter()
+        event.latency = now - self._sent
+        event.total = now - self.started
+        event.connect_time = self.connect_time + pop_connect_time()
+        return event
+
+    def response(self, status: int, bytes_in: int, retry_after: float = None):
+        event = self.__finish()
+        event.status = status
+        event.bytes_in = bytes_in
+        if status == 429:
+            event.retry_after = retry_after
+            self.hooks.on_rate_limit(event)
+        self.hooks.after_response(event)
+
+    def error(self, error: Exception):
+        event = self.__finish()
+        event.error = error
+        self.hooks.on_error(event)
+
+    def retry(self, delay: float):
+        event = self.event
+        event.retry_delay = delay
+        self.backoff += delay
+        self.hooks.on_retry(event)
+
+
+def _new_stats() -> dict:
+    return {'requests': 0, 'errors': 0, 'retries': 0, 'rate_limited': 0, 'statuses': {}, 'bytes_in': 0,
+            'bytes_out': 0, 'queue_wait': 0.0, 'connect_time': 0.0, 'backoff': 0.0, 'latency_sum': 0.0}
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class MetricsCollector(RequestHooks):
+    def __init__(self, window: int = 1024):
+        # Latency percentiles are computed over the last window attempts of each endpoint
+        if type(window) is not int or window < 1:
+            raise ShipdayException('Window must be a positive integer')
+        self._window = window
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._latencies = {}
+
+    def __get_stats(self, event: RequestEvent) -> dict:
+        key = '{} {}'.format(event.method, event.endpoint)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _new_stats()
+            self._latencies[key] = deque(maxlen=self._window)
+        return stats
+
+    def __record(self, event: RequestEvent) -> dict:
+        stats = self.__get_stats(event)
+        stats['requests'] += 1
+        stats['bytes_out'] += event.bytes_out or 0
+        stats['bytes_in'] += event.bytes_in or 0
+        stats['queue_wait'] += event.queue_wait
+        stats['connect_time'] += event.connect_time
+        stats['latency_sum'] += event.latency
+        self._latencies['{} {}'.format(event.method, event.endpoint)].append(event.latency)
+        return stats
+
+    def after_response(self, event: RequestEvent):
+        with self._lock:
+            statuses = self.__record(event)['statuses']
+            statuses[event.status] = statuses.get(event.status, 0) + 1
+
+    def on_error(self, event: RequestEvent):
+        with self._lock:
+            self.__record(event)['errors'] += 1
+
+    def on_retry(self, event: RequestEvent):
+        with self._lock:
+            stats = self.__get_stats(event)
+            stats['retries'] += 1
+            stats['backoff'] += event.retry_delay
+
+    def on_rate_limit(self, event: RequestEvent):
+        with self._lock:
+            self.__get_stats(event)['rate_limited'] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snapshot = {}
+            for key, stats in self._stats.items():
+                stats = dict(stats, statuses=dict(stats['statuses']))
+                ordered = sorted(self._latencies[key])
+                if ordered:
+                    stats['latency'] = {'p50': _percentile(ordered, 0.5), 'p90': _percentile(ordered, 0.9),
+                                        'p99': _percentile(ordered, 0.99), 'max': ordered[-1]}
+                snapshot[key] = stats
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._latencies.clear()
+
+
+class OpenTelemetryHooks(RequestHooks):
+    def __init__(self, tracer=None, propagate: bool = True):
+        try:
+            from opentelemetry import trace, propagate as propagation
+        except ImportError as e:
+            raise ShipdayException('OpenTelemetryHooks requires opentelemetry-api, install shipday[otel]') from e
+        self._trace = trace
+        self._propagation = propagation
+        self._tracer = tracer if tracer is not None else trace.get_tracer('shipday')
+        self._propagate = propagate
+
+    def before_send(self, event: RequestEvent):
+        span = self._tracer.start_span('{} {}'.format(event.method, event.endpoint), kind=self._trace.SpanKind.CLIENT,
+                                       attributes={'http.request.method': event.method, 'url.template': event.endpoint,
+                                                   'http.request.resend_count': event.attempt - 1,
+                                                   'http.request.body.size': event.bytes_out,
+                                                   'shipday.queue_wait': event.queue_wait})
+        event.context['otel_span'] = span
+        if self._propagate:
+            # Adds the traceparent header so the server side joins the trace
+            self._propagation.inject(event.headers, context=self._trace.set_span_in_context(span))
+
+    def after_response(self, event: RequestEvent):
+        span = event.context.pop('otel_span', None)
+        if span is None:
+            return
+        span.set_attribute('http.response.status_code', event.status)
+        if event.bytes_in is not None:
+            span.set_attribute('http.response.body.size', event.bytes_in)
+        span.set_attribute('shipday.connect_time', event.connect_time)
+        if event.retry_after is not None:
+            span.set_attribute('shipday.retry_after', event.retry_after)
+        if event.status >= 500:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end()
+
+    def on_error(self, event: RequestEvent):
+        span = event.context.pop('otel_span', None)
+        if span is None:
+            return
+        span.record_exception(event.error)
+        span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(event.error)))
+        span.end()
@@ -0,0 +1,151 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from shipday.exceptions import ShipdayException
+
+DEFAULT_BUCKET = 'default'
+
+
+def parse_retry_after(value) -> float:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # HTTP dates are rare, so email.utils is only imported when one shows up
+    from email.utils import parsedate_to_datetime
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def parse_reset(value) -> float:
+    if value is None:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return parse_retry_after(value)
+    # Large values are epoch timestamps, small ones are seconds until reset
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def parse_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_rate_limit_details(headers) -> dict:
+    return {
+        'retry_after': parse_retry_after(headers.get('Retry-After')),
+        'limit': parse_int(headers.get('X-RateLimit-Limit')),
+        'remaining': parse_int(headers.get('X-RateLimit-Remaining')),
+        'reset': parse_reset(headers.get('X-RateLimit-Reset')),
+    }
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        if type(rate) not in (int, float) or rate <= 0:
+            raise ShipdayException('Rate must be a positive number')
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._generation = 0
+        # When the last block came in and until when it stalls the bucket
+        self._blocked = (0.0, 0.0)
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            delay = (self._updated - now) + max(0.0, -self._tokens) / self.rate
+            return delay, self._generation
+
+    def block(self, seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            until = now + seconds
+            if until > self._updated:
+                self._updated = until
+            self._tokens = min(self._tokens, 1.0)
+            self._blocked = (now, until)
+            self._generation += 1
+
+    def reschedule(self, ready: float) -> tuple:
+        # Moves a reservation that was due at ready behind the last block, it keeps the token it already took
+        with self._lock:
+            blocked_at, until = self._blocked
+            ready = until + max(0.0, ready - blocked_at)
+            return max(0.0, ready - time.monotonic()), self._generation, ready
+
+    def generation(self) -> int:
+        return self._generation
+
+
+class RateLimiter:
+    def __init__(self, rate: float, capacity: float = None, limits: dict = None, default_retry_after: float = 1.0):
+        self._buckets = {DEFAULT_BUCKET: TokenBucket(rate, capacity)}
+        for prefix, limit in (limits or {}).items():
+            self._buckets[prefix] = TokenBucket(*limit) if type(limit) in (tuple, list) else TokenBucket(limit)
+        # The longest prefix wins, so orders/query/ is not shadowed by orders/
+        self._prefixes = sorted(((prefix, bucket) for prefix, bucket in self._buckets.items()
+                                 if prefix != DEFAULT_BUCKET), key=lambda t: -len(t[0]))
+        self._default_retry_after = default_retry_after
+
+    def get_bucket(self, suffix: str) -> TokenBucket:
+        for prefix, bucket in self._prefixes:
+            if suffix.startswith(prefix):
+                return bucket
+        return self._buckets[DEFAULT_BUCKET]
+
+    def acquire(self, suffix: str) -> float:
+        bucket = self.get_bucket(suffix)
+        waited = 0.0
+        delay, generation = bucket.reserve()
+        ready = time.monotonic() + delay
+        while delay > 0:
+            time.sleep(delay)
+            waited += delay
+            delay = 0.0
+            if bucket.generation() != generation:
+                delay, generation, ready = bucket.reschedule(ready)
+        return waited
+
+    async def acquire_async(self, suffix: str) -> float:
+        import asyncio
+        bucket = self.get_bucket(suffix)
+        waited = 0.0
+        delay, generation = bucket.reserve()
+        ready = time.monotonic() + delay
+        while delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = 0.0
+            if bucket.generation() != generation:
+                delay, generation, ready = bucket.reschedule(ready)
+        return waited
+
+    def update(self, suffix: str, status_code: int, details: dict):
+        if status_code == 429:
+            stall = details['retry_after']
+            if stall is None:
+                stall = details['reset']
+            self.get_bucket(suffix).block(stall if stall is not None else self._default_retry_after)
+        elif details['remaining'] == 0 and details['reset'] is not None:
+            self.get_bucket(suffix).block(details['reset'])
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+from shipday.exceptions import ShipdayException
+
+DEFAULT_TTLS = {
+    'orders/': 5.0,
+    'carriers/': 30.0,
+    'on-demand/details/': 5.0,
+}
+
+
+class ResponseCache:
+    def __init__(self, max_size: int = 1024, ttls: dict = None, default_ttl: float = 0.0):
+        if type(max_size) is not int or max_size < 1:
+            raise ShipdayException('Max size must be a positive integer')
+        self._max_size = max_size
+        self._ttls = sorted((ttls if ttls is not None else DEFAULT_TTLS).items(), key=lambda t: -len(t[0]))
+        self._default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        # Bumped by every invalidation, a read sent before one must not store its older body
+        self._generation = 0
+
+    def get_ttl(self, suffix: str) -> float:
+        for prefix, ttl in self._ttls:
+            if suffix.startswith(prefix):
+                return ttl
+        return self._default_ttl
+
+    def get(self, suffix: str) -> bytes:
+        if not self.get_ttl(suffix):
+            return None
+        with self._lock:
+            entry = self._entries.get(suffix)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[suffix]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(suffix)
+            self._hits += 1
+            return entry[1]
+
+    def get_generation(self) -> int:
+        return self._generation
+
+    def set(self, suffix: str, body: bytes, generation: int = None):
+        ttl = self.get_ttl(suffix)
+        if not ttl:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[suffix] = (time.monotonic() + ttl, body)
+            self._entries.move_to_end(suffix)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, prefixes):
+        with self._lock:
+            self._generation += 1
+            stale = [suffix for suffix in self._entries if suffix.startswith(tuple(prefixes))]
+            for suffix in stale:
+                del self._entries[suffix]
+            self._invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
@@ -0,0 +1,38 @@
+import random
+import time
+
+from shipday.exceptions import ShipdayException
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, retry_on_status=(429, 500, 502, 503, 504), retry_on_exceptions=(),
+                 total_budget: float = 30.0, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        if type(max_attempts) is not int or max_attempts < 1:
+            raise ShipdayException('Max attempts must be a positive integer')
+        self.max_attempts = max_attempts
+        self.retry_on_status = frozenset(retry_on_status)
+        self.retry_on_exceptions = tuple(retry_on_exceptions)
+        self.total_budget = total_budget
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        return status_code in self.retry_on_status
+
+    def is_retryable_exception(self, exception: Exception, transport_errors: tuple = ()) -> bool:
+        return isinstance(exception, self.retry_on_exceptions + tuple(transport_errors))
+
+    def get_backoff(self, attempt: int, retry_after: float = None) -> float:
+        # Full jitter: a uniform delay between 0 and the capped exponential backoff
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def next_delay(self, attempt: int, started: float, retry_after: float = None) -> float:
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.get_backoff(attempt, retry_after)
+        if self.total_budget is not None and time.monotonic() - started + delay > self.total_budget:
+            return None
+        return delay
@@ -1,56 +1,287 @@
-import json
-from typing import Any
+import threading
+import time
+from typing import Any, TYPE_CHECKING
 
-import requests
+from shipday.exceptions import ShipdayException, ShipdayRateLimitException
+from shipday.httpclient.codec import get_codec
+from shipday.httpclient.instrumentation import RequestTrace, get_endpoint, get_hooks
+from shipday.httpclient.rate_limiter import get_rate_limit_details
+from shipday.httpclient.single_flight import SingleFlight
+from shipday.utils.profiling import NULL_PHASE, get_phase, get_profiler
 
-from shipday.exceptions import ShipdayRateLimitException
+if TYPE_CHECKING:
+    import requests
+    from shipday.httpclient.fair_scheduler import Flow
+    from shipday.httpclient.rate_limiter import RateLimiter
+    from shipday.httpclient.response_cache import ResponseCache
+    from shipday.httpclient.retry_policy import RetryPolicy
+
+BASE_URL = 'https://api.shipday.com/'
 
 
 class ShipdayClient:
     def __init__(self, *args, api_key, **kwargs, ):
         self._api_key = api_key
         self._timeout = kwargs['timeout'] if 'timeout' in kwargs else 1000
-        self._base_url = 'https://api.shipday.com/'
+        self._base_url = self.__get_base_url_(kwargs['base_url'] if 'base_url' in kwargs else None)
+        self._pool_connections = kwargs['pool_connections'] if 'pool_connections' in kwargs else 10
+        self._pool_maxsize = kwargs['pool_maxsize'] if 'pool_maxsize' in kwargs else 10
+        self._pool_block = kwargs['pool_block'] if 'pool_block' in kwargs else False
+        self._keep_alive = kwargs['keep_alive'] if 'keep_alive' in kwargs else True
+        self._rate_limiter: 'RateLimiter' = kwargs['rate_limiter'] if 'rate_limiter' in kwargs else None
+        self._retry_policy: 'RetryPolicy' = kwargs['retry_policy'] if 'retry_policy' in kwargs else None
+        self._response_cache: 'ResponseCache' = kwargs['response_cache'] if 'response_cache' in kwargs else None
+        self._scheduler: 'Flow' = kwargs['scheduler'] if 'scheduler' in kwargs else None
+        self._codec = get_codec(kwargs['codec'] if 'codec' in kwargs else None)
+        self._hooks = get_hooks(kwargs['hooks'] if 'hooks' in kwargs else None)
+        self._profiler = get_profiler(kwargs['profiler'] if 'profiler' in kwargs else None)
+        # Identical GETs in flight at the same time share one request
+        self._single_flight = SingleFlight() if (kwargs['coalesce'] if 'coalesce' in kwargs else True) else None
+        self._headers = self.__build_headers_()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @staticmethod
+    def __get_base_url_(base_url: str) -> str:
+        if base_url is None:
+            return BASE_URL
+        if type(base_url) is not str or not base_url.startswith(('http://', 'https://')):
+            raise ShipdayException('Base url must be an http or https url')
+        return base_url if base_url.endswith('/') else base_url + '/'
 
     def __get_headers_(self):
-        return {
+        return self._headers
+
+    def __build_headers_(self):
+        headers = {
             'Authorization': 'Basic {}'.format(self._api_key),
             'Content-Type': 'application/json',
         }
+        if not self._keep_alive:
+            headers['Connection'] = 'close'
+        return headers
 
     def __get_api_key_(self):
         return self._api_key
 
+    def __get_session_(self) -> 'requests.Session':
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.__create_session_()
+        return self._session
+
+    def __create_session_(self) -> 'requests.Session':
+        # requests is only imported once the first request is sent
+        import requests
+        if self._hooks is not None:
+            from shipday.httpclient.timed_adapter import TimedHTTPAdapter as HTTPAdapter
+        else:
+            from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self._pool_connections, pool_maxsize=self._pool_maxsize,
+                              pool_block=self._pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
     def __create_url_(self, suffix: str) -> str:
         return self._base_url + suffix
 
-    def __check_status_(self, response: Any):
+    def __check_status_(self, suffix: str, response: Any, trace: RequestTrace = None, stream: bool = False):
+        if self._rate_limiter is None and response.status_code != 429:
+            if trace is not None:
+                trace.response(response.status_code, self.__get_size_(response, stream))
+            return
+        details = get_rate_limit_details(response.headers)
+        if trace is not None:
+            trace.response(response.status_code, self.__get_size_(response, stream), details['retry_after'])
+        if self._rate_limiter is not None:
+            self._rate_limiter.update(suffix, response.status_code, details)
         if response.status_code == 429:
-            raise ShipdayRateLimitException(response.text)
+            raise ShipdayRateLimitException(response.text, **details)
+
+    @staticmethod
+    def __get_size_(response: Any, stream: bool) -> int:
+        # Streamed bodies have not been read yet, so their size comes from the headers
+        if not stream:
+            return len(response.content)
+        length = response.headers.get('Content-Length')
+        return int(length) if length is not None and length.isdigit() else None
+
+    def __send_(self, method: str, suffix: str, data: dict = None, stream: bool = False,
+                trace: RequestTrace = None):
+        waited = 0.0
+        if self._rate_limiter is not None:
+            with get_phase('wait'):
+                waited = self._rate_limiter.acquire(suffix)
+        payload = None
+        if data is not None:
+            with get_phase('encode'):
+                payload = self._codec.encode(data)
+        if self._scheduler is not None:
+            # Requests of all the clients sharing the scheduler take turns for its slots
+            with get_phase('wait'):
+                waited += self._scheduler.acquire()
+        try:
+            headers = self.__get_headers_()
+            if trace is not None:
+                headers = trace.send(headers, len(payload) if payload is not None else 0, waited)
+            try:
+                with get_phase('network'):
+                    response = self.__get_session_().request(method, self.__create_url_(suffix), data=payload,
+                                                             headers=headers, stream=stream)
+            except Exception as e:
+                if trace is not None:
+                    trace.error(e)
+                raise
+        finally:
+            if self._scheduler is not None:
+                self._scheduler.release()
+        self.__check_status_(suffix, response, trace, stream)
+        return response
+
+    def __request_(self, method: str, suffix: str, data: dict = None, decode: bool = True,
+                   idempotent: bool = None, dedupe=None, stream: bool = False):
+        policy = self._retry_policy
+        trace = RequestTrace(self._hooks, method, suffix) if self._hooks is not None else None
+        if policy is None:
+            return self.__finish_(self.__send_(method, suffix, data, stream, trace), None, decode)
+
+        import requests
+        if idempotent is None:
+            idempotent = method != 'POST'
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            response, error, retry_after = None, None, None
+            try:
+                response = self.__send_(method, suffix, data, stream, trace)
+            except ShipdayRateLimitException as e:
+                if not policy.is_retryable_status(429):
+                    raise
+                error, retry_after = e, e.retry_after
+            except Exception as e:
+                if not policy.is_retryable_exception(e, (requests.ConnectionError, requests.Timeout)):
+                    raise
+                error = e
+            if response is not None and not policy.is_retryable_status(response.status_code):
+                return self.__finish_(response, None, decode)
+            if response is not None and stream:
+                response.close()
+
+            # A rate limited request was never processed, anything else may have reached the server
+            maybe_processed = not isinstance(error, (ShipdayRateLimitException, requests.ConnectTimeout))
+            if self._rate_limiter is not None:
+                retry_after = None
+            delay = policy.next_delay(attempt, started, retry_after)
+            if delay is None or (maybe_processed and not idempotent and dedupe is None):
+                return self.__finish_(response, error, decode)
+
+            if trace is not None:
+                trace.retry(delay)
+            with get_phase('wait'):
+                time.sleep(delay)
+            if maybe_processed and not idempotent:
+                try:
+                    existing = dedupe()
+                except Exception:
+                    # We can not tell whether the request went through, so it is not sent again
+                    return self.__finish_(response, error, decode)
+                if existing is not None:
+                    return existing
+
+    def __finish_(self, response, error: Exception, decode: bool):
+        if error is not None:
+            raise error
+        if not decode:
+            return response
+        with get_phase('decode'):
+            return self._codec.decode(response.content)
+
+    def __profile_(self, method: str, suffix: str):
+        # Requests made outside a profiled service method are reported per endpoint
+        if self._profiler is None:
+            return NULL_PHASE
+        return self._profiler.call('{} {}'.format(method, get_endpoint(method, suffix)))
 
     def set_api_key(self, api_key: str):
         self._api_key = api_key
+        self._headers = self.__build_headers_()
+        # Cached and in flight reads belong to the previous account
+        if self._single_flight is not None:
+            self._single_flight.forget(('',))
+        if self._response_cache is not None:
+            self._response_cache.clear()
 
-    def get(self, suffix: str):
-        url = self.__create_url_(suffix)
-        response = requests.get(url, headers=self.__get_headers_())
-        self.__check_status_(response)
-        return response.json()
-
-    def post(self, suffix: str, data: dict):
-        url = self.__create_url_(suffix)
-        response = requests.post(url, json.dumps(data), headers=self.__get_headers_())
-        self.__check_status_(response)
-        return response.json()
-
-    def put(self, suffix: str, data: dict):
-        url = self.__create_url_(suffix)
-        response = requests.put(url, json.dumps(data), headers=self.__get_headers_())
-        self.__check_status_(response)
-        return response.json()
-
-    def delete(self, suffix: str):
-        url = self.__create_url_(suffix)
-        response = requests.delete(url, headers=self.__get_headers_())
-        self.__check_status_(response)
-        return response
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __invalidate_(self, invalidates):
+        if self._single_flight is not None and invalidates:
+            self._single_flight.forget(invalidates)
+        if self._response_cache is not None and invalidates:
+            self._response_cache.invalidate(invalidates)
+
+    def get(self, suffix: str, raw: bool = False, fresh: bool = False):
+        # fresh reads skip the cache and in flight requests, for checks that must see the latest state
+        with self.__profile_('GET', suffix):
+            cache = self._response_cache
+            if fresh or (cache is None and self._single_flight is None):
+                if raw:
+                    return self.__request_('GET', suffix, decode=False).content
+                return self.__request_('GET', suffix)
+            body = cache.get(suffix) if cache is not None else None
+            if body is None:
+                body = self.__fetch_(suffix) if self._single_flight is None \
+                    else self._single_flight.do(suffix, self.__fetch_, suffix)
+            if raw:
+                return body
+            with get_phase('decode'):
+                return self._codec.decode(body)
+
+    def __fetch_(self, suffix: str) -> bytes:
+        # Shared callers get the raw body and decode their own copy
+        cache = self._response_cache
+        generation = cache.get_generation() if cache is not None else None
+        response = self.__request_('GET', suffix, decode=False)
+        if cache is not None and response.status_code == 200:
+            cache.set(suffix, response.content, generation)
+        return response.content
+
+    def iter_get(self, suffix: str, chunk_size: int = 65536):
+        response = self.__request_('GET', suffix, decode=False, stream=True)
+        try:
+            if response.status_code >= 400:
+                raise ShipdayException(response.text)
+            yield from response.iter_content(chunk_size)
+        finally:
+            response.close()
+
+    def post(self, suffix: str, data: dict, idempotent: bool = False, dedupe=None, invalidates=(),
+             raw: bool = False):
+        with self.__profile_('POST', suffix):
+            try:
+                if raw:
+                    return self.__request_('POST', suffix, data, decode=False, idempotent=idempotent).content
+                return self.__request_('POST', suffix, data, idempotent=idempotent, dedupe=dedupe)
+            finally:
+                self.__invalidate_(invalidates)
+
+    def put(self, suffix: str, data: dict, invalidates=()):
+        with self.__profile_('PUT', suffix):
+            try:
+                return self.__request_('PUT', suffix, data)
+            finally:
+                self.__invalidate_(invalidates)
+
+    def delete(self, suffix: str, invalidates=()):
+        with self.__profile_('DELETE', suffix):
+            try:
+                return self.__request_('DELETE', suffix, decode=False)
+            finally:
+                self.__invalidate_(invalidates)
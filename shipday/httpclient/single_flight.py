@@ -0,0 +1,119 @@
+import threading
+
+from shipday.utils.profiling import get_phase
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Callers asking for a key that is already being loaded wait for that load and share its result
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._leaders = 0
+        self._followers = 0
+
+    def do(self, key, func, *args):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self._leaders += 1
+                leader = True
+            else:
+                self._followers += 1
+                leader = False
+        if not leader:
+            with get_phase('network'):
+                flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = func(*args)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self.__land(key, flight)
+            flight.done.set()
+
+    def __land(self, key, flight: _Flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def forget(self, prefixes):
+        # Loads started before a write may return stale data, later callers start a new one
+        with self._lock:
+            for key in [key for key in self._flights if key.startswith(tuple(prefixes))]:
+                del self._flights[key]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'in_flight': len(self._flights), 'leaders': self._leaders, 'followers': self._followers}
+
+
+# Tells the waiters of a cancelled load to start their own
+_RETRY = object()
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self._leaders = 0
+        self._followers = 0
+
+    async def do(self, key, func, *args):
+        import asyncio
+        while True:
+            waiters = self._flights.get(key)
+            if waiters is None:
+                break
+            waiter = asyncio.get_running_loop().create_future()
+            waiters.append(waiter)
+            self._followers += 1
+            with get_phase('network'):
+                result = await waiter
+            if result is not _RETRY:
+                return result
+
+        waiters = self._flights[key] = []
+        self._leaders += 1
+        try:
+            result = await func(*args)
+        except asyncio.CancelledError:
+            self.__land(key, waiters, _RETRY)
+            raise
+        except Exception as e:
+            self.__land(key, waiters, error=e)
+            raise
+        self.__land(key, waiters, result)
+        return result
+
+    def __land(self, key, waiters: list, result=None, error: Exception = None):
+        if self._flights.get(key) is waiters:
+            del self._flights[key]
+        for waiter in waiters:
+            # A waiter cancelled while waiting is already done
+            if waiter.done():
+                continue
+            if error is not None:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(result)
+
+    def forget(self, prefixes):
+        for key in [key for key in self._flights if key.startswith(tuple(prefixes))]:
+            del self._flights[key]
+
+    def get_stats(self) -> dict:
+        return {'in_flight': len(self._flights), 'leaders': self._leaders, 'followers': self._followers}
@@ -0,0 +1 @@
+from shipday.loader.order_loader import OrderLoader
@@ -0,0 +1,366 @@
+import csv
+import math
+from datetime import datetime
+from typing import Iterable, Iterator, TYPE_CHECKING
+
+from shipday.bo import RowError
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.codec import get_codec, get_decode_errors
+from shipday.order.address import Address
+from shipday.order.order_info import Order
+from shipday.order.order_item import OrderItem
+
+if TYPE_CHECKING:
+    from shipday.order.order_batch import OrderBatch
+
+
+def _text(value: str) -> str:
+    return value if type(value) is str else str(value)
+
+
+def _float(value) -> float:
+    number = float(value)
+    # verify() lets NaN through, as every comparison with it is False
+    if not math.isfinite(number):
+        raise ValueError('{} is not a finite number'.format(value))
+    return number
+
+
+def _int(value) -> int:
+    if type(value) is int:
+        return value
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError('{} is not an integer'.format(value))
+    return int(number)
+
+
+def _datetime(value) -> datetime:
+    return value if type(value) is datetime else datetime.fromisoformat(value)
+
+
+# Field path -> (target object, slot, default converter)
+FIELDS = {
+    'order_number': ('order', '_order_number', _text),
+    'delivery_instruction': ('order', '_delivery_instruction', _text),
+    'pickup_instruction': ('order', '_pickup_instruction', _text),
+    'expected_delivery_time': ('order', '_delivery_time', _datetime),
+    'expected_pickup_time': ('order', '_pickup_time', _datetime),
+    'customer.name': ('customer', '_name', _text),
+    'customer.email': ('customer', '_email', _text),
+    'customer.phone_number': ('customer', '_phone_number', _text),
+    'customer.address_line': ('customer', '_address_line', _text),
+    'pickup.name': ('pickup', '_name', _text),
+    'pickup.phone_number': ('pickup', '_phone_number', _text),
+    'pickup.address_line': ('pickup', '_address_line', _text),
+    'cost.tips': ('cost', '_tips', _float),
+    'cost.tax': ('cost', '_tax', _float),
+    'cost.discount': ('cost', '_discount', _float),
+    'cost.delivery_fee': ('cost', '_delivery_fee', _float),
+    'cost.total': ('cost', '_total', _float),
+    'item.name': ('item', '_name', _text),
+    'item.unit_price': ('item', '_unit_price', _float),
+    'item.quantity': ('item', '_quantity', _int),
+    'item.add_ons': ('item', '_add_ons', _text),
+    'item.detail': ('item', '_detail', _text),
+}
+for _owner in ('customer', 'pickup'):
+    for _name in ('unit', 'street', 'city', 'state', 'zip', 'country'):
+        FIELDS['{}.address.{}'.format(_owner, _name)] = (_owner + '.address', '_' + _name, _text)
+    FIELDS[_owner + '.address.latitude'] = (_owner + '.address', '_latitude', _float)
+    FIELDS[_owner + '.address.longitude'] = (_owner + '.address', '_longitude', _float)
+
+TARGETS = ('order', 'customer', 'customer.address', 'pickup', 'pickup.address', 'cost', 'item')
+
+
+class OrderLoader:
+    def __init__(self, mapping: dict, validate: bool = True, codec=None):
+        if type(mapping) is not dict or len(mapping) == 0:
+            raise ShipdayException('Mapping must be a non empty dict')
+        self._fields = []
+        for path, column in mapping.items():
+            if path not in FIELDS:
+                raise ShipdayException('Unknown order field: {}'.format(path))
+            target, slot, converter = FIELDS[path]
+            if type(column) is tuple:
+                column, converter = column
+            self._fields.append((path, column, TARGETS.index(target), slot, converter))
+        self._has_address = ('customer.address' in (FIELDS[path][0] for path in mapping),
+                             'pickup.address' in (FIELDS[path][0] for path in mapping))
+        self._group_by_order = 'order_number' in mapping
+        self._validate = validate
+        self._codec = get_codec(codec)
+        self.errors = []
+
+    def __compile(self, columns) -> tuple:
+        # Splits the mapping into order level and item level fields bound to the row positions
+        order_fields, item_fields = [], []
+        for path, column, target, slot, converter in self._fields:
+            if columns is not None:
+                if column not in columns:
+                    raise ShipdayException('Column {} for {} is missing'.format(column, path))
+                column = columns.index(column)
+            (item_fields if target == TARGETS.index('item') else order_fields).append(
+                (path, column, target, slot, converter))
+        key = None
+        if self._group_by_order:
+            key = next(column for path, column, target, slot, converter in order_fields if path == 'order_number')
+        return order_fields, item_fields, key
+
+    def __new_order(self) -> tuple:
+        order = Order()
+        targets = [order, order._customer, None, order._pickup, None, order._order_cost, None]
+        if self._has_address[0]:
+            targets[2] = order._customer._address = Address()
+        if self._has_address[1]:
+            targets[4] = order._pickup._address = Address()
+        return order, targets
+
+    @staticmethod
+    def __assign(targets: list, fields: list, row):
+        for path, column, target, slot, converter in fields:
+            value = _get_value(row, column)
+            if value is None or value == '':
+                continue
+            try:
+                setattr(targets[target], slot, converter(value))
+            except (TypeError, ValueError) as e:
+                raise _invalid_value(path, value, e)
+
+    @staticmethod
+    def __convert(fields: list, row, defaults: dict) -> list:
+        # The column version of __assign, empty cells keep what a new Order would hold
+        values = []
+        for path, column, target, slot, converter in fields:
+            value = _get_value(row, column)
+            if value is None or value == '':
+                values.append(defaults.get(path))
+                continue
+            try:
+                values.append(converter(value))
+            except (TypeError, ValueError) as e:
+                raise _invalid_value(path, value, e)
+        return values
+
+    def __finish(self, order: Order, line: int):
+        if self._validate:
+            try:
+                order.verify()
+                # Order.verify leaves the costs out, a file can still hold negative tips or totals
+                order.order_cost.verify()
+            except ShipdayException as e:
+                self.errors.append(RowError(line, str(e)))
+                return None
+        return order
+
+    @staticmethod
+    def __split(rows: Iterable[tuple], key) -> Iterator[tuple]:
+        # Flags the rows that start an order, the next rows with the same order number add items to it
+        previous, first = None, True
+        for line, row in rows:
+            row_key = _get_value(row, key) if key is not None else None
+            yield line, row, first or key is None or row_key != previous
+            previous, first = row_key, False
+
+    def __load(self, rows: Iterable[tuple], columns) -> Iterator[Order]:
+        order_fields, item_fields, key = self.__compile(columns)
+        order, targets, order_line, broken = None, None, None, False
+        for line, row, starts in self.__split(rows, key):
+            if starts:
+                if order is not None and not broken:
+                    order = self.__finish(order, order_line)
+                    if order is not None:
+                        yield order
+                order, targets = self.__new_order()
+                order_line, broken = line, False
+                try:
+                    self.__assign(targets, order_fields, row)
+                except ShipdayException as e:
+                    self.errors.append(RowError(line, str(e)))
+                    broken = True
+                    continue
+            elif broken:
+                continue
+            if item_fields:
+                item = OrderItem()
+                targets[6] = item
+                try:
+                    self.__assign(targets, item_fields, row)
+                except ShipdayException as e:
+                    self.errors.append(RowError(line, str(e)))
+                    broken = True
+                    continue
+                order._order_items.append(item)
+        if order is not None and not broken:
+            order = self.__finish(order, order_line)
+            if order is not None:
+                yield order
+
+    def __load_batches(self, rows: Iterable[tuple], columns, batch_size: int) -> Iterator['OrderBatch']:
+        # Fills the batch columns from the converted cells, no Order objects are created
+        from shipday.order.order_batch import DEFAULTS
+        _verify_batch_size(batch_size)
+        order_fields, item_fields, key = self.__compile(columns)
+        lines, orders, items = [], [], []
+        # line, values and items of the order being read, None when one of its rows could not be converted
+        current = None
+        for line, row, starts in self.__split(rows, key):
+            if starts:
+                if current is not None:
+                    line_number, values, order_items = current
+                    lines.append(line_number)
+                    orders.append(values)
+                    items.append(order_items)
+                    if len(lines) >= batch_size:
+                        yield self.__create_batch(order_fields, item_fields, lines, orders, items)
+                        lines, orders, items = [], [], []
+                try:
+                    current = (line, self.__convert(order_fields, row, DEFAULTS), [])
+                except ShipdayException as e:
+                    self.errors.append(RowError(line, str(e)))
+                    current = None
+                    continue
+            elif current is None:
+                continue
+            if item_fields:
+                try:
+                    current[2].append(self.__convert(item_fields, row, DEFAULTS))
+                except ShipdayException as e:
+                    self.errors.append(RowError(line, str(e)))
+                    current = None
+        if current is not None:
+            line_number, values, order_items = current
+            lines.append(line_number)
+            orders.append(values)
+            items.append(order_items)
+        if lines:
+            yield self.__create_batch(order_fields, item_fields, lines, orders, items)
+
+    def __create_batch(self, order_fields: list, item_fields: list, lines: list, orders: list, items: list):
+        from shipday.order.order_batch import OrderBatch
+        order_paths, item_paths = [field[0] for field in order_fields], [field[0] for field in item_fields]
+        flat = [item for order_items in items for item in order_items]
+        batch = OrderBatch.from_columns(
+            {path: list(values) for path, values in zip(order_paths, zip(*orders))} if orders else {},
+            {path: list(values) for path, values in zip(item_paths, zip(*flat))} if flat else {},
+            list(map(len, items)))
+        if not self._validate:
+            return batch
+        errors = batch.validate()
+        if not errors:
+            return batch
+        # Invalid orders are left out of the batch and reported with their line, like the ones verify() rejects
+        self.errors.extend(RowError(lines[error.row], error.message) for error in errors)
+        invalid = {error.row for error in errors}
+        keep = [row for row in range(len(lines)) if row not in invalid]
+        return self.__create_batch(order_fields, item_fields, [lines[row] for row in keep],
+                                   [orders[row] for row in keep], [items[row] for row in keep])
+
+    def iter_csv(self, source, delimiter: str = ',', encoding: str = 'utf-8') -> Iterator[Order]:
+        with _open(source, encoding) as file:
+            reader = csv.reader(file, delimiter=delimiter)
+            try:
+                columns = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                raise ShipdayException('Malformed CSV header: {}'.format(e))
+            yield from self.__load(self.__read_csv(reader, len(columns)), columns)
+
+    def iter_csv_batches(self, source, batch_size: int = 10000, delimiter: str = ',',
+                         encoding: str = 'utf-8') -> Iterator['OrderBatch']:
+        with _open(source, encoding) as file:
+            reader = csv.reader(file, delimiter=delimiter)
+            try:
+                columns = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                raise ShipdayException('Malformed CSV header: {}'.format(e))
+            yield from self.__load_batches(self.__read_csv(reader, len(columns)), columns, batch_size)
+
+    def __read_csv(self, reader, width: int) -> Iterator[tuple]:
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                self.errors.append(RowError(reader.line_num, 'Malformed CSV row: {}'.format(e)))
+                continue
+            if not row:
+                continue
+            if len(row) != width:
+                self.errors.append(RowError(reader.line_num, 'Expected {} columns, found {}'.format(width, len(row))))
+                continue
+            yield reader.line_num, row
+
+    def iter_ndjson(self, source, encoding: str = 'utf-8') -> Iterator[Order]:
+        with _open(source, encoding) as file:
+            yield from self.__load(self.__read_ndjson(file), None)
+
+    def iter_ndjson_batches(self, source, batch_size: int = 10000, encoding: str = 'utf-8') -> Iterator['OrderBatch']:
+        with _open(source, encoding) as file:
+            yield from self.__load_batches(self.__read_ndjson(file), None, batch_size)
+
+    def __read_ndjson(self, file) -> Iterator[tuple]:
+        decode_errors = get_decode_errors(self._codec)
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = self._codec.decode(text)
+            except decode_errors as e:
+                self.errors.append(RowError(line, 'Malformed JSON line: {}'.format(e)))
+                continue
+            if type(row) is not dict:
+                self.errors.append(RowError(line, 'Expected a JSON object'))
+                continue
+            yield line, row
+
+    @staticmethod
+    def iter_batches(orders: Iterable[Order], batch_size: int = 10000):
+        from shipday.order.order_batch import OrderBatch
+        _verify_batch_size(batch_size)
+        chunk = []
+        for order in orders:
+            chunk.append(order)
+            if len(chunk) >= batch_size:
+                yield OrderBatch(chunk)
+                chunk = []
+        if chunk:
+            yield OrderBatch(chunk)
+
+
+def _verify_batch_size(batch_size: int):
+    if type(batch_size) is not int or batch_size < 1:
+        raise ShipdayException('Batch size must be a positive integer')
+
+
+def _invalid_value(path: str, value, error: Exception) -> ShipdayException:
+    return ShipdayException('Invalid value for {}: {!r} ({})'.format(path, value, error))
+
+
+def _get_value(row, column):
+    try:
+        return row[column]
+    except (IndexError, KeyError):
+        return None
+
+
+def _open(source, encoding: str):
+    if hasattr(source, 'read'):
+        return _Borrowed(source)
+    return open(source, newline='', encoding=encoding)
+
+
+class _Borrowed:
+    # Leaves file objects passed in by the caller open
+    def __init__(self, file):
+        self._file = file
+
+    def __enter__(self):
+        return self._file
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
@@ -1,8 +1,30 @@
-from shipday.order.address import Address
-from shipday.order.customer import Customer
-from shipday.order.order_cost import OrderCost
-from shipday.order.order_info import Order
-from shipday.order.order_item import OrderItem
-from shipday.order.order_query import OrderQuery
-from shipday.order.order_status import OrderStatus
-from shipday.order.pickup import Pickup
+from importlib import import_module
+
+# Models are resolved on first access, reading a status constant does not load the codec or the views
+_LAZY_ATTRIBUTES = {
+    'Address': 'shipday.order.address',
+    'Customer': 'shipday.order.customer',
+    'OrderCost': 'shipday.order.order_cost',
+    'Order': 'shipday.order.order_info',
+    'OrderItem': 'shipday.order.order_item',
+    'OrderQuery': 'shipday.order.order_query',
+    'OrderStatus': 'shipday.order.order_status',
+    'Pickup': 'shipday.order.pickup',
+    'OrderView': 'shipday.order.order_view',
+    'OrderListView': 'shipday.order.order_view',
+    'OrderCodec': 'shipday.order.order_codec',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
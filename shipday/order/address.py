@@ -1,15 +1,26 @@
-from collections import defaultdict
-
+from shipday.utils.fields import Field, TypedField
 from shipday.utils.verifiers import verify_none_or_instance_of, verify_none_or_within_range, \
-    verify_all_none_or_not, verify_instance_of
+    verify_all_none_or_not
 
 
 class Address:
+    __slots__ = ('_unit', '_street', '_city', '_state', '_zip', '_country', '_latitude', '_longitude',
+                 '_unit_in_address')
+
+    unit = Field()
+    street = Field()
+    city = Field()
+    state = Field()
+    zip = Field()
+    country = Field()
+    latitude = Field()
+    longitude = Field()
+    unit_in_address = TypedField(bool, "Unit in address must be a boolean")
+
     def __init__(self, *args, unit: str = None, street: str = None, city: str = None,
                  state: str = None, zip: str = None, country: str = None,
                  latitude: float = None, longitude: float = None,
                  **kwargs):
-        kwargs = defaultdict(lambda: None, **kwargs)
         self._unit = unit
         self._street = street
         self._city = city
@@ -20,79 +31,6 @@ class Address:
         self._longitude = longitude
         self._unit_in_address = kwargs['unit_in_address'] if 'unit_in_address' in kwargs else False
 
-    @property
-    def unit(self):
-        return self._unit
-
-    @unit.setter
-    def unit(self, value):
-        self._unit = value
-
-    @property
-    def street(self):
-        return self._street
-
-    @street.setter
-    def street(self, value):
-        self._street = value
-
-    @property
-    def city(self):
-        return self._city
-
-    @city.setter
-    def city(self, value: str):
-        self._city = value
-
-    @property
-    def state(self):
-        return self._state
-
-    @state.setter
-    def state(self, value):
-        self._state = value
-
-    @property
-    def zip(self):
-        return self._zip
-
-    @zip.setter
-    def zip(self, value):
-        self._zip = value
-
-    @property
-    def country(self):
-        return self._country
-
-    @country.setter
-    def country(self, value):
-        self._country = value
-
-    @property
-    def latitude(self):
-        return self._latitude
-
-    @latitude.setter
-    def latitude(self, value):
-        self._latitude = value
-
-    @property
-    def longitude(self):
-        return self._longitude
-
-    @longitude.setter
-    def longitude(self, value):
-        self._longitude = value
-
-    @property
-    def unit_in_address(self):
-        return self._unit_in_address
-
-    @unit_in_address.setter
-    def unit_in_address(self, value):
-        verify_instance_of(bool, value, "Unit in address must be a boolean")
-        self._unit_in_address = value
-
     def __repr__(self):
         return self.get_single_line()
 
@@ -107,8 +45,7 @@ class Address:
         verify_none_or_instance_of(float, self.longitude, "Longitude must be float")
         verify_none_or_within_range(self.latitude, -90, 90, "Latitude must be between -90 and 90")
         verify_none_or_within_range(self.longitude, -180, 180, "Longitude must be between -180 and 180")
-        verify_all_none_or_not([self.latitude, self.longitude], "Latitude and Longitude must be both None or float"),
-
+        verify_all_none_or_not((self._latitude, self._longitude), "Latitude and Longitude must be both None or float")
 
     def get_breakdown(self) -> dict:
         obj = dict()
@@ -1,56 +1,26 @@
 import json
-from collections import defaultdict
 
 from shipday.order.address import Address
+from shipday.utils.fields import TypedField
 from shipday.utils.verifiers import verify_instance_of, verify_none_or_instance_of
 
 
 class Customer:
+    __slots__ = ('_name', '_address', '_email', '_phone_number', '_address_line')
+
+    name = TypedField(str, "Name is not String")
+    address = TypedField(Address, "Address is not String")
+    email = TypedField(str, "Email is not String")
+    phone_number = TypedField(str, "Phone number is not String")
+
     def __init__(self, *arg,
                  name: str = None, address: Address = None, email: str = None, phone_number: str = None,
                  **kwargs):
-        kwargs = defaultdict(lambda: None, **kwargs)
-        self._name = name or kwargs['customerName']
+        self._name = name or kwargs.get('customerName')
         self._address = address
-        self._email = email or kwargs['customerEmail']
-        self._phone_number = phone_number or kwargs['customerPhoneNumber']
-        self._address_line = kwargs['customerAddress']
-
-    @property
-    def name(self):
-        return self._name
-
-    @name.setter
-    def name(self, value):
-        verify_instance_of(str, value, "Name is not String")
-        self._name = value
-
-    @property
-    def address(self) -> Address:
-        return self._address
-
-    @address.setter
-    def address(self, value: Address):
-        verify_instance_of(Address, value, "Address is not String")
-        self._address = value
-
-    @property
-    def email(self):
-        return self._email
-
-    @email.setter
-    def email(self, value):
-        verify_instance_of(str, value, "Email is not String")
-        self._email = value
-
-    @property
-    def phone_number(self):
-        return self._phone_number
-
-    @phone_number.setter
-    def phone_number(self, value):
-        verify_instance_of(str, value, "Phone number is not String")
-        self._phone_number = value
+        self._email = email or kwargs.get('customerEmail')
+        self._phone_number = phone_number or kwargs.get('customerPhoneNumber')
+        self._address_line = kwargs.get('customerAddress')
 
     def __repr__(self):
         return json.dumps(self.get_body())
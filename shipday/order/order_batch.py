@@ -0,0 +1,488 @@
+import sys
+from itertools import compress, repeat
+from operator import attrgetter
+from typing import Iterable, List
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError('OrderBatch requires numpy, install shipday[batch]') from e
+
+from shipday.bo import RowError
+from shipday.exceptions import ShipdayException
+from shipday.order.address import Address
+from shipday.order.customer import Customer
+from shipday.order.order_codec import _parse_time
+from shipday.order.order_cost import OrderCost
+from shipday.order.order_info import Order
+from shipday.order.order_item import OrderItem
+from shipday.order.pickup import Pickup
+from shipday.utils.verifiers import NUMBER_TYPES
+
+ORDER_CHECKS = (
+    'Order must have a order number',
+    'Customer must have a name',
+    'Customer must have a Address',
+    'Customer must have a phone number',
+    'Customer email must be a String or None',
+    'Pickup must have a name',
+    'Pickup must be of type Address',
+    'Pickup phone number must be String or None',
+)
+ADDRESS_CHECKS = (
+    'Unit must be a str',
+    'Street must be str',
+    'City must be str',
+    'State must be str',
+    'Zip must be str',
+    'Country must be str',
+    'Latitude must be float',
+    'Longitude must be float',
+)
+ITEM_CHECKS = (
+    'Order Item is not of type OrderItem',
+    'OrderItem must have a name of type string',
+    'OrderItem must have a valid price of type int or float',
+    'Order quantity must be a positive integer',
+    'Add ons must be String or None',
+    'Details must be String or None',
+)
+COST_COLUMNS = (
+    ('tips', 'Tips must be a positive number'),
+    ('tax', 'Tax must be a positive number'),
+    ('discount', 'Discount must be a positive number'),
+    ('delivery_fee', 'Delivery Fee must be a positive number'),
+    ('total', 'Total must be a positive number'),
+)
+ADDRESS_PREFIXES = ('Customer address', 'Pickup address')
+
+
+NONE_TYPE = type(None)
+# Columns are named like the OrderLoader fields, each holds the raw values of one order field
+ORDER_COLUMNS = {
+    'order_number': ('order', '_order_number'),
+    'delivery_instruction': ('order', '_delivery_instruction'),
+    'pickup_instruction': ('order', '_pickup_instruction'),
+    'expected_delivery_time': ('order', '_delivery_time'),
+    'expected_pickup_time': ('order', '_pickup_time'),
+    'customer.name': ('customer', '_name'),
+    'customer.email': ('customer', '_email'),
+    'customer.phone_number': ('customer', '_phone_number'),
+    'customer.address_line': ('customer', '_address_line'),
+    'pickup.name': ('pickup', '_name'),
+    'pickup.phone_number': ('pickup', '_phone_number'),
+    'pickup.address_line': ('pickup', '_address_line'),
+}
+ADDRESS_OWNERS = ('customer', 'pickup')
+ADDRESS_FIELDS = ('unit', 'street', 'city', 'state', 'zip', 'country', 'latitude', 'longitude')
+ITEM_FIELDS = ('name', 'unit_price', 'quantity', 'add_ons', 'detail')
+# What a new Order holds for a field that is not given
+DEFAULTS = {'cost.' + name: 0.0 for name, _ in COST_COLUMNS}
+DEFAULTS['item.unit_price'] = 0
+# Text is interned, so values repeated across orders such as store names and cities share one string
+TEXT_COLUMNS = frozenset(
+    [path for path in ORDER_COLUMNS if not path.startswith('expected_')] +
+    ['{}.address.{}'.format(owner, name) for owner in ADDRESS_OWNERS for name in ADDRESS_FIELDS[:6]] +
+    ['item.name', 'item.add_ons', 'item.detail'])
+RECORD_KEYS = {
+    'order_number': 'orderNumber',
+    'delivery_instruction': 'deliveryInstruction',
+    'pickup_instruction': 'pickupInstruction',
+    'customer.name': 'customerName',
+    'customer.email': 'customerEmail',
+    'customer.phone_number': 'customerPhoneNumber',
+    'customer.address_line': 'customerAddress',
+    'pickup.name': 'restaurantName',
+    'pickup.phone_number': 'restaurantPhoneNumber',
+    'pickup.address_line': 'restaurantAddress',
+    'cost.tips': 'tips',
+    'cost.tax': 'tax',
+    'cost.discount': 'discountAmount',
+    'cost.delivery_fee': 'deliveryFee',
+}
+RECORD_ADDRESSES = (('customer', 'dropoff', 'deliveryLatitude', 'deliveryLongitude'),
+                    ('pickup', 'pickup', 'pickupLatitude', 'pickupLongitude'))
+
+
+def _get(objects: list, name: str) -> list:
+    return list(map(attrgetter(name), objects))
+
+
+def _pluck(records: list, key: str, default=None) -> list:
+    return list(map(dict.get, records, repeat(key), repeat(default)))
+
+
+def _is_type(values: list, *types) -> np.ndarray:
+    types = frozenset(types)
+    if types.issuperset(map(type, values)):
+        # Most columns are valid, the per value flags are only needed when one of them is not
+        return np.ones(len(values), dtype=bool)
+    return np.fromiter(map(types.__contains__, map(type, values)), dtype=bool, count=len(values))
+
+
+def _get_numbers(values: list) -> np.ndarray:
+    # Values that are not numbers become NaN so they fail every range check
+    valid = _is_type(values, *NUMBER_TYPES)
+    numbers = np.full(len(values), np.nan)
+    numbers[valid] = np.fromiter(compress(values, valid.tolist()), dtype=np.float64, count=int(valid.sum()))
+    return numbers
+
+
+def _intern(values: list) -> list:
+    if not any(values):
+        return values
+    try:
+        return list(map(sys.intern, values))
+    except TypeError:
+        # Columns mixing text with None or other values
+        intern = sys.intern
+        return [intern(value) if type(value) is str else value for value in values]
+
+
+def _to_objects(values: list) -> np.ndarray:
+    # fromiter keeps lists and tuples as single values, np.array would turn them into extra dimensions
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _read_records(records: list) -> dict:
+    # Records in the format of OrderCodec.encode
+    columns = {path: _pluck(records, key, DEFAULTS.get(path)) for path, key in RECORD_KEYS.items()}
+    columns['cost.total'] = [total or cost or 0.0 for total, cost in zip(_pluck(records, 'totalOrderCost'),
+                                                                           _pluck(records, 'totalCost'))]
+    dates = _pluck(records, 'expectedDeliveryDate')
+    columns['expected_delivery_time'] = list(map(_parse_time, dates, _pluck(records, 'expectedDeliveryTime')))
+    columns['expected_pickup_time'] = list(map(_parse_time, dates, _pluck(records, 'expectedPickupTime')))
+    for owner, key, latitude, longitude in RECORD_ADDRESSES:
+        breakdowns = _pluck(records, key)
+        present = _is_type(breakdowns, dict).tolist()
+        columns[owner + '.address'] = present
+        for name in ADDRESS_FIELDS[:6]:
+            columns['{}.address.{}'.format(owner, name)] = [
+                breakdown.get(name) if type(breakdown) is dict else None for breakdown in breakdowns]
+        for name, values in (('latitude', _pluck(records, latitude)), ('longitude', _pluck(records, longitude))):
+            columns['{}.address.{}'.format(owner, name)] = [
+                value if is_present else None for value, is_present in zip(values, present)]
+    return columns
+
+
+def _read_api_records(records: list) -> dict:
+    # Orders returned by the API nest the contacts and the costing, read the same way as OrderCodec.decode
+    size = len(records)
+    customers = _pluck(records, 'customer')
+    pickups = [pickup or {} for pickup in _pluck(records, 'restaurant')]
+    costings = [costing or {} for costing in _pluck(records, 'costing')]
+    columns = {
+        'order_number': _pluck(records, 'orderNumber'),
+        'delivery_instruction': _pluck(records, 'deliveryInstruction'),
+        'pickup_instruction': _pluck(records, 'pickupInstruction'),
+        'expected_delivery_time': [None] * size,
+        'expected_pickup_time': [None] * size,
+        'customer.name': _pluck(customers, 'name'),
+        'customer.email': [email or other for email, other in zip(_pluck(customers, 'emailAddress'),
+                                                                  _pluck(customers, 'email'))],
+        'customer.phone_number': _pluck(customers, 'phoneNumber'),
+        'customer.address_line': _pluck(customers, 'address'),
+        'pickup.name': _pluck(pickups, 'name'),
+        'pickup.phone_number': _pluck(pickups, 'phoneNumber'),
+        'pickup.address_line': _pluck(pickups, 'address'),
+        'cost.tips': _pluck(costings, 'tips', 0.0),
+        'cost.tax': _pluck(costings, 'tax', 0.0),
+        'cost.discount': _pluck(costings, 'discountAmount', 0.0),
+        'cost.delivery_fee': _pluck(costings, 'deliveryFee', 0.0),
+        'cost.total': [total or other or 0.0 for total, other in zip(_pluck(costings, 'totalCost'),
+                                                                     _pluck(costings, 'totalOrderCost'))],
+    }
+    for owner, contacts in zip(ADDRESS_OWNERS, (customers, pickups)):
+        # Only the coordinates of an address are returned, see OrderCodec
+        latitudes, longitudes = _pluck(contacts, 'latitude'), _pluck(contacts, 'longitude')
+        present = [latitude is not None and longitude is not None
+                   for latitude, longitude in zip(latitudes, longitudes)]
+        columns[owner + '.address'] = present
+        for name in ADDRESS_FIELDS[:6]:
+            columns['{}.address.{}'.format(owner, name)] = [None] * size
+        columns[owner + '.address.latitude'] = [value if is_present else None
+                                                for value, is_present in zip(latitudes, present)]
+        columns[owner + '.address.longitude'] = [value if is_present else None
+                                                 for value, is_present in zip(longitudes, present)]
+    return columns
+
+
+class OrderBatch:
+    def __init__(self, orders: Iterable[Order] = ()):
+        orders = list(orders)
+        customers, pickups = _get(orders, '_customer'), _get(orders, '_pickup')
+        owners = {'order': orders, 'customer': customers, 'pickup': pickups}
+        columns = {path: _get(owners[owner], slot) for path, (owner, slot) in ORDER_COLUMNS.items()}
+        costs = _get(orders, '_order_cost')
+        for name, _ in COST_COLUMNS:
+            columns['cost.' + name] = _get(costs, '_' + name)
+        for owner in ADDRESS_OWNERS:
+            addresses = _get(owners[owner], '_address')
+            columns[owner + '.address'] = _is_type(addresses, Address)
+            for name in ADDRESS_FIELDS:
+                slot = '_' + name
+                columns['{}.address.{}'.format(owner, name)] = [
+                    getattr(address, slot) if type(address) is Address else None for address in addresses]
+
+        item_lists = _get(orders, '_order_items')
+        items = [item for order_items in item_lists for item in order_items]
+        item_columns = {'item': _is_type(items, OrderItem)}
+        for name in ITEM_FIELDS:
+            slot = '_' + name
+            item_columns['item.' + name] = [getattr(item, slot) if type(item) is OrderItem else None
+                                            for item in items]
+        self.__fill(len(orders), columns, list(map(len, item_lists)), item_columns)
+        # Batches of orders give back the same objects from to_orders
+        self._orders = orders
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> 'OrderBatch':
+        # Fills the columns straight from wire dicts, in the format of OrderCodec.encode or as returned by the
+        # API, without creating Order objects
+        records = list(records)
+        nested = _is_type(_pluck(records, 'customer'), dict)
+        if not nested.any():
+            columns = _read_records(records)
+        elif nested.all():
+            columns = _read_api_records(records)
+        else:
+            # Both formats in one list, each part is read by its own reader and put back in the record order
+            flags = nested.tolist()
+            parts = (_read_records([record for record, is_nested in zip(records, flags) if not is_nested]),
+                     _read_api_records([record for record, is_nested in zip(records, flags) if is_nested]))
+            positions = np.empty(len(records), dtype=np.int64)
+            positions[np.argsort(nested, kind='stable')] = np.arange(len(records))
+            positions = positions.tolist()
+            columns = {}
+            for path in parts[0]:
+                values = parts[0][path] + parts[1][path]
+                columns[path] = list(map(values.__getitem__, positions))
+        item_lists = [items if type(items) is list else [] for items in
+                      (record.get('orderItem') or record.get('orderItems') for record in records)]
+        items = [item for order_items in item_lists for item in order_items]
+        present = _is_type(items, dict)
+        items = [item if is_present else {} for item, is_present in zip(items, present.tolist())]
+        item_columns = {
+            'item': present,
+            'item.name': _pluck(items, 'name'),
+            'item.unit_price': [price or item.get('unit_price') or 0 for price, item in
+                                zip(_pluck(items, 'unitPrice'), items)],
+            'item.quantity': _pluck(items, 'quantity'),
+            'item.add_ons': [add_ons or item.get('add_ons') for add_ons, item in zip(_pluck(items, 'addOns'), items)],
+            'item.detail': _pluck(items, 'detail'),
+        }
+        batch = cls.__new__(cls)
+        batch.__fill(len(records), columns, list(map(len, item_lists)), item_columns)
+        return batch
+
+    @classmethod
+    def from_columns(cls, columns: dict, item_columns: dict = None, item_counts=None) -> 'OrderBatch':
+        # Columns are lists keyed by OrderLoader field paths, such as 'customer.address.street' or 'item.quantity'.
+        # Missing columns hold what a new Order would, and an address is set when one of its fields is given.
+        sizes = {len(values) for values in columns.values()}
+        if len(sizes) > 1:
+            raise ShipdayException('Columns must have the same length')
+        size = sizes.pop() if sizes else 0
+        item_columns = item_columns or {}
+        item_counts = list(item_counts) if item_counts is not None else [0] * size
+        item_sizes = {len(values) for values in item_columns.values()} | {sum(item_counts)}
+        if len(item_counts) != size or len(item_sizes) > 1:
+            raise ShipdayException('Item counts must match the orders and the item columns')
+        item_size = item_sizes.pop()
+        filled = {}
+        paths = list(ORDER_COLUMNS) + ['cost.' + name for name, _ in COST_COLUMNS] + [
+            '{}.address.{}'.format(owner, name) for owner in ADDRESS_OWNERS for name in ADDRESS_FIELDS]
+        for path in paths:
+            filled[path] = list(columns[path]) if path in columns else [DEFAULTS.get(path)] * size
+        unknown = set(columns) - set(paths)
+        if unknown:
+            raise ShipdayException('Unknown order columns: {}'.format(', '.join(sorted(unknown))))
+        for owner in ADDRESS_OWNERS:
+            present = any(path.startswith(owner + '.address.') for path in columns)
+            filled[owner + '.address'] = np.full(size, present, dtype=bool)
+        filled_items = {'item': np.ones(item_size, dtype=bool)}
+        for name in ITEM_FIELDS:
+            path = 'item.' + name
+            filled_items[path] = list(item_columns[path]) if path in item_columns \
+                else [DEFAULTS.get(path)] * item_size
+        if set(item_columns) - set(filled_items):
+            raise ShipdayException('Unknown item columns: {}'.format(
+                ', '.join(sorted(set(item_columns) - set(filled_items)))))
+        batch = cls.__new__(cls)
+        batch.__fill(size, filled, item_counts, filled_items)
+        return batch
+
+    def __fill(self, size: int, columns: dict, item_counts: list, item_columns: dict):
+        # columns hold lists of raw values, the checks read their types before they are stored as object arrays
+        self._size = size
+        self._orders = None
+        self._order_checks = np.column_stack((
+            _is_type(columns['order_number'], str),
+            _is_type(columns['customer.name'], str),
+            columns['customer.address'],
+            _is_type(columns['customer.phone_number'], str),
+            _is_type(columns['customer.email'], str, NONE_TYPE),
+            _is_type(columns['pickup.name'], str),
+            columns['pickup.address'],
+            _is_type(columns['pickup.phone_number'], str, NONE_TYPE),
+        )).reshape(size, len(ORDER_CHECKS))
+
+        # Rows without an address hold None in every address column, which passes the address checks
+        self._address_checks = []
+        self._coordinates = []
+        for owner in ADDRESS_OWNERS:
+            prefix = owner + '.address.'
+            latitudes, longitudes = columns[prefix + 'latitude'], columns[prefix + 'longitude']
+            self._address_checks.append(np.column_stack(
+                [_is_type(columns[prefix + name], str, NONE_TYPE) for name in ADDRESS_FIELDS[:6]] +
+                [_is_type(latitudes, float, NONE_TYPE), _is_type(longitudes, float, NONE_TYPE)]
+            ).reshape(size, len(ADDRESS_CHECKS)))
+            self._coordinates.append(np.column_stack((_get_numbers(latitudes), _get_numbers(longitudes)))
+                                     .reshape(size, 2))
+
+        self.tips = _get_numbers(columns['cost.tips'])
+        self.tax = _get_numbers(columns['cost.tax'])
+        self.discount = _get_numbers(columns['cost.discount'])
+        self.delivery_fee = _get_numbers(columns['cost.delivery_fee'])
+        self.total = _get_numbers(columns['cost.total'])
+
+        counts = np.array(item_counts, dtype=np.int64)
+        item_size = int(counts.sum())
+        present = item_columns['item']
+        self._item_counts = counts
+        self.item_rows = np.repeat(np.arange(size, dtype=np.int64), counts)
+        self._item_numbers = np.arange(item_size, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        prices, quantities = item_columns['item.unit_price'], item_columns['item.quantity']
+        self._item_checks = np.column_stack((
+            present,
+            _is_type(item_columns['item.name'], str),
+            _is_type(prices, *NUMBER_TYPES),
+            _is_type(quantities, int),
+            _is_type(item_columns['item.add_ons'], str, NONE_TYPE),
+            _is_type(item_columns['item.detail'], str, NONE_TYPE),
+        )).reshape(item_size, len(ITEM_CHECKS))
+        # Values that are not items only fail the first check
+        self._item_checks[~present, 1:] = True
+        self.unit_prices = np.where(present, _get_numbers(prices), np.nan)
+        self.quantities = np.where(present & self._item_checks[:, 3], _get_numbers(quantities), np.nan)
+
+        self._columns = {path: _to_objects(_intern(values) if path in TEXT_COLUMNS else values)
+                         for path, values in columns.items() if not path.endswith('.address')}
+        self._columns.update((owner + '.address', np.asarray(columns[owner + '.address'], dtype=bool))
+                             for owner in ADDRESS_OWNERS)
+        self._item_columns = {path: _to_objects(_intern(values) if path in TEXT_COLUMNS else values)
+                              for path, values in item_columns.items() if path != 'item'}
+        self._item_columns['item'] = present
+        self.order_numbers = self._columns['order_number']
+
+    def get_column(self, path: str) -> np.ndarray:
+        # The raw values of a field, by its OrderLoader path such as 'pickup.name' or 'item.add_ons'
+        if path in self._columns:
+            return self._columns[path]
+        if path in self._item_columns:
+            return self._item_columns[path]
+        raise ShipdayException('Unknown order column: {}'.format(path))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self):
+        return 'OrderBatch(orders={}, items={})'.format(self._size, len(self.item_rows))
+
+    def validate(self) -> List[RowError]:
+        errors = []
+        for column, message in enumerate(ORDER_CHECKS):
+            errors.extend(RowError(row, message) for row in np.flatnonzero(~self._order_checks[:, column]).tolist())
+
+        for prefix, checks, coordinates in zip(ADDRESS_PREFIXES, self._address_checks, self._coordinates):
+            for column, message in enumerate(ADDRESS_CHECKS):
+                errors.extend(RowError(row, '{}: {}'.format(prefix, message))
+                              for row in np.flatnonzero(~checks[:, column]).tolist())
+            latitude, longitude = coordinates[:, 0], coordinates[:, 1]
+            with np.errstate(invalid='ignore'):
+                for values, limit, message in ((latitude, 90, 'Latitude must be between -90 and 90'),
+                                               (longitude, 180, 'Longitude must be between -180 and 180')):
+                    out_of_range = (values < -limit) | (values > limit)
+                    errors.extend(RowError(row, '{}: {}'.format(prefix, message))
+                                  for row in np.flatnonzero(out_of_range).tolist())
+                # Address.verify treats 0.0 like None when checking that both coordinates are set
+                filled = (latitude == latitude) & (latitude != 0)
+                filled = filled.astype(np.int8) + ((longitude == longitude) & (longitude != 0))
+            errors.extend(RowError(row, '{}: Latitude and Longitude must be both None or float'.format(prefix))
+                          for row in np.flatnonzero(filled == 1).tolist())
+
+        for name, message in COST_COLUMNS:
+            values = getattr(self, name)
+            with np.errstate(invalid='ignore'):
+                invalid = ~(values >= 0)
+            errors.extend(RowError(row, message) for row in np.flatnonzero(invalid).tolist())
+
+        with np.errstate(invalid='ignore'):
+            item_checks = np.column_stack((self._item_checks, ~(self.unit_prices < 0), ~(self.quantities < 1))) \
+                if len(self.item_rows) else np.zeros((0, len(ITEM_CHECKS) + 2), dtype=bool)
+        item_messages = ITEM_CHECKS + ('OrderItem must have a valid price', 'Order quantity must be a positive integer')
+        failed_items, failed_columns = np.nonzero(~item_checks)
+        for item, column in zip(failed_items.tolist(), failed_columns.tolist()):
+            errors.append(RowError(int(self.item_rows[item]), 'Exception in item no: {} Message: {}'.format(
+                int(self._item_numbers[item]), item_messages[column])))
+
+        errors.sort(key=lambda error: error.row)
+        return errors
+
+    def to_orders(self, skip_invalid: bool = False) -> List[Order]:
+        # Costs changed on the batch, such as by update_total_cost, are written back to the orders
+        invalid = set(self.get_invalid_rows().tolist()) if skip_invalid else ()
+        rows = [row for row in range(self._size) if row not in invalid]
+        orders = [self._orders[row] for row in rows] if self._orders is not None else self.__create_orders(rows)
+        costs = [(name, getattr(self, name).tolist()) for name, _ in COST_COLUMNS]
+        for row, order in zip(rows, orders):
+            cost = order._order_cost
+            for name, values in costs:
+                value = values[row]
+                if value == value:
+                    setattr(cost, '_' + name, value)
+        return orders
+
+    def __create_orders(self, rows: list) -> List[Order]:
+        # Batches built from columns create their orders only when asked, like OrderCodec.decode does
+        columns = {path: column.tolist() for path, column in self._columns.items()}
+        items = {path: column.tolist() for path, column in self._item_columns.items()}
+        starts = (np.cumsum(self._item_counts) - self._item_counts).tolist()
+        counts = self._item_counts.tolist()
+        orders = []
+        for row in rows:
+            order = Order.__new__(Order)
+            targets = {'order': order, 'customer': Customer.__new__(Customer), 'pickup': Pickup.__new__(Pickup)}
+            for path, (owner, slot) in ORDER_COLUMNS.items():
+                setattr(targets[owner], slot, columns[path][row])
+            for owner in ADDRESS_OWNERS:
+                address = None
+                if columns[owner + '.address'][row]:
+                    address = Address.__new__(Address)
+                    address._unit_in_address = False
+                    for name in ADDRESS_FIELDS:
+                        setattr(address, '_' + name, columns['{}.address.{}'.format(owner, name)][row])
+                targets[owner]._address = address
+            cost = OrderCost.__new__(OrderCost)
+            for name, _ in COST_COLUMNS:
+                setattr(cost, '_' + name, columns['cost.' + name][row])
+            order_items = []
+            for index in range(starts[row], starts[row] + counts[row]):
+                item = OrderItem.__new__(OrderItem)
+                for name in ITEM_FIELDS:
+                    setattr(item, '_' + name, items['item.' + name][index])
+                order_items.append(item)
+            order._customer, order._pickup = targets['customer'], targets['pickup']
+            order._order_cost, order._order_items = cost, order_items
+            orders.append(order)
+        return orders
+
+    def get_invalid_rows(self) -> np.ndarray:
+        return np.unique(np.array([error.row for error in self.validate()], dtype=np.int64))
+
+    def get_item_totals(self) -> np.ndarray:
+        return np.bincount(self.item_rows, weights=self.unit_prices * self.quantities, minlength=self._size)
+
+    def update_total_cost(self) -> np.ndarray:
+        self.total = self.tax + self.tips + self.delivery_fee - self.discount + self.get_item_totals()
+        return self.total
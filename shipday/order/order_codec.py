@@ -0,0 +1,246 @@
+from datetime import datetime
+
+from shipday.httpclient.codec import get_codec
+from shipday.order.address import Address
+from shipday.order.customer import Customer
+from shipday.order.order_cost import OrderCost
+from shipday.order.order_info import Order
+from shipday.order.order_item import OrderItem
+from shipday.order.pickup import Pickup
+from shipday.utils.profiling import profiled
+
+
+def _encode_breakdown(address: Address) -> dict:
+    obj = {}
+    if address._unit is not None:
+        obj['unit'] = address._unit
+    if address._street is not None:
+        obj['street'] = address._street
+    if address._city is not None:
+        obj['city'] = address._city
+    if address._state is not None:
+        obj['state'] = address._state
+    if address._zip is not None:
+        obj['zip'] = address._zip
+    if address._country is not None:
+        obj['country'] = address._country
+    return obj
+
+
+def _encode_item(item: OrderItem) -> dict:
+    obj = {'name': item._name, 'unitPrice': item._unit_price, 'quantity': item._quantity}
+    if item._add_ons is not None:
+        obj['addOns'] = item._add_ons
+    if item._detail is not None:
+        obj['detail'] = item._detail
+    return obj
+
+
+def _decode_address(breakdown: dict, latitude, longitude) -> Address:
+    address = Address.__new__(Address)
+    address._unit = breakdown.get('unit')
+    address._street = breakdown.get('street')
+    address._city = breakdown.get('city')
+    address._state = breakdown.get('state')
+    address._zip = breakdown.get('zip')
+    address._country = breakdown.get('country')
+    address._latitude = latitude
+    address._longitude = longitude
+    address._unit_in_address = False
+    return address
+
+
+def _decode_location(contact: dict):
+    # API orders give the contact address as a single line and coordinates, the breakdown is not returned
+    latitude, longitude = contact.get('latitude'), contact.get('longitude')
+    if latitude is None or longitude is None:
+        return None
+    return _decode_address({}, latitude, longitude)
+
+
+def _decode_item(data: dict) -> OrderItem:
+    item = OrderItem.__new__(OrderItem)
+    item._name = data.get('name')
+    item._unit_price = data.get('unitPrice') or data.get('unit_price') or 0
+    item._quantity = data.get('quantity')
+    item._add_ons = data.get('addOns') or data.get('add_ons')
+    item._detail = data.get('detail')
+    return item
+
+
+def _parse_time(date: str, time: str):
+    if not date or not time:
+        return None
+    try:
+        return datetime.fromisoformat('{}T{}'.format(date, time))
+    except (TypeError, ValueError):
+        return None
+
+
+class OrderCodec:
+    def __init__(self, codec=None):
+        # The default codec is picked on first use so importing the module stays cheap
+        self._codec = get_codec(codec) if codec is not None else None
+
+    def __get_codec(self):
+        if self._codec is None:
+            self._codec = get_codec()
+        return self._codec
+
+    @profiled('build')
+    def encode(self, order: Order) -> dict:
+        cost = order._order_cost
+        total = cost._total
+        obj = {
+            'orderNumber': order._order_number,
+            'orderItem': [_encode_item(item) for item in order._order_items],
+            'tips': cost._tips,
+            'tax': cost._tax,
+            'discountAmount': cost._discount,
+            'deliveryFee': cost._delivery_fee,
+            'totalCost': total,
+            'totalOrderCost': total,
+        }
+
+        customer = order._customer
+        if customer is not None:
+            address = customer._address
+            obj['customerName'] = customer._name
+            obj['customerAddress'] = customer._address_line or (
+                address.get_single_line() if address is not None else None)
+            obj['dropoff'] = _encode_breakdown(address) if address is not None else None
+            obj['customerEmail'] = customer._email
+            obj['customerPhoneNumber'] = customer._phone_number
+            if address is not None and address._latitude is not None and address._longitude is not None:
+                obj['deliveryLatitude'] = address._latitude
+                obj['deliveryLongitude'] = address._longitude
+
+        pickup = order._pickup
+        if pickup is not None:
+            address = pickup._address
+            obj['restaurantName'] = pickup._name
+            obj['restaurantAddress'] = pickup._address_line or (
+                address.get_single_line() if address is not None else None)
+            obj['pickup'] = _encode_breakdown(address) if address is not None else None
+            if address is not None and address._latitude is not None and address._longitude is not None:
+                obj['pickupLatitude'] = address._latitude
+                obj['pickupLongitude'] = address._longitude
+            if pickup._phone_number is not None:
+                obj['restaurantPhoneNumber'] = pickup._phone_number
+
+        delivery_time = order._delivery_time
+        if delivery_time is not None:
+            obj['expectedDeliveryDate'] = delivery_time.date().isoformat()
+            obj['expectedDeliveryTime'] = delivery_time.time().isoformat(timespec='seconds')
+        if order._pickup_time is not None:
+            obj['expectedPickupTime'] = order._pickup_time.time().isoformat(timespec='seconds')
+        if order._delivery_instruction is not None:
+            obj['deliveryInstruction'] = order._delivery_instruction
+        if order._pickup_instruction is not None:
+            obj['pickupInstruction'] = order._pickup_instruction
+        return obj
+
+    @profiled('build')
+    def encode_many(self, orders) -> list:
+        encode = self.encode
+        return [encode(order) for order in orders]
+
+    def dumps(self, orders) -> bytes:
+        if type(orders) is Order:
+            return self.__get_codec().encode(self.encode(orders))
+        return self.__get_codec().encode(self.encode_many(orders))
+
+    def decode(self, data: dict) -> Order:
+        if type(data.get('customer')) is dict:
+            return self.__decode_nested(data)
+        get = data.get
+
+        customer = Customer.__new__(Customer)
+        customer._name = get('customerName')
+        customer._email = get('customerEmail')
+        customer._phone_number = get('customerPhoneNumber')
+        customer._address_line = get('customerAddress')
+        dropoff = get('dropoff')
+        customer._address = _decode_address(dropoff, get('deliveryLatitude'), get('deliveryLongitude')) \
+            if type(dropoff) is dict else None
+
+        pickup = Pickup.__new__(Pickup)
+        pickup._name = get('restaurantName')
+        pickup._phone_number = get('restaurantPhoneNumber')
+        pickup._address_line = get('restaurantAddress')
+        breakdown = get('pickup')
+        pickup._address = _decode_address(breakdown, get('pickupLatitude'), get('pickupLongitude')) \
+            if type(breakdown) is dict else None
+
+        cost = OrderCost.__new__(OrderCost)
+        cost._tips = get('tips', 0.0)
+        cost._tax = get('tax', 0.0)
+        cost._discount = get('discountAmount', 0.0)
+        cost._delivery_fee = get('deliveryFee', 0.0)
+        cost._total = get('totalOrderCost') or get('totalCost') or 0.0
+
+        items = get('orderItem') or get('orderItems') or []
+        delivery_date = get('expectedDeliveryDate')
+        return self.__create_order(get('orderNumber'), customer, pickup, [_decode_item(item) for item in items],
+                                   cost, _parse_time(delivery_date, get('expectedDeliveryTime')),
+                                   _parse_time(delivery_date, get('expectedPickupTime')),
+                                   get('deliveryInstruction'), get('pickupInstruction'))
+
+    def __decode_nested(self, data: dict) -> Order:
+        # Orders returned by the API nest the customer, the restaurant and the costing. Their addresses keep the
+        # single line and the coordinates, the street, city and zip breakdown is not part of the response
+        get = data.get
+        source = data['customer']
+        customer = Customer.__new__(Customer)
+        customer._name = source.get('name')
+        customer._email = source.get('emailAddress') or source.get('email')
+        customer._phone_number = source.get('phoneNumber')
+        customer._address_line = source.get('address')
+        customer._address = _decode_location(source)
+
+        source = get('restaurant') or {}
+        pickup = Pickup.__new__(Pickup)
+        pickup._name = source.get('name')
+        pickup._phone_number = source.get('phoneNumber')
+        pickup._address_line = source.get('address')
+        pickup._address = _decode_location(source)
+
+        source = get('costing') or {}
+        cost = OrderCost.__new__(OrderCost)
+        cost._tips = source.get('tips', 0.0)
+        cost._tax = source.get('tax', 0.0)
+        cost._discount = source.get('discountAmount', 0.0)
+        cost._delivery_fee = source.get('deliveryFee', 0.0)
+        cost._total = source.get('totalCost') or source.get('totalOrderCost') or 0.0
+
+        items = get('orderItem') or get('orderItems') or []
+        return self.__create_order(get('orderNumber'), customer, pickup, [_decode_item(item) for item in items],
+                                   cost, None, None, get('deliveryInstruction'), get('pickupInstruction'))
+
+    @staticmethod
+    def __create_order(order_number, customer, pickup, order_items, order_cost, delivery_time, pickup_time,
+                       delivery_instruction, pickup_instruction) -> Order:
+        order = Order.__new__(Order)
+        order._order_number = order_number
+        order._customer = customer
+        order._pickup = pickup
+        order._order_items = order_items
+        order._order_cost = order_cost
+        order._delivery_time = delivery_time
+        order._pickup_time = pickup_time
+        order._delivery_instruction = delivery_instruction
+        order._pickup_instruction = pickup_instruction
+        return order
+
+    def decode_many(self, data: list) -> list:
+        decode = self.decode
+        return [decode(order) for order in data]
+
+    def loads(self, body: bytes):
+        data = self.__get_codec().decode(body)
+        if type(data) is list:
+            return self.decode_many(data)
+        return self.decode(data)
+
+
+ORDER_CODEC = OrderCodec()
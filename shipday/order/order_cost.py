@@ -1,64 +1,25 @@
-from collections import defaultdict
-
+from shipday.utils.fields import NumberField
 from shipday.utils.verifiers import verify_not_negative
 
 
 class OrderCost:
+    __slots__ = ('_tips', '_tax', '_discount', '_delivery_fee', '_total')
+
+    tips = NumberField("Tips must be a positive number", convert=float)
+    tax = NumberField("Tax must be a positive number")
+    discount = NumberField("Discount must be a positive number")
+    delivery_fee = NumberField("Delivery Fee must be a positive number", convert=float)
+    total = NumberField("Total must be a positive number")
+
     def __init__(self, *args,
                  tips: float = 0.0, tax: float = 0.0, discount: float = 0.0, delivery_fee: float = 0.0,
                  total: float = 0.0,
                  **kwargs):
-        kwargs = defaultdict(lambda: 0.0, **kwargs)
         self._tips = tips
         self._tax = tax
-        self._discount = discount or kwargs['discountAmount']
-        self._delivery_fee = delivery_fee or kwargs['deliveryFee']
-        self._total = total or kwargs['totalOrderCost']
-
-    @property
-    def tips(self):
-        return self._tips
-
-    @tips.setter
-    def tips(self, value):
-        verify_not_negative(value, "Tips must be a positive number")
-        self._tips = float(value)
-
-    @property
-    def tax(self):
-        return self._tax
-
-    @tax.setter
-    def tax(self, value):
-        verify_not_negative(value, "Tax must be a positive number")
-        self._tax = value
-
-    @property
-    def discount(self):
-        return self._discount
-
-    @discount.setter
-    def discount(self, value):
-        verify_not_negative(value, "Discount must be a positive number")
-        self._discount = value
-
-    @property
-    def delivery_fee(self):
-        return self._delivery_fee
-
-    @delivery_fee.setter
-    def delivery_fee(self, value):
-        verify_not_negative(value, "Delivery Fee must be a positive number")
-        self._delivery_fee = float(value)
-
-    @property
-    def total(self):
-        return self._total
-
-    @total.setter
-    def total(self, value):
-        verify_not_negative(value, "Total must be a positive number")
-        self._total = value
+        self._discount = discount or kwargs.get('discountAmount', 0.0)
+        self._delivery_fee = delivery_fee or kwargs.get('deliveryFee', 0.0)
+        self._total = total or kwargs.get('totalOrderCost', 0.0)
 
     def verify(self):
         verify_not_negative(self._tips, "Tips must be a positive number")
@@ -0,0 +1,123 @@
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.codec import get_codec, get_decode_errors
+from shipday.utils.lazy_json import LazyObject
+
+
+class ContactView(LazyObject):
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return self.get('name')
+
+    @property
+    def phone_number(self) -> str:
+        return self.get('phoneNumber')
+
+    @property
+    def address(self) -> str:
+        return self.get('address')
+
+    @property
+    def latitude(self) -> float:
+        return self.get('latitude')
+
+    @property
+    def longitude(self) -> float:
+        return self.get('longitude')
+
+
+class CustomerView(ContactView):
+    __slots__ = ()
+
+    @property
+    def email(self) -> str:
+        email = self.get('emailAddress')
+        return email if email is not None else self.get('email')
+
+
+class PickupView(ContactView):
+    __slots__ = ()
+
+
+class OrderView(LazyObject):
+    __slots__ = ()
+
+    @property
+    def order_id(self) -> int:
+        return self.get('orderId')
+
+    @property
+    def order_number(self) -> str:
+        return self.get('orderNumber')
+
+    @property
+    def order_status(self) -> str:
+        status = self.get('orderStatus')
+        if type(status) is dict:
+            return status.get('orderState')
+        return status
+
+    @property
+    def customer(self) -> CustomerView:
+        return self.get_object('customer', CustomerView)
+
+    @property
+    def pickup(self) -> PickupView:
+        return self.get_object('restaurant', PickupView)
+
+    @property
+    def order_items(self) -> list:
+        items = self.get('orderItem')
+        return items if items is not None else self.get('orderItems')
+
+    @property
+    def order_cost(self) -> dict:
+        return self.get('costing')
+
+    @property
+    def delivery_instruction(self) -> str:
+        return self.get('deliveryInstruction')
+
+    @property
+    def pickup_instruction(self) -> str:
+        return self.get('pickupInstruction')
+
+
+class OrderListView:
+    # The list is read with the native JSON codec in one pass and each order is wrapped in a view. Scanning the
+    # bytes in Python was several times slower than a full orjson or json decode, even for a single field.
+    def __init__(self, buffer: bytes, codec=None):
+        self._buffer = buffer
+        self._codec = codec
+        self._orders = None
+
+    def __get_orders(self) -> list:
+        if self._orders is None:
+            codec = self._codec if self._codec is not None else get_codec()
+            try:
+                orders = codec.decode(self._buffer)
+            except get_decode_errors(codec) as e:
+                raise ShipdayException('Malformed JSON response: {}'.format(e)) from e
+            if type(orders) is not list:
+                raise ShipdayException('Expected a list of orders, got: {}'.format(self._buffer[:200]))
+            self._orders = orders
+        return self._orders
+
+    def __len__(self) -> int:
+        return len(self.__get_orders())
+
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return [OrderView(order) for order in self.__get_orders()[index]]
+        return OrderView(self.__get_orders()[index])
+
+    def __iter__(self):
+        for order in self.__get_orders():
+            yield OrderView(order)
+
+    def to_list(self) -> list:
+        return list(self.__get_orders())
+
+    def __repr__(self):
+        return self._buffer.decode('utf-8')
@@ -1,46 +1,24 @@
 import json
-from collections import defaultdict
 
 from shipday.order.address import Address
+from shipday.utils.fields import TypedField
 from shipday.utils.verifiers import verify_instance_of, verify_none_or_instance_of
 
 
 class Pickup:
+    __slots__ = ('_name', '_address', '_phone_number', '_address_line')
+
+    name = TypedField(str, 'Pickup name is not a string')
+    address = TypedField(Address, 'Pickup address is not of Address type')
+    phone_number = TypedField(str, 'Pickup Phone number is not a string')
+
     def __init__(self, *args,
                  name: str = None, address: Address = None, phone_number: str = None,
                  **kwargs):
-        kwargs = defaultdict(lambda: None, **kwargs)
-        self._name = name or kwargs['restaurantName']
+        self._name = name or kwargs.get('restaurantName')
         self._address = address
-        self._phone_number = phone_number or kwargs['restaurantPhoneNumber']
-        self.__address_line = kwargs['restaurantAddress']
-
-    @property
-    def name(self):
-        return self._name
-
-    @name.setter
-    def name(self, value):
-        verify_instance_of(str, value, 'Pickup name is not a string')
-        self._name = value
-
-    @property
-    def address(self):
-        return self._address
-
-    @address.setter
-    def address(self, value):
-        verify_instance_of(Address, value, 'Pickup address is not of Address type')
-        self._address = value
-
-    @property
-    def phone_number(self):
-        return self._phone_number
-
-    @phone_number.setter
-    def phone_number(self, value):
-        verify_instance_of(str, value, 'Pickup Phone number is not a string')
-        self._phone_number = value
+        self._phone_number = phone_number or kwargs.get('restaurantPhoneNumber')
+        self._address_line = kwargs.get('restaurantAddress')
 
     def __repr__(self):
         return json.dumps(self.get_body())
@@ -53,7 +31,7 @@ class Pickup:
     def get_body(self) -> dict:
         obj = {
             'restaurantName': self.name,
-            'restaurantAddress': self.__address_line or (
+            'restaurantAddress': self._address_line or (
                 self.address.get_single_line() if self._address is not None else None),
             'pickup': self.address.get_breakdown() if self._address is not None else None,
         }
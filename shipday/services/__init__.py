@@ -1,3 +1,25 @@
-from shipday.services.carrier_service import CarrierService
-from shipday.services.order_service import OrderService
-from shipday.services.on_demand_delivery_service import OnDemandDeliveryService
+from importlib import import_module
+
+# Services are resolved on first access so sync users never load asyncio and the async transport
+_LAZY_ATTRIBUTES = {
+    'CarrierService': 'shipday.services.carrier_service',
+    'OrderService': 'shipday.services.order_service',
+    'OnDemandDeliveryService': 'shipday.services.on_demand_delivery_service',
+    'AsyncCarrierService': 'shipday.services.async_carrier_service',
+    'AsyncOrderService': 'shipday.services.async_order_service',
+    'AsyncOnDemandDeliveryService': 'shipday.services.async_on_demand_delivery_service',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,27 @@
+from typing import AsyncIterator
+
+from shipday.carrier import CarrierRequest
+from shipday.httpclient.async_shipdayclient import AsyncShipdayClient
+from shipday.services.carrier_service import CarrierService
+from shipday.utils.lazy_json import iter_stream_async
+
+
+class AsyncCarrierService(CarrierService):
+    def __init__(self, *args, api_key=None, httpclient: AsyncShipdayClient = None, **kwargs):
+        self.httpclient = httpclient or AsyncShipdayClient(*args, api_key=api_key, **kwargs)
+
+    async def get_carriers(self):
+        return await self.httpclient.get(self.path)
+
+    def iter_carriers(self, fields=None, chunk_size: int = 65536) -> AsyncIterator[dict]:
+        return iter_stream_async(self.httpclient.iter_get(self.path, chunk_size), fields)
+
+    async def add_carrier(self, request: CarrierRequest):
+        request.verify()
+        response = await self.httpclient.post(self.path, request.get_body(), invalidates=(self.path,))
+        return self._check_response(response)
+
+    async def delete_carrier(self, carrier_id: int):
+        response = await self.httpclient.delete(self._get_delete_path(carrier_id), invalidates=(self.path,))
+
+        return response
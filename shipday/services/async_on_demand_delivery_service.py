@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import Iterable
+
+from shipday.bo import PodType
+from shipday.exceptions.shipday_exception import ShipdayException
+from shipday.httpclient.async_shipdayclient import AsyncShipdayClient
+from shipday.order.address import Address
+from shipday.services.async_order_watcher import AsyncOnDemandWatcher
+from shipday.services.on_demand_delivery_service import OnDemandDeliveryService
+from shipday.utils.cached_value import AsyncCachedValue
+
+
+class AsyncOnDemandDeliveryService(OnDemandDeliveryService):
+    def __init__(self, *args, api_key=None, httpclient: AsyncShipdayClient = None, services_ttl: float = 60,
+                 services_stale_ttl: float = 60, **kwargs):
+        self.httpclient = httpclient or AsyncShipdayClient(*args, api_key=api_key, **kwargs)
+        self._services_cache = AsyncCachedValue(self._load_services, services_ttl, services_stale_ttl) \
+            if services_ttl else None
+
+    async def get_services(self) -> list:
+        res = await self.httpclient.get(self.SERVICES_PATH)
+        return res
+
+    async def get_active_services(self) -> list:
+        if self._services_cache is not None:
+            services = await self._services_cache.get()
+        else:
+            services = await self._load_services()
+        return self._get_active_service_names(services)
+
+    async def _load_services(self) -> list:
+        return self._check_services(await self.get_services())
+
+    async def estimate(self, order_id: int) -> dict:
+        res = await self.httpclient.get(self._get_order_path(self.ESTIMATE_PATH, order_id))
+        return res
+
+    async def check_availability(self, *args, pickup_address: Address, delivery_address: Address,
+                                 delivery_time: datetime = None) -> dict:
+        data = self._get_availability_payload(pickup_address, delivery_address, delivery_time)
+        res = await self.httpclient.post(self.AVAILABILITY_PATH, data, idempotent=True)
+        return res
+
+    async def assign(self, *args, order_id: int, service_name: str, tip: float = 0, estimate_reference=None,
+                     contactless_delivery: bool = False, pod_types: list[PodType] = None, **kwargs) -> dict:
+        self._verify_assign(order_id, tip, estimate_reference)
+
+        if service_name not in await self.get_active_services():
+            # The cached catalog may be outdated, check once more with a fresh one
+            self.invalidate_services()
+            if self._services_cache is None or service_name not in await self.get_active_services():
+                raise ShipdayException('Service not available')
+        data = self._get_assign_payload(order_id, service_name, tip, estimate_reference, contactless_delivery,
+                                        pod_types)
+
+        res = await self.httpclient.post(self.ASSIGN_PATH, data,
+                                         dedupe=lambda: self._find_assignment(order_id, service_name),
+                                         invalidates=self._get_invalidated_paths(order_id))
+        return res
+
+    async def cancel(self, order_id: int) -> dict:
+        res = await self.httpclient.post(self._get_order_path(self.CANCEL_PATH, order_id), {}, idempotent=True,
+                                         invalidates=self._get_invalidated_paths(order_id))
+        return res
+
+    async def get_details(self, order_id: int) -> dict:
+        res = await self.httpclient.get(self._get_order_path(self.DETAILS_PATH, order_id))
+        return res
+
+    def watch(self, order_ids: Iterable[int], on_change=None, **kwargs) -> AsyncOnDemandWatcher:
+        return AsyncOnDemandWatcher(self, order_ids, on_change=on_change, **kwargs)
+
+    async def _find_assignment(self, order_id: int, service_name: str):
+        return self._get_assignment(await self.httpclient.get(self._get_order_path(self.DETAILS_PATH, order_id),
+                                                              fresh=True), service_name)
@@ -0,0 +1,120 @@
+import asyncio
+from typing import AsyncIterator, Iterable
+
+from shipday.bo import InsertResult
+from shipday.httpclient.async_shipdayclient import AsyncShipdayClient
+from shipday.order import Order, OrderQuery, OrderListView
+from shipday.order.order_codec import ORDER_CODEC
+from shipday.services.async_order_watcher import AsyncOrderWatcher
+from shipday.services.order_service import OrderService
+from shipday.utils.lazy_json import iter_stream_async
+
+
+class AsyncOrderService(OrderService):
+    def __init__(self, *args, api_key=None, httpclient: AsyncShipdayClient = None, **kwargs):
+        self.httpclient = httpclient or AsyncShipdayClient(*args, api_key=api_key, **kwargs)
+
+    async def get_orders(self, lazy: bool = False) -> list:
+        if lazy:
+            return OrderListView(await self.httpclient.get(self.PATH, raw=True))
+        return await self.httpclient.get(self.PATH)
+
+    def iter_orders(self, fields=None, chunk_size: int = 65536) -> AsyncIterator[dict]:
+        return iter_stream_async(self.httpclient.iter_get(self.PATH, chunk_size), fields)
+
+    async def get_order(self, order_number: str, lazy: bool = False) -> list:
+        if lazy:
+            return OrderListView(await self.httpclient.get(self._get_order_path(order_number), raw=True))
+        response = await self.httpclient.get(self._get_order_path(order_number))
+        return response
+
+    async def insert_order(self, request: Order):
+        request.verify()
+        response = await self.httpclient.post(self.PATH, ORDER_CODEC.encode(request),
+                                              dedupe=lambda: self._find_inserted_order(request.order_number),
+                                              invalidates=(self.PATH,))
+        return self._check_response(response)
+
+    async def insert_orders(self, orders: Iterable[Order], max_in_flight: int = 10) -> AsyncIterator[InsertResult]:
+        self._verify_max_in_flight(max_in_flight)
+        pending = set()
+        try:
+            for index, order in enumerate(orders):
+                try:
+                    order.verify()
+                except Exception as e:
+                    yield InsertResult(index, order, exception=e)
+                    continue
+                if len(pending) >= max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(self.__insert_verified_order(index, order)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def __insert_verified_order(self, index: int, order: Order) -> InsertResult:
+        try:
+            response = await self.httpclient.post(self.PATH, ORDER_CODEC.encode(order),
+                                                  dedupe=lambda: self._find_inserted_order(order.order_number),
+                                                  invalidates=(self.PATH,))
+            return InsertResult(index, order, response=self._check_response(response))
+        except Exception as e:
+            return InsertResult(index, order, exception=e)
+
+    async def edit_order(self, order_id: int, request: Order):
+        response = await self.httpclient.put(self.EDIT_PATH.format_map({'order_id': order_id}),
+                                             self._get_edit_payload(order_id, request), invalidates=(self.PATH,))
+        return self._check_response(response)
+
+    async def delete_order(self, order_id: int):
+        response = await self.httpclient.delete(self._get_delete_path(order_id), invalidates=(self.PATH,))
+        return response
+
+    async def assign_order(self, order_id: int, carrier_id: int):
+        response = await self.httpclient.put(self._get_assign_path(order_id, carrier_id), {},
+                                             invalidates=(self.PATH,))
+        return response
+
+    async def query(self, query: OrderQuery, lazy: bool = False):
+        if lazy:
+            body = await self.httpclient.post(self.QUERY_PATH, self._get_query_payload(query), idempotent=True, raw=True)
+            return OrderListView(body)
+        response = await self.httpclient.post(self.QUERY_PATH, self._get_query_payload(query), idempotent=True)
+        return response
+
+    async def iter_query(self, query: OrderQuery, page_size: int = 100) -> AsyncIterator[dict]:
+        payload = self._get_query_payload(query)
+        self._verify_page_size(page_size)
+        cursor = query.start_cursor if query.start_cursor is not None else 1
+        task = asyncio.ensure_future(self.__get_page(payload, cursor, page_size, query.end_cursor))
+        try:
+            while task is not None:
+                orders = await task
+                cursor += len(orders)
+                task = None
+                if self._has_next_page(orders, page_size, cursor, query.end_cursor):
+                    task = asyncio.ensure_future(self.__get_page(payload, cursor, page_size, query.end_cursor))
+                for order in orders:
+                    yield order
+        finally:
+            if task is not None:
+                task.cancel()
+
+    def watch(self, order_ids: Iterable[int], on_change=None, **kwargs) -> AsyncOrderWatcher:
+        return AsyncOrderWatcher(self, order_ids, on_change=on_change, **kwargs)
+
+    async def __get_page(self, payload: dict, cursor: int, page_size: int, end_cursor: int = None) -> list:
+        return self._check_page(await self.httpclient.post(self.QUERY_PATH,
+                                                           self._get_page_payload(payload, cursor, page_size,
+                                                                                  end_cursor),
+                                                           idempotent=True))
+
+    async def _find_inserted_order(self, order_number: str):
+        return self._get_inserted_response(await self.httpclient.get(self._get_order_path(order_number),
+                                                                     fresh=True))
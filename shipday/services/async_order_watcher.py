@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from shipday.services.order_watcher import OnDemandWatcher, OrderWatcher
+
+
+class _AsyncLoop:
+    # Mixed into the async watchers, poll is a coroutine and the background loop is a task
+    _task = None
+
+    async def poll(self) -> list:
+        now = time.monotonic()
+        due = self._watchlist.get_due(now)
+        if not due:
+            return []
+        changes, errors = [], []
+        async for order_id, snapshot, placed in self._fetch(due, errors):
+            self._observe(order_id, snapshot, placed, now, changes, errors)
+        return self._finish(due, now, changes, errors)
+
+    async def run(self, timeout: float = None):
+        self._stopping = False
+        await self.__loop(timeout, True)
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.ensure_future(self.__loop(None, False))
+        return self
+
+    async def stop(self):
+        self._stopping = True
+        self._wake.set()
+        task, self._task = self._task, None
+        if task is not None and task is not asyncio.current_task():
+            await task
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def __loop(self, timeout: float, until_done: bool):
+        # The event of the sync watcher is replaced by one bound to the running loop, add() sets either
+        self._wake = asyncio.Event()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stopping:
+            self._wake.clear()
+            await self.poll()
+            done, delay = self._get_delay(deadline, until_done)
+            if done:
+                return
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+class AsyncOrderWatcher(_AsyncLoop, OrderWatcher):
+    async def _fetch(self, due: list, errors: list):
+        for query, order_ids, unplaced in self._get_queries(due):
+            self._stats.fetches += 1
+            found = set()
+            try:
+                async for order in self._service.iter_query(query, self._page_size):
+                    order_id = order.get('orderId')
+                    if order_id in self._watchlist:
+                        found.add(order_id)
+                        yield order_id, order, self._get_placement_time(order)
+            except Exception as e:
+                self._fail(order_ids, e, errors)
+                continue
+            self._drop_missing(unplaced, found, errors)
+
+
+class AsyncOnDemandWatcher(_AsyncLoop, OnDemandWatcher):
+    async def _fetch(self, due: list, errors: list):
+        semaphore = asyncio.Semaphore(self._max_in_flight)
+
+        async def get_details(order_id: int):
+            async with semaphore:
+                return await self._service.get_details(order_id)
+
+        tasks = [(entry.order_id, asyncio.ensure_future(get_details(entry.order_id))) for entry in due]
+        self._stats.fetches += len(tasks)
+        try:
+            for order_id, task in tasks:
+                try:
+                    details = self._check_details(await task)
+                except Exception as e:
+                    self._fail([order_id], e, errors)
+                    continue
+                yield order_id, details, None
+        finally:
+            for _, task in tasks:
+                task.cancel()
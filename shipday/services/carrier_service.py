@@ -1,27 +1,39 @@
+from typing import Iterator
+
 from shipday.carrier import CarrierRequest
 from shipday.exceptions import ShipdayException
 from shipday.httpclient.shipdayclient import ShipdayClient
+from shipday.utils.lazy_json import iter_stream
 
 
 class CarrierService:
     path = 'carriers/'
 
-    def __init__(self, *args, api_key, **kwargs):
-        self.httpclient = ShipdayClient(*args, api_key=api_key, **kwargs)
+    def __init__(self, *args, api_key=None, httpclient: ShipdayClient = None, **kwargs):
+        self.httpclient = httpclient or ShipdayClient(*args, api_key=api_key, **kwargs)
 
     def get_carriers(self):
         return self.httpclient.get(self.path)
 
+    def iter_carriers(self, fields=None, chunk_size: int = 65536) -> Iterator[dict]:
+        return iter_stream(self.httpclient.iter_get(self.path, chunk_size), fields)
+
     def add_carrier(self, request: CarrierRequest):
         request.verify()
-        response = self.httpclient.post(self.path, request.get_body())
-        if 'errorCode' in response:
-            raise ShipdayException(response['errorMessage'])
-        return response
+        response = self.httpclient.post(self.path, request.get_body(), invalidates=(self.path,))
+        return self._check_response(response)
 
     def delete_carrier(self, carrier_id: int):
+        response = self.httpclient.delete(self._get_delete_path(carrier_id), invalidates=(self.path,))
+
+        return response
+
+    def _get_delete_path(self, carrier_id: int) -> str:
         if type(carrier_id) is not int:
             raise ShipdayException('Provide a valid carrier id')
-        response = self.httpclient.delete(self.path + str(carrier_id))
+        return self.path + str(carrier_id)
 
+    def _check_response(self, response):
+        if 'errorCode' in response:
+            raise ShipdayException(response['errorMessage'])
         return response
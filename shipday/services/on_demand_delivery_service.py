@@ -3,7 +3,10 @@ from shipday.utils.verifiers import verify_instance_of, verify_none_or_instance_
 from shipday.exceptions.shipday_exception import ShipdayException
 from shipday.httpclient.shipdayclient import ShipdayClient
 from shipday.order.address import Address
+from shipday.services.order_watcher import OnDemandWatcher
+from shipday.utils.cached_value import CachedValue
 from datetime import datetime
+from typing import Iterable
 
 
 class OnDemandDeliveryService:
@@ -14,26 +17,97 @@ class OnDemandDeliveryService:
     ASSIGN_PATH = PATH + 'assign'
     DETAILS_PATH = PATH + 'details/{order_id}'
     CANCEL_PATH = PATH + 'cancel/{order_id}'
+    ORDERS_PATH = 'orders/'
 
-    def __init__(self, *args, api_key, **kwargs):
-        self.httpclient = ShipdayClient(*args, api_key=api_key, **kwargs)
+    def __init__(self, *args, api_key=None, httpclient: ShipdayClient = None, services_ttl: float = 60,
+                 services_stale_ttl: float = 60, **kwargs):
+        self.httpclient = httpclient or ShipdayClient(*args, api_key=api_key, **kwargs)
+        self._services_cache = CachedValue(self._load_services, services_ttl, services_stale_ttl) \
+            if services_ttl else None
 
     def get_services(self) -> list:
         res = self.httpclient.get(self.SERVICES_PATH)
         return res
 
     def get_active_services(self) -> list:
-        services = self.get_services()
-        active_services = [tp['name'] for tp in services if tp[tp['name']] is True]
-        return active_services
+        services = self._services_cache.get() if self._services_cache is not None else self._load_services()
+        return self._get_active_service_names(services)
+
+    def _load_services(self) -> list:
+        return self._check_services(self.get_services())
+
+    def invalidate_services(self):
+        if self._services_cache is not None:
+            self._services_cache.invalidate()
 
     def estimate(self, order_id: int) -> dict:
-        verify_instance_of(int, order_id, 'Order id must be integer')
-        res = self.httpclient.get(self.ESTIMATE_PATH.format_map({'order_id': order_id}))
+        res = self.httpclient.get(self._get_order_path(self.ESTIMATE_PATH, order_id))
         return res
 
     def check_availability(self, *args, pickup_address: Address, delivery_address: Address,
                            delivery_time: datetime = None) -> dict:
+        data = self._get_availability_payload(pickup_address, delivery_address, delivery_time)
+        res = self.httpclient.post(self.AVAILABILITY_PATH, data, idempotent=True)
+        return res
+
+    def assign(self, *args, order_id:int, service_name: str, tip: float = 0, estimate_reference=None, contactless_delivery: bool = False, pod_types: list[PodType] = None, **kwargs) -> dict:
+        self._verify_assign(order_id, tip, estimate_reference)
+
+        if service_name not in self.get_active_services():
+            # The cached catalog may be outdated, check once more with a fresh one
+            self.invalidate_services()
+            if self._services_cache is None or service_name not in self.get_active_services():
+                raise ShipdayException('Service not available')
+        data = self._get_assign_payload(order_id, service_name, tip, estimate_reference, contactless_delivery,
+                                        pod_types)
+
+        res = self.httpclient.post(self.ASSIGN_PATH, data,
+                                   dedupe=lambda: self._find_assignment(order_id, service_name),
+                                   invalidates=self._get_invalidated_paths(order_id))
+        return res
+
+    def cancel(self, order_id: int) -> dict:
+        res = self.httpclient.post(self._get_order_path(self.CANCEL_PATH, order_id), {}, idempotent=True,
+                                   invalidates=self._get_invalidated_paths(order_id))
+        return res
+
+    def get_details(self, order_id: int) -> dict:
+        res = self.httpclient.get(self._get_order_path(self.DETAILS_PATH, order_id))
+        return res
+
+    def watch(self, order_ids: Iterable[int], on_change=None, **kwargs) -> OnDemandWatcher:
+        return OnDemandWatcher(self, order_ids, on_change=on_change, **kwargs)
+
+    def _find_assignment(self, order_id: int, service_name: str):
+        # Read past the response cache, outdated details would send the assign again
+        return self._get_assignment(self.httpclient.get(self._get_order_path(self.DETAILS_PATH, order_id),
+                                                        fresh=True), service_name)
+
+    def _get_assignment(self, details, service_name: str):
+        if type(details) is dict and details.get('name') == service_name:
+            return details
+        return None
+
+    def _get_invalidated_paths(self, order_id: int) -> tuple:
+        return self.DETAILS_PATH.format_map({'order_id': order_id}), self.ORDERS_PATH
+
+    def _get_order_path(self, template: str, order_id: int) -> str:
+        verify_instance_of(int, order_id, 'Order id must be integer')
+        return template.format_map({'order_id': order_id})
+
+    def _check_services(self, services) -> list:
+        # Only a catalog is cached, an error body would be served in its place until the TTL runs out
+        if type(services) is dict and 'errorCode' in services:
+            raise ShipdayException(services.get('errorMessage'))
+        if type(services) is not list:
+            raise ShipdayException('Unexpected on-demand services response: {!r}'.format(services))
+        return services
+
+    def _get_active_service_names(self, services: list) -> list:
+        return [tp['name'] for tp in services if tp[tp['name']] is True]
+
+    def _get_availability_payload(self, pickup_address: Address, delivery_address: Address,
+                                  delivery_time: datetime = None) -> dict:
         verify_instance_of(Address, pickup_address, 'Pickup address must be of type {}'.format(Address))
         verify_instance_of(Address, delivery_address, 'Delivery address must be of type {}'.format(Address))
         verify_none_or_instance_of(datetime, delivery_time, 'Delivery Time must be of type {}'.format(datetime))
@@ -56,16 +130,15 @@ class OnDemandDeliveryService:
         if delivery_time is not None:
             data['deliveryTime'] = delivery_time.isoformat()
 
-        res = self.httpclient.post(self.AVAILABILITY_PATH, data)
-        return res
+        return data
 
-    def assign(self, *args, order_id:int, service_name: str, tip: float = 0, estimate_reference=None, contactless_delivery: bool = False, pod_types: list[PodType] = None, **kwargs) -> dict:
+    def _verify_assign(self, order_id: int, tip: float, estimate_reference):
         verify_instance_of(int, order_id, 'Order id must be integer')
         verify_instance_of([int, float], tip, 'Tip must be a number')
         verify_none_or_instance_of(str, estimate_reference, 'Invalid Reference')
 
-        if service_name not in self.get_active_services():
-            raise ShipdayException('Service not available')
+    def _get_assign_payload(self, order_id: int, service_name: str, tip: float, estimate_reference,
+                            contactless_delivery: bool, pod_types: list) -> dict:
         data = {
             'name': service_name,
             'orderId': order_id,
@@ -75,16 +148,4 @@ class OnDemandDeliveryService:
         }
         if estimate_reference is not None:
             data['estimateReference'] = estimate_reference
-
-        res = self.httpclient.post(self.ASSIGN_PATH, data)
-        return res
-
-    def cancel(self, order_id: int) -> dict:
-        verify_instance_of(int, order_id, 'Order id must be integer')
-        res = self.httpclient.post(self.CANCEL_PATH.format_map({'order_id': order_id}), {})
-        return res
-
-    def get_details(self, order_id: int) -> dict:
-        verify_instance_of(int, order_id, 'Order id must be integer')
-        res = self.httpclient.get(self.DETAILS_PATH.format_map({'order_id': order_id}))
-        return res
+        return data
@@ -1,6 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextvars import copy_context
+from typing import Iterable, Iterator
+
+from shipday.bo import InsertResult
 from shipday.exceptions import ShipdayException
 from shipday.httpclient.shipdayclient import ShipdayClient
-from shipday.order import Order, OrderQuery
+from shipday.order import Order, OrderQuery, OrderListView
+from shipday.order.order_codec import ORDER_CODEC
+from shipday.services.order_watcher import OrderWatcher
+from shipday.utils.lazy_json import iter_stream
 from shipday.utils.verifiers import verify_instance_of
 
 
@@ -10,55 +18,170 @@ class OrderService:
     ASSIGN_PATH = PATH + 'assign/{order_id}/{carrier_id}'
     QUERY_PATH = PATH + 'query/'
 
-    def __init__(self, *args, api_key, **kwargs):
-        self.httpclient = ShipdayClient(*args, api_key=api_key, **kwargs)
+    def __init__(self, *args, api_key=None, httpclient: ShipdayClient = None, **kwargs):
+        self.httpclient = httpclient or ShipdayClient(*args, api_key=api_key, **kwargs)
 
-    def get_orders(self) -> list:
+    def get_orders(self, lazy: bool = False) -> list:
+        if lazy:
+            return OrderListView(self.httpclient.get(self.PATH, raw=True))
         return self.httpclient.get(self.PATH)
 
-    def get_order(self, order_number: str) -> list:
-        if order_number is None:
-            raise ShipdayException('Order number can not be None')
-        response = self.httpclient.get(self.PATH + str(order_number))
+    def iter_orders(self, fields=None, chunk_size: int = 65536) -> Iterator[dict]:
+        return iter_stream(self.httpclient.iter_get(self.PATH, chunk_size), fields)
+
+    def get_order(self, order_number: str, lazy: bool = False) -> list:
+        if lazy:
+            return OrderListView(self.httpclient.get(self._get_order_path(order_number), raw=True))
+        response = self.httpclient.get(self._get_order_path(order_number))
         return response
 
     def insert_order(self, request: Order):
         request.verify()
-        response = self.httpclient.post(self.PATH, request.get_body())
-        if 'errorCode' in response:
-            raise ShipdayException(response['errorMessage'])
-        return response
+        response = self.httpclient.post(self.PATH, ORDER_CODEC.encode(request),
+                                        dedupe=lambda: self._find_inserted_order(request.order_number),
+                                        invalidates=(self.PATH,))
+        return self._check_response(response)
+
+    def insert_orders(self, orders: Iterable[Order], max_in_flight: int = 10) -> Iterator[InsertResult]:
+        self._verify_max_in_flight(max_in_flight)
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            pending = set()
+            for index, order in enumerate(orders):
+                try:
+                    order.verify()
+                except Exception as e:
+                    yield InsertResult(index, order, exception=e)
+                    continue
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                # Workers run in a copy of the caller context so a profiled call covers their requests
+                pending.add(executor.submit(copy_context().run, self.__insert_verified_order, index, order))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def __insert_verified_order(self, index: int, order: Order) -> InsertResult:
+        try:
+            response = self.httpclient.post(self.PATH, ORDER_CODEC.encode(order),
+                                            dedupe=lambda: self._find_inserted_order(order.order_number),
+                                            invalidates=(self.PATH,))
+            return InsertResult(index, order, response=self._check_response(response))
+        except Exception as e:
+            return InsertResult(index, order, exception=e)
 
     def edit_order(self, order_id: int, request: Order):
-        request.verify()
-        payload = request.get_body()
-        payload['orderId'] = order_id
-        response = self.httpclient.put(
-            self.EDIT_PATH.format_map(
-                {'order_id': order_id}
-            ),
-            payload
-        )
-        if 'errorCode' in response:
-            raise ShipdayException(response['errorMessage'])
-        return response
+        response = self.httpclient.put(self.EDIT_PATH.format_map({'order_id': order_id}),
+                                       self._get_edit_payload(order_id, request), invalidates=(self.PATH,))
+        return self._check_response(response)
 
     def delete_order(self, order_id: int):
-        verify_instance_of(int, order_id, 'Order id must be integer')
-
-        response = self.httpclient.delete(self.PATH + str(order_id))
+        response = self.httpclient.delete(self._get_delete_path(order_id), invalidates=(self.PATH,))
         return response
 
     def assign_order(self, order_id: int, carrier_id: int):
-        verify_instance_of(int, order_id, 'Order id must be integer')
-        verify_instance_of(int, carrier_id, 'Carrier id must be integer')
+        response = self.httpclient.put(self._get_assign_path(order_id, carrier_id), {},
+                                       invalidates=(self.PATH,))
+        return response
 
-        response = self.httpclient.put(self.ASSIGN_PATH.format_map({'order_id': order_id, 'carrier_id': carrier_id}),
-                                       {})
+    def query(self, query: OrderQuery, lazy: bool = False):
+        if lazy:
+            body = self.httpclient.post(self.QUERY_PATH, self._get_query_payload(query), idempotent=True, raw=True)
+            return OrderListView(body)
+        response = self.httpclient.post(self.QUERY_PATH, self._get_query_payload(query), idempotent=True)
         return response
 
-    def query(self, query: OrderQuery):
+    def iter_query(self, query: OrderQuery, page_size: int = 100) -> Iterator[dict]:
+        payload = self._get_query_payload(query)
+        self._verify_page_size(page_size)
+        cursor = query.start_cursor if query.start_cursor is not None else 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(copy_context().run, self.__get_page, payload, cursor, page_size,
+                                     query.end_cursor)
+            while future is not None:
+                orders = future.result()
+                cursor += len(orders)
+                future = None
+                if self._has_next_page(orders, page_size, cursor, query.end_cursor):
+                    future = executor.submit(copy_context().run, self.__get_page, payload, cursor, page_size,
+                                             query.end_cursor)
+                yield from orders
+
+    def watch(self, order_ids: Iterable[int], on_change=None, **kwargs) -> OrderWatcher:
+        # Reads the orders through query windows instead of one get_order each, see OrderWatcher for the options
+        return OrderWatcher(self, order_ids, on_change=on_change, **kwargs)
+
+    def __get_page(self, payload: dict, cursor: int, page_size: int, end_cursor: int = None) -> list:
+        return self._check_page(self.httpclient.post(self.QUERY_PATH,
+                                                     self._get_page_payload(payload, cursor, page_size, end_cursor),
+                                                     idempotent=True))
+
+    def _get_page_payload(self, payload: dict, cursor: int, page_size: int, end_cursor: int = None) -> dict:
+        page_end = cursor + page_size - 1
+        if end_cursor is not None:
+            page_end = min(page_end, end_cursor)
+        return dict(payload, startCursor=cursor, endCursor=page_end)
+
+    def _check_page(self, orders) -> list:
+        # An error body is a dict, iterating it would yield its keys as orders and never end the pages
+        if type(orders) is dict and 'errorCode' in orders:
+            raise ShipdayException(orders.get('errorMessage'))
+        if type(orders) is not list:
+            raise ShipdayException('Unexpected order query response: {!r}'.format(orders))
+        return orders
+
+    def _has_next_page(self, orders: list, page_size: int, cursor: int, end_cursor: int = None) -> bool:
+        # A short page is the last one
+        return len(orders) >= page_size and (end_cursor is None or cursor <= end_cursor)
+
+    def _verify_page_size(self, page_size: int):
+        verify_instance_of(int, page_size, 'Page size must be integer')
+        if page_size < 1:
+            raise ShipdayException('Page size must be a positive integer')
+
+    def _find_inserted_order(self, order_number: str):
+        # Read past the response cache, a cached empty result would send the insert again
+        return self._get_inserted_response(self.httpclient.get(self._get_order_path(order_number), fresh=True))
+
+    def _get_inserted_response(self, orders):
+        # Used before re-sending an insert that may have gone through, order numbers are expected to be unique
+        if type(orders) is list and len(orders) > 0:
+            return {'success': True, 'orderId': orders[0].get('orderId'), 'response': 'Order already inserted'}
+        return None
+
+    def _get_order_path(self, order_number: str) -> str:
+        if order_number is None:
+            raise ShipdayException('Order number can not be None')
+        return self.PATH + str(order_number)
+
+    def _get_edit_payload(self, order_id: int, request: Order) -> dict:
+        request.verify()
+        payload = ORDER_CODEC.encode(request)
+        payload['orderId'] = order_id
+        return payload
+
+    def _get_delete_path(self, order_id: int) -> str:
+        verify_instance_of(int, order_id, 'Order id must be integer')
+        return self.PATH + str(order_id)
+
+    def _get_assign_path(self, order_id: int, carrier_id: int) -> str:
+        verify_instance_of(int, order_id, 'Order id must be integer')
+        verify_instance_of(int, carrier_id, 'Carrier id must be integer')
+        return self.ASSIGN_PATH.format_map({'order_id': order_id, 'carrier_id': carrier_id})
+
+    def _get_query_payload(self, query: OrderQuery) -> dict:
         if type(query) is not OrderQuery:
             raise ShipdayException("Query is not of type " + str(OrderQuery))
-        response = self.httpclient.post(self.QUERY_PATH, query.get_body())
+        return query.get_body()
+
+    def _verify_max_in_flight(self, max_in_flight: int):
+        verify_instance_of(int, max_in_flight, 'Max in flight must be integer')
+        if max_in_flight < 1:
+            raise ShipdayException('Max in flight must be a positive integer')
+
+    def _check_response(self, response):
+        if 'errorCode' in response:
+            raise ShipdayException(response['errorMessage'])
         return response
@@ -0,0 +1,414 @@
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from shipday.bo import StatusChange
+from shipday.exceptions import ShipdayException
+from shipday.order.order_query import OrderQuery
+from shipday.order.order_status import OrderStatus
+
+# Seconds between two polls of an order in each stage, orders in a final stage are no longer watched
+STATUS_INTERVALS = {
+    OrderStatus.ACTIVE: 60,
+    OrderStatus.NOT_ASSIGNED: 60,
+    OrderStatus.NOT_ACCEPTED: 30,
+    OrderStatus.NOT_STARTED_YET: 30,
+    OrderStatus.STARTED: 15,
+    OrderStatus.PICKED_UP: 10,
+    OrderStatus.READY_TO_DELIVER: 10,
+    OrderStatus.ALREADY_DELIVERED: None,
+    OrderStatus.FAILED_DELIVERY: None,
+    OrderStatus.INCOMPLETE: None,
+}
+# On-demand deliveries also end once they are delivered or cancelled
+DELIVERY_INTERVALS = dict(STATUS_INTERVALS, DELIVERED=None, CANCELLED=None)
+DEFAULT_INTERVAL = 30
+ORDER_FIELDS = ('orderStatus',)
+DELIVERY_FIELDS = ('status',)
+
+# Widens the query windows so an order placed on the edge is not lost to rounding of the time filter
+_WINDOW_PADDING = timedelta(seconds=1)
+
+
+def _verify_number(value, message: str):
+    if type(value) not in (int, float) or value < 0:
+        raise ShipdayException(message)
+
+
+def _get_intervals(defaults: dict, intervals: dict) -> dict:
+    # The given intervals replace the defaults of their statuses only, so final statuses stay final
+    if intervals is not None and type(intervals) is not dict:
+        raise ShipdayException('Intervals must be a dict of status to seconds')
+    merged = dict(defaults)
+    merged.update(intervals or {})
+    return merged
+
+
+def _verify_options(intervals: dict, default_interval: float, fields):
+    for interval in intervals.values():
+        if interval is not None:
+            _verify_number(interval, 'Intervals must be positive numbers or None')
+    _verify_number(default_interval, 'Default interval must be a positive number')
+    if fields is not None and (type(fields) not in (list, tuple) or any(type(field) is not str for field in fields)):
+        raise ShipdayException('Fields must be a list of field names')
+
+
+def _parse_time(value) -> datetime:
+    if type(value) is not str:
+        return None
+    try:
+        placed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return placed if placed.tzinfo is not None else placed.replace(tzinfo=timezone.utc)
+
+
+def _get_windows(entries: list, span: timedelta) -> list:
+    # Groups entries sorted by placement time into as few windows of at most span as possible
+    windows = []
+    for entry in entries:
+        if windows and entry.placed - windows[-1][0] <= span:
+            windows[-1][1] = entry.placed
+            windows[-1][2].append(entry.order_id)
+        else:
+            windows.append([entry.placed, entry.placed, [entry.order_id]])
+    return windows
+
+
+class _Entry:
+    __slots__ = ('order_id', 'status', 'digest', 'placed', 'due')
+
+    def __init__(self, order_id: int, due: float):
+        self.order_id = order_id
+        self.status = None
+        self.digest = None
+        self.placed = None
+        self.due = due
+
+
+class _Watchlist:
+    def __init__(self, intervals: dict, default_interval: float, fields):
+        self._intervals = intervals
+        self._default_interval = default_interval
+        self._fields = fields
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, order_ids: Iterable[int]):
+        order_ids = list(order_ids)
+        for order_id in order_ids:
+            if type(order_id) is not int:
+                raise ShipdayException('Order id must be integer')
+        now = time.monotonic()
+        with self._lock:
+            for order_id in order_ids:
+                if order_id not in self._entries:
+                    self._entries[order_id] = _Entry(order_id, now)
+
+    def remove(self, order_ids: Iterable[int]):
+        with self._lock:
+            for order_id in order_ids:
+                self._entries.pop(order_id, None)
+
+    def __contains__(self, order_id) -> bool:
+        return order_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_due(self, now: float) -> list:
+        with self._lock:
+            return [entry for entry in self._entries.values() if entry.due <= now]
+
+    def get_next_due(self) -> float:
+        with self._lock:
+            return min((entry.due for entry in self._entries.values()), default=None)
+
+    def observe(self, order_id: int, snapshot, status: str, now: float, placed: datetime = None) -> StatusChange:
+        # Snapshots are compared by a digest of the watched fields, only a different digest is a change
+        digest = self.__get_digest(snapshot)
+        with self._lock:
+            entry = self._entries.get(order_id)
+            if entry is None:
+                return None
+            if entry.placed is None:
+                entry.placed = placed
+            change = None
+            if digest != entry.digest:
+                change = StatusChange(order_id, status, entry.status, snapshot)
+                entry.digest, entry.status = digest, status
+            interval = self.__get_interval(status)
+            if interval is None:
+                del self._entries[order_id]
+            else:
+                entry.due = now + interval
+            return change
+
+    def postpone(self, entries: list, now: float):
+        # Orders missing from a poll keep their last snapshot and are polled again after its interval
+        with self._lock:
+            for entry in entries:
+                if entry.due <= now and self._entries.get(entry.order_id) is entry:
+                    interval = self.__get_interval(entry.status)
+                    entry.due = now + (interval if interval is not None else self._default_interval)
+
+    def __get_interval(self, status: str) -> float:
+        return self._intervals[status] if status in self._intervals else self._default_interval
+
+    def __get_digest(self, snapshot) -> bytes:
+        if self._fields is not None and type(snapshot) is dict:
+            snapshot = [snapshot.get(field) for field in self._fields]
+        body = json.dumps(snapshot, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(body.encode('utf-8'), digest_size=16).digest()
+
+
+class _Stats:
+    def __init__(self):
+        self.polls = 0
+        self.fetches = 0
+        self.snapshots = 0
+        self.changes = 0
+        self.errors = 0
+
+    def to_dict(self, watching: int) -> dict:
+        return {'watching': watching, 'polls': self.polls, 'fetches': self.fetches, 'snapshots': self.snapshots,
+                'changes': self.changes, 'errors': self.errors}
+
+
+class _Watcher(ABC):
+    def __init__(self, order_ids: Iterable[int], on_change, on_error, intervals: dict, default_interval: float,
+                 fields):
+        # on_change(change) gets every StatusChange, on_error(order_ids, exception) the failed reads. Without
+        # on_error the first error is raised from poll once the other orders are done.
+        _verify_options(intervals, default_interval, fields)
+        self._watchlist = _Watchlist(intervals, default_interval, fields)
+        self._watchlist.add(order_ids)
+        self._on_change = on_change
+        self._on_error = on_error
+        self._stats = _Stats()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def add(self, order_ids: Iterable[int]):
+        # New orders are polled right away
+        self._watchlist.add(order_ids)
+        self._wake.set()
+
+    def remove(self, order_ids: Iterable[int]):
+        self._watchlist.remove(order_ids)
+
+    def __contains__(self, order_id) -> bool:
+        return order_id in self._watchlist
+
+    def __len__(self) -> int:
+        return len(self._watchlist)
+
+    def poll(self) -> list:
+        # Reads the orders that are due and returns their changes
+        now = time.monotonic()
+        due = self._watchlist.get_due(now)
+        if not due:
+            return []
+        changes, errors = [], []
+        for order_id, snapshot, placed in self._fetch(due, errors):
+            self._observe(order_id, snapshot, placed, now, changes, errors)
+        return self._finish(due, now, changes, errors)
+
+    def run(self, timeout: float = None):
+        # Polls until no order is left to watch, stop() is called or timeout seconds passed
+        self._stopping = False
+        self.__loop(timeout, True)
+
+    def start(self):
+        # Polls in a background thread until stop(), orders in a final stage leave it waiting for new ones
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self.__loop, args=(None, False), daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def get_stats(self) -> dict:
+        return self._stats.to_dict(len(self._watchlist))
+
+    def __loop(self, timeout: float, until_done: bool):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stopping:
+            self._wake.clear()
+            self.poll()
+            done, delay = self._get_delay(deadline, until_done)
+            if done:
+                return
+            self._wake.wait(delay)
+
+    def _get_delay(self, deadline: float, until_done: bool) -> tuple:
+        next_due = self._watchlist.get_next_due()
+        if next_due is None and until_done:
+            return True, None
+        now = time.monotonic()
+        delay = max(next_due - now, 0) if next_due is not None else None
+        if deadline is not None:
+            if now >= deadline:
+                return True, None
+            delay = deadline - now if delay is None else min(delay, deadline - now)
+        return False, delay
+
+    @abstractmethod
+    def _fetch(self, due: list, errors: list):
+        # Yields (order_id, snapshot, placement time or None) for the due orders, failed reads go to _fail
+        pass
+
+    @abstractmethod
+    def _get_status(self, snapshot) -> str:
+        pass
+
+    def _observe(self, order_id: int, snapshot, placed: datetime, now: float, changes: list, errors: list):
+        self._stats.snapshots += 1
+        change = self._watchlist.observe(order_id, snapshot, self._get_status(snapshot), now, placed)
+        if change is None:
+            return
+        self._stats.changes += 1
+        changes.append(change)
+        if self._on_change is not None:
+            try:
+                self._on_change(change)
+            except Exception as e:
+                self._fail([order_id], e, errors)
+
+    def _fail(self, order_ids: list, error: Exception, errors: list):
+        self._stats.errors += 1
+        if self._on_error is None:
+            errors.append(error)
+            return
+        try:
+            self._on_error(order_ids, error)
+        except Exception:
+            # A failing error callback must not stop the other orders
+            pass
+
+    def _finish(self, due: list, now: float, changes: list, errors: list) -> list:
+        self._watchlist.postpone(due, now)
+        self._stats.polls += 1
+        if errors:
+            raise errors[0]
+        return changes
+
+
+class OrderWatcher(_Watcher):
+    def __init__(self, service, order_ids: Iterable[int], *args, on_change=None, on_error=None,
+                 intervals: dict = None, default_interval: float = DEFAULT_INTERVAL, fields=ORDER_FIELDS,
+                 window: float = 3600, lookback: float = 86400, page_size: int = 100, **kwargs):
+        # Orders are read from query results instead of one get_order each. Orders not seen yet are looked for
+        # among the ones placed in the last lookback seconds, then due orders are grouped by placement time
+        # into windows of at most window seconds and each window is one paged query.
+        super().__init__(order_ids, on_change, on_error, _get_intervals(STATUS_INTERVALS, intervals),
+                         default_interval, fields)
+        _verify_number(window, 'Window must be a positive number')
+        _verify_number(lookback, 'Lookback must be a positive number')
+        service._verify_page_size(page_size)
+        self._service = service
+        self._window = timedelta(seconds=window)
+        self._lookback = timedelta(seconds=lookback)
+        self._page_size = page_size
+
+    def _get_status(self, order) -> str:
+        status = order.get('orderStatus') if type(order) is dict else None
+        return status.get('orderState') if type(status) is dict else None
+
+    def _get_placement_time(self, order) -> datetime:
+        log = order.get('activityLog')
+        return _parse_time(log.get('placementTime')) if type(log) is dict else None
+
+    def _get_queries(self, due: list) -> list:
+        recent = None
+        if any(entry.placed is None for entry in due):
+            recent = datetime.now(timezone.utc) - self._lookback
+        older = sorted((entry for entry in due if entry.placed is not None
+                        and (recent is None or entry.placed < recent)), key=lambda entry: entry.placed)
+        # Each query comes with the due orders it covers and the ones only the lookback query can find
+        queries = [(OrderQuery(start_time=first - _WINDOW_PADDING, end_time=last + _WINDOW_PADDING), order_ids, ())
+                   for first, last, order_ids in _get_windows(older, self._window)]
+        if recent is not None:
+            queries.append((OrderQuery(start_time=recent),
+                            [entry.order_id for entry in due if entry.placed is None or entry.placed >= recent],
+                            [entry.order_id for entry in due if entry.placed is None]))
+        return queries
+
+    def _drop_missing(self, unplaced: list, found: set, errors: list):
+        # An order missing from the lookback query was placed before it or does not exist. Watching it would
+        # send the whole lookback query again on every poll, so it is dropped and reported.
+        missing = [order_id for order_id in unplaced if order_id not in found]
+        if missing:
+            self._watchlist.remove(missing)
+            self._fail(missing, ShipdayException('Orders not found among the ones placed in the last {:g} seconds'
+                                                 .format(self._lookback.total_seconds())), errors)
+
+    def _fetch(self, due: list, errors: list):
+        for query, order_ids, unplaced in self._get_queries(due):
+            self._stats.fetches += 1
+            found = set()
+            try:
+                for order in self._service.iter_query(query, self._page_size):
+                    # Other orders placed in the same window are skipped before they are hashed
+                    order_id = order.get('orderId')
+                    if order_id in self._watchlist:
+                        found.add(order_id)
+                        yield order_id, order, self._get_placement_time(order)
+            except Exception as e:
+                self._fail(order_ids, e, errors)
+                continue
+            self._drop_missing(unplaced, found, errors)
+
+
+class OnDemandWatcher(_Watcher):
+    def __init__(self, service, order_ids: Iterable[int], *args, on_change=None, on_error=None,
+                 intervals: dict = None, default_interval: float = DEFAULT_INTERVAL, fields=DELIVERY_FIELDS,
+                 max_in_flight: int = 10, **kwargs):
+        # Deliveries have no batch read, due orders are read with up to max_in_flight get_details at a time
+        super().__init__(order_ids, on_change, on_error, _get_intervals(DELIVERY_INTERVALS, intervals),
+                         default_interval, fields)
+        if type(max_in_flight) is not int or max_in_flight < 1:
+            raise ShipdayException('Max in flight must be a positive integer')
+        self._service = service
+        self._max_in_flight = max_in_flight
+
+    def _get_status(self, details) -> str:
+        return details.get('status') if type(details) is dict else None
+
+    def _check_details(self, details):
+        # Error bodies, such as the one of a cancelled delivery, are failed reads and not snapshots
+        if type(details) is dict and 'errorCode' in details:
+            raise ShipdayException(details.get('errorMessage'))
+        return details
+
+    def _fetch(self, due: list, errors: list):
+        with ThreadPoolExecutor(max_workers=min(self._max_in_flight, len(due))) as executor:
+            futures = [(entry.order_id, executor.submit(copy_context().run, self._service.get_details,
+                                                        entry.order_id)) for entry in due]
+            self._stats.fetches += len(futures)
+            for order_id, future in futures:
+                try:
+                    details = self._check_details(future.result())
+                except Exception as e:
+                    self._fail([order_id], e, errors)
+                    continue
+                yield order_id, details, None
@@ -1,15 +1,58 @@
+from typing import TYPE_CHECKING
+
 from shipday.exceptions import ShipdayException
-from shipday.services import OrderService, CarrierService, OnDemandDeliveryService
+from shipday.httpclient.shipdayclient import ShipdayClient
+from shipday.utils.profiling import ProfiledService, get_profiler
+
+if TYPE_CHECKING:
+    from shipday.services import OrderService, CarrierService, OnDemandDeliveryService
 
 
 class Shipday:
     def __init__(self, *args, api_key, **kwargs):
         self.__api_key__ = api_key
         self.__verify_api_key()
-        self.OrderService = OrderService(api_key=api_key)
-        self.CarrierService = CarrierService(api_key=api_key)
-        self.OnDemandDeliveryService = OnDemandDeliveryService(api_key=api_key)
+        # profiler=True creates one profiler shared by the client and the services
+        self.profiler = get_profiler(kwargs['profiler'] if 'profiler' in kwargs else None)
+        if self.profiler is not None:
+            kwargs['profiler'] = self.profiler
+        self.httpclient = ShipdayClient(*args, api_key=api_key, **kwargs)
+        self.__kwargs = kwargs
+        self.__services = {}
 
     def __verify_api_key(self):
         if self.__api_key__ is None or len(self.__api_key__) < 10:
             raise ShipdayException('Invalid API key')
+
+    def __get_service(self, service_class):
+        service = self.__services.get(service_class)
+        if service is None:
+            service = service_class(httpclient=self.httpclient, **self.__kwargs)
+            if self.profiler is not None:
+                service = ProfiledService(service, self.profiler)
+            service = self.__services.setdefault(service_class, service)
+        return service
+
+    @property
+    def OrderService(self) -> 'OrderService':
+        from shipday.services.order_service import OrderService
+        return self.__get_service(OrderService)
+
+    @property
+    def CarrierService(self) -> 'CarrierService':
+        from shipday.services.carrier_service import CarrierService
+        return self.__get_service(CarrierService)
+
+    @property
+    def OnDemandDeliveryService(self) -> 'OnDemandDeliveryService':
+        from shipday.services.on_demand_delivery_service import OnDemandDeliveryService
+        return self.__get_service(OnDemandDeliveryService)
+
+    def close(self):
+        self.httpclient.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
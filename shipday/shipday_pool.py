@@ -0,0 +1,74 @@
+import threading
+
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.fair_scheduler import FairScheduler
+from shipday.shipday_object import Shipday
+
+
+def _verify_factory(factory, name: str):
+    if factory is not None and not callable(factory):
+        raise ShipdayException('{} must be a factory, every api key gets its own'.format(name))
+
+
+class ShipdayPool:
+    def __init__(self, *args, max_in_flight: int = 20, weights: dict = None, rate_limiter=None,
+                 response_cache=None, **kwargs):
+        # Rate limiters and response caches hold the state of one account, so they are given as factories and
+        # built once per api key. The other keyword arguments are passed to every Shipday.
+        _verify_factory(rate_limiter, 'Rate limiter')
+        _verify_factory(response_cache, 'Response cache')
+        self.scheduler = FairScheduler(max_in_flight)
+        self.__rate_limiter = rate_limiter
+        self.__response_cache = response_cache
+        self.__weights = dict(weights or {})
+        self.__kwargs = kwargs
+        self.__tenants = {}
+        self.__lock = threading.Lock()
+
+    def get(self, api_key: str) -> Shipday:
+        tenant = self.__tenants.get(api_key)
+        if tenant is None:
+            with self.__lock:
+                tenant = self.__tenants.get(api_key)
+                if tenant is None:
+                    tenant = self.__tenants[api_key] = self.__create_tenant(api_key)
+        return tenant
+
+    def __create_tenant(self, api_key: str) -> Shipday:
+        kwargs = dict(self.__kwargs)
+        if self.__rate_limiter is not None:
+            kwargs['rate_limiter'] = self.__rate_limiter()
+        if self.__response_cache is not None:
+            kwargs['response_cache'] = self.__response_cache()
+        flow = self.scheduler.get_flow(api_key, self.__weights.get(api_key))
+        return Shipday(api_key=api_key, scheduler=flow, **kwargs)
+
+    def set_weight(self, api_key: str, weight: float):
+        # A tenant with weight 2 gets twice the share of a tenant with weight 1 when both have requests waiting
+        self.scheduler.set_weight(api_key, weight)
+        self.__weights[api_key] = weight
+
+    def remove(self, api_key: str):
+        with self.__lock:
+            tenant = self.__tenants.pop(api_key, None)
+        if tenant is not None:
+            tenant.close()
+            self.scheduler.remove_flow(api_key)
+
+    def __contains__(self, api_key: str) -> bool:
+        return api_key in self.__tenants
+
+    def __len__(self) -> int:
+        return len(self.__tenants)
+
+    def close(self):
+        with self.__lock:
+            tenants, self.__tenants = list(self.__tenants.values()), {}
+        for tenant in tenants:
+            tenant.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
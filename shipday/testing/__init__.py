@@ -0,0 +1,3 @@
+from shipday.testing.faults import Faults, Fault, constant, uniform, exponential, lognormal
+from shipday.testing.state import StandInState
+from shipday.testing.server import StandInServer
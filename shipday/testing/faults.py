@@ -0,0 +1,89 @@
+import math
+import random
+import threading
+
+from shipday.exceptions import ShipdayException
+
+
+def constant(seconds: float):
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float):
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential(mean: float):
+    return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+
+
+def lognormal(median: float, sigma: float = 0.5):
+    # Long tailed, closer to what real APIs look like than a uniform spread
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def _get_latency(latency):
+    if latency is None:
+        return None
+    if type(latency) in (int, float):
+        if latency < 0:
+            raise ShipdayException('Latency must be a positive number')
+        return constant(float(latency))
+    if not callable(latency):
+        raise ShipdayException('Latency must be a number or a distribution')
+    return latency
+
+
+class Fault:
+    __slots__ = ('status', 'retry_after', 'latency', 'slow_body')
+
+    def __init__(self, status: int = None, retry_after: float = None, latency: float = 0.0, slow_body: float = 0.0):
+        self.status = status
+        self.retry_after = retry_after
+        self.latency = latency
+        self.slow_body = slow_body
+
+    def __repr__(self):
+        return 'Fault(status={}, latency={:.4f}, slow_body={:.4f})'.format(self.status, self.latency, self.slow_body)
+
+
+class Faults:
+    def __init__(self, *args, latency=None, error_rate: float = 0.0, error_statuses=(500, 502, 503),
+                 rate_limit_every: int = 0, rate_limit_burst: int = 0, retry_after: float = 1,
+                 slow_body: float = 0.0, seed=None, **kwargs):
+        if type(error_rate) not in (int, float) or not 0 <= error_rate <= 1:
+            raise ShipdayException('Error rate must be between 0 and 1')
+        if not error_statuses or any(type(status) is not int or status < 500 for status in error_statuses):
+            raise ShipdayException('Error statuses must be 5xx status codes')
+        if type(rate_limit_every) is not int or type(rate_limit_burst) is not int \
+                or rate_limit_every < 0 or rate_limit_burst < 0 or rate_limit_burst > rate_limit_every:
+            raise ShipdayException('Rate limit burst must fit in rate_limit_every requests')
+        self._latency = _get_latency(latency)
+        self._slow_body = _get_latency(slow_body)
+        self._error_rate = error_rate
+        self._error_statuses = tuple(error_statuses)
+        self._rate_limit_every = rate_limit_every
+        self._rate_limit_burst = rate_limit_burst
+        self._retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def next(self) -> Fault:
+        # Decides what happens to the next request, the first rate_limit_burst of every rate_limit_every
+        # requests are rejected with 429
+        with self._lock:
+            count = self._count
+            self._count += 1
+            rng = self._random
+            fault = Fault(latency=self._latency(rng) if self._latency is not None else 0.0,
+                          slow_body=self._slow_body(rng) if self._slow_body is not None else 0.0)
+            if self._rate_limit_every and count % self._rate_limit_every < self._rate_limit_burst:
+                fault.status, fault.retry_after = 429, self._retry_after
+            elif self._error_rate and rng.random() < self._error_rate:
+                fault.status = rng.choice(self._error_statuses)
+        return fault
+
+
+NO_FAULTS = Faults()
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from shipday.testing.faults import Faults, NO_FAULTS
+from shipday.testing.state import StandInState
+
+SLOW_BODY_CHUNKS = 10
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Keep alive lets the client reuse pooled connections like it does against the real API
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes, without TCP_NODELAY every response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.__handle('GET')
+
+    def do_POST(self):
+        self.__handle('POST')
+
+    def do_PUT(self):
+        self.__handle('PUT')
+
+    def do_DELETE(self):
+        self.__handle('DELETE')
+
+    def __handle(self, method: str):
+        server: StandInServer = self.server.stand_in
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        server.record(method, self.path)
+        fault = server.faults.next()
+        if fault.latency:
+            time.sleep(fault.latency)
+
+        headers = {}
+        if not (self.headers.get('Authorization') or '').startswith('Basic '):
+            status, payload = 401, {'errorCode': 401, 'errorMessage': 'Unauthorized'}
+        elif fault.status == 429:
+            status, payload = 429, {'errorCode': 429, 'errorMessage': 'Too many requests'}
+            headers['Retry-After'] = str(fault.retry_after)
+            headers['X-RateLimit-Remaining'] = '0'
+        elif fault.status is not None:
+            status, payload = fault.status, {'errorCode': fault.status, 'errorMessage': 'Injected failure'}
+        else:
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                status, payload = 400, {'errorCode': 400, 'errorMessage': 'Malformed JSON'}
+            else:
+                status, payload = server.state.handle(method, self.path[len(server.prefix):], data)
+        self.__reply(status, json.dumps(payload).encode('utf-8'), headers, fault.slow_body)
+
+    def __reply(self, status: int, body: bytes, headers: dict, slow_body: float):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not slow_body:
+            self.wfile.write(body)
+            return
+        # A slow body trickles out in chunks spread over slow_body seconds
+        size = max(1, -(-len(body) // SLOW_BODY_CHUNKS))
+        starts = range(0, len(body), size)
+        for start in starts:
+            time.sleep(slow_body / len(starts))
+            self.wfile.write(body[start:start + size])
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    def __init__(self, *args, state: StandInState = None, faults: Faults = None, host: str = '127.0.0.1',
+                 port: int = 0, **kwargs):
+        # Extra keyword arguments such as orders and carriers seed a new state
+        self.state = state if state is not None else StandInState(**kwargs)
+        self.faults = faults if faults is not None else NO_FAULTS
+        self.prefix = '/'
+        self.requests = []
+        self._requests_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), StandInHandler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}{}'.format(host, port, self.prefix)
+
+    def record(self, method: str, path: str):
+        with self._requests_lock:
+            self.requests.append((method, path))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,201 @@
+import re
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_SERVICES = ('DoorDash', 'Uber')
+
+
+def _error(status: int, message: str) -> tuple:
+    return status, {'errorCode': status, 'errorMessage': message}
+
+
+def _parse_time(value):
+    try:
+        time = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return time if time.tzinfo is not None else time.replace(tzinfo=timezone.utc)
+
+
+def _to_api_order(order_id: int, payload: dict, placement_time: str) -> dict:
+    # Orders are sent in the flat insert format and read back in the nested format the API returns
+    get = payload.get
+    total = get('totalOrderCost')
+    return {
+        'orderId': order_id,
+        'orderNumber': get('orderNumber'),
+        'customer': {'name': get('customerName'), 'address': get('customerAddress'),
+                     'emailAddress': get('customerEmail'), 'phoneNumber': get('customerPhoneNumber'),
+                     'latitude': get('deliveryLatitude'), 'longitude': get('deliveryLongitude')},
+        'restaurant': {'name': get('restaurantName'), 'address': get('restaurantAddress'),
+                       'phoneNumber': get('restaurantPhoneNumber'),
+                       'latitude': get('pickupLatitude'), 'longitude': get('pickupLongitude')},
+        'orderItem': get('orderItem') or [],
+        'costing': {'totalCost': total if total is not None else get('totalCost'), 'tips': get('tips'),
+                    'tax': get('tax'), 'discountAmount': get('discountAmount'), 'deliveryFee': get('deliveryFee')},
+        'orderStatus': {'orderState': 'ACTIVE'},
+        'assignedCarrier': None,
+        'activityLog': {'placementTime': placement_time},
+        'deliveryInstruction': get('deliveryInstruction'),
+        'pickupInstruction': get('pickupInstruction'),
+    }
+
+
+class StandInState:
+    ROUTES = (
+        ('GET', re.compile(r'orders/?'), 'get_orders'),
+        ('POST', re.compile(r'orders/?'), 'insert_order'),
+        ('POST', re.compile(r'orders/query/?'), 'query_orders'),
+        ('PUT', re.compile(r'orders/assign/(\d+)/(\d+)'), 'assign_order'),
+        ('GET', re.compile(r'orders/([^/]+)'), 'get_order'),
+        ('DELETE', re.compile(r'orders/(\d+)'), 'delete_order'),
+        ('PUT', re.compile(r'order/edit/(\d+)'), 'edit_order'),
+        ('GET', re.compile(r'carriers/?'), 'get_carriers'),
+        ('POST', re.compile(r'carriers/?'), 'add_carrier'),
+        ('DELETE', re.compile(r'carriers/(\d+)'), 'delete_carrier'),
+        ('GET', re.compile(r'on-demand/services'), 'get_services'),
+        ('GET', re.compile(r'on-demand/estimate/(\d+)'), 'estimate'),
+        ('POST', re.compile(r'on-demand/assign'), 'assign_delivery'),
+        ('POST', re.compile(r'on-demand/cancel/(\d+)'), 'cancel_delivery'),
+        ('GET', re.compile(r'on-demand/details/(\d+)'), 'get_delivery'),
+        ('POST', re.compile(r'third-party/availability'), 'check_availability'),
+    )
+
+    def __init__(self, *args, orders=(), carriers=(), services=DEFAULT_SERVICES, **kwargs):
+        self._lock = threading.Lock()
+        self.orders = {}
+        self.carriers = {}
+        self.deliveries = {}
+        self.services = list(services)
+        self._next_order_id = 1
+        self._next_carrier_id = 1
+        for order in orders:
+            order = dict(order)
+            order_id = order.get('orderId') or self._next_order_id
+            order['orderId'] = order_id
+            self.orders[order_id] = order
+            self._next_order_id = max(self._next_order_id, order_id + 1)
+        for carrier in carriers:
+            carrier = dict(carrier)
+            carrier_id = carrier.get('id') or self._next_carrier_id
+            carrier['id'] = carrier_id
+            self.carriers[carrier_id] = carrier
+            self._next_carrier_id = max(self._next_carrier_id, carrier_id + 1)
+
+    def handle(self, method: str, path: str, payload=None) -> tuple:
+        # Returns the status code and the JSON body for a request path without the base url
+        path = path.split('?', 1)[0].lstrip('/')
+        for route_method, pattern, name in self.ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match is not None:
+                with self._lock:
+                    return getattr(self, '_' + name)(payload, *match.groups())
+        return _error(404, 'No route for {} {}'.format(method, path))
+
+    def _get_orders(self, payload) -> tuple:
+        return 200, list(self.orders.values())
+
+    def _get_order(self, payload, order_number: str) -> tuple:
+        return 200, [order for order in self.orders.values() if order.get('orderNumber') == order_number]
+
+    def _insert_order(self, payload) -> tuple:
+        if type(payload) is not dict or not payload.get('orderNumber'):
+            return _error(400, 'Order number is required')
+        order_id = self._next_order_id
+        self._next_order_id += 1
+        self.orders[order_id] = _to_api_order(order_id, payload, datetime.now(timezone.utc).isoformat())
+        return 200, {'success': True, 'orderId': order_id, 'response': 'Order inserted'}
+
+    def _edit_order(self, payload, order_id: str) -> tuple:
+        order = self.orders.get(int(order_id))
+        if order is None:
+            return _error(404, 'Order not found')
+        edited = _to_api_order(order['orderId'], payload or {}, order['activityLog']['placementTime']
+                               if type(order.get('activityLog')) is dict else None)
+        edited['orderStatus'], edited['assignedCarrier'] = order.get('orderStatus'), order.get('assignedCarrier')
+        self.orders[order['orderId']] = edited
+        return 200, {'success': True, 'orderId': order['orderId'], 'response': 'Order updated'}
+
+    def _delete_order(self, payload, order_id: str) -> tuple:
+        if self.orders.pop(int(order_id), None) is None:
+            return _error(404, 'Order not found')
+        return 200, {'success': True}
+
+    def _assign_order(self, payload, order_id: str, carrier_id: str) -> tuple:
+        order, carrier = self.orders.get(int(order_id)), self.carriers.get(int(carrier_id))
+        if order is None or carrier is None:
+            return _error(404, 'Order or carrier not found')
+        order['assignedCarrier'] = dict(carrier)
+        order['orderStatus'] = {'orderState': 'ASSIGNED'}
+        return 200, {'success': True}
+
+    def _query_orders(self, payload) -> tuple:
+        payload = payload or {}
+        start, end = _parse_time(payload.get('startTime')), _parse_time(payload.get('endTime'))
+        status = payload.get('orderStatus')
+        matches = []
+        for order in self.orders.values():
+            if status is not None and (order.get('orderStatus') or {}).get('orderState') != status:
+                continue
+            if start is not None or end is not None:
+                placed = _parse_time((order.get('activityLog') or {}).get('placementTime'))
+                if placed is None or (start is not None and placed < start) or (end is not None and placed > end):
+                    continue
+            matches.append(order)
+        # Cursors are 1 based and both ends are included
+        first = max(1, payload.get('startCursor') or 1)
+        last = payload.get('endCursor')
+        return 200, matches[first - 1:last]
+
+    def _get_carriers(self, payload) -> tuple:
+        return 200, list(self.carriers.values())
+
+    def _add_carrier(self, payload) -> tuple:
+        if type(payload) is not dict or not payload.get('name'):
+            return _error(400, 'Carrier name is required')
+        carrier_id = self._next_carrier_id
+        self._next_carrier_id += 1
+        self.carriers[carrier_id] = dict(payload, id=carrier_id, isActive=True)
+        return 200, {'success': True, 'id': carrier_id}
+
+    def _delete_carrier(self, payload, carrier_id: str) -> tuple:
+        if self.carriers.pop(int(carrier_id), None) is None:
+            return _error(404, 'Carrier not found')
+        return 200, {'success': True}
+
+    def _get_services(self, payload) -> tuple:
+        return 200, [{'name': name, name: True} for name in self.services]
+
+    def _estimate(self, payload, order_id: str) -> tuple:
+        if int(order_id) not in self.orders:
+            return _error(404, 'Order not found')
+        return 200, [{'name': name, 'fee': 5.0 + index, 'referenceId': '{}-{}'.format(name, order_id)}
+                     for index, name in enumerate(self.services)]
+
+    def _check_availability(self, payload) -> tuple:
+        return 200, [{'name': name, 'available': True, 'fee': 5.0 + index}
+                     for index, name in enumerate(self.services)]
+
+    def _assign_delivery(self, payload) -> tuple:
+        payload = payload or {}
+        order_id = payload.get('orderId')
+        if order_id not in self.orders:
+            return _error(404, 'Order not found')
+        if payload.get('name') not in self.services:
+            return _error(400, 'Service not available')
+        details = dict(payload, status='ASSIGNED')
+        self.deliveries[order_id] = details
+        return 200, details
+
+    def _cancel_delivery(self, payload, order_id: str) -> tuple:
+        if self.deliveries.pop(int(order_id), None) is None:
+            return _error(404, 'Delivery not found')
+        return 200, {'success': True}
+
+    def _get_delivery(self, payload, order_id: str) -> tuple:
+        details = self.deliveries.get(int(order_id))
+        if details is None:
+            return _error(404, 'Delivery not found')
+        return 200, details
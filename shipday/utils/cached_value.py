@@ -0,0 +1,124 @@
+import threading
+import time
+
+from shipday.utils.verifiers import verify_not_negative
+
+
+class CachedValue:
+    def __init__(self, loader, ttl: float, stale_ttl: float = 0):
+        verify_not_negative(ttl, 'TTL must not be negative')
+        verify_not_negative(stale_ttl, 'Stale TTL must not be negative')
+        self._loader = loader
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._value = None
+        self._loaded_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _get_age(self) -> float:
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    def get(self):
+        age = self._get_age()
+        if age is not None and age < self._ttl:
+            return self._value
+        if age is not None and age < self._ttl + self._stale_ttl:
+            self.__refresh_in_background()
+            return self._value
+        with self._lock:
+            # Another caller may have loaded the value while we were waiting for the lock
+            age = self._get_age()
+            if age is None or age >= self._ttl:
+                self.__load()
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._loaded_at = None
+
+    def __load(self):
+        value = self._loader()
+        self._value = value
+        self._loaded_at = time.monotonic()
+
+    def __refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.__refresh, daemon=True).start()
+
+    def __refresh(self):
+        # The flag is cleared under the lock that guards its check, so two refreshes never run at once
+        with self._lock:
+            try:
+                age = self._get_age()
+                if age is None or age >= self._ttl:
+                    self.__load()
+            except Exception:
+                # The stale value is served until a later refresh succeeds
+                pass
+            finally:
+                self._refreshing = False
+
+
+class AsyncCachedValue:
+    def __init__(self, loader, ttl: float, stale_ttl: float = 0):
+        verify_not_negative(ttl, 'TTL must not be negative')
+        verify_not_negative(stale_ttl, 'Stale TTL must not be negative')
+        self._loader = loader
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._value = None
+        self._loaded_at = None
+        self._refresh_task = None
+        self._lock = None
+
+    def _get_age(self) -> float:
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    def __get_lock(self) -> 'asyncio.Lock':
+        # asyncio is imported on first use, the sync services share this module and should not load it
+        import asyncio
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def get(self):
+        age = self._get_age()
+        if age is not None and age < self._ttl:
+            return self._value
+        if age is not None and age < self._ttl + self._stale_ttl:
+            if self._refresh_task is None or self._refresh_task.done():
+                import asyncio
+                self._refresh_task = asyncio.ensure_future(self.__refresh())
+            return self._value
+        async with self.__get_lock():
+            age = self._get_age()
+            if age is None or age >= self._ttl:
+                await self.__load()
+            return self._value
+
+    def invalidate(self):
+        self._value = None
+        self._loaded_at = None
+
+    async def __load(self):
+        value = await self._loader()
+        self._value = value
+        self._loaded_at = time.monotonic()
+
+    async def __refresh(self):
+        try:
+            async with self.__get_lock():
+                age = self._get_age()
+                if age is None or age >= self._ttl:
+                    await self.__load()
+        except Exception:
+            pass
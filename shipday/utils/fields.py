@@ -0,0 +1,82 @@
+from shipday.exceptions import ShipdayException
+from shipday.utils.verifiers import NUMBER_TYPES
+
+
+# Public attributes backed by a private slot, by default the attribute name with a leading underscore
+class Field:
+    __slots__ = ('name', 'slot', '_member')
+
+    def __init__(self, slot: str = None):
+        self.name = None
+        self.slot = slot
+        self._member = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        if self.slot is None:
+            self.slot = '_' + name
+        # The member descriptor of the slot, reading through it skips the attribute lookup
+        self._member = getattr(owner, self.slot)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self._member.__get__(instance, owner)
+
+    def __set__(self, instance, value):
+        self.verify(value)
+        self._member.__set__(instance, value)
+
+    def verify(self, value):
+        pass
+
+
+class TypedField(Field):
+    __slots__ = ('types', 'message', 'optional')
+
+    def __init__(self, types, message: str, optional: bool = False, slot: str = None):
+        super().__init__(slot)
+        self.types = tuple(types) if type(types) in (list, tuple) else (types,)
+        self.message = message
+        self.optional = optional
+
+    def verify(self, value):
+        if value is None:
+            if not self.optional:
+                raise ShipdayException(self.message)
+        elif type(value) not in self.types:
+            raise ShipdayException(self.message)
+
+
+class NumberField(TypedField):
+    __slots__ = ('minimum', 'convert')
+
+    def __init__(self, message: str, minimum=0, types=NUMBER_TYPES, convert=None, slot: str = None):
+        super().__init__(types, message, slot=slot)
+        self.minimum = minimum
+        self.convert = convert
+
+    def __set__(self, instance, value):
+        self.verify(value)
+        self._member.__set__(instance, value if self.convert is None else self.convert(value))
+
+    def verify(self, value):
+        if type(value) not in self.types or (self.minimum is not None and value < self.minimum):
+            raise ShipdayException(self.message)
+
+
+class ListField(Field):
+    __slots__ = ('item_type', 'message', 'item_message')
+
+    def __init__(self, item_type, message: str, item_message: str, slot: str = None):
+        super().__init__(slot)
+        self.item_type = item_type
+        self.message = message
+        self.item_message = item_message
+
+    def verify(self, value):
+        if type(value) is not list:
+            raise ShipdayException(self.message)
+        for item in value:
+            if type(item) is not self.item_type:
+                raise ShipdayException(self.item_message)
@@ -0,0 +1,311 @@
+import json
+import re
+
+from shipday.exceptions import ShipdayException
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(rb'[^,\]}\s]+')
+# Skips everything up to the next bracket, including whole strings that may contain brackets
+_SKIP = re.compile(rb'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+
+_OPEN = (ord('{'), ord('['))
+_QUOTE = ord('"')
+_COMMA = ord(',')
+_COLON = ord(':')
+_OBJECT_END = ord('}')
+_ARRAY_END = ord(']')
+
+
+def _malformed(pos: int) -> ShipdayException:
+    return ShipdayException('Malformed JSON response at position {}'.format(pos))
+
+
+def skip_whitespace(buffer: bytes, pos: int) -> int:
+    return _WHITESPACE.match(buffer, pos).end()
+
+
+def _find_value_end(buffer: bytes, pos: int, final: bool = True):
+    # Returns None when the value runs past the end of the buffer
+    if pos >= len(buffer):
+        return None
+    first = buffer[pos]
+    if first in _OPEN:
+        depth = 0
+        while True:
+            pos = _SKIP.match(buffer, pos).end()
+            if pos >= len(buffer) or buffer[pos] == _QUOTE:
+                # Ran out of data, possibly inside a string
+                return None
+            depth += 1 if buffer[pos] in _OPEN else -1
+            pos += 1
+            if depth == 0:
+                return pos
+    if first == _QUOTE:
+        match = _STRING.match(buffer, pos)
+        return match.end() if match is not None else None
+    match = _SCALAR.match(buffer, pos)
+    if match is None:
+        raise _malformed(pos)
+    if match.end() == len(buffer) and not final:
+        # A number at the end of a chunk may continue in the next one
+        return None
+    return match.end()
+
+
+def skip_value(buffer: bytes, pos: int) -> int:
+    pos = skip_whitespace(buffer, pos)
+    end = _find_value_end(buffer, pos)
+    if end is None:
+        raise _malformed(pos)
+    return end
+
+
+def decode(buffer: bytes, start: int, end: int):
+    return json.loads(buffer[start:end])
+
+
+def decode_key(buffer: bytes, start: int, end: int) -> str:
+    key = buffer[start + 1:end - 1]
+    if b'\\' in key:
+        return json.loads(buffer[start:end])
+    return key.decode('utf-8')
+
+
+def iter_array(buffer: bytes, pos: int = 0):
+    pos = skip_whitespace(buffer, pos)
+    if pos >= len(buffer) or buffer[pos] != ord('['):
+        raise _malformed(pos)
+    pos = skip_whitespace(buffer, pos + 1)
+    if pos < len(buffer) and buffer[pos] == _ARRAY_END:
+        return
+    while True:
+        start = skip_whitespace(buffer, pos)
+        end = skip_value(buffer, start)
+        yield start, end
+        pos = skip_whitespace(buffer, end)
+        if pos >= len(buffer):
+            raise _malformed(pos)
+        if buffer[pos] == _ARRAY_END:
+            return
+        if buffer[pos] != _COMMA:
+            raise _malformed(pos)
+        pos += 1
+
+
+def iter_members(buffer: bytes, pos: int = 0):
+    pos = skip_whitespace(buffer, pos)
+    if pos >= len(buffer) or buffer[pos] != ord('{'):
+        raise _malformed(pos)
+    pos = skip_whitespace(buffer, pos + 1)
+    if pos < len(buffer) and buffer[pos] == _OBJECT_END:
+        return
+    while True:
+        key = _STRING.match(buffer, skip_whitespace(buffer, pos))
+        if key is None:
+            raise _malformed(pos)
+        pos = skip_whitespace(buffer, key.end())
+        if pos >= len(buffer) or buffer[pos] != _COLON:
+            raise _malformed(pos)
+        start = skip_whitespace(buffer, pos + 1)
+        end = skip_value(buffer, start)
+        yield decode_key(buffer, key.start(), key.end()), start, end
+        pos = skip_whitespace(buffer, end)
+        if pos >= len(buffer):
+            raise _malformed(pos)
+        if buffer[pos] == _OBJECT_END:
+            return
+        if buffer[pos] != _COMMA:
+            raise _malformed(pos)
+        pos += 1
+
+
+class LazyObject:
+    __slots__ = ('_buffer', '_start', '_end', '_spans', '_scanner', '_values')
+
+    def __init__(self, buffer: bytes, start: int = 0, end: int = None):
+        if type(buffer) is dict:
+            # Wraps an object a native decoder has already read, which is faster than scanning its bytes
+            self._buffer = None
+            self._start = self._end = 0
+            self._spans = self._scanner = None
+            self._values = buffer
+            return
+        self._buffer = buffer
+        self._start = start
+        self._end = len(buffer) if end is None else end
+        self._spans = {}
+        self._scanner = iter_members(buffer, start)
+        self._values = {}
+
+    def _find(self, key: str):
+        span = self._spans.get(key)
+        if span is not None or self._scanner is None:
+            return span
+        for name, start, end in self._scanner:
+            self._spans[name] = (start, end)
+            if name == key:
+                return start, end
+        self._scanner = None
+        return None
+
+    def get(self, key: str, default=None):
+        if key in self._values:
+            return self._values[key]
+        if self._buffer is None:
+            return default
+        span = self._find(key)
+        if span is None:
+            return default
+        value = decode(self._buffer, *span)
+        self._values[key] = value
+        return value
+
+    def get_object(self, key: str, view_class=None):
+        if self._buffer is None:
+            value = self._values.get(key)
+            return (view_class or LazyObject)(value) if type(value) is dict else None
+        span = self._find(key)
+        if span is None or self._buffer[span[0]] != ord('{'):
+            return None
+        return (view_class or LazyObject)(self._buffer, *span)
+
+    def __getitem__(self, key: str):
+        if self._buffer is None:
+            return self._values[key]
+        if self._find(key) is None:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        if self._buffer is None:
+            return key in self._values
+        return self._find(key) is not None
+
+    def keys(self) -> list:
+        if self._buffer is None:
+            return list(self._values)
+        self._find(None)
+        return list(self._spans)
+
+    def to_dict(self) -> dict:
+        if self._buffer is None:
+            return self._values
+        return decode(self._buffer, self._start, self._end)
+
+    def get_raw(self) -> bytes:
+        if self._buffer is None:
+            return json.dumps(self._values, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        return self._buffer[self._start:self._end]
+
+    def __repr__(self):
+        return self.get_raw().decode('utf-8')
+
+
+def project(buffer: bytes, start: int, end: int, fields: frozenset):
+    if buffer[start] != ord('{'):
+        return decode(buffer, start, end)
+    return {key: decode(buffer, value_start, value_end)
+            for key, value_start, value_end in iter_members(buffer, start) if key in fields}
+
+
+class ArrayParser:
+    def __init__(self, fields=None, decoder=None):
+        self._fields = frozenset(fields) if fields is not None else None
+        self._decoder = decoder or json.loads
+        # Unread data, a bytearray so chunks are appended and read elements dropped without copying the rest
+        self._buffer = bytearray()
+        self._started = False
+        self._finished = False
+        self._after_element = False
+        self._after_comma = False
+        self._offset = 0
+        # Where the scan of an unfinished container stopped, relative to its start, and its bracket depth
+        self._scan = None
+
+    def feed(self, chunk: bytes) -> list:
+        if self._finished:
+            if chunk.strip():
+                raise _malformed(self._offset)
+            return []
+        self._buffer += chunk
+        return self.__consume(final=False)
+
+    def close(self) -> list:
+        elements = self.__consume(final=True)
+        if not self._finished:
+            raise _malformed(self._offset + len(self._buffer))
+        return elements
+
+    def __consume(self, final: bool) -> list:
+        elements, pos = self.__parse(self._buffer, final)
+        self._offset += pos
+        del self._buffer[:pos]
+        return elements
+
+    def __find_value_end(self, buffer: bytearray, pos: int, final: bool):
+        # Containers carry on from where the previous feed stopped, so a long element is scanned once
+        if buffer[pos] not in _OPEN:
+            return _find_value_end(buffer, pos, final)
+        scan, depth = (pos + self._scan[0], self._scan[1]) if self._scan is not None else (pos, 0)
+        while True:
+            scan = _SKIP.match(buffer, scan).end()
+            if scan >= len(buffer) or buffer[scan] == _QUOTE:
+                # Ran out of data, possibly inside a string which is read again from its quote
+                self._scan = (scan - pos, depth)
+                return None
+            depth += 1 if buffer[scan] in _OPEN else -1
+            scan += 1
+            if depth == 0:
+                self._scan = None
+                return scan
+
+    def __parse(self, buffer: bytearray, final: bool) -> tuple:
+        elements = []
+        pos = 0
+        while True:
+            pos = skip_whitespace(buffer, pos)
+            if pos >= len(buffer):
+                return elements, pos
+            if not self._started:
+                if buffer[pos] != ord('['):
+                    raise _malformed(self._offset + pos)
+                self._started = True
+                pos += 1
+                continue
+            if buffer[pos] == _ARRAY_END and not self._after_comma:
+                self._finished = True
+                return elements, pos + 1
+            if self._after_element:
+                if buffer[pos] != _COMMA:
+                    raise _malformed(self._offset + pos)
+                self._after_element = False
+                self._after_comma = True
+                pos += 1
+                continue
+            end = self.__find_value_end(buffer, pos, final)
+            if end is None:
+                return elements, pos
+            if self._fields is None:
+                elements.append(self._decoder(bytes(buffer[pos:end])))
+            else:
+                elements.append(project(buffer, pos, end, self._fields))
+            self._after_element = True
+            self._after_comma = False
+            pos = end
+
+
+def iter_stream(chunks, fields=None):
+    parser = ArrayParser(fields)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def iter_stream_async(chunks, fields=None):
+    parser = ArrayParser(fields)
+    async for chunk in chunks:
+        for element in parser.feed(chunk):
+            yield element
+    for element in parser.close():
+        yield element
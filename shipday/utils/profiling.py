@@ -0,0 +1,261 @@
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+PHASES = ('validate', 'build', 'encode', 'wait', 'network', 'decode', 'sdk')
+
+# The call being profiled in the current thread or task, None when profiling is off
+_active = ContextVar('shipday_profile', default=None)
+
+
+def _get_owner() -> tuple:
+    # Threads and tasks that inherit a call keep their own phase stack
+    task = None
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is not None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+    return threading.get_ident(), id(task) if task is not None else 0
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+class _Record:
+    # Time is charged to the innermost phase only, so nested phases are not counted twice
+    __slots__ = ('profiler', 'name', 'owner', 'stack', 'mark', 'memory_mark')
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.owner = _get_owner()
+        self.stack = ['sdk']
+        self.mark = time.perf_counter()
+        self.memory_mark = profiler.get_memory()
+
+    def charge(self, count: bool = False):
+        now, memory = time.perf_counter(), self.profiler.get_memory()
+        self.profiler.add(self.name, self.stack[-1], now - self.mark, memory - self.memory_mark, count)
+        self.mark, self.memory_mark = now, memory
+
+
+class _Phase:
+    __slots__ = ('record', 'name')
+
+    def __init__(self, record: _Record, name: str):
+        self.record = record
+        self.name = name
+
+    def __enter__(self):
+        record = self.record
+        record.charge()
+        record.stack.append(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        record = self.record
+        record.charge(count=True)
+        record.stack.pop()
+        return False
+
+
+class _Call:
+    __slots__ = ('profiler', 'name', 'count', 'record', 'token', 'started')
+
+    def __init__(self, profiler, name: str, count: bool):
+        self.profiler = profiler
+        self.name = name
+        self.count = count
+        self.record = None
+        self.token = None
+
+    def __enter__(self):
+        # A call made inside another one, such as a dedupe lookup, belongs to the outer call
+        if _active.get() is None:
+            self.record = _Record(self.profiler, self.name)
+            self.token = _active.set(self.record)
+            self.started = self.record.mark
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.record is not None:
+            self.record.charge()
+            _active.reset(self.token)
+            self.profiler.add_call(self.name, self.record.mark - self.started, self.count)
+        return False
+
+
+def get_phase(name: str):
+    record = _active.get()
+    if record is None:
+        return NULL_PHASE
+    if record.owner != _get_owner():
+        # A worker thread or task started from a profiled call gets its own record for the same call
+        record = _Record(record.profiler, record.name)
+        _active.set(record)
+    return _Phase(record, name)
+
+
+def profiled(phase: str):
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active.get() is None:
+                return func(*args, **kwargs)
+            with get_phase(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Profiler:
+    def __init__(self, memory: bool = False):
+        # With memory enabled tracemalloc runs while the profiler is in use and allocations are recorded per phase
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._memory = memory
+        self._tracing = False
+        if memory:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+
+    def get_memory(self) -> int:
+        return self._tracemalloc.get_traced_memory()[0] if self._memory else 0
+
+    def call(self, name: str, count: bool = True):
+        return _Call(self, name, count)
+
+    def phase(self, name: str):
+        return get_phase(name)
+
+    def __get_call(self, name: str) -> dict:
+        call = self._calls.get(name)
+        if call is None:
+            call = self._calls[name] = {'calls': 0, 'time': 0.0, 'phases': {}}
+        return call
+
+    def add(self, name: str, phase: str, elapsed: float, memory: int, count: bool):
+        with self._lock:
+            phases = self.__get_call(name)['phases']
+            stats = phases.get(phase)
+            if stats is None:
+                stats = phases[phase] = {'count': 0, 'time': 0.0, 'memory': 0}
+            stats['time'] += elapsed
+            stats['memory'] += memory
+            if count:
+                stats['count'] += 1
+
+    def add_call(self, name: str, elapsed: float, count: bool):
+        with self._lock:
+            call = self.__get_call(name)
+            call['time'] += elapsed
+            if count:
+                call['calls'] += 1
+
+    def report(self) -> dict:
+        with self._lock:
+            report = {}
+            for name, call in self._calls.items():
+                phases = {phase: dict(call['phases'][phase]) for phase in PHASES if phase in call['phases']}
+                report[name] = {'calls': call['calls'], 'time': call['time'], 'phases': phases}
+            return report
+
+    def format(self) -> str:
+        lines = []
+        for name, call in sorted(self.report().items(), key=lambda item: -item[1]['time']):
+            phase_time = sum(stats['time'] for stats in call['phases'].values()) or 1.0
+            lines.append('{} calls={} time={:.6f}s'.format(name, call['calls'], call['time']))
+            lines.append('  {:<10}{:>12}{:>8}{:>10}{:>14}'.format('phase', 'time (s)', '%', 'count', 'memory (B)'))
+            for phase, stats in call['phases'].items():
+                lines.append('  {:<10}{:>12.6f}{:>7.1f}%{:>10}{:>14}'.format(
+                    phase, stats['time'], 100 * stats['time'] / phase_time, stats['count'], stats['memory']))
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+
+    def close(self):
+        # Only stops tracemalloc if this profiler started it
+        if self._tracing:
+            self._tracemalloc.stop()
+            self._tracing = False
+
+
+def get_profiler(profiler):
+    if profiler is None or profiler is False:
+        return None
+    if profiler is True:
+        return Profiler()
+    return profiler
+
+
+class ProfiledService:
+    # Wraps a service so each public method is reported as one call, iterators are profiled while they are consumed
+    def __init__(self, service, profiler: Profiler):
+        import inspect
+        self._inspect = inspect
+        self._service = service
+        self._profiler = profiler
+        self._prefix = type(service).__name__ + '.'
+
+    def __getattr__(self, name: str):
+        value = getattr(self._service, name)
+        if name.startswith('_') or not callable(value):
+            return value
+        call_name, profiler, inspect = self._prefix + name, self._profiler, self._inspect
+        if inspect.isasyncgenfunction(value):
+            @wraps(value)
+            async def iterate_async(*args, **kwargs):
+                iterator, first = value(*args, **kwargs).__aiter__(), True
+                while True:
+                    with profiler.call(call_name, count=first):
+                        try:
+                            item = await iterator.__anext__()
+                        except StopAsyncIteration:
+                            return
+                    first = False
+                    yield item
+            return iterate_async
+        if inspect.iscoroutinefunction(value):
+            @wraps(value)
+            async def call_async(*args, **kwargs):
+                with profiler.call(call_name):
+                    return await value(*args, **kwargs)
+            return call_async
+
+        @wraps(value)
+        def call(*args, **kwargs):
+            with profiler.call(call_name):
+                result = value(*args, **kwargs)
+            if inspect.isgenerator(result) or (hasattr(result, '__next__') and hasattr(result, '__iter__')):
+                return self.__iterate(call_name, result)
+            return result
+        return call
+
+    def __iterate(self, call_name: str, iterator):
+        profiler = self._profiler
+        while True:
+            with profiler.call(call_name, count=False):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
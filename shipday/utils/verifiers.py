@@ -1,48 +1,50 @@
 from shipday.exceptions import ShipdayException
 
+NUMBER_TYPES = (int, float)
+
+
+def _is_instance_of(obj_type, variable) -> bool:
+    # obj_type may be a single type or a list/tuple of types, nothing is allocated for the check
+    if type(obj_type) is list or type(obj_type) is tuple:
+        return type(variable) in obj_type
+    return type(variable) is obj_type
+
 
 def verify_none_or_instance_of(obj_type, variable, error_message):
-    if type(obj_type) is not list:
-        obj_type = [obj_type]
-    if variable is None:
-        return
-    if type(variable) not in obj_type:
+    if variable is not None and not _is_instance_of(obj_type, variable):
         raise ShipdayException(error_message)
 
 
 def verify_instance_of(obj_type, variable, error_message):
-    if type(obj_type) is not list:
-        obj_type = [obj_type]
-    if type(variable) not in obj_type:
+    if not _is_instance_of(obj_type, variable):
         raise ShipdayException(error_message)
 
 
 def verify_not_negative(number, error_message):
-    verify_instance_of([int, float], number, error_message)
-    if number < 0:
+    if type(number) not in NUMBER_TYPES or number < 0:
         raise ShipdayException(error_message)
 
 
 def verify_none_or_not_negative(number, error_message):
-    verify_none_or_instance_of([int, float], number, error_message)
-
-    if number is not None and number < 0:
+    if number is not None and (type(number) not in NUMBER_TYPES or number < 0):
         raise ShipdayException(error_message)
 
 
 def verify_none_or_within_range(number, min_value, max_value, error_message):
     if number is None:
         return
-    verify_instance_of([int, float], number, error_message)
-    if number < min_value or number > max_value:
+    if type(number) not in NUMBER_TYPES or number < min_value or number > max_value:
         raise ShipdayException(error_message)
 
 
 def verify_all_none_or_not(variables, error_message):
     if variables is None:
         return
-    if type(variables) is not list:
-        variables = [variables]
-    filtered = list(filter(None, variables))
-    if len(filtered) != 0 and len(filtered) != len(variables):
+    if type(variables) is not list and type(variables) is not tuple:
+        return
+    filled = 0
+    for variable in variables:
+        if variable:
+            filled += 1
+    if filled != 0 and filled != len(variables):
         raise ShipdayException(error_message)
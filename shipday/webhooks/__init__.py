@@ -0,0 +1,4 @@
+from shipday.webhooks.events import OrderEvent, EventOrderView, parse_event
+from shipday.webhooks.dedupe import Deduplicator
+from shipday.webhooks.event_queue import EventQueue, AsyncEventQueue
+from shipday.webhooks.app import WebhookApp, AsyncWebhookApp
@@ -0,0 +1,148 @@
+import hmac
+import json
+
+from shipday.exceptions import ShipdayException
+from shipday.webhooks.dedupe import Deduplicator
+from shipday.webhooks.event_queue import AsyncEventQueue, EventQueue
+from shipday.webhooks.events import parse_event
+
+TOKEN_HEADER = 'token'
+MAX_BODY_SIZE = 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+def _reply(status: int, message: str, headers: list = ()) -> tuple:
+    return status, json.dumps({'status': message}).encode('utf-8'), list(headers)
+
+
+class _WebhookReceiver:
+    def __init__(self, token, deduplicator: Deduplicator = None, max_body_size: int = MAX_BODY_SIZE,
+                 retry_after: int = 1):
+        # token is the one set for the webhook in Shipday, a list of tokens allows rotating it
+        tokens = [token] if type(token) is str else list(token or ())
+        if not tokens or any(type(value) is not str or not value for value in tokens):
+            raise ShipdayException('Webhook token is required')
+        self._tokens = [value.encode('utf-8') for value in tokens]
+        self._deduplicator = deduplicator if deduplicator is not None else Deduplicator()
+        self._max_body_size = max_body_size
+        self._retry_after = str(retry_after)
+
+    def _is_authorized(self, token: bytes) -> bool:
+        # Compares every token in constant time so the response time does not leak which one matched
+        authorized = False
+        for expected in self._tokens:
+            authorized |= hmac.compare_digest(expected, token or b'')
+        return authorized
+
+    def _check(self, method: str, token: bytes, length: int):
+        if method != 'POST':
+            return _reply(405, 'method not allowed', [('Allow', 'POST')])
+        if not self._is_authorized(token):
+            return _reply(401, 'unauthorized')
+        if length is not None and length > self._max_body_size:
+            return _reply(413, 'too large')
+        return None
+
+    def _accept(self, body: bytes, put) -> tuple:
+        if len(body) > self._max_body_size:
+            return _reply(413, 'too large')
+        try:
+            event = parse_event(body)
+        except ShipdayException:
+            return _reply(400, 'malformed')
+        key = event.key
+        # Redeliveries are acknowledged so the sender stops retrying them
+        if not self._deduplicator.add(key):
+            return _reply(200, 'duplicate')
+        if not put(event):
+            # Forgets the event so the redelivery asked for by 503 is accepted
+            self._deduplicator.discard(key)
+            return _reply(503, 'busy', [('Retry-After', self._retry_after)])
+        return _reply(200, 'accepted')
+
+    def handle(self, method: str, token: bytes, body: bytes, put) -> tuple:
+        return self._check(method, token, len(body)) or self._accept(body, put)
+
+
+class WebhookApp(_WebhookReceiver):
+    # A WSGI app, events are handed to the queue and the request returns without waiting for the handler
+    def __init__(self, queue: EventQueue, *args, token, deduplicator: Deduplicator = None,
+                 max_body_size: int = MAX_BODY_SIZE, retry_after: int = 1, **kwargs):
+        super().__init__(token, deduplicator, max_body_size, retry_after)
+        self.queue = queue.start()
+
+    def __call__(self, environ: dict, start_response):
+        length = environ.get('CONTENT_LENGTH')
+        length = int(length) if length and length.isdigit() else 0
+        token = environ.get('HTTP_' + TOKEN_HEADER.upper().replace('-', '_'))
+        response = self._check(environ['REQUEST_METHOD'], token.encode('latin-1') if token else None, length)
+        if response is None:
+            body = environ['wsgi.input'].read(length) if length else b''
+            response = self._accept(body, self.queue.put)
+        status, body, headers = response
+        start_response('{} {}'.format(status, _REASONS[status]),
+                       [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))] + headers)
+        return [body]
+
+
+class AsyncWebhookApp(_WebhookReceiver):
+    # An ASGI app, the queue workers start with the lifespan of the server or on the first request
+    def __init__(self, queue: AsyncEventQueue, *args, token, deduplicator: Deduplicator = None,
+                 max_body_size: int = MAX_BODY_SIZE, retry_after: int = 1, **kwargs):
+        super().__init__(token, deduplicator, max_body_size, retry_after)
+        self.queue = queue
+
+    async def __call__(self, scope: dict, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.__lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.__http(scope, receive, send)
+
+    async def __lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.queue.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.queue.started:
+                    await self.queue.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __http(self, scope: dict, receive, send):
+        headers = dict(scope.get('headers') or ())
+        length = headers.get(b'content-length')
+        response = self._check(scope['method'], headers.get(TOKEN_HEADER.encode('latin-1')),
+                               int(length) if length and length.isdigit() else None)
+        if response is None:
+            body = await self.__read_body(receive)
+            if body is None:
+                response = _reply(413, 'too large')
+            else:
+                if not self.queue.started:
+                    self.queue.start()
+                response = self._accept(body, self.queue.put)
+        status, body, extra = response
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length', str(len(body)).encode('latin-1'))]
+                    + [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in extra]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def __read_body(self, receive) -> bytes:
+        # Returns None once the body goes over max_body_size, without buffering the rest
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return b''.join(chunks)
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self._max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
@@ -0,0 +1,52 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from shipday.exceptions import ShipdayException
+
+
+class Deduplicator:
+    def __init__(self, max_size: int = 100000, ttl: float = None):
+        # Remembers the last max_size event keys, older keys are forgotten first
+        if type(max_size) is not int or max_size < 1:
+            raise ShipdayException('Max size must be a positive integer')
+        if ttl is not None and (type(ttl) not in (int, float) or ttl <= 0):
+            raise ShipdayException('TTL must be a positive number')
+        self._max_size = max_size
+        self._ttl = ttl
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self._duplicates = 0
+        self._evictions = 0
+
+    def add(self, key) -> bool:
+        # Returns False when the key was seen before
+        now = time.monotonic()
+        with self._lock:
+            expires = self._keys.get(key)
+            if expires is not None and expires > now:
+                self._duplicates += 1
+                return False
+            self._keys[key] = now + self._ttl if self._ttl is not None else math.inf
+            self._keys.move_to_end(key)
+            while len(self._keys) > self._max_size:
+                self._keys.popitem(last=False)
+                self._evictions += 1
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._keys.pop(key, None)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            expires = self._keys.get(key)
+            return expires is not None and expires > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'size': len(self._keys), 'duplicates': self._duplicates, 'evictions': self._evictions}
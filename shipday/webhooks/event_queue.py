@@ -0,0 +1,230 @@
+import queue
+import threading
+import time
+
+from shipday.exceptions import ShipdayException
+
+# Tells a worker to stop, it is queued behind the events so they are handled first
+_STOP = object()
+
+
+def _verify_options(max_size: int, batch_size: int, max_wait: float, workers: int):
+    if type(max_size) is not int or max_size < 1:
+        raise ShipdayException('Max size must be a positive integer')
+    if type(batch_size) is not int or batch_size < 1:
+        raise ShipdayException('Batch size must be a positive integer')
+    if type(max_wait) not in (int, float) or max_wait < 0:
+        raise ShipdayException('Max wait must be a positive number')
+    if type(workers) is not int or workers < 1:
+        raise ShipdayException('Workers must be a positive integer')
+
+
+def _report(on_error, batch: list, error: Exception):
+    if on_error is None:
+        return
+    try:
+        on_error(batch, error)
+    except Exception:
+        # A failing error callback must not stop the worker
+        pass
+
+
+class _Stats:
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = 0
+        self.handled = 0
+        self.failed = 0
+        self.batches = 0
+
+    def to_dict(self, size: int) -> dict:
+        return {'size': size, 'accepted': self.accepted, 'rejected': self.rejected, 'handled': self.handled,
+                'failed': self.failed, 'batches': self.batches}
+
+
+class EventQueue:
+    def __init__(self, handler, *args, max_size: int = 10000, batch_size: int = 100, max_wait: float = 0.05,
+                 workers: int = 1, on_error=None, **kwargs):
+        # handler gets lists of up to batch_size events, a batch is handed over once it is full or max_wait
+        # seconds after its first event. on_error(events, exception) is called when the handler raises.
+        _verify_options(max_size, batch_size, max_wait, workers)
+        self._handler = handler
+        self._on_error = on_error
+        self._batch_size = batch_size
+        self._max_wait = max_wait
+        self._worker_count = workers
+        self._queue = queue.Queue(max_size)
+        self._workers = []
+        self._lock = threading.Lock()
+        self._stats = _Stats()
+
+    def start(self):
+        with self._lock:
+            if not self._workers:
+                self._workers = [threading.Thread(target=self.__work, daemon=True)
+                                 for _ in range(self._worker_count)]
+                for worker in self._workers:
+                    worker.start()
+        return self
+
+    def put(self, event, timeout: float = 0) -> bool:
+        # Returns False when the queue is full, the receiver then asks the sender to retry later
+        try:
+            self._queue.put(event, block=timeout > 0, timeout=timeout if timeout > 0 else None)
+        except queue.Full:
+            with self._lock:
+                self._stats.rejected += 1
+            return False
+        with self._lock:
+            self._stats.accepted += 1
+        return True
+
+    def __next_batch(self) -> tuple:
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                event = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    def __work(self):
+        stop = False
+        while not stop:
+            batch, stop = self.__next_batch()
+            if batch:
+                self.__handle(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+
+    def __handle(self, batch: list):
+        try:
+            self._handler(batch)
+        except Exception as e:
+            with self._lock:
+                self._stats.failed += len(batch)
+                self._stats.batches += 1
+            _report(self._on_error, batch, e)
+            return
+        with self._lock:
+            self._stats.handled += len(batch)
+            self._stats.batches += 1
+
+    def join(self):
+        # Waits until every queued event has been handled
+        self._queue.join()
+
+    def stop(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(_STOP)
+        for worker in workers:
+            worker.join()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return self._stats.to_dict(self._queue.qsize())
+
+
+class AsyncEventQueue:
+    def __init__(self, handler, *args, max_size: int = 10000, batch_size: int = 100, max_wait: float = 0.05,
+                 workers: int = 1, on_error=None, **kwargs):
+        # The handler is a coroutine function, the queue is bound to the event loop it is started in
+        _verify_options(max_size, batch_size, max_wait, workers)
+        self._handler = handler
+        self._on_error = on_error
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._max_wait = max_wait
+        self._worker_count = workers
+        self._queue = None
+        self._workers = []
+        self._stats = _Stats()
+
+    def start(self):
+        import asyncio
+        if not self._workers:
+            if self._queue is None:
+                self._queue = asyncio.Queue(self._max_size)
+            self._workers = [asyncio.ensure_future(self.__work()) for _ in range(self._worker_count)]
+        return self
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def put(self, event) -> bool:
+        import asyncio
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._stats.rejected += 1
+            return False
+        self._stats.accepted += 1
+        return True
+
+    async def __next_batch(self) -> tuple:
+        import asyncio
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self._max_wait
+        while len(batch) < self._batch_size:
+            if self._queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                event = self._queue.get_nowait()
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    async def __work(self):
+        stop = False
+        while not stop:
+            batch, stop = await self.__next_batch()
+            if batch:
+                await self.__handle(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+
+    async def __handle(self, batch: list):
+        try:
+            await self._handler(batch)
+        except Exception as e:
+            self._stats.failed += len(batch)
+            self._stats.batches += 1
+            _report(self._on_error, batch, e)
+            return
+        self._stats.handled += len(batch)
+        self._stats.batches += 1
+
+    async def join(self):
+        await self._queue.join()
+
+    async def stop(self):
+        import asyncio
+        workers, self._workers = self._workers, []
+        for _ in workers:
+            await self._queue.put(_STOP)
+        await asyncio.gather(*workers)
+
+    def get_stats(self) -> dict:
+        return self._stats.to_dict(self._queue.qsize() if self._queue is not None else 0)
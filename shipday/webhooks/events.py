@@ -0,0 +1,90 @@
+import hashlib
+from datetime import datetime, timezone
+
+from shipday.exceptions import ShipdayException
+from shipday.order.order_status import OrderStatus
+from shipday.order.order_view import ContactView, OrderView
+from shipday.utils.lazy_json import LazyObject, skip_whitespace
+
+
+class EventOrderView(OrderView):
+    # Webhook payloads name the order fields in snake case
+    __slots__ = ()
+
+    @property
+    def order_id(self) -> int:
+        order_id = self.get('orderId')
+        return order_id if order_id is not None else self.get('id')
+
+    @property
+    def order_number(self) -> str:
+        order_number = self.get('orderNumber')
+        return order_number if order_number is not None else self.get('order_number')
+
+
+class OrderEvent(LazyObject):
+    # Fields are only decoded when they are read, handlers that look at the status and the order id
+    # never decode the rest of the payload
+    __slots__ = ()
+
+    @property
+    def event(self) -> str:
+        return self.get('event')
+
+    @property
+    def order_status(self) -> str:
+        status = self.get('order_status')
+        return status if status is not None else self.get('orderStatus')
+
+    @property
+    def is_known_status(self) -> bool:
+        return self.order_status in OrderStatus._list_
+
+    @property
+    def timestamp(self) -> datetime:
+        value = self.get('timestamp')
+        if type(value) in (int, float):
+            return datetime.fromtimestamp(value / 1000, timezone.utc)
+        if type(value) is str:
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        return None
+
+    @property
+    def order(self) -> EventOrderView:
+        return self.get_object('order', EventOrderView)
+
+    @property
+    def order_id(self) -> int:
+        order = self.order
+        return order.order_id if order is not None else self.get('order_id')
+
+    @property
+    def order_number(self) -> str:
+        order = self.order
+        return order.order_number if order is not None else self.get('order_number')
+
+    @property
+    def carrier(self) -> ContactView:
+        return self.get_object('carrier', ContactView)
+
+    @property
+    def key(self) -> bytes:
+        # Redeliveries repeat the same payload, so a digest of the body identifies the event
+        return hashlib.blake2b(self.get_raw(), digest_size=16).digest()
+
+    def __repr__(self):
+        return 'OrderEvent(event={}, order_id={}, order_status={})'.format(self.event, self.order_id,
+                                                                         self.order_status)
+
+
+def parse_event(body: bytes) -> OrderEvent:
+    start = skip_whitespace(body, 0)
+    if start >= len(body) or body[start] != ord('{'):
+        raise ShipdayException('Webhook body must be a JSON object')
+    event = OrderEvent(body, start, len(body.rstrip()))
+    # Walks the top level members without decoding them, a truncated body fails here instead of in a handler
+    event.keys()
+    return event
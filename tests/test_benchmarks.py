@@ -0,0 +1,108 @@
+import pytest
+
+from benchmarks import __main__ as runner
+from benchmarks.harness import CALIBRATION, compare, dump, get_spread, measure, merge, percentile, summarize
+
+
+def get_result(value: float, metric: str = 'min') -> dict:
+    return summarize([value], metric=metric)
+
+
+class TestBenchmarks:
+    """Benchmark harness"""
+
+    def test_measure(self):
+        """Reports the time of a single call ::"""
+        calls = []
+        result = measure(lambda: calls.append(1), repeat=3, min_time=0.001)
+        assert result['samples'] == 3
+        assert len(calls) >= result['number'] * 3
+        assert 0 < result['min'] <= result['median']
+        assert result['metric'] == 'min'
+
+    @pytest.mark.parametrize('fraction, expected', [(0, 1), (0.5, 3), (0.9, 4.6), (1, 5)])
+    def test_percentile(self, fraction, expected):
+        """Interpolates between the closest samples ::"""
+        assert percentile([5, 1, 4, 2, 3], fraction) == pytest.approx(expected)
+
+    @pytest.mark.parametrize('current, regressed', [(1.2, False), (1.3, True), (0.5, False)])
+    def test_compare_tolerance(self, current, regressed):
+        """Flags results slower than the baseline plus the tolerance ::"""
+        baseline = {'results': {'order.verify': get_result(1.0)}}
+        regressions = compare({'order.verify': get_result(current)}, baseline, tolerance=0.25)
+        assert bool(regressions) is regressed
+
+    def test_compare_calibration(self):
+        """Scales the baseline by the calibration workload ::"""
+        baseline = {'results': {CALIBRATION: get_result(1.0), 'order.verify': get_result(1.0)}}
+        results = {CALIBRATION: get_result(2.0), 'order.verify': get_result(2.2)}
+        assert compare(results, baseline, tolerance=0.25) == []
+        results[CALIBRATION] = get_result(1.0)
+        assert len(compare(results, baseline, tolerance=0.25)) == 1
+
+    def test_compare_budget(self):
+        """Flags results over their budget and ignores missing results ::"""
+        baseline = {'results': {'client.get_orders': get_result(1.0, 'median')}, 'budgets': {'import.shipday': 0.05}}
+        assert compare({'import.shipday': get_result(0.01, 'median')}, baseline) == []
+        assert compare({'import.shipday': get_result(0.08, 'median')}, baseline) == [
+            'import.shipday: 0.08s is over the budget of 0.05s']
+
+    @pytest.mark.parametrize('timings, regressed', [([1.4, 1.45, 1.5], True), ([1.4, 2.0, 2.1], False)])
+    def test_compare_spread(self, timings, regressed):
+        """Widens the tolerance to the spread of a noisy run ::"""
+        baseline = {'results': {'order.verify': summarize([1.0, 1.02, 1.05], metric='min')}}
+        current = summarize(timings, metric='min')
+        assert get_spread(current) == pytest.approx(timings[1] / timings[0] - 1)
+        assert bool(compare({'order.verify': current}, baseline, tolerance=0.25)) is regressed
+
+    @pytest.mark.parametrize('argv, status', [(['--quick'], 0), ([], 1)])
+    def test_quick_not_compared(self, tmp_path, monkeypatch, argv, status):
+        """Does not compare quick runs with the baseline ::"""
+        class Group:
+            @staticmethod
+            def collect(quick):
+                return {'order.verify': get_result(2.0)}
+
+        monkeypatch.setattr(runner, 'calibrate', lambda: get_result(1.0))
+        monkeypatch.setattr(runner, 'import_module', lambda name: Group)
+        baseline = str(tmp_path / 'baseline.json')
+        dump({'results': {CALIBRATION: get_result(1.0), 'order.verify': get_result(1.0)}}, baseline)
+        argv = argv + ['--only', 'models', '--baseline', baseline, '--output', str(tmp_path / 'results.json')]
+        assert runner.main(argv) == status
+
+    def test_merge(self):
+        """Keeps the faster result of two runs ::"""
+        merged = merge({'a': get_result(1.0), 'b': get_result(2.0)}, {'a': get_result(1.5), 'b': get_result(1.0),
+                                                                        'c': get_result(3.0)})
+        assert {name: result['min'] for name, result in merged.items()} == {'a': 1.0, 'b': 1.0, 'c': 3.0}
+        assert (merged['a']['noise'], merged['b']['noise']) == (0.5, 1.0)
+        assert 'noise' not in merged['c']
+
+    def test_compare_noise(self):
+        """Allows the drift seen between the baseline runs ::"""
+        baseline = {'results': {'order.verify': dict(get_result(1.0), noise=0.4)}}
+        assert compare({'order.verify': get_result(1.35)}, baseline, tolerance=0.25) == []
+        assert len(compare({'order.verify': get_result(1.45)}, baseline, tolerance=0.25)) == 1
+
+    @pytest.mark.parametrize('confirm, status', [(0, 1), (1, 0)])
+    def test_confirm(self, tmp_path, monkeypatch, confirm, status):
+        """Runs a group with regressions again and reports only the ones that persist ::"""
+        timings = [2.0, 1.0]
+
+        class Group:
+            @staticmethod
+            def collect(quick):
+                return {'order.verify': get_result(timings.pop(0))}
+
+        monkeypatch.setattr(runner, 'calibrate', lambda: get_result(1.0))
+        monkeypatch.setattr(runner, 'import_module', lambda name: Group)
+        baseline = str(tmp_path / 'baseline.json')
+        dump({'results': {CALIBRATION: get_result(1.0), 'order.verify': get_result(1.0)}}, baseline)
+        argv = ['--only', 'models', '--baseline', baseline, '--output', str(tmp_path / 'results.json'),
+                '--confirm', str(confirm)]
+        assert runner.main(argv) == status
+
+    def test_quick_baseline(self):
+        """Refuses to save quick results as the baseline ::"""
+        with pytest.raises(SystemExit):
+            runner.parse_args(['--quick', '--save-baseline'])
@@ -0,0 +1,160 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.export import OrderExporter
+from shipday.order import OrderQuery
+
+
+def get_api_order(order_id: int) -> dict:
+    return {
+        'orderId': order_id,
+        'orderNumber': str(order_id),
+        'customer': {'name': 'customer {}'.format(order_id), 'address': 'Dhaka', 'phoneNumber': '+1',
+                     'emailAddress': 'c@shipday.com'},
+        'restaurant': {'name': 'shop', 'address': 'Banani', 'phoneNumber': '+2'},
+        'costing': {'totalCost': 10.5, 'tips': 1.0, 'deliveryFee': 2.0},
+        'orderItem': [{'name': 'Tea', 'unitPrice': 1.0, 'quantity': 2}],
+    }
+
+
+class QueryService:
+    def __init__(self, total: int):
+        self.total = total
+        self.produced = 0
+        self.page_sizes = []
+
+    def iter_query(self, query, page_size=100):
+        self.page_sizes.append(page_size)
+        for order_id in range(1, self.total + 1):
+            self.produced += 1
+            yield get_api_order(order_id)
+
+
+class RecordingFile(io.BytesIO):
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(self.service.produced)
+        return super().write(data)
+
+
+class TestOrderExporter:
+    """Order Exporter"""
+
+    def test_ndjson(self):
+        """Writes one projected JSON object per line ::"""
+        service = QueryService(3)
+        destination = io.BytesIO()
+        assert OrderExporter(service, page_size=50).to_ndjson(OrderQuery(), destination) == 3
+        rows = [json.loads(line) for line in destination.getvalue().splitlines()]
+        assert [row['order_id'] for row in rows] == [1, 2, 3]
+        assert rows[0]['customer_name'] == 'customer 1'
+        assert rows[0]['order_items'] == [{'name': 'Tea', 'unitPrice': 1.0, 'quantity': 2}]
+        assert service.page_sizes == [50]
+
+    def test_csv(self):
+        """Writes a header and flattened rows ::"""
+        destination = io.BytesIO()
+        exporter = OrderExporter(QueryService(2), fields={'id': 'orderId', 'tips': 'costing.tips',
+                                                          'first_item': 'orderItem.0.name', 'missing': 'a.b',
+                                                          'items': 'orderItem'})
+        exporter.to_csv(OrderQuery(), destination)
+        rows = list(csv.reader(io.StringIO(destination.getvalue().decode('utf-8'))))
+        assert rows[0] == ['id', 'tips', 'first_item', 'missing', 'items']
+        assert rows[1][:4] == ['1', '1.0', 'Tea', '']
+        assert json.loads(rows[1][4]) == [{'name': 'Tea', 'unitPrice': 1.0, 'quantity': 2}]
+
+    def test_field_list(self):
+        """Accepts a list of paths as the projection ::"""
+        exporter = OrderExporter(fields=['orderId', 'customer.name'])
+        assert exporter.project(get_api_order(7)) == [7, 'customer 7']
+
+    @pytest.mark.parametrize('write', ['write_ndjson', 'write_csv'])
+    def test_bounded_buffer(self, write):
+        """Flushes while results are still being produced ::"""
+        service = QueryService(500)
+        destination = RecordingFile(service)
+        getattr(OrderExporter(buffer_size=4096), write)(service.iter_query(None), destination)
+        assert len(destination.writes) > 10
+        assert destination.writes[0] < 100
+
+    def test_compression(self, tmp_path):
+        """Compresses the output ::"""
+        path = tmp_path / 'orders.ndjson.gz'
+        OrderExporter(QueryService(20), compression='gzip').to_ndjson(OrderQuery(), str(path))
+        with gzip.open(str(path)) as file:
+            assert len(file.read().splitlines()) == 20
+
+    def test_compression_file_object(self):
+        """Compresses into a caller owned file and leaves it open ::"""
+        destination = io.BytesIO()
+        OrderExporter(QueryService(5), compression='gzip').to_csv(OrderQuery(), destination)
+        assert not destination.closed
+        assert len(gzip.decompress(destination.getvalue()).splitlines()) == 6
+
+    def test_parquet(self, tmp_path):
+        """Writes row groups to a parquet file ::"""
+        parquet = pytest.importorskip('pyarrow.parquet')
+        path = str(tmp_path / 'orders.parquet')
+        assert OrderExporter(QueryService(25)).to_parquet(OrderQuery(), path, row_group_size=10) == 25
+        table = parquet.read_table(path)
+        assert table.num_rows == 25
+        assert parquet.ParquetFile(path).num_row_groups == 3
+
+    def test_parquet_schema(self, tmp_path):
+        """Keeps the column types of the first row group for the later ones ::"""
+        parquet = pytest.importorskip('pyarrow.parquet')
+        orders = [get_api_order(order_id) for order_id in range(1, 5)]
+        for order in orders[:2]:
+            order['customer']['name'] = None
+            order['costing']['totalCost'] = 10
+        orders[3]['costing']['totalCost'] = 1.5
+        path = str(tmp_path / 'orders.parquet')
+        assert OrderExporter().write_parquet(orders, path, row_group_size=2) == 4
+        table = parquet.read_table(path)
+        assert table.column('customer_name').to_pylist() == [None, None, 'customer 3', 'customer 4']
+        assert table.column('total_cost').to_pylist() == [10.0, 10.0, 10.5, 1.5]
+        assert str(table.schema.field('order_id').type) == 'int64'
+
+    @pytest.mark.parametrize('compression', ['bz2', 'xz'])
+    def test_parquet_compression(self, compression, tmp_path):
+        """Throws exception for stream compressions parquet does not have ::"""
+        with pytest.raises(ShipdayException, match='compression'):
+            OrderExporter(compression=compression).write_parquet([], str(tmp_path / 'orders.parquet'))
+
+    @pytest.mark.parametrize('kwargs', [{'buffer_size': 0}, {'fields': 'orderId'}])
+    def test_invalid_options(self, kwargs):
+        """Throws exception for invalid options ::"""
+        with pytest.raises(ShipdayException):
+            OrderExporter(**kwargs)
+
+    def test_unknown_compression(self):
+        """Throws exception for unknown compression ::"""
+        with pytest.raises(ShipdayException):
+            OrderExporter(QueryService(1), compression='zip').to_ndjson(OrderQuery(), io.BytesIO())
+
+    def test_needs_service(self):
+        """Throws exception when querying without a service ::"""
+        with pytest.raises(ShipdayException):
+            OrderExporter().to_ndjson(OrderQuery(), io.BytesIO())
+
+    def test_api_error(self):
+        """Raises the API error of a query instead of writing empty rows ::"""
+        from shipday.services import OrderService
+
+        class ErrorClient:
+            def post(self, suffix, data, **kwargs):
+                return {'errorCode': 401, 'errorMessage': 'Unauthorized'}
+
+        destination = io.BytesIO()
+        with pytest.raises(ShipdayException, match='Unauthorized'):
+            OrderExporter(OrderService(httpclient=ErrorClient())).to_ndjson(OrderQuery(), destination)
+        assert destination.getvalue() == b''
@@ -0,0 +1,173 @@
+import asyncio
+import json
+
+import pytest
+
+from shipday.exceptions import ShipdayException, ShipdayRateLimitException
+from shipday.httpclient.async_shipdayclient import AsyncShipdayClient
+from shipday.httpclient.retry_policy import RetryPolicy
+
+web = pytest.importorskip('aiohttp.web')
+
+
+async def serve(handler):
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, 'http://127.0.0.1:{}/'.format(port)
+
+
+class TestAsyncShipdayClient:
+    """Async Shipday Http Client"""
+
+    def test_requests(self):
+        """Sends json requests and decodes json responses ::"""
+        async def handler(request):
+            body = await request.text()
+            return web.json_response({'method': request.method, 'path': request.path, 'body': body,
+                                      'auth': request.headers['Authorization']})
+
+        async def run():
+            runner, url = await serve(handler)
+            client = AsyncShipdayClient(api_key='1234567890')
+            client._base_url = url
+            try:
+                return await client.get('orders/'), await client.post('orders/', {'a': 1})
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        get, post = asyncio.run(run())
+        assert get == {'method': 'GET', 'path': '/orders/', 'body': '', 'auth': 'Basic 1234567890'}
+        assert post['method'] == 'POST' and json.loads(post['body']) == {'a': 1}
+
+    def test_rate_limit(self):
+        """Throws rate limit exception on 429 ::"""
+        async def handler(request):
+            return web.Response(status=429, text='Too many requests')
+
+        async def run():
+            runner, url = await serve(handler)
+            client = AsyncShipdayClient(api_key='1234567890')
+            client._base_url = url
+            try:
+                await client.get('orders/')
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        with pytest.raises(ShipdayRateLimitException):
+            asyncio.run(run())
+
+    @pytest.mark.parametrize('max_concurrency', [1, 4])
+    def test_max_concurrency(self, max_concurrency):
+        """Never has more than max_concurrency requests in flight ::"""
+        state = {'in_flight': 0, 'peak': 0}
+
+        async def handler(request):
+            state['in_flight'] += 1
+            state['peak'] = max(state['peak'], state['in_flight'])
+            await asyncio.sleep(0.01)
+            state['in_flight'] -= 1
+            return web.json_response([])
+
+        async def run():
+            runner, url = await serve(handler)
+            client = AsyncShipdayClient(api_key='1234567890', max_concurrency=max_concurrency,
+                                        coalesce=False)
+            client._base_url = url
+            try:
+                await asyncio.gather(*[client.get('orders/') for _ in range(20)])
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        asyncio.run(run())
+        assert state['peak'] == max_concurrency
+
+    def test_iter_get(self):
+        """Streams the response body in chunks ::"""
+        async def handler(request):
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for i in range(3):
+                await response.write('[{}]'.format(i).encode('utf-8') if i == 0 else b'')
+            await response.write_eof()
+            return response
+
+        async def run():
+            runner, url = await serve(handler)
+            client = AsyncShipdayClient(api_key='1234567890')
+            client._base_url = url
+            try:
+                return b''.join([chunk async for chunk in client.iter_get('orders/', chunk_size=1)])
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        assert asyncio.run(run()) == b'[0]'
+
+    def test_iter_get_abandoned(self):
+        """Releases the request slot once the headers arrive, not when the stream is closed ::"""
+        async def handler(request):
+            if request.path == '/orders/':
+                return web.json_response([])
+            response = web.StreamResponse()
+            await response.prepare(request)
+            await response.write(b'[0')
+            await asyncio.sleep(1)
+            return response
+
+        async def run():
+            runner, url = await serve(handler)
+            client = AsyncShipdayClient(api_key='1234567890', max_concurrency=1)
+            client._base_url = url
+            chunks = client.iter_get('stream/')
+            try:
+                first = await chunks.__anext__()
+                # The stream is left open while another request needs the only slot
+                return first, await asyncio.wait_for(client.get('orders/'), 0.5)
+            finally:
+                await chunks.aclose()
+                await client.close()
+                await runner.cleanup()
+
+        assert asyncio.run(run()) == (b'[0', [])
+
+    @pytest.mark.parametrize('statuses, expected', [
+        ([503, 200], b'[0]'),
+        ([503, 503], 'Service unavailable'),
+        ([404], 'Not found'),
+    ])
+    def test_iter_get_retries(self, statuses, expected):
+        """Retries a streamed request with the retry policy of the client ::"""
+        calls = []
+
+        async def handler(request):
+            status = statuses[len(calls)]
+            calls.append(status)
+            if status == 200:
+                return web.Response(body=b'[0]')
+            return web.Response(status=status, text='Service unavailable' if status == 503 else 'Not found')
+
+        async def run():
+            runner, url = await serve(handler)
+            client = AsyncShipdayClient(api_key='1234567890', retry_policy=RetryPolicy(max_attempts=2,
+                                                                                       backoff_base=0.01))
+            client._base_url = url
+            try:
+                return b''.join([chunk async for chunk in client.iter_get('orders/')])
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        if type(expected) is bytes:
+            assert asyncio.run(run()) == expected
+        else:
+            with pytest.raises(ShipdayException, match=expected):
+                asyncio.run(run())
+        assert calls == statuses
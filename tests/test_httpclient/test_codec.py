@@ -0,0 +1,69 @@
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.codec import JsonCodec, OrjsonCodec, MsgspecCodec, get_codec
+from shipday.httpclient.shipdayclient import ShipdayClient
+
+PAYLOAD = {'orderNumber': '1', 'customerName': 'Café', 'orderItem': [{'unitPrice': 2.5, 'quantity': 1}],
+           'tips': 0.0, 'pickup': None, 'flag': True}
+
+
+def get_codecs():
+    codecs = [JsonCodec()]
+    for codec_class in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+class TestCodec:
+    """JSON Codec"""
+
+    @pytest.mark.parametrize('codec', get_codecs(), ids=lambda codec: codec.name)
+    def test_round_trip(self, codec):
+        """Encodes to bytes and decodes back ::"""
+        body = codec.encode(PAYLOAD)
+        assert type(body) is bytes
+        assert json.loads(body) == PAYLOAD
+        assert codec.decode(body) == PAYLOAD
+
+    def test_default(self):
+        """Picks the fastest installed codec ::"""
+        expected = get_codecs()[1].name if len(get_codecs()) > 1 else 'json'
+        assert get_codec().name == expected
+
+    def test_by_name(self):
+        """Resolves codecs by name and passes instances through ::"""
+        codec = JsonCodec()
+        assert get_codec('json').name == 'json'
+        assert get_codec(codec) is codec
+
+    def test_unknown(self):
+        """Throws exception for unknown codecs ::"""
+        with pytest.raises(ShipdayException):
+            get_codec('yaml')
+
+    def test_missing(self):
+        """Throws exception if the requested codec is not installed ::"""
+        with mock.patch.dict('sys.modules', {'msgspec': None}):
+            with pytest.raises(ShipdayException):
+                get_codec('msgspec')
+
+    def test_client(self):
+        """Client sends encoded bytes with precomputed headers ::"""
+        client = ShipdayClient(api_key='1234567890', codec='json')
+        response = mock.Mock(status_code=200, content=b'{"success": true}')
+        with mock.patch.object(requests.Session, 'request', return_value=response, autospec=True) as request:
+            assert client.post('orders/', {'a': 1}) == {'success': True}
+            client.put('orders/', {'a': 2})
+        first, second = request.call_args_list
+        assert first.kwargs['data'] == b'{"a":1}'
+        assert first.kwargs['headers'] is second.kwargs['headers']
+        client.set_api_key('0987654321')
+        assert client._headers['Authorization'] == 'Basic 0987654321'
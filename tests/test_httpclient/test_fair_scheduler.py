@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.fair_scheduler import FairScheduler, AsyncFairScheduler
+
+
+def run_in_order(scheduler: FairScheduler, requests: list) -> list:
+    # Holds the only slot while the requests queue up, then records the order they are let through
+    order, lock = [], threading.Lock()
+    scheduler.acquire('holder')
+
+    def send(name):
+        scheduler.acquire(name)
+        with lock:
+            order.append(name)
+        scheduler.release()
+
+    threads = []
+    for name in requests:
+        thread = threading.Thread(target=send, args=(name,))
+        thread.start()
+        threads.append(thread)
+        # Queues the requests in the order they are listed
+        while scheduler.get_stats()['waiting'] < len(threads):
+            time.sleep(0.001)
+    scheduler.release()
+    for thread in threads:
+        thread.join()
+    return order
+
+
+class TestFairScheduler:
+    """Fair Scheduler"""
+
+    @pytest.mark.parametrize('max_in_flight', [0, -1, 1.5, None])
+    def test_invalid_max_in_flight(self, max_in_flight):
+        """Throws exception if max in flight is not a positive integer ::"""
+        with pytest.raises(ShipdayException):
+            FairScheduler(max_in_flight)
+
+    @pytest.mark.parametrize('weight', [0, -1, '2'])
+    def test_invalid_weight(self, weight):
+        """Throws exception if weight is not a positive number ::"""
+        with pytest.raises(ShipdayException):
+            FairScheduler().set_weight('merchant', weight)
+
+    def test_max_in_flight(self):
+        """Never lets more than max_in_flight requests through ::"""
+        scheduler, state, lock = FairScheduler(3), {'in_flight': 0, 'peak': 0}, threading.Lock()
+
+        def send(name):
+            scheduler.acquire(name)
+            with lock:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            time.sleep(0.005)
+            with lock:
+                state['in_flight'] -= 1
+            scheduler.release()
+
+        threads = [threading.Thread(target=send, args=('merchant {}'.format(i % 4),)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert state['peak'] == 3
+        assert scheduler.get_stats()['in_flight'] == 0
+
+    def test_does_not_starve(self):
+        """A flow with a large backlog does not hold back the requests of other flows ::"""
+        order = run_in_order(FairScheduler(1), ['bulk'] * 10 + ['dispatch'] * 2)
+        assert order.index('dispatch') <= 1
+        assert order[:4].count('dispatch') == 2
+
+    def test_weights(self):
+        """Flows get slots in proportion to their weights ::"""
+        scheduler = FairScheduler(1)
+        scheduler.set_weight('large', 2)
+        order = run_in_order(scheduler, ['large'] * 12 + ['small'] * 6)
+        assert order[:9].count('large') == 6
+        assert order[:9].count('small') == 3
+
+    def test_flow(self):
+        """Flows acquire and release slots of their scheduler ::"""
+        scheduler = FairScheduler(1)
+        flow = scheduler.get_flow('merchant', weight=3)
+        assert flow.weight == 3
+        assert flow.acquire() == 0.0
+        assert scheduler.get_stats()['in_flight'] == 1
+        flow.release()
+        scheduler.remove_flow('merchant')
+        assert flow.weight == 1.0
+
+    def test_async(self):
+        """Lets tasks through in fair order and skips cancelled ones ::"""
+        scheduler, order = AsyncFairScheduler(1), []
+
+        async def send(name):
+            await scheduler.acquire(name)
+            order.append(name)
+            await asyncio.sleep(0)
+            scheduler.release()
+
+        async def run():
+            await scheduler.acquire('holder')
+            tasks = [asyncio.ensure_future(send(name)) for name in ['bulk'] * 6 + ['dispatch']]
+            await asyncio.sleep(0)
+            cancelled = asyncio.ensure_future(send('cancelled'))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            scheduler.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert order.index('dispatch') <= 1
+        assert 'cancelled' not in order
+        assert scheduler.get_stats()['in_flight'] == 0
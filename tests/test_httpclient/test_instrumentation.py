@@ -0,0 +1,243 @@
+import asyncio
+from unittest import mock
+
+import pytest
+import requests
+
+from shipday import Shipday
+from shipday.exceptions import ShipdayException, ShipdayRateLimitException
+from shipday.httpclient.instrumentation import MetricsCollector, RequestHooks, HookChain, OpenTelemetryHooks, \
+    get_endpoint
+from shipday.httpclient.retry_policy import RetryPolicy
+from shipday.httpclient.shipdayclient import ShipdayClient
+from shipday.testing import Faults, StandInServer
+
+API_KEY = '1234567890'
+
+
+class RecordingHooks(RequestHooks):
+    def __init__(self):
+        self.events = []
+
+    def before_send(self, event):
+        event.headers['X-Request-Source'] = 'test'
+        self.events.append(('before_send', event.endpoint, event.attempt))
+
+    def after_response(self, event):
+        self.events.append(('after_response', event.status))
+
+    def on_error(self, event):
+        self.events.append(('on_error', type(event.error)))
+
+    def on_retry(self, event):
+        self.events.append(('on_retry', event.attempt))
+
+    def on_rate_limit(self, event):
+        self.events.append(('on_rate_limit', event.retry_after))
+
+
+class FailingHooks(RequestHooks):
+    def before_send(self, event):
+        raise ValueError('before_send')
+
+    def after_response(self, event):
+        raise ValueError('after_response')
+
+    def on_error(self, event):
+        raise ValueError('on_error')
+
+    def on_retry(self, event):
+        raise ValueError('on_retry')
+
+    def on_rate_limit(self, event):
+        raise ValueError('on_rate_limit')
+
+
+class TestInstrumentation:
+    """Request Instrumentation"""
+
+    @pytest.mark.parametrize('method, suffix, expected', [
+        ('GET', 'orders/', 'orders/'),
+        ('GET', 'orders/A-100', 'orders/{order_number}'),
+        ('DELETE', 'orders/42', 'orders/{order_id}'),
+        ('POST', 'orders/query/', 'orders/query/'),
+        ('PUT', 'orders/assign/1/2', 'orders/assign/{order_id}/{carrier_id}'),
+        ('PUT', 'order/edit/7', 'order/edit/{order_id}'),
+        ('DELETE', 'carriers/3', 'carriers/{carrier_id}'),
+        ('GET', 'on-demand/details/9', 'on-demand/details/{order_id}'),
+        ('POST', 'third-party/availability', 'third-party/availability'),
+        ('GET', 'unknown/12/items/34?page=2', 'unknown/{id}/items/{id}'),
+    ])
+    def test_endpoint(self, method, suffix, expected):
+        """Reports the endpoint template instead of the raw path ::"""
+        assert get_endpoint(method, suffix) == expected
+
+    def test_hook_order(self):
+        """Calls the hooks through a rate limited and retried request ::"""
+        hooks = RecordingHooks()
+        faults = Faults(rate_limit_every=10, rate_limit_burst=1, retry_after=0.01)
+        with StandInServer(faults=faults) as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url, hooks=hooks,
+                                   retry_policy=RetryPolicy(backoff_base=0.01))
+            assert client.get('orders/A-1') == []
+        assert hooks.events == [
+            ('before_send', 'orders/{order_number}', 1),
+            ('on_rate_limit', 0.01),
+            ('after_response', 429),
+            ('on_retry', 1),
+            ('before_send', 'orders/{order_number}', 2),
+            ('after_response', 200),
+        ]
+
+    def test_headers(self):
+        """Sends the headers added in before_send ::"""
+        client = ShipdayClient(api_key=API_KEY, hooks=RecordingHooks())
+        response = mock.Mock(status_code=200, content=b'[]', headers={})
+        with mock.patch.object(requests.Session, 'request', return_value=response, autospec=True) as request:
+            client.get('orders/')
+        headers = request.call_args.kwargs['headers']
+        assert headers['X-Request-Source'] == 'test'
+        assert 'X-Request-Source' not in client._headers
+
+    def test_error(self):
+        """Reports transport errors ::"""
+        hooks = RecordingHooks()
+        client = ShipdayClient(api_key=API_KEY, hooks=hooks)
+        with mock.patch.object(requests.Session, 'request', side_effect=requests.ConnectionError('reset')):
+            with pytest.raises(requests.ConnectionError):
+                client.get('orders/')
+        assert hooks.events[-1] == ('on_error', requests.ConnectionError)
+
+    def test_metrics(self):
+        """Aggregates latency, bytes, retries and rate limits per endpoint ::"""
+        metrics = MetricsCollector()
+        faults = Faults(rate_limit_every=10, rate_limit_burst=1, retry_after=0.01)
+        with StandInServer(orders=[{'orderId': 1, 'orderNumber': '100'}], faults=faults) as server:
+            with Shipday(api_key=API_KEY, base_url=server.url, hooks=metrics,
+                         retry_policy=RetryPolicy(backoff_base=0.01)) as shipday:
+                for _ in range(4):
+                    shipday.OrderService.get_orders()
+                shipday.OrderService.delete_order(1)
+        snapshot = metrics.snapshot()
+        orders = snapshot['GET orders/']
+        assert orders['requests'] == 5
+        assert orders['statuses'] == {429: 1, 200: 4}
+        assert orders['retries'] == orders['rate_limited'] == 1
+        assert orders['backoff'] > 0
+        assert orders['bytes_in'] > 0
+        assert orders['connect_time'] > 0
+        assert 0 < orders['latency']['p50'] <= orders['latency']['max']
+        assert snapshot['DELETE orders/{order_id}']['statuses'] == {200: 1}
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_queue_wait(self):
+        """Reports the time spent waiting for the rate limiter ::"""
+        from shipday.httpclient.rate_limiter import RateLimiter
+        metrics = MetricsCollector()
+        with StandInServer() as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url, hooks=metrics,
+                                   rate_limiter=RateLimiter(rate=50, capacity=1))
+            for _ in range(3):
+                client.get('carriers/')
+        assert metrics.snapshot()['GET carriers/']['queue_wait'] > 0.02
+
+    def test_rate_limit_without_retry(self):
+        """Reports a 429 that is raised to the caller ::"""
+        hooks = RecordingHooks()
+        with StandInServer(faults=Faults(rate_limit_every=1, rate_limit_burst=1)) as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url, hooks=hooks)
+            with pytest.raises(ShipdayRateLimitException):
+                client.get('carriers/')
+        assert [event[0] for event in hooks.events] == ['before_send', 'on_rate_limit', 'after_response']
+
+    def test_hook_chain(self):
+        """Calls every hook and accepts partial hook objects ::"""
+        class OnlyRetry:
+            def __init__(self):
+                self.calls = 0
+
+            def on_retry(self, event):
+                self.calls += 1
+
+        first, second = OnlyRetry(), RecordingHooks()
+        chain = HookChain([first, second])
+        chain.on_retry(mock.Mock(attempt=1))
+        chain.after_response(mock.Mock(status=200))
+        assert first.calls == 1
+        assert second.events == [('on_retry', 1), ('after_response', 200)]
+        with pytest.raises(ShipdayException):
+            HookChain([])
+
+    def test_failing_hook(self, caplog):
+        """Logs the errors of a hook and carries on with the request and the other hooks ::"""
+        hooks = RecordingHooks()
+        faults = Faults(rate_limit_every=10, rate_limit_burst=1, retry_after=0.01)
+        with StandInServer(faults=faults) as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url, hooks=[FailingHooks(), hooks],
+                                   retry_policy=RetryPolicy(backoff_base=0.01))
+            with caplog.at_level('ERROR', logger='shipday.httpclient.instrumentation'):
+                assert client.get('orders/A-1') == []
+        assert [event[0] for event in hooks.events] == ['before_send', 'on_rate_limit', 'after_response', 'on_retry',
+                                                        'before_send', 'after_response']
+        assert [record.exc_info[1].args[0] for record in caplog.records] == [
+            'before_send', 'on_rate_limit', 'after_response', 'on_retry', 'before_send', 'after_response']
+        assert 'FailingHooks.before_send' in caplog.records[0].getMessage()
+
+    def test_failing_error_hook(self, caplog):
+        """Raises the transport error, not the error of a failing on_error hook ::"""
+        hooks = RecordingHooks()
+        client = ShipdayClient(api_key=API_KEY, hooks=[FailingHooks(), hooks])
+        with mock.patch.object(requests.Session, 'request', side_effect=requests.ConnectionError('reset')):
+            with pytest.raises(requests.ConnectionError):
+                client.get('orders/')
+        assert hooks.events[-1] == ('on_error', requests.ConnectionError)
+        assert caplog.records[-1].exc_info[1].args[0] == 'on_error'
+
+    def test_async_client(self):
+        """Reports requests sent by the async client ::"""
+        pytest.importorskip('aiohttp')
+        from shipday.httpclient.async_shipdayclient import AsyncShipdayClient
+        metrics, hooks = MetricsCollector(), RecordingHooks()
+
+        async def run(url):
+            client = AsyncShipdayClient(api_key=API_KEY, base_url=url, hooks=[metrics, hooks])
+            try:
+                await client.get('orders/')
+                await client.post('orders/query/', {'startCursor': 1})
+                return [chunk async for chunk in client.iter_get('carriers/')]
+            finally:
+                await client.close()
+
+        with StandInServer() as server:
+            asyncio.run(run(server.url))
+        snapshot = metrics.snapshot()
+        assert set(snapshot) == {'GET orders/', 'POST orders/query/', 'GET carriers/'}
+        assert snapshot['GET orders/']['connect_time'] > 0
+        assert snapshot['POST orders/query/']['bytes_out'] == len(b'{"startCursor":1}')
+        assert hooks.events[0] == ('before_send', 'orders/', 1)
+
+    def test_opentelemetry(self):
+        """Creates a client span per attempt and propagates the trace context ::"""
+        pytest.importorskip('opentelemetry.sdk')
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        hooks = OpenTelemetryHooks(tracer=provider.get_tracer('test'))
+        client = ShipdayClient(api_key=API_KEY, hooks=hooks)
+        response = mock.Mock(status_code=200, content=b'[]', headers={})
+        with mock.patch.object(requests.Session, 'request', return_value=response, autospec=True) as request:
+            client.get('orders/A-1')
+        span, = exporter.get_finished_spans()
+        assert span.name == 'GET orders/{order_number}'
+        assert span.attributes['http.response.status_code'] == 200
+        assert 'traceparent' in request.call_args.kwargs['headers']
+
+    def test_opentelemetry_missing(self):
+        """Throws exception if OpenTelemetry is not installed ::"""
+        with mock.patch.dict('sys.modules', {'opentelemetry': None}):
+            with pytest.raises(ShipdayException):
+                OpenTelemetryHooks()
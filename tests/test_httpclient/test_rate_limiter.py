@@ -0,0 +1,115 @@
+from unittest import mock
+
+import pytest
+import requests
+
+from shipday.exceptions import ShipdayException, ShipdayRateLimitException
+from shipday.httpclient.rate_limiter import DEFAULT_BUCKET, TokenBucket, RateLimiter, parse_retry_after, parse_reset, \
+    get_rate_limit_details
+from shipday.httpclient.shipdayclient import ShipdayClient
+
+
+class TestRateLimiter:
+    """Token Bucket Rate Limiter"""
+
+    @pytest.mark.parametrize('value, expected', [
+        (None, None),
+        ('5', 5.0),
+        ('0.5', 0.5),
+        ('-3', 0.0),
+        ('Wed, 21 Oct 2015 07:28:00 GMT', 0.0),
+        ('soon', None),
+    ])
+    def test_parse_retry_after(self, value, expected):
+        """Parses delay seconds and http dates ::"""
+        assert parse_retry_after(value) == expected
+
+    def test_parse_reset_epoch(self):
+        """Converts epoch timestamps to seconds until reset ::"""
+        with mock.patch('time.time', return_value=2000000000.0):
+            assert parse_reset('2000000030') == 30.0
+        assert parse_reset('12') == 12.0
+
+    def test_rate_limit_details(self):
+        """Reads Retry-After and X-RateLimit headers ::"""
+        headers = requests.structures.CaseInsensitiveDict({
+            'retry-after': '2', 'X-RateLimit-Limit': '60', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '7'
+        })
+        assert get_rate_limit_details(headers) == {'retry_after': 2.0, 'limit': 60, 'remaining': 0, 'reset': 7.0}
+
+    @pytest.mark.parametrize('rate', [0, -1, '10', None])
+    def test_invalid_rate(self, rate):
+        """Throws exception if rate is not a positive number ::"""
+        with pytest.raises(ShipdayException):
+            TokenBucket(rate)
+
+    def test_bucket_paces_requests(self):
+        """Spends the burst capacity and then paces at the refill rate ::"""
+        with mock.patch('time.monotonic', return_value=100.0):
+            bucket = TokenBucket(rate=10, capacity=2)
+            delays = [bucket.reserve()[0] for _ in range(4)]
+        assert delays == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+    def test_bucket_block(self):
+        """Stalls the bucket after a block ::"""
+        with mock.patch('time.monotonic', return_value=100.0):
+            bucket = TokenBucket(rate=10, capacity=5)
+            generation = bucket.generation()
+            bucket.block(3)
+            delays = [bucket.reserve()[0] for _ in range(2)]
+        assert delays == pytest.approx([3.0, 3.1])
+        assert bucket.generation() == generation + 1
+
+    def test_block_only_affected_bucket(self):
+        """A 429 stalls only the bucket of the endpoint ::"""
+        limiter = RateLimiter(rate=10, limits={'on-demand/': (2, 2)})
+        assert limiter.get_bucket('on-demand/assign') is not limiter.get_bucket('orders/')
+        details = {'retry_after': 5.0, 'limit': None, 'remaining': None, 'reset': None}
+        limiter.update('on-demand/assign', 429, details)
+        with mock.patch('time.sleep') as sleep:
+            limiter.acquire('orders/')
+            sleep.assert_not_called()
+            limiter.acquire('on-demand/services')
+            assert sleep.call_args.args[0] == pytest.approx(5.0, abs=0.1)
+
+    def test_longest_prefix(self):
+        """Picks the bucket of the longest matching prefix ::"""
+        limiter = RateLimiter(rate=10, limits={'orders/': 5, 'orders/query/': 1})
+        assert limiter.get_bucket('orders/query/').rate == 1
+        assert limiter.get_bucket('orders/12').rate == 5
+        assert limiter.get_bucket('carriers/').rate == 10
+
+    def test_block_while_waiting(self):
+        """A request waiting when a block comes in is moved behind it without taking a second token ::"""
+        clock = [100.0]
+        with mock.patch('time.monotonic', side_effect=lambda: clock[0]):
+            bucket = TokenBucket(rate=10, capacity=1)
+            limiter = RateLimiter(rate=10)
+            limiter._buckets[DEFAULT_BUCKET] = bucket
+            bucket.reserve()
+
+            def sleep(delay):
+                # The 429 arrives half way through the first wait
+                if clock[0] == 100.0:
+                    bucket.block(2)
+                clock[0] += delay
+
+            with mock.patch('time.sleep', side_effect=sleep):
+                waited = limiter.acquire('orders/')
+            tokens = bucket._tokens
+        assert waited == pytest.approx(0.1 + 2.0)
+        assert tokens == pytest.approx(-1.0)
+
+    def test_client_rate_limit_exception(self):
+        """Exposes retry_after on the rate limit exception and stalls the limiter ::"""
+        limiter = RateLimiter(rate=10)
+        client = ShipdayClient(api_key='1234567890', rate_limiter=limiter)
+        response = mock.Mock(status_code=429, text='Too many requests',
+                             headers=requests.structures.CaseInsensitiveDict({'Retry-After': '4'}))
+        with mock.patch.object(requests.Session, 'request', return_value=response):
+            with pytest.raises(ShipdayRateLimitException) as e:
+                client.get('orders/')
+        assert e.value.retry_after == 4.0
+        with mock.patch('time.sleep') as sleep:
+            limiter.acquire('orders/')
+        assert sleep.call_args.args[0] == pytest.approx(4.0, abs=0.1)
@@ -0,0 +1,119 @@
+from unittest import mock
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.response_cache import ResponseCache
+from shipday.httpclient.shipdayclient import ShipdayClient
+from shipday.services import OrderService, CarrierService, OnDemandDeliveryService
+from tests.test_services.test_order_service import get_order
+
+
+def get_client(cache: ResponseCache) -> ShipdayClient:
+    client = ShipdayClient(api_key='1234567890', response_cache=cache)
+    session = mock.Mock()
+    session.request.side_effect = lambda method, url, **kwargs: mock.Mock(
+        status_code=200, content=b'[{"orderId": 1}]' if method == 'GET' else b'{"success": true}')
+    client._session = session
+    return client
+
+
+class TestResponseCache:
+    """Response Cache"""
+
+    @pytest.mark.parametrize('max_size', [0, -1, 1.5, None])
+    def test_invalid_max_size(self, max_size):
+        """Throws exception if max size is not a positive integer ::"""
+        with pytest.raises(ShipdayException):
+            ResponseCache(max_size=max_size)
+
+    @pytest.mark.parametrize('suffix, ttl', [
+        ('orders/', 5.0), ('orders/100', 5.0), ('carriers/', 30.0), ('on-demand/details/1', 5.0),
+        ('on-demand/estimate/1', 0.0), ('on-demand/services', 0.0),
+    ])
+    def test_default_ttls(self, suffix, ttl):
+        """Caches only the order, carrier and details endpoints by default ::"""
+        assert ResponseCache().get_ttl(suffix) == ttl
+
+    def test_expiry(self):
+        """Entries expire after their ttl ::"""
+        cache = ResponseCache(ttls={'orders/': 10})
+        with mock.patch('time.monotonic', return_value=100.0):
+            cache.set('orders/', b'[]')
+            assert cache.get('orders/') == b'[]'
+        with mock.patch('time.monotonic', return_value=110.0):
+            assert cache.get('orders/') is None
+
+    def test_lru_eviction(self):
+        """Evicts the least recently used entry ::"""
+        cache = ResponseCache(max_size=2)
+        cache.set('orders/1', b'1')
+        cache.set('orders/2', b'2')
+        cache.get('orders/1')
+        cache.set('orders/3', b'3')
+        assert [cache.get('orders/1'), cache.get('orders/2'), cache.get('orders/3')] == [b'1', None, b'3']
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_stats(self):
+        """Counts hits and misses of cacheable endpoints ::"""
+        cache = ResponseCache()
+        cache.get('orders/')
+        cache.set('orders/', b'[]')
+        cache.get('orders/')
+        cache.get('on-demand/services')
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['hit_rate'], stats['size']) == (1, 1, 0.5, 1)
+
+    def test_client_cache(self):
+        """Serves repeated reads from the cache as independent copies ::"""
+        client = get_client(ResponseCache())
+        service = OrderService(httpclient=client)
+        first = service.get_order('100')
+        first.append('changed')
+        assert service.get_order('100') == [{'orderId': 1}]
+        assert client._session.request.call_count == 1
+
+    def test_invalidation_during_read(self):
+        """A read sent before a write does not cache the body from before the write ::"""
+        client = get_client(ResponseCache())
+
+        def request(method, url, **kwargs):
+            # The write finishes while the read is in flight
+            if method == 'GET' and client._session.request.call_count == 1:
+                OrderService(httpclient=client).delete_order(1)
+            return mock.Mock(status_code=200, content=b'[]' if method == 'GET' else b'{"success": true}')
+
+        client._session.request.side_effect = request
+        client.get('orders/1')
+        client.get('orders/1')
+        methods = [call.args[0] for call in client._session.request.call_args_list]
+        assert methods == ['GET', 'DELETE', 'GET']
+
+    def test_api_key_change(self):
+        """Does not serve the reads of the previous api key ::"""
+        client = get_client(ResponseCache())
+        client.get('orders/1')
+        client.set_api_key('0987654321')
+        client.get('orders/1')
+        assert client._session.request.call_count == 2
+
+    @pytest.mark.parametrize('read, write', [
+        (lambda c: OrderService(httpclient=c).get_orders(), lambda c: OrderService(httpclient=c).delete_order(1)),
+        (lambda c: OrderService(httpclient=c).get_order('100'),
+         lambda c: OrderService(httpclient=c).edit_order(1, get_order('100'))),
+        (lambda c: OrderService(httpclient=c).get_order('100'),
+         lambda c: OrderService(httpclient=c).assign_order(1, 2)),
+        (lambda c: CarrierService(httpclient=c).get_carriers(),
+         lambda c: CarrierService(httpclient=c).delete_carrier(1)),
+        (lambda c: OnDemandDeliveryService(httpclient=c).get_details(1),
+         lambda c: OnDemandDeliveryService(httpclient=c).cancel(1)),
+    ])
+    def test_mutation_invalidates(self, read, write):
+        """Mutations through the same client invalidate the cached reads ::"""
+        client = get_client(ResponseCache())
+        read(client)
+        read(client)
+        write(client)
+        read(client)
+        methods = [call.args[0] for call in client._session.request.call_args_list]
+        assert methods.count('GET') == 2
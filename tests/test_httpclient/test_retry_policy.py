@@ -0,0 +1,118 @@
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+from shipday.exceptions import ShipdayException, ShipdayRateLimitException
+from shipday.httpclient.response_cache import ResponseCache
+from shipday.httpclient.retry_policy import RetryPolicy
+from shipday.httpclient.shipdayclient import ShipdayClient
+from shipday.services import OrderService
+from tests.test_services.test_order_service import get_order
+
+
+def get_response(status_code=200, body=None):
+    response = mock.Mock(status_code=status_code, text='',
+                         headers=requests.structures.CaseInsensitiveDict({'Retry-After': '0'}))
+    response.content = json.dumps(body if body is not None else {}).encode('utf-8')
+    return response
+
+
+def get_client(*responses, **kwargs) -> ShipdayClient:
+    client = ShipdayClient(api_key='1234567890', retry_policy=RetryPolicy(**kwargs))
+    session = mock.Mock()
+    session.request.side_effect = list(responses)
+    client._session = session
+    return client
+
+
+class TestRetryPolicy:
+    """Retry Policy"""
+
+    @pytest.mark.parametrize('max_attempts', [0, -1, 1.5, None])
+    def test_invalid_max_attempts(self, max_attempts):
+        """Throws exception if max attempts is not a positive integer ::"""
+        with pytest.raises(ShipdayException):
+            RetryPolicy(max_attempts=max_attempts)
+
+    @pytest.mark.parametrize('attempt, expected', [(1, 0.5), (2, 1.0), (3, 2.0), (10, 8.0)])
+    def test_backoff_cap(self, attempt, expected):
+        """Draws the delay uniformly up to the capped exponential backoff ::"""
+        policy = RetryPolicy()
+        with mock.patch('random.uniform', side_effect=lambda low, high: high) as uniform:
+            assert policy.get_backoff(attempt) == expected
+        assert uniform.call_args.args[0] == 0
+
+    def test_backoff_retry_after(self):
+        """Never retries sooner than Retry-After ::"""
+        assert RetryPolicy().get_backoff(1, retry_after=3.0) == 3.0
+
+    def test_next_delay_limits(self):
+        """Stops after max attempts or when the budget is spent ::"""
+        policy = RetryPolicy(max_attempts=3, total_budget=10.0, backoff_base=1.0)
+        with mock.patch('time.monotonic', return_value=100.0):
+            assert policy.next_delay(2, started=100.0) is not None
+            assert policy.next_delay(3, started=100.0) is None
+            assert policy.next_delay(1, started=91.0, retry_after=2.0) is None
+
+    def test_retry_get(self):
+        """Retries GET on a retryable status ::"""
+        client = get_client(get_response(503), get_response(502), get_response(200, [1]))
+        with mock.patch('time.sleep'):
+            assert client.get('orders/') == [1]
+        assert client._session.request.call_count == 3
+
+    def test_retry_connection_error(self):
+        """Retries GET on connection errors and raises when attempts run out ::"""
+        client = get_client(*[requests.ConnectionError('reset')] * 3)
+        with mock.patch('time.sleep'), pytest.raises(requests.ConnectionError):
+            client.get('orders/')
+        assert client._session.request.call_count == 3
+
+    def test_no_retry_non_idempotent_post(self):
+        """Does not re-send a POST that may have been processed ::"""
+        client = get_client(get_response(500, {'error': True}), get_response(200))
+        with mock.patch('time.sleep'):
+            assert client.post('carriers/', {}) == {'error': True}
+        assert client._session.request.call_count == 1
+
+    def test_retry_rate_limited_post(self):
+        """Re-sends a rate limited POST because it was never processed ::"""
+        client = get_client(get_response(429), get_response(200, {'ok': True}))
+        with mock.patch('time.sleep'):
+            assert client.post('carriers/', {}) == {'ok': True}
+        assert client._session.request.call_count == 2
+
+    def test_rate_limit_not_retryable(self):
+        """Raises rate limit exception if 429 is not retryable ::"""
+        client = get_client(get_response(429), retry_on_status=(503,))
+        with pytest.raises(ShipdayRateLimitException):
+            client.get('orders/')
+
+    @pytest.mark.parametrize('existing, calls', [({'orderId': 1}, 1), (None, 2)])
+    def test_dedupe(self, existing, calls):
+        """Returns the existing result or re-sends if there is none ::"""
+        client = get_client(requests.ConnectionError('reset'), get_response(200, {'orderId': 2}))
+        with mock.patch('time.sleep'):
+            assert client.post('orders/', {}, dedupe=lambda: existing) == (existing or {'orderId': 2})
+        assert client._session.request.call_count == calls
+
+    def test_insert_order_dedupe(self):
+        """Does not insert an order twice after a connection reset ::"""
+        client = get_client(requests.ConnectionError('reset'), get_response(200, [{'orderId': 42}]))
+        with mock.patch('time.sleep'):
+            response = OrderService(httpclient=client).insert_order(get_order('100'))
+        assert response['orderId'] == 42
+        methods = [(call.args[0], call.args[1]) for call in client._session.request.call_args_list]
+        assert methods == [('POST', 'https://api.shipday.com/orders/'), ('GET', 'https://api.shipday.com/orders/100')]
+
+    def test_dedupe_skips_cache(self):
+        """Looks for the inserted order past a cached empty result ::"""
+        client = get_client(requests.ConnectionError('reset'), get_response(200, [{'orderId': 42}]))
+        client._response_cache = ResponseCache()
+        client._response_cache.set('orders/100', b'[]')
+        with mock.patch('time.sleep'):
+            response = OrderService(httpclient=client).insert_order(get_order('100'))
+        assert response['orderId'] == 42
+        assert [call.args[0] for call in client._session.request.call_args_list] == ['POST', 'GET']
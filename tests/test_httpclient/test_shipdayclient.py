@@ -0,0 +1,103 @@
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.shipdayclient import ShipdayClient
+
+
+def get_response(status_code=200, body=None):
+    response = mock.Mock(status_code=status_code, text='')
+    response.content = json.dumps(body if body is not None else {}).encode('utf-8')
+    return response
+
+
+class TestShipdayClient:
+    """Shipday Http Client"""
+
+    def test_session_reused(self):
+        """Reuses one pooled session for every request ::"""
+        client = ShipdayClient(api_key='1234567890')
+        with mock.patch.object(requests.Session, 'request', return_value=get_response(), autospec=True) as request:
+            client.get('orders/')
+            client.post('orders/', {})
+            client.put('orders/', {})
+            client.delete('orders/1')
+        assert request.call_count == 4
+        sessions = {call.args[0] for call in request.call_args_list}
+        assert len(sessions) == 1
+
+    @pytest.mark.parametrize('base_url, expected', [
+        (None, 'https://api.shipday.com/orders/'),
+        ('http://127.0.0.1:8080', 'http://127.0.0.1:8080/orders/'),
+        ('https://sandbox.example.com/v1/', 'https://sandbox.example.com/v1/orders/'),
+    ])
+    def test_base_url(self, base_url, expected):
+        """Sends requests to the configured base url ::"""
+        client = ShipdayClient(api_key='1234567890', base_url=base_url)
+        with mock.patch.object(requests.Session, 'request', return_value=get_response(), autospec=True) as request:
+            client.get('orders/')
+        assert request.call_args.args[2] == expected
+
+    @pytest.mark.parametrize('base_url', ['api.shipday.com', 'ftp://api.shipday.com/', 42])
+    def test_invalid_base_url(self, base_url):
+        """Throws exception if base url is not an http url ::"""
+        with pytest.raises(ShipdayException):
+            ShipdayClient(api_key='1234567890', base_url=base_url)
+
+    @pytest.mark.parametrize('pool_connections, pool_maxsize', [(1, 1), (4, 32)])
+    def test_pool_size(self, pool_connections, pool_maxsize):
+        """Mounts an adapter with the configured pool size ::"""
+        client = ShipdayClient(api_key='1234567890', pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        with mock.patch.object(requests.Session, 'request', return_value=get_response(), autospec=True) as request:
+            client.get('orders/')
+        adapter = request.call_args.args[0].get_adapter('https://api.shipday.com/')
+        assert adapter._pool_connections == pool_connections
+        assert adapter._pool_maxsize == pool_maxsize
+
+    @pytest.mark.parametrize('keep_alive, connection', [(True, None), (False, 'close')])
+    def test_keep_alive(self, keep_alive, connection):
+        """Sends Connection: close only if keep alive is disabled ::"""
+        client = ShipdayClient(api_key='1234567890', keep_alive=keep_alive)
+        with mock.patch.object(requests.Session, 'request', return_value=get_response(), autospec=True) as request:
+            client.get('orders/')
+        assert request.call_args.kwargs['headers'].get('Connection') == connection
+
+    def test_close(self):
+        """Creates a new session after close ::"""
+        client = ShipdayClient(api_key='1234567890')
+        with mock.patch.object(requests.Session, 'request', return_value=get_response(), autospec=True) as request:
+            client.get('orders/')
+            client.close()
+            client.get('orders/')
+        first, second = (call.args[0] for call in request.call_args_list)
+        assert first is not second
+
+    def test_raw_body(self):
+        """Returns the undecoded response body when asked for raw ::"""
+        client = ShipdayClient(api_key='1234567890')
+        response = get_response(body=[{'orderId': 1}])
+        with mock.patch.object(requests.Session, 'request', return_value=response, autospec=True):
+            assert client.get('orders/', raw=True) == b'[{"orderId": 1}]'
+            assert client.post('orders/query/', {}, idempotent=True, raw=True) == b'[{"orderId": 1}]'
+            assert client.get('orders/') == [{'orderId': 1}]
+
+    def test_iter_get(self):
+        """Streams the response body and releases the connection ::"""
+        client = ShipdayClient(api_key='1234567890')
+        response = get_response()
+        response.iter_content.return_value = iter([b'[1,', b'2]'])
+        with mock.patch.object(requests.Session, 'request', return_value=response, autospec=True) as request:
+            assert list(client.iter_get('orders/', chunk_size=2)) == [b'[1,', b'2]']
+        assert request.call_args.kwargs['stream'] is True
+        response.iter_content.assert_called_once_with(2)
+        response.close.assert_called_once()
+
+    def test_iter_get_error(self):
+        """Throws exception for error responses ::"""
+        client = ShipdayClient(api_key='1234567890')
+        with mock.patch.object(requests.Session, 'request', return_value=get_response(401), autospec=True):
+            with pytest.raises(ShipdayException):
+                list(client.iter_get('orders/'))
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from shipday import Shipday
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.single_flight import SingleFlight, AsyncSingleFlight
+from shipday.testing import Faults, StandInServer
+
+API_KEY = '1234567890'
+
+
+class Loader:
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, key):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {'key': key, 'call': self.calls}
+
+    async def load_async(self, key):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {'key': key, 'call': self.calls}
+
+
+class TestSingleFlight:
+    """Single Flight"""
+
+    def test_shares_load(self):
+        """Concurrent callers of the same key share one load ::"""
+        flight, loader = SingleFlight(), Loader()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: flight.do('orders/1', loader, 'orders/1'), range(8)))
+        assert loader.calls == 1
+        assert results == [{'key': 'orders/1', 'call': 1}] * 8
+        assert flight.get_stats() == {'in_flight': 0, 'leaders': 1, 'followers': 7}
+
+    def test_separate_keys(self):
+        """Different keys and later calls load again ::"""
+        flight, loader = SingleFlight(), Loader(delay=0)
+        assert flight.do('orders/1', loader, 'orders/1')['call'] == 1
+        assert flight.do('orders/1', loader, 'orders/1')['call'] == 2
+        assert flight.do('orders/2', loader, 'orders/2')['call'] == 3
+
+    def test_shares_error(self):
+        """Waiters get the error of the shared load ::"""
+        flight, loader = SingleFlight(), Loader(error=ShipdayException('Unavailable'))
+
+        def call(_):
+            try:
+                return flight.do('carriers/', loader, 'carriers/')
+            except ShipdayException as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert list(executor.map(call, range(4))) == ['Unavailable'] * 4
+        assert loader.calls == 1
+
+    def test_forget(self):
+        """Callers after a forget start a new load ::"""
+        flight, loader = SingleFlight(), Loader(delay=0.1)
+        first = threading.Thread(target=flight.do, args=('orders/1', loader, 'orders/1'))
+        first.start()
+        time.sleep(0.02)
+        flight.forget(('orders/',))
+        assert flight.do('orders/1', loader, 'orders/1')['call'] == 2
+        first.join()
+
+    def test_async(self):
+        """Concurrent tasks share one load ::"""
+        flight, loader = AsyncSingleFlight(), Loader()
+
+        async def run():
+            return await asyncio.gather(*[flight.do('orders/1', loader.load_async, 'orders/1') for _ in range(8)])
+
+        assert asyncio.run(run()) == [{'key': 'orders/1', 'call': 1}] * 8
+        assert loader.calls == 1
+        assert flight.get_stats() == {'in_flight': 0, 'leaders': 1, 'followers': 7}
+
+    def test_async_error(self):
+        """Waiting tasks get the error of the shared load ::"""
+        flight, loader = AsyncSingleFlight(), Loader(error=ShipdayException('Unavailable'))
+
+        async def run():
+            return await asyncio.gather(*[flight.do('orders/1', loader.load_async, 'orders/1') for _ in range(3)],
+                                        return_exceptions=True)
+
+        assert [str(result) for result in asyncio.run(run())] == ['Unavailable'] * 3
+        assert loader.calls == 1
+
+    def test_async_leader_cancelled(self):
+        """A waiter takes over when the task doing the load is cancelled ::"""
+        flight, loader = AsyncSingleFlight(), Loader()
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do('orders/1', loader.load_async, 'orders/1'))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do('orders/1', loader.load_async, 'orders/1'))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(run()) == {'key': 'orders/1', 'call': 2}
+
+    @pytest.mark.parametrize('coalesce, expected', [(True, 1), (False, 8)])
+    def test_client(self, coalesce, expected):
+        """Identical concurrent reads send one request, each caller gets its own copy ::"""
+        orders = [{'orderId': 1, 'orderNumber': '99'}]
+        with StandInServer(orders=orders, faults=Faults(latency=0.05)) as server:
+            with Shipday(api_key=API_KEY, base_url=server.url, coalesce=coalesce, pool_maxsize=8) as shipday:
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    results = list(executor.map(lambda _: shipday.OrderService.get_order('99'), range(8)))
+            assert len(server.requests) == expected
+        assert results == [orders] * 8
+        assert len({id(result) for result in results}) == 8
+
+    def test_client_write_between_reads(self):
+        """Reads after a write do not join a read started before it ::"""
+        with StandInServer(orders=[{'orderId': 1, 'orderNumber': '99'}], faults=Faults(latency=0.05)) as server:
+            with Shipday(api_key=API_KEY, base_url=server.url) as shipday:
+                service = shipday.OrderService
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    before = executor.submit(service.get_order, '99')
+                    time.sleep(0.01)
+                    service.delete_order(1)
+                    assert service.get_order('99') == []
+                    before.result()
+            assert [method for method, path in server.requests] == ['GET', 'DELETE', 'GET']
+
+    def test_async_client(self):
+        """Identical concurrent reads of the async client send one request ::"""
+        pytest.importorskip('aiohttp')
+        from shipday import AsyncShipday
+
+        async def run(url):
+            async with AsyncShipday(api_key=API_KEY, base_url=url) as shipday:
+                return await asyncio.gather(*[shipday.CarrierService.get_carriers() for _ in range(8)])
+
+        with StandInServer(carriers=[{'id': 1, 'name': 'carrier'}], faults=Faults(latency=0.05)) as server:
+            results = asyncio.run(run(server.url))
+            assert len(server.requests) == 1
+        assert results == [[{'id': 1, 'name': 'carrier'}]] * 8
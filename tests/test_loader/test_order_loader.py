@@ -0,0 +1,201 @@
+import io
+import json
+
+import pytest
+
+from shipday.bo import RowError
+from shipday.exceptions import ShipdayException
+from shipday.loader import OrderLoader
+from shipday.order import Order
+
+MAPPING = {
+    'order_number': 'Order #',
+    'customer.name': 'Customer',
+    'customer.phone_number': 'Phone',
+    'customer.address.street': 'Street',
+    'customer.address.latitude': 'Lat',
+    'customer.address.longitude': 'Lng',
+    'pickup.name': 'Store',
+    'pickup.address.street': 'Store Street',
+    'cost.tips': 'Tip',
+    'item.name': 'Item',
+    'item.unit_price': 'Price',
+    'item.quantity': 'Qty',
+}
+HEADER = 'Order #,Customer,Phone,Street,Lat,Lng,Store,Store Street,Tip,Item,Price,Qty\n'
+CSV = HEADER + (
+    '1,John,+100,Main St,23.5,90.25,Shop,Side St,2,Pizza,10.5,2\n'
+    '1,John,+100,Main St,23.5,90.25,Shop,Side St,2,Tea,1,3\n'
+    '2,Jane,+200,Elm St,,,Shop,Side St,,Burger,5,1\n'
+)
+
+
+def to_ndjson(text: str) -> str:
+    lines = text.splitlines()
+    columns = lines[0].split(',')
+    return '\n'.join(json.dumps(dict(zip(columns, line.split(',')))) for line in lines[1:]) + '\n'
+
+
+class TestOrderLoader:
+    """Order Loader"""
+
+    @pytest.mark.parametrize('read', [
+        lambda loader: list(loader.iter_csv(io.StringIO(CSV))),
+        lambda loader: list(loader.iter_ndjson(io.StringIO(to_ndjson(CSV)))),
+    ])
+    def test_load(self, read):
+        """Maps rows to orders and groups items by order number ::"""
+        loader = OrderLoader(MAPPING)
+        orders = read(loader)
+        assert loader.errors == []
+        assert [type(order) for order in orders] == [Order, Order]
+        first, second = orders
+        assert first.order_number == '1'
+        assert [(item.name, item.unit_price, item.quantity) for item in first.order_items] == \
+               [('Pizza', 10.5, 2), ('Tea', 1.0, 3)]
+        assert (first.customer.name, first.customer.phone_number) == ('John', '+100')
+        assert (first.customer.address.street, first.customer.address.latitude) == ('Main St', 23.5)
+        assert first.pickup.address.street == 'Side St'
+        assert first.order_cost.tips == 2.0
+        assert second.customer.address.latitude is None
+        assert second.order_cost.tips == 0.0
+
+    def test_file(self, tmp_path):
+        """Reads from a path ::"""
+        path = tmp_path / 'orders.csv'
+        path.write_text(CSV)
+        assert [order.order_number for order in OrderLoader(MAPPING).iter_csv(str(path))] == ['1', '2']
+
+    def test_streams(self):
+        """Yields each order before reading the rest of the file ::"""
+        source = io.StringIO(CSV + ''.join('{0},X,+1,S,,,Shop,St,,I,1,1\n'.format(i) for i in range(3, 1000)))
+        orders = OrderLoader(MAPPING).iter_csv(source)
+        assert next(orders).order_number == '1'
+        assert source.tell() < len(source.getvalue())
+
+    def test_malformed_rows(self):
+        """Reports malformed rows with their line number and keeps going ::"""
+        text = HEADER + (
+            '1,John,+100,Main St,23.5,90.25,Shop,Side St,2,Pizza,ten,2\n'
+            '2,Jane,+200,Elm St\n'
+            '3,Joe,,Elm St,,,Shop,Side St,,Burger,5,1\n'
+            '4,Ann,+400,Elm St,,,Shop,Side St,,Burger,5,1.5\n'
+            '5,Bob,+500,Elm St,,,Shop,Side St,,Burger,5,1\n'
+        )
+        loader = OrderLoader(MAPPING)
+        assert [order.order_number for order in loader.iter_csv(io.StringIO(text))] == ['5']
+        assert [error.row for error in loader.errors] == [2, 3, 4, 5]
+        assert 'item.unit_price' in loader.errors[0].message
+        assert loader.errors[2] == RowError(4, 'Customer must have a phone number')
+
+    def test_malformed_json(self):
+        """Reports malformed JSON lines ::"""
+        text = to_ndjson(CSV).replace('"Order #": "2"', '"Order #": 2,,', 1) + '[1]\n'
+        loader = OrderLoader(MAPPING)
+        assert [order.order_number for order in loader.iter_ndjson(io.StringIO(text))] == ['1']
+        assert [error.row for error in loader.errors] == [3, 4]
+
+    def test_decode_errors(self):
+        """Reports lines the codec can not decode with its own error type ::"""
+        class DecodeError(Exception):
+            pass
+
+        class Codec:
+            name = 'custom'
+            decode_errors = (DecodeError,)
+
+            def decode(self, text):
+                if text.startswith('{'):
+                    return json.loads(text)
+                raise DecodeError('not an object')
+
+        loader = OrderLoader(MAPPING, codec=Codec())
+        orders = list(loader.iter_ndjson(io.StringIO(to_ndjson(CSV) + 'broken\n')))
+        assert [order.order_number for order in orders] == ['1', '2']
+        assert loader.errors == [RowError(4, 'Malformed JSON line: not an object')]
+
+    @pytest.mark.parametrize('tip, message', [('-2', 'Tips must be a positive number'),
+                                              ('nan', 'nan is not a finite number'),
+                                              ('inf', 'inf is not a finite number')])
+    def test_invalid_cost(self, tip, message):
+        """Rejects orders with invalid costs ::"""
+        text = CSV.replace('Side St,2,', 'Side St,{},'.format(tip))
+        loader = OrderLoader(MAPPING)
+        assert [order.order_number for order in loader.iter_csv(io.StringIO(text))] == ['2']
+        assert loader.errors[0].row == 2
+        assert message in loader.errors[0].message
+
+    def test_without_validation(self):
+        """Yields orders as read when validation is off ::"""
+        loader = OrderLoader({'order_number': 'Order #', 'customer.name': 'Customer'}, validate=False)
+        orders = list(loader.iter_csv(io.StringIO(CSV)))
+        assert [order.order_number for order in orders] == ['1', '2']
+        assert orders[0].order_items == []
+
+    def test_converter(self):
+        """Uses custom converters from the mapping ::"""
+        mapping = dict(MAPPING, **{'cost.tips': ('Tip', lambda value: float(value) / 100)})
+        orders = list(OrderLoader(mapping).iter_csv(io.StringIO(CSV)))
+        assert orders[0].order_cost.tips == 0.02
+
+    @pytest.mark.parametrize('mapping', [None, {}, {'unknown': 'column'}])
+    def test_invalid_mapping(self, mapping):
+        """Throws exception for invalid mappings ::"""
+        with pytest.raises(ShipdayException):
+            OrderLoader(mapping)
+
+    def test_missing_column(self):
+        """Throws exception if a mapped column is missing ::"""
+        with pytest.raises(ShipdayException):
+            list(OrderLoader({'order_number': 'Number'}).iter_csv(io.StringIO(CSV)))
+
+    def test_batches(self):
+        """Groups orders into OrderBatch chunks ::"""
+        pytest.importorskip('numpy')
+        source = io.StringIO(CSV + ''.join('{0},X,+1,S,,,Shop,St,,I,1,1\n'.format(i) for i in range(3, 11)))
+        batches = list(OrderLoader.iter_batches(OrderLoader(MAPPING).iter_csv(source), batch_size=4))
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        assert all(batch.validate() == [] for batch in batches)
+        assert [order.order_number for order in batches[0].to_orders()] == ['1', '2', '3', '4']
+
+    @pytest.mark.parametrize('read', [
+        lambda loader, text, size: list(loader.iter_csv_batches(io.StringIO(text), batch_size=size)),
+        lambda loader, text, size: list(loader.iter_ndjson_batches(io.StringIO(to_ndjson(text)), batch_size=size)),
+    ])
+    def test_column_batches(self, read):
+        """Fills batches straight from the rows, like the batches of the loaded orders ::"""
+        pytest.importorskip('numpy')
+        text = CSV + ''.join('{0},X,+1,S,,,Shop,St,,I,1,1\n'.format(i) for i in range(3, 11))
+        loader = OrderLoader(MAPPING)
+        batches = read(loader, text, 4)
+        assert loader.errors == []
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        assert batches[0].order_numbers.tolist() == ['1', '2', '3', '4']
+        assert batches[0].quantities.tolist() == [2.0, 3.0, 1.0, 1.0, 1.0]
+        assert batches[0].tips.tolist() == [2.0, 0.0, 0.0, 0.0]
+        expected = OrderLoader.iter_batches(OrderLoader(MAPPING).iter_csv(io.StringIO(text)), batch_size=4)
+        for batch, other in zip(batches, expected):
+            assert batch.get_invalid_rows().tolist() == other.get_invalid_rows().tolist() == []
+            assert [order.customer.address.latitude for order in batch.to_orders()] == \
+                   [order.customer.address.latitude for order in other.to_orders()]
+
+    def test_column_batches_malformed_rows(self):
+        """Leaves out the rows the object loader rejects and reports them with their line ::"""
+        pytest.importorskip('numpy')
+        text = HEADER + (
+            '1,John,+100,Main St,23.5,90.25,Shop,Side St,2,Pizza,ten,2\n'
+            '2,Jane,+200,Elm St\n'
+            '3,Joe,,Elm St,,,Shop,Side St,,Burger,5,1\n'
+            '4,Ann,+400,Elm St,,,Shop,Side St,,Burger,5,1.5\n'
+            '5,Bob,+500,Elm St,,,Shop,Side St,,Burger,5,1\n'
+        )
+        loader, expected = OrderLoader(MAPPING), OrderLoader(MAPPING)
+        batches = list(loader.iter_csv_batches(io.StringIO(text), batch_size=2))
+        list(expected.iter_csv(io.StringIO(text)))
+        assert [number for batch in batches for number in batch.order_numbers.tolist()] == ['5']
+        assert sorted(loader.errors, key=lambda error: error.row) == expected.errors
+
+    def test_column_batches_size(self):
+        """Throws exception for a batch size below one ::"""
+        with pytest.raises(ShipdayException):
+            list(OrderLoader(MAPPING).iter_csv_batches(io.StringIO(CSV), batch_size=0))
@@ -0,0 +1,186 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from shipday.bo import RowError
+from shipday.exceptions import ShipdayException
+from shipday.order import Order, Customer, Pickup, OrderItem, OrderCost, Address, OrderCodec
+
+np = pytest.importorskip('numpy')
+from shipday.order.order_batch import OrderBatch  # noqa: E402
+
+
+def get_order(order_number='1', **kwargs) -> Order:
+    address = kwargs.pop('address', Address(street='Jefferson St', city='California', latitude=23.5, longitude=90.0))
+    customer = Customer(name='customer', address=address, phone_number='+1343523423')
+    pickup = Pickup(name='pickup', address=Address(street='Hacker way'))
+    items = kwargs.pop('order_items', [OrderItem(name='Pizza', unit_price=2, quantity=7),
+                                       OrderItem(name='Tea', unit_price=1.5, quantity=2, add_ons='Sugar')])
+    return Order(orderNumber=order_number, customer=customer, pickup=pickup, order_items=items,
+                 order_cost=OrderCost(tips=1.0, tax=2.0, discount=0.5, deliveryFee=3.0, total=30.0), **kwargs)
+
+
+def set_private(obj, name, value):
+    setattr(obj, '_' + name, value)
+    return obj
+
+
+class TestOrderBatch:
+    """Order Batch"""
+
+    def test_columns(self):
+        """Stores orders and items as columns ::"""
+        batch = OrderBatch([get_order('1'), get_order('2', order_items=[])])
+        assert len(batch) == 2
+        assert batch.order_numbers.tolist() == ['1', '2']
+        assert batch.item_rows.tolist() == [0, 0]
+        assert batch.unit_prices.tolist() == [2.0, 1.5]
+        assert batch.quantities.tolist() == [7.0, 2.0]
+        assert batch.tips.dtype == np.float64
+        assert batch.validate() == []
+
+    def test_empty(self):
+        """Handles an empty batch ::"""
+        batch = OrderBatch([])
+        assert len(batch) == 0
+        assert batch.validate() == []
+        assert batch.update_total_cost().tolist() == []
+
+    def test_update_total_cost(self):
+        """Computes the same totals as Order.update_total_cost ::"""
+        orders = [get_order(str(i), order_items=[OrderItem(name='x', unit_price=i, quantity=i + 1)] * (i % 3))
+                  for i in range(50)]
+        batch = OrderBatch(orders)
+        totals = batch.update_total_cost()
+        for order in orders:
+            order.update_total_cost()
+        assert totals.tolist() == pytest.approx([order.order_cost.total for order in orders])
+        assert batch.total is totals
+
+    def test_to_orders(self):
+        """Gives back the orders with the batch costs, without the invalid ones if asked ::"""
+        orders = [get_order('1'), get_order('2', order_items=[]), get_order(None)]
+        batch = OrderBatch(orders)
+        batch.update_total_cost()
+        valid = batch.to_orders(skip_invalid=True)
+        assert valid == orders[:2]
+        assert [order.order_cost.total for order in valid] == [22.5, 5.5]
+        assert valid[0].customer.name == 'customer' and valid[0].order_items[1].add_ons == 'Sugar'
+        assert OrderCodec().encode(valid[0])['customerName'] == 'customer'
+        assert len(batch.to_orders()) == 3
+
+    @pytest.mark.parametrize('order, message', [
+        (set_private(get_order(), 'order_number', None), 'Order must have a order number'),
+        (get_order(address=None), 'Customer must have a Address'),
+        (get_order(address=Address(latitude=95.0, longitude=10.0)),
+         'Customer address: Latitude must be between -90 and 90'),
+        (get_order(address=Address(latitude=10.0, longitude=-181.0)),
+         'Customer address: Longitude must be between -180 and 180'),
+        (get_order(address=Address(latitude=10.0)),
+         'Customer address: Latitude and Longitude must be both None or float'),
+        (get_order(address=Address(latitude=10, longitude=10.0)), 'Customer address: Latitude must be float'),
+        (get_order(address=Address(street=1)), 'Customer address: Street must be str'),
+        (set_private(get_order(), 'order_cost', OrderCost(tips=-1.0)), 'Tips must be a positive number'),
+        (set_private(get_order(), 'order_cost', OrderCost(tax='1')), 'Tax must be a positive number'),
+        (get_order(order_items=[OrderItem(name='Pizza', unit_price=2)]),
+         'Exception in item no: 0 Message: Order quantity must be a positive integer'),
+        (get_order(order_items=[OrderItem(name='Pizza', unit_price=2, quantity=1),
+                                OrderItem(unit_price=2, quantity=1)]),
+         'Exception in item no: 1 Message: OrderItem must have a name of type string'),
+        (get_order(order_items=[set_private(OrderItem(name='Pizza', quantity=1), 'unit_price', -2)]),
+         'Exception in item no: 0 Message: OrderItem must have a valid price'),
+    ])
+    def test_validate(self, order, message):
+        """Reports the same rule violations as the object validators ::"""
+        batch = OrderBatch([get_order('ok'), order])
+        assert RowError(1, message) in batch.validate()
+        assert batch.get_invalid_rows().tolist() == [1]
+
+    def test_reports_every_row(self):
+        """Reports every invalid row instead of stopping at the first ::"""
+        orders = [get_order(str(i)) if i % 3 else get_order(str(i), address=None) for i in range(30)]
+        orders[4].customer._name = None
+        errors = OrderBatch(orders).validate()
+        assert [error.row for error in errors] == sorted(error.row for error in errors)
+        assert {error.row for error in errors} == {i for i in range(30) if i % 3 == 0} | {4}
+
+    def test_agrees_with_verify(self):
+        """Rows rejected by Order.verify are reported as invalid ::"""
+        orders = [get_order('1'), get_order(address=None), set_private(get_order(), 'order_number', 2),
+                  get_order(order_items=[OrderItem(name='x', unit_price='1', quantity=1)]),
+                  get_order(expected_delivery_time=datetime(2022, 1, 1))]
+        invalid = set(OrderBatch(orders).get_invalid_rows().tolist())
+        for row, order in enumerate(orders):
+            try:
+                order.verify()
+                assert row not in invalid
+            except ShipdayException:
+                assert row in invalid
+
+    def test_from_records(self):
+        """Builds a batch from wire dicts ::"""
+        records = OrderCodec().encode_many([get_order('1'), get_order('2')])
+        batch = OrderBatch.from_records(records)
+        assert batch.order_numbers.tolist() == ['1', '2']
+        assert batch.validate() == []
+
+    def test_from_records_agrees_with_orders(self):
+        """Builds the same columns from flat and api records as from the decoded orders ::"""
+        orders = [get_order('1'), get_order('2', address=None), get_order('3', order_items=[]),
+                  get_order('4', address=Address(latitude=95.0, longitude=10.0)),
+                  get_order('5', expected_delivery_time=datetime(2022, 1, 1))]
+        flat = OrderCodec().encode_many(orders)
+        api = [{'orderNumber': '6', 'customer': {'name': 'c', 'phone': '+1', 'address': 'Main St'},
+                'restaurant': {'name': 'r', 'address': 'Side St'}, 'dropoff': {'lat': 23.5, 'lng': 90.0},
+                'orderItem': [{'name': 'x', 'unitPrice': 2, 'quantity': 3}], 'costing': {'totalCost': 6.0}}]
+        for records in (flat, api):
+            batch = OrderBatch.from_records(records)
+            expected = OrderBatch(OrderCodec().decode_many(records))
+            assert batch.validate() == expected.validate()
+            assert batch.order_numbers.tolist() == expected.order_numbers.tolist()
+            assert batch.quantities.tolist() == expected.quantities.tolist()
+            assert batch.total.tolist() == expected.total.tolist()
+
+    def test_from_records_to_orders(self):
+        """Creates the orders of a record batch only when asked ::"""
+        orders = [get_order('1'), get_order('2', order_items=[])]
+        records = OrderCodec().encode_many(orders)
+        batch = OrderBatch.from_records(records)
+        assert all(isinstance(order, Order) for order in batch.to_orders())
+        assert OrderCodec().encode_many(batch.to_orders()) == records
+
+    def test_from_columns(self):
+        """Builds a batch from value columns, with defaults for the missing ones ::"""
+        batch = OrderBatch.from_columns(
+            {'order_number': ['1', '2'], 'customer.name': ['a', 'b'], 'customer.phone_number': ['+1', '+2'],
+             'customer.address.street': ['Main St', 'Elm St'], 'pickup.name': ['p', 'p'],
+             'pickup.address.street': ['Side St', 'Side St']},
+            {'item.name': ['x', 'y', 'z'], 'item.quantity': [1, 2, 3]}, [2, 1])
+        assert batch.item_rows.tolist() == [0, 0, 1]
+        assert batch.unit_prices.tolist() == [0.0, 0.0, 0.0]
+        assert batch.tips.tolist() == [0.0, 0.0]
+        assert batch.validate() == []
+        assert batch.to_orders()[1].order_items[0].name == 'z'
+
+    @pytest.mark.parametrize('columns, item_columns, item_counts', [
+        ({'order_number': ['1', '2'], 'customer.name': ['a']}, None, None),
+        ({'order_number': ['1']}, {'item.name': ['x']}, None),
+        ({'order_number': ['1']}, {'item.name': ['x']}, [2]),
+        ({'order_number': ['1'], 'customer.nickname': ['a']}, None, None),
+    ])
+    def test_from_columns_errors(self, columns, item_columns, item_counts):
+        """Throws exception for uneven or unknown columns ::"""
+        with pytest.raises(ShipdayException):
+            OrderBatch.from_columns(columns, item_columns, item_counts)
+
+    def test_get_column(self):
+        """Keeps the text columns interned ::"""
+        records = OrderCodec().encode_many([get_order('1'), get_order('2')])
+        batch = OrderBatch.from_records(json.loads(json.dumps(records)))
+        names = batch.get_column('pickup.name')
+        assert names.tolist() == ['pickup', 'pickup']
+        assert names[0] is names[1]
+        assert batch.get_column('customer.address').tolist() == [True, True]
+        with pytest.raises(ShipdayException):
+            batch.get_column('customer.nickname')
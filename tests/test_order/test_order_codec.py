@@ -0,0 +1,106 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from shipday.order import Order, Customer, Pickup, OrderItem, OrderCost, Address, OrderCodec
+
+customer_address = Address(street='Jefferson St', city='California', state='CA', country='USA',
+                           latitude=23.5, longitude=90.25)
+customer = Customer(name='customer', address=customer_address, email='customer@shipday.com',
+                    phone_number='+1343523423')
+pickup_address = Address(unit='4B', street='Hacker way', city='California', zip='94025')
+pickup = Pickup(name='pickup', address=pickup_address, phone_number='+134343534')
+item_1 = OrderItem(name='Pizza', unitPrice=2, quantity=7, add_ons='Extra cheese', detail='Signature Item')
+item_2 = OrderItem(name='Burger', unit_price=5.5, quantity=1)
+
+ORDERS = [
+    Order(orderNumber='1'),
+    Order(orderNumber='2', customer=customer, pickup=pickup, order_items=[item_1, item_2],
+          order_cost=OrderCost(tips=1.0, tax=2.0, discount=1.5, deliveryFee=5, total=20)),
+    Order(orderNumber='3', customer=customer, pickup=Pickup(name='pickup', restaurantAddress='Somewhere'),
+          order_items=[item_2], expected_delivery_time=datetime(2022, 5, 4, 13, 30),
+          expected_pickup_time=datetime(2022, 5, 4, 13, 0), deliveryInstruction='Ring twice',
+          pickupInstruction='Ask for Bob'),
+    Order(orderNumber='4', customerName='flat', customerAddress='Line 1', customerPhoneNumber='+1',
+          restaurantName='shop', orderItems=[{'name': 'Tea', 'unitPrice': 1, 'quantity': 2}], tips=2.0),
+]
+
+
+class TestOrderCodec:
+    """Order Codec"""
+
+    codec = OrderCodec(codec='json')
+
+    @pytest.mark.parametrize('order', ORDERS)
+    def test_encode(self, order: Order):
+        """Encodes the same wire dict as get_body ::"""
+        body = self.codec.encode(order)
+        assert body == order.get_body()
+        assert list(body) == list(order.get_body())
+
+    @pytest.mark.parametrize('order', ORDERS)
+    def test_round_trip(self, order: Order):
+        """Decodes the wire dict back to an equivalent order ::"""
+        decoded = self.codec.decode(self.codec.encode(order))
+        assert type(decoded) is Order
+        assert self.codec.encode(decoded) == self.codec.encode(order)
+        assert decoded.expected_delivery_time == order.expected_delivery_time
+
+    def test_decode_matches_constructor(self):
+        """Decodes flat dicts like the Order constructor ::"""
+        data = {'orderNumber': '9', 'customerName': 'c', 'customerEmail': 'c@shipday.com', 'restaurantName': 'r',
+                'orderItems': [{'name': 'Tea', 'unitPrice': 1, 'quantity': 2, 'addOns': 'Sugar'}],
+                'tips': 1.0, 'deliveryFee': 3.0, 'totalOrderCost': 10.0, 'deliveryInstruction': 'Door'}
+        assert self.codec.encode(self.codec.decode(data)) == Order(**data).get_body()
+
+    def test_decode_api_order(self):
+        """Decodes orders in the shape returned by the API ::"""
+        order = self.codec.decode({
+            'orderId': 7, 'orderNumber': '7',
+            'customer': {'name': 'John', 'address': 'Dhaka', 'emailAddress': 'john@shipday.com',
+                         'phoneNumber': '+1'},
+            'restaurant': {'name': 'Shop', 'address': 'Banani', 'phoneNumber': '+2'},
+            'orderItem': [{'name': 'Tea', 'unitPrice': 1.0, 'quantity': 2}],
+            'costing': {'totalCost': 12.0, 'tips': 1.0, 'deliveryFee': 3.0},
+        })
+        assert order.order_number == '7'
+        assert (order.customer.name, order.customer.email, order.customer.phone_number) == \
+               ('John', 'john@shipday.com', '+1')
+        assert order.pickup.name == 'Shop'
+        assert [item.name for item in order.order_items] == ['Tea']
+        assert (order.order_cost.total, order.order_cost.tips, order.order_cost.tax) == (12.0, 1.0, 0.0)
+        assert self.codec.encode(order)['customerAddress'] == 'Dhaka'
+
+    def test_api_order_round_trip(self):
+        """Keeps the address lines and coordinates of an API order ::"""
+        order = self.codec.decode({
+            'orderNumber': '8',
+            'customer': {'name': 'John', 'address': 'Dhaka', 'latitude': 23.8, 'longitude': 90.4},
+            'restaurant': {'name': 'Shop', 'address': 'Banani'},
+        })
+        body = self.codec.encode(order)
+        assert (body['customerAddress'], body['deliveryLatitude'], body['deliveryLongitude']) == ('Dhaka', 23.8, 90.4)
+        assert body['restaurantAddress'] == 'Banani' and order.pickup.address is None
+        assert body == order.get_body()
+
+    def test_pickup_address_line(self):
+        """Reads the pickup address line from the same slot as the customer one ::"""
+        order = self.codec.decode({'orderNumber': '9', 'restaurantAddress': 'Somewhere'})
+        assert order.pickup._address_line == order.pickup.get_body()['restaurantAddress'] == 'Somewhere'
+
+    def test_many(self):
+        """Encodes and decodes lists of orders ::"""
+        body = self.codec.dumps(ORDERS)
+        assert json.loads(body) == [order.get_body() for order in ORDERS]
+        decoded = self.codec.loads(body)
+        assert self.codec.encode_many(decoded) == json.loads(body)
+        assert self.codec.loads(self.codec.dumps(ORDERS[1])).order_number == '2'
+
+    def test_get_body_encodes_cost_once(self):
+        """get_body encodes the order cost a single time ::"""
+        order = ORDERS[1]
+        with mock.patch.object(OrderCost, 'get_body', autospec=True, side_effect=lambda cost: {}) as get_body:
+            order.get_body()
+        assert get_body.call_count == 1
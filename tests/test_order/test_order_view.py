@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.order import OrderView, OrderListView, OrderQuery
+from shipday.services import OrderService
+
+ORDERS = [
+    {
+        'orderId': 1,
+        'orderNumber': '100',
+        'customer': {'name': 'John', 'emailAddress': 'john@shipday.com', 'phoneNumber': '+1234567890',
+                     'address': 'Dhaka', 'latitude': 23.8, 'longitude': 90.4},
+        'restaurant': {'name': 'Popeyes', 'phoneNumber': '+1987654321', 'address': 'Banani'},
+        'orderItem': [{'name': 'Burger', 'unitPrice': 10.0, 'quantity': 2}],
+        'costing': {'totalCost': 25.0, 'tips': 2.0},
+        'orderStatus': {'orderState': 'ACTIVE'},
+        'deliveryInstruction': 'Ring twice',
+    },
+    {
+        'orderId': 2,
+        'orderNumber': '101',
+        'customer': {'name': 'Jane', 'email': 'jane@shipday.com'},
+        'orderItems': [],
+        'orderStatus': 'ALREADY_DELIVERED',
+    },
+]
+BODY = json.dumps(ORDERS).encode('utf-8')
+
+
+class RawClient:
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+
+    def get(self, suffix, raw=False):
+        self.calls.append(('GET', suffix, raw))
+        return self.body if raw else json.loads(self.body)
+
+    def post(self, suffix, data, raw=False, **kwargs):
+        self.calls.append(('POST', suffix, raw))
+        return self.body if raw else json.loads(self.body)
+
+
+class TestOrderView:
+    """Order View"""
+
+    def test_order_fields(self):
+        """Reads order fields from the response bytes ::"""
+        order = OrderListView(BODY)[0]
+        assert isinstance(order, OrderView)
+        assert order.order_id == 1
+        assert order.order_number == '100'
+        assert order.order_status == 'ACTIVE'
+        assert order.order_items == ORDERS[0]['orderItem']
+        assert order.order_cost == {'totalCost': 25.0, 'tips': 2.0}
+        assert order.delivery_instruction == 'Ring twice'
+        assert order.pickup_instruction is None
+
+    def test_nested_views(self):
+        """Reads customer and pickup details lazily ::"""
+        order = OrderListView(BODY)[0]
+        assert order.customer.name == 'John'
+        assert order.customer.email == 'john@shipday.com'
+        assert order.customer.phone_number == '+1234567890'
+        assert (order.customer.latitude, order.customer.longitude) == (23.8, 90.4)
+        assert order.pickup.name == 'Popeyes'
+        assert order.pickup.address == 'Banani'
+
+    def test_alternative_keys(self):
+        """Falls back to the alternative key spellings ::"""
+        order = OrderListView(BODY)[1]
+        assert order.customer.email == 'jane@shipday.com'
+        assert order.order_items == []
+        assert order.order_status == 'ALREADY_DELIVERED'
+        assert order.pickup is None
+
+    def test_list_view(self):
+        """Behaves like a read only list ::"""
+        orders = OrderListView(BODY)
+        assert len(orders) == 2
+        assert [order.order_id for order in orders] == [1, 2]
+        assert [order.order_id for order in orders[1:]] == [2]
+        assert orders[-1].order_number == '101'
+        assert orders.to_list() == ORDERS
+        assert len(OrderListView(b'[]')) == 0
+
+    @pytest.mark.parametrize('codec', ['json', None])
+    def test_codec(self, codec):
+        """Decodes the list with the given or the fastest installed codec ::"""
+        from shipday.httpclient.codec import get_codec
+        orders = OrderListView(BODY, get_codec(codec) if codec is not None else None)
+        assert [order.customer.name for order in orders] == ['John', 'Jane']
+
+    @pytest.mark.parametrize('body', [b'{"errorCode": 401, "errorMessage": "Unauthorized"}', b'[{"orderId": 1'])
+    def test_malformed(self, body):
+        """Throws exception for a body that is not a list of orders ::"""
+        with pytest.raises(ShipdayException):
+            len(OrderListView(body))
+
+    @pytest.mark.parametrize('call, method', [
+        (lambda service: service.get_orders(lazy=True), 'GET'),
+        (lambda service: service.get_order('100', lazy=True), 'GET'),
+        (lambda service: service.query(OrderQuery(), lazy=True), 'POST'),
+    ])
+    def test_service_lazy(self, call, method):
+        """Services return views over the raw response ::"""
+        client = RawClient(BODY)
+        orders = call(OrderService(httpclient=client))
+        assert isinstance(orders, OrderListView)
+        assert client.calls[0][0] == method and client.calls[0][2] is True
+        assert orders[0].order_id == 1
+
+    def test_service_default(self):
+        """Services decode the whole response by default ::"""
+        client = RawClient(BODY)
+        assert OrderService(httpclient=client).get_orders() == ORDERS
+        assert client.calls == [('GET', 'orders/', False)]
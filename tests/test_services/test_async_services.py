@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+
+from shipday import AsyncShipday
+from shipday.carrier import CarrierRequest
+from shipday.exceptions import ShipdayException
+from shipday.order import Order, OrderQuery
+from tests.test_services.test_order_service import get_order, PagingClient
+from shipday.services import AsyncOrderService, AsyncCarrierService, AsyncOnDemandDeliveryService
+
+
+class FakeAsyncClient:
+    def __init__(self, response=None):
+        self.response = response if response is not None else {}
+        self.calls = []
+
+    async def get(self, suffix):
+        self.calls.append(('GET', suffix, None))
+        return self.response
+
+    async def post(self, suffix, data, **kwargs):
+        self.calls.append(('POST', suffix, data))
+        return self.response
+
+    async def put(self, suffix, data, **kwargs):
+        self.calls.append(('PUT', suffix, data))
+        return self.response
+
+    async def delete(self, suffix, **kwargs):
+        self.calls.append(('DELETE', suffix, None))
+        return self.response
+
+
+class TestAsyncServices:
+    """Async Services"""
+
+    def test_async_shipday_services(self):
+        """AsyncShipday creates async services sharing one client ::"""
+        shipday = AsyncShipday(api_key='1234567890')
+        services = [shipday.OrderService, shipday.CarrierService, shipday.OnDemandDeliveryService]
+        assert [type(service) for service in services] == [AsyncOrderService, AsyncCarrierService,
+                                                          AsyncOnDemandDeliveryService]
+        assert all(service.httpclient is shipday.httpclient for service in services)
+
+    @pytest.mark.parametrize('call, expected', [
+        (lambda s: s.get_orders(), ('GET', 'orders/', None)),
+        (lambda s: s.get_order('100'), ('GET', 'orders/100', None)),
+        (lambda s: s.delete_order(12), ('DELETE', 'orders/12', None)),
+        (lambda s: s.assign_order(12, 3), ('PUT', 'orders/assign/12/3', {})),
+        (lambda s: s.query(OrderQuery(start_cursor=1)), ('POST', 'orders/query/', {'startCursor': 1})),
+    ])
+    def test_order_service_requests(self, call, expected):
+        """Sends the same requests as OrderService ::"""
+        client = FakeAsyncClient()
+        asyncio.run(call(AsyncOrderService(httpclient=client)))
+        assert client.calls == [expected]
+
+    @pytest.mark.parametrize('call', [
+        lambda s: s.get_order(None),
+        lambda s: s.delete_order('12'),
+        lambda s: s.assign_order(12, '3'),
+        lambda s: s.query({}),
+        lambda s: s.insert_order(Order()),
+    ])
+    def test_order_service_validation(self, call):
+        """Throws exception before sending invalid requests ::"""
+        client = FakeAsyncClient()
+        with pytest.raises(ShipdayException):
+            asyncio.run(call(AsyncOrderService(httpclient=client)))
+        assert client.calls == []
+
+    def test_error_response(self):
+        """Throws exception if the response has an error code ::"""
+        client = FakeAsyncClient({'errorCode': 1, 'errorMessage': 'Invalid'})
+        request = CarrierRequest(name='My Carrier', email='ca@shipday.com', phone_number='+139024523')
+        with pytest.raises(ShipdayException):
+            asyncio.run(AsyncCarrierService(httpclient=client).add_carrier(request))
+
+    @pytest.mark.parametrize('service_name, available', [('Uber', True), ('DoorDash', False)])
+    def test_assign(self, service_name, available):
+        """Assigns only to active services ::"""
+        client = FakeAsyncClient([{'name': 'Uber', 'Uber': True}, {'name': 'DoorDash', 'DoorDash': False}])
+        service = AsyncOnDemandDeliveryService(httpclient=client)
+        if available:
+            asyncio.run(service.assign(order_id=1, service_name=service_name))
+            assert client.calls[-1][:2] == ('POST', 'on-demand/assign')
+        else:
+            with pytest.raises(ShipdayException):
+                asyncio.run(service.assign(order_id=1, service_name=service_name))
+
+    def test_insert_orders(self):
+        """Inserts every order and reports per order results ::"""
+        client = FakeAsyncClient({'success': True})
+        orders = [get_order('1'), Order(), get_order('3')]
+
+        async def run():
+            return [result async for result in AsyncOrderService(httpclient=client).insert_orders(orders, 2)]
+
+        results = {result.index: result for result in asyncio.run(run())}
+        assert [results[i].ok for i in range(3)] == [True, False, True]
+        assert [call[2]['orderNumber'] for call in client.calls] == ['1', '3']
+
+    def test_iter_query(self):
+        """Walks the cursors page by page ::"""
+        class AsyncPagingClient(PagingClient):
+            async def post(self, suffix, data, **kwargs):
+                return PagingClient.post(self, suffix, data)
+
+        client = AsyncPagingClient(25)
+
+        async def run():
+            service = AsyncOrderService(httpclient=client)
+            return [order['orderId'] async for order in service.iter_query(OrderQuery(), page_size=10)]
+
+        assert asyncio.run(run()) == list(range(1, 26))
+        assert client.pages == [(1, 10), (11, 20), (21, 30)]
+
+    def test_iter_query_error(self):
+        """Raises the API error instead of reading the error body as a page ::"""
+        class ErrorClient:
+            async def post(self, suffix, data, **kwargs):
+                return {'errorCode': 401, 'errorMessage': 'Unauthorized'}
+
+        async def run():
+            return [order async for order in AsyncOrderService(httpclient=ErrorClient()).iter_query(OrderQuery(),
+                                                                                                      page_size=1)]
+
+        with pytest.raises(ShipdayException, match='Unauthorized'):
+            asyncio.run(run())
+
+    def test_assign_uses_cached_catalog(self):
+        """Downloads the service catalog once for many assigns ::"""
+        client = FakeAsyncClient([{'name': 'Uber', 'Uber': True}])
+        service = AsyncOnDemandDeliveryService(httpclient=client)
+
+        async def run():
+            for order_id in range(5):
+                await service.assign(order_id=order_id, service_name='Uber')
+
+        asyncio.run(run())
+        assert [call[1] for call in client.calls].count('on-demand/services') == 1
+
+    def test_catalog_error_not_cached(self):
+        """Raises an error body of the catalog and does not cache it ::"""
+        client = FakeAsyncClient({'errorCode': 500, 'errorMessage': 'Server error'})
+        service = AsyncOnDemandDeliveryService(httpclient=client)
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(ShipdayException, match='Server error'):
+                    await service.get_active_services()
+
+        asyncio.run(run())
+        assert [call[1] for call in client.calls].count('on-demand/services') == 2
+
+    def test_iter_orders(self):
+        """Streams the order list ::"""
+        class AsyncStreamClient:
+            async def iter_get(self, suffix, chunk_size=65536):
+                body = b'[{"orderId": 1, "orderNumber": "1"}, {"orderId": 2, "orderNumber": "2"}]'
+                for start in range(0, len(body), chunk_size):
+                    yield body[start:start + chunk_size]
+
+        async def run():
+            orders = AsyncOrderService(httpclient=AsyncStreamClient()).iter_orders(fields=['orderId'], chunk_size=7)
+            carriers = AsyncCarrierService(httpclient=AsyncStreamClient()).iter_carriers(chunk_size=3)
+            return [order async for order in orders], [carrier async for carrier in carriers]
+
+        orders, carriers = asyncio.run(run())
+        assert orders == [{'orderId': 1}, {'orderId': 2}]
+        assert [carrier['orderNumber'] for carrier in carriers] == ['1', '2']
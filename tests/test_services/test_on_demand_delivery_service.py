@@ -0,0 +1,64 @@
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.services import OnDemandDeliveryService
+
+
+class CatalogClient:
+    def __init__(self, *catalogs):
+        self.catalogs = list(catalogs)
+        self.calls = []
+
+    def get(self, suffix):
+        self.calls.append(suffix)
+        return self.catalogs.pop(0) if len(self.catalogs) > 1 else self.catalogs[0]
+
+    def post(self, suffix, data, **kwargs):
+        self.calls.append(suffix)
+        return {'success': True}
+
+
+class TestOnDemandDeliveryService:
+    """On Demand Delivery Service"""
+
+    def test_assign_uses_cached_catalog(self):
+        """Downloads the service catalog once for many assigns ::"""
+        client = CatalogClient([{'name': 'Uber', 'Uber': True}])
+        service = OnDemandDeliveryService(httpclient=client)
+        for order_id in range(5):
+            service.assign(order_id=order_id, service_name='Uber')
+        assert client.calls.count('on-demand/services') == 1
+        assert client.calls.count('on-demand/assign') == 5
+
+    @pytest.mark.parametrize('services_ttl, requests', [(0, 3), (60, 1)])
+    def test_services_ttl(self, services_ttl, requests):
+        """Caches the catalog unless services_ttl is zero ::"""
+        client = CatalogClient([{'name': 'Uber', 'Uber': True}])
+        service = OnDemandDeliveryService(httpclient=client, services_ttl=services_ttl)
+        for _ in range(3):
+            assert service.get_active_services() == ['Uber']
+        assert client.calls.count('on-demand/services') == requests
+
+    def test_assign_refreshes_outdated_catalog(self):
+        """Checks a fresh catalog before rejecting a service ::"""
+        client = CatalogClient([{'name': 'Uber', 'Uber': False}], [{'name': 'Uber', 'Uber': True}])
+        service = OnDemandDeliveryService(httpclient=client)
+        assert service.get_active_services() == []
+        service.assign(order_id=1, service_name='Uber')
+        assert client.calls == ['on-demand/services', 'on-demand/services', 'on-demand/assign']
+
+    def test_assign_unavailable_service(self):
+        """Throws exception if the service is not active ::"""
+        client = CatalogClient([{'name': 'Uber', 'Uber': False}])
+        with pytest.raises(ShipdayException):
+            OnDemandDeliveryService(httpclient=client).assign(order_id=1, service_name='Uber')
+        assert 'on-demand/assign' not in client.calls
+
+    def test_error_not_cached(self):
+        """Raises an error body of the catalog and does not cache it ::"""
+        client = CatalogClient({'errorCode': 500, 'errorMessage': 'Server error'}, [{'name': 'Uber', 'Uber': True}])
+        service = OnDemandDeliveryService(httpclient=client)
+        with pytest.raises(ShipdayException, match='Server error'):
+            service.get_active_services()
+        assert service.get_active_services() == ['Uber']
+        assert client.calls.count('on-demand/services') == 2
@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.order import Order, Customer, Pickup, OrderItem, Address, OrderQuery
+from shipday.services import OrderService, CarrierService
+
+
+def get_order(order_number) -> Order:
+    address = Address(street='Jefferson St', city='California', state='CA', country='USA')
+    return Order(orderNumber=order_number,
+                 customer=Customer(name='customer', address=address, phone_number='+1343523423'),
+                 pickup=Pickup(name='pickup', address=address),
+                 order_items=[OrderItem(name='Pizza', unit_price=2, quantity=7)])
+
+
+class FakeClient:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.bodies = []
+
+    def post(self, suffix, data, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.bodies.append(data)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        if data['orderNumber'] == 'rejected':
+            return {'errorCode': 1, 'errorMessage': 'Rejected'}
+        if data['orderNumber'] == 'broken':
+            raise ConnectionError('Connection reset')
+        return {'orderId': int(data['orderNumber'])}
+
+
+class PagingClient:
+    def __init__(self, total):
+        self.total = total
+        self.pages = []
+
+    def post(self, suffix, data, **kwargs):
+        self.pages.append((data['startCursor'], data['endCursor']))
+        return [{'orderId': i} for i in range(data['startCursor'], min(data['endCursor'], self.total) + 1)]
+
+
+class StreamClient:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.consumed = 0
+        self.calls = []
+
+    def iter_get(self, suffix, chunk_size=65536):
+        self.calls.append((suffix, chunk_size))
+        for start in range(0, len(self.body), chunk_size):
+            self.consumed = start + chunk_size
+            yield self.body[start:start + chunk_size]
+
+
+class TestOrderService:
+    """Order Service"""
+
+    def test_insert_orders(self):
+        """Inserts every order and reports per order results ::"""
+        client = FakeClient()
+        orders = [get_order(str(i)) for i in range(20)]
+        results = list(OrderService(httpclient=client).insert_orders(orders, max_in_flight=4))
+        assert sorted(result.index for result in results) == list(range(20))
+        assert all(result.ok for result in results)
+        assert all(result.response == {'orderId': result.index} for result in results)
+
+    def test_insert_orders_failures(self):
+        """Reports invalid orders, error responses and exceptions without aborting ::"""
+        client = FakeClient()
+        orders = [get_order('1'), Order(), get_order('rejected'), get_order('broken'), get_order('5')]
+        results = {result.index: result for result in OrderService(httpclient=client).insert_orders(orders)}
+        assert [results[i].ok for i in range(5)] == [True, False, False, False, True]
+        assert type(results[1].exception) is ShipdayException
+        assert str(results[2].exception) == 'Rejected'
+        assert type(results[3].exception) is ConnectionError
+        assert results[3].order is orders[3]
+        assert len(client.bodies) == 4
+
+    @pytest.mark.parametrize('max_in_flight', [1, 3])
+    def test_insert_orders_max_in_flight(self, max_in_flight):
+        """Never sends more than max_in_flight orders at once ::"""
+        client = FakeClient(delay=0.01)
+        orders = [get_order(str(i)) for i in range(12)]
+        assert len(list(OrderService(httpclient=client).insert_orders(orders, max_in_flight=max_in_flight))) == 12
+        assert client.peak == max_in_flight
+
+    @pytest.mark.parametrize('max_in_flight', [0, -1, 1.5, None])
+    def test_insert_orders_invalid_max_in_flight(self, max_in_flight):
+        """Throws exception if max_in_flight is not a positive integer ::"""
+        with pytest.raises(ShipdayException):
+            list(OrderService(httpclient=FakeClient()).insert_orders([], max_in_flight=max_in_flight))
+
+    @pytest.mark.parametrize('total, page_size, pages', [
+        (0, 10, [(1, 10)]),
+        (25, 10, [(1, 10), (11, 20), (21, 30)]),
+        (20, 10, [(1, 10), (11, 20), (21, 30)]),
+        (5, 1, [(i, i) for i in range(1, 7)]),
+    ])
+    def test_iter_query(self, total, page_size, pages):
+        """Walks the cursors page by page ::"""
+        client = PagingClient(total)
+        orders = OrderService(httpclient=client).iter_query(OrderQuery(), page_size=page_size)
+        assert [order['orderId'] for order in orders] == list(range(1, total + 1))
+        assert client.pages == pages
+
+    def test_iter_query_cursors(self):
+        """Starts at start_cursor and stops at end_cursor ::"""
+        client = PagingClient(100)
+        orders = OrderService(httpclient=client).iter_query(OrderQuery(start_cursor=5, end_cursor=27), page_size=10)
+        assert [order['orderId'] for order in orders] == list(range(5, 28))
+        assert client.pages == [(5, 14), (15, 24), (25, 27)]
+
+    def test_iter_query_prefetch(self):
+        """Fetches the next page while the current one is consumed ::"""
+        client = PagingClient(100)
+        orders = OrderService(httpclient=client).iter_query(OrderQuery(), page_size=10)
+        assert next(orders) == {'orderId': 1}
+        for _ in range(100):
+            if len(client.pages) == 2:
+                break
+            time.sleep(0.01)
+        assert client.pages == [(1, 10), (11, 20)]
+        orders.close()
+
+    @pytest.mark.parametrize('page_size', [1, 2, 100])
+    def test_iter_query_error(self, page_size):
+        """Raises the API error instead of reading the error body as a page ::"""
+        class ErrorClient:
+            def __init__(self):
+                self.calls = 0
+
+            def post(self, suffix, data, **kwargs):
+                self.calls += 1
+                return {'errorCode': 401, 'errorMessage': 'Unauthorized'}
+
+        client = ErrorClient()
+        with pytest.raises(ShipdayException, match='Unauthorized'):
+            list(OrderService(httpclient=client).iter_query(OrderQuery(), page_size=page_size))
+        assert client.calls == 1
+
+    @pytest.mark.parametrize('page_size', [0, -1, 1.5, None])
+    def test_iter_query_invalid_page_size(self, page_size):
+        """Throws exception if page size is not a positive integer ::"""
+        with pytest.raises(ShipdayException):
+            next(OrderService(httpclient=PagingClient(1)).iter_query(OrderQuery(), page_size=page_size))
+
+    def test_iter_orders(self):
+        """Yields orders while the response is still streaming ::"""
+        body = json.dumps([{'orderId': i, 'orderNumber': str(i), 'customer': {'name': 'c'}} for i in range(50)])
+        client = StreamClient(body.encode('utf-8'))
+        orders = OrderService(httpclient=client).iter_orders(fields=['orderId', 'customer'], chunk_size=64)
+        assert next(orders) == {'orderId': 0, 'customer': {'name': 'c'}}
+        assert client.consumed < len(client.body)
+        assert [order['orderId'] for order in orders] == list(range(1, 50))
+        assert client.calls == [('orders/', 64)]
+
+    def test_iter_carriers(self):
+        """Streams the carrier list ::"""
+        client = StreamClient(b'[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]')
+        assert list(CarrierService(httpclient=client).iter_carriers(fields=('name',), chunk_size=5)) == \
+               [{'name': 'a'}, {'name': 'b'}]
@@ -0,0 +1,271 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from shipday.bo import StatusChange
+from shipday.exceptions import ShipdayException
+from shipday.order import Address, Customer, Order, OrderCost, OrderItem, OrderStatus, Pickup
+from shipday.services import OnDemandDeliveryService, OrderService
+from shipday.services.order_watcher import STATUS_INTERVALS
+from shipday.testing import StandInServer
+
+API_KEY = '##########.#######################'
+# Polls every order that is not in a final status on each poll
+NO_WAIT = {status: 0 for status, interval in STATUS_INTERVALS.items() if interval is not None}
+
+
+def make_order(number: int) -> Order:
+    address = Address(street='Hacker way', city='California', zip='94025')
+    return Order(order_number=str(number),
+                 customer=Customer(name='customer', address=address, email='customer@shipday.com',
+                                   phone_number='+1343523423'),
+                 pickup=Pickup(name='pickup', address=address, phone_number='+134343534'),
+                 order_items=[OrderItem(name='Item', unit_price=2.5, quantity=2)],
+                 order_cost=OrderCost(total=5.0))
+
+
+def insert_orders(service: OrderService, count: int) -> list:
+    return sorted(result.response['orderId'] for result in service.insert_orders(make_order(n) for n in range(count)))
+
+
+def set_status(server: StandInServer, order_id: int, status: str):
+    server.state.orders[order_id]['orderStatus'] = {'orderState': status}
+
+
+def count_queries(server: StandInServer) -> int:
+    return sum(1 for method, path in server.requests if 'orders/query' in path)
+
+
+class TestOrderWatcher:
+    """Order Watcher"""
+
+    def test_emits_changes(self):
+        """Emits the first snapshot and then only status changes ::"""
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            order_ids = insert_orders(service, 3)
+            changes = []
+            watcher = service.watch(order_ids, on_change=changes.append, intervals=NO_WAIT)
+            assert [change.previous_status for change in watcher.poll()] == [None] * 3
+            assert watcher.poll() == []
+            server.state.orders[order_ids[0]]['costing']['tips'] = 2.0
+            assert watcher.poll() == []
+            set_status(server, order_ids[1], OrderStatus.STARTED)
+            change, = watcher.poll()
+        assert type(change) is StatusChange
+        assert (change.order_id, change.previous_status, change.status) == (order_ids[1], 'ACTIVE', 'STARTED')
+        assert change.snapshot['orderId'] == order_ids[1]
+        assert len(changes) == 4
+        assert watcher.get_stats()['changes'] == 4
+
+    def test_batches_reads(self):
+        """Reads many orders with a few paged queries instead of one request each ::"""
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            order_ids = insert_orders(service, 60)
+            watcher = service.watch(order_ids, intervals=NO_WAIT, page_size=50)
+            before = len(server.requests)
+            assert len(watcher.poll()) == 60
+            assert len(watcher.poll()) == 0
+            # Two pages a poll, the second poll queries the window of the placement times found by the first
+            assert len(server.requests) - before == count_queries(server) == 4
+        assert watcher.get_stats()['fetches'] == 2
+
+    def test_windows(self):
+        """Groups due orders into query windows by placement time ::"""
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            order_ids = insert_orders(service, 4)
+            now = datetime.now(timezone.utc)
+            for order_id, hours in zip(order_ids, (30, 29.5, 5, 1)):
+                server.state.orders[order_id]['activityLog']['placementTime'] = \
+                    (now - timedelta(hours=hours)).isoformat()
+            watcher = service.watch(order_ids, intervals=NO_WAIT, window=3600, lookback=36 * 3600)
+            assert len(watcher.poll()) == 4
+            before = count_queries(server)
+            set_status(server, order_ids[0], OrderStatus.PICKED_UP)
+            assert [change.order_id for change in watcher.poll()] == [order_ids[0]]
+            assert count_queries(server) - before == 3
+
+    def test_intervals(self):
+        """Polls each order again after the interval of its status ::"""
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            first, second = insert_orders(service, 2)
+            set_status(server, second, OrderStatus.STARTED)
+            # Out of the query window of the first order, which would read it as well
+            server.state.orders[second]['activityLog']['placementTime'] = \
+                (datetime.now(timezone.utc) - timedelta(hours=10)).isoformat()
+            watcher = service.watch([first, second], intervals={OrderStatus.ACTIVE: 0, OrderStatus.STARTED: 60})
+            assert len(watcher.poll()) == 2
+            set_status(server, first, OrderStatus.NOT_ASSIGNED)
+            set_status(server, second, OrderStatus.PICKED_UP)
+            assert [change.order_id for change in watcher.poll()] == [first]
+        assert watcher._watchlist.get_next_due() > 0
+
+    def test_final_status(self):
+        """Stops watching an order once it reaches a final status ::"""
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            order_id, = insert_orders(service, 1)
+            set_status(server, order_id, OrderStatus.ALREADY_DELIVERED)
+            watcher = service.watch([order_id])
+            change, = watcher.poll()
+            assert change.status == OrderStatus.ALREADY_DELIVERED
+            assert order_id not in watcher and len(watcher) == 0
+            watcher.run()
+        assert watcher.get_stats()['polls'] == 1
+
+    def test_missing_orders(self):
+        """Reports and drops orders the lookback query does not find ::"""
+        errors = []
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            order_id, = insert_orders(service, 1)
+            watcher = service.watch([order_id, 99], intervals=NO_WAIT, default_interval=0,
+                                    on_error=lambda order_ids, error: errors.append((order_ids, error)))
+            change, = watcher.poll()
+            assert change.order_id == order_id and change.status == 'ACTIVE'
+            assert 99 not in watcher and order_id in watcher
+            before = count_queries(server)
+            assert watcher.poll() == []
+            # The found order is read through its own window, not the whole lookback again
+            assert count_queries(server) - before == 1
+            with pytest.raises(ShipdayException):
+                service.watch([99]).poll()
+        (order_ids, error), = errors
+        assert order_ids == [99] and type(error) is ShipdayException
+
+    def test_api_error(self):
+        """Passes the API error of a query to on_error ::"""
+        class ErrorClient:
+            def post(self, suffix, data, **kwargs):
+                return {'errorCode': 401, 'errorMessage': 'Unauthorized'}
+
+        errors = []
+        watcher = OrderService(httpclient=ErrorClient()).watch(
+            [1], on_error=lambda order_ids, error: errors.append((order_ids, error)))
+        assert watcher.poll() == []
+        (order_ids, error), = errors
+        assert order_ids == [1] and type(error) is ShipdayException and str(error) == 'Unauthorized'
+
+    def test_errors(self):
+        """Passes failed reads and failing callbacks to on_error ::"""
+        def on_change(change):
+            raise ValueError('handler failed')
+
+        errors = []
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            order_id, = insert_orders(service, 1)
+            watcher = service.watch([order_id], on_change=on_change, default_interval=0,
+                                    on_error=lambda order_ids, error: errors.append((order_ids, error)))
+            assert len(watcher.poll()) == 1
+            assert [(order_ids, type(error)) for order_ids, error in errors] == [([order_id], ValueError)]
+            with pytest.raises(ValueError):
+                service.watch([order_id], on_change=on_change).poll()
+        assert watcher.get_stats()['errors'] == 1
+
+    def test_background(self):
+        """Polls in a background thread until stopped ::"""
+        changed = threading.Event()
+        with StandInServer() as server:
+            service = OrderService(api_key=API_KEY, base_url=server.url)
+            order_id, = insert_orders(service, 1)
+
+            def on_change(change):
+                if change.status == OrderStatus.PICKED_UP:
+                    changed.set()
+
+            with service.watch([], on_change=on_change, intervals={OrderStatus.ACTIVE: 0.01},
+                               default_interval=0.01) as watcher:
+                watcher.add([order_id])
+                set_status(server, order_id, OrderStatus.PICKED_UP)
+                assert changed.wait(5)
+        assert watcher._thread is None
+
+    def test_watcher_is_abstract(self):
+        """The shared watcher base can not be created without a way to read orders ::"""
+        from shipday.services.order_watcher import _Watcher
+        with pytest.raises(TypeError):
+            _Watcher([], None, None, {}, 0, None)
+
+    @pytest.mark.parametrize('kwargs', [{'intervals': []}, {'intervals': {'ACTIVE': -1}},
+                                        {'default_interval': '30'}, {'fields': 'orderStatus'},
+                                        {'window': -1}, {'page_size': 0}])
+    def test_invalid_options(self, kwargs):
+        """Raises for invalid options ::"""
+        with pytest.raises(ShipdayException):
+            OrderService(api_key=API_KEY).watch([1], **kwargs)
+        with pytest.raises(ShipdayException):
+            OrderService(api_key=API_KEY).watch(['1'])
+
+
+class TestOnDemandWatcher:
+    """On Demand Watcher"""
+
+    def test_emits_changes(self):
+        """Reads due deliveries with get_details and emits their changes ::"""
+        errors = []
+        with StandInServer() as server:
+            server.state.deliveries[7] = {'orderId': 7, 'name': 'Uber', 'status': 'ASSIGNED'}
+            service = OnDemandDeliveryService(api_key=API_KEY, base_url=server.url)
+            watcher = service.watch([7, 8], default_interval=0,
+                                    on_error=lambda order_ids, error: errors.extend(order_ids))
+            change, = watcher.poll()
+            assert (change.order_id, change.status) == (7, 'ASSIGNED')
+            server.state.deliveries[7]['fee'] = 5.0
+            assert watcher.poll() == []
+            server.state.deliveries[7]['status'] = 'DELIVERED'
+            change, = watcher.poll()
+        assert (change.previous_status, change.status) == ('ASSIGNED', 'DELIVERED')
+        assert 7 not in watcher and 8 in watcher
+        assert errors == [8, 8, 8]
+
+
+class TestAsyncWatchers:
+    """Async Watchers"""
+
+    def test_order_watcher(self):
+        """Polls orders through query windows in a task ::"""
+        pytest.importorskip('aiohttp')
+        from shipday.services import AsyncOrderService
+
+        async def run(server, order_ids):
+            service = AsyncOrderService(api_key=API_KEY, base_url=server.url)
+            changed = asyncio.Event()
+            watcher = service.watch(order_ids, on_change=lambda change: changed.set(),
+                                    intervals={OrderStatus.ACTIVE: 0.01})
+            first = await watcher.poll()
+            changed.clear()
+            set_status(server, order_ids[0], OrderStatus.ALREADY_DELIVERED)
+            async with watcher:
+                await asyncio.wait_for(changed.wait(), 5)
+            await service.httpclient.close()
+            return first, len(watcher)
+
+        with StandInServer() as server:
+            order_ids = insert_orders(OrderService(api_key=API_KEY, base_url=server.url), 2)
+            first, watching = asyncio.run(run(server, order_ids))
+        assert sorted(change.order_id for change in first) == order_ids
+        assert watching == 1
+
+    def test_on_demand_watcher(self):
+        """Runs until every delivery reached a final status ::"""
+        pytest.importorskip('aiohttp')
+        from shipday.services import AsyncOnDemandDeliveryService
+
+        async def run(server):
+            changes = []
+            service = AsyncOnDemandDeliveryService(api_key=API_KEY, base_url=server.url)
+            await service.watch([1, 2], on_change=changes.append, default_interval=0).run(timeout=5)
+            await service.httpclient.close()
+            return changes
+
+        with StandInServer() as server:
+            for order_id in (1, 2):
+                server.state.deliveries[order_id] = {'orderId': order_id, 'status': 'CANCELLED'}
+            changes = asyncio.run(run(server))
+        assert sorted(change.order_id for change in changes) == [1, 2]
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from shipday import Shipday
+from shipday.exceptions import ShipdayException
+from shipday.services import OrderService, CarrierService, OnDemandDeliveryService
+
+
+class TestShipday:
+    """Shipday Object"""
+
+    @pytest.mark.parametrize('api_key', [None, '', '123'])
+    def test_invalid_api_key(self, api_key):
+        """Throws exception if api key is invalid ::"""
+        with pytest.raises(ShipdayException):
+            Shipday(api_key=api_key)
+
+    def test_services_created_lazily(self):
+        """Creates services on first access ::"""
+        shipday = Shipday(api_key='1234567890')
+        assert shipday._Shipday__services == {}
+        assert type(shipday.OrderService) is OrderService
+        assert shipday.OrderService is shipday.OrderService
+        assert list(shipday._Shipday__services) == [OrderService]
+
+    def test_services_share_client(self):
+        """All services share one http client ::"""
+        shipday = Shipday(api_key='1234567890')
+        services = [shipday.OrderService, shipday.CarrierService, shipday.OnDemandDeliveryService]
+        assert [type(service) for service in services] == [OrderService, CarrierService, OnDemandDeliveryService]
+        assert all(service.httpclient is shipday.httpclient for service in services)
+
+    def test_import_is_lazy(self):
+        """Importing the client loads no services, models or transport ::"""
+        code = ('import sys, time; started = time.perf_counter(); from shipday import Shipday; '
+                'print(time.perf_counter() - started); '
+                'print(",".join(m for m in ("requests", "asyncio", "aiohttp", "shipday.services", "shipday.order") '
+                'if m in sys.modules))')
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        elapsed, loaded = output.splitlines()
+        assert loaded == ''
+        assert float(elapsed) < 0.5
+
+    @pytest.mark.parametrize('service', ['OrderService', 'OnDemandDeliveryService'])
+    def test_first_service_is_sync_only(self, service):
+        """The first service access does not load the async services or transport ::"""
+        code = ("import sys; from shipday import Shipday; Shipday(api_key='1234567890').{}; "
+                'print(",".join(m for m in ("asyncio", "aiohttp", "shipday.services.async_order_service", '
+                '"shipday.services.async_on_demand_delivery_service") if m in sys.modules))').format(service)
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        assert output.strip() == ''
+
+    def test_unknown_attribute(self):
+        """Raises AttributeError for names the package does not export ::"""
+        import shipday
+        with pytest.raises(AttributeError):
+            shipday.Missing
+        assert {'Shipday', 'AsyncShipday'} <= set(dir(shipday))
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from shipday import Shipday, ShipdayPool
+from shipday.exceptions import ShipdayException
+from shipday.httpclient.rate_limiter import RateLimiter
+from shipday.httpclient.response_cache import ResponseCache
+from shipday.order import Address, Customer, Order, OrderCost, OrderItem, Pickup
+from shipday.testing import Faults, StandInServer
+
+BULK_KEY, DISPATCH_KEY = 'bulk-12345678', 'dispatch-1234'
+
+
+def make_order(number: int) -> Order:
+    address = Address(street='Hacker way', city='California', zip='94025')
+    return Order(order_number=str(number),
+                 customer=Customer(name='customer', address=address, email='customer@shipday.com',
+                                   phone_number='+1343523423'),
+                 pickup=Pickup(name='pickup', address=address, phone_number='+134343534'),
+                 order_items=[OrderItem(name='Item', unit_price=2.5, quantity=2)],
+                 order_cost=OrderCost(total=5.0))
+
+
+class TestShipdayPool:
+    """Shipday Pool"""
+
+    def test_tenants(self):
+        """Keeps one Shipday per api key with its own client ::"""
+        with ShipdayPool() as pool:
+            first, second = pool.get(BULK_KEY), pool.get(DISPATCH_KEY)
+            assert type(first) is Shipday
+            assert pool.get(BULK_KEY) is first
+            assert first.httpclient is not second.httpclient
+            assert BULK_KEY in pool and len(pool) == 2
+            pool.remove(BULK_KEY)
+            assert BULK_KEY not in pool and len(pool) == 1
+            with pytest.raises(ShipdayException):
+                pool.get('123')
+
+    def test_per_key_state(self):
+        """Builds a rate limiter and a response cache per api key ::"""
+        with ShipdayPool(rate_limiter=lambda: RateLimiter(5), response_cache=ResponseCache) as pool:
+            first, second = pool.get(BULK_KEY).httpclient, pool.get(DISPATCH_KEY).httpclient
+            assert type(first._rate_limiter) is RateLimiter
+            assert first._rate_limiter is not second._rate_limiter
+            assert first._response_cache is not second._response_cache
+        with pytest.raises(ShipdayException):
+            ShipdayPool(rate_limiter=RateLimiter(5))
+
+    def test_weights(self):
+        """Applies the weights given up front and later ::"""
+        with ShipdayPool(weights={BULK_KEY: 0.5}) as pool:
+            pool.get(BULK_KEY)
+            assert pool.scheduler.get_weight(BULK_KEY) == 0.5
+            pool.set_weight(DISPATCH_KEY, 4)
+            assert pool.get(DISPATCH_KEY).httpclient._scheduler.weight == 4
+
+    def test_fair_scheduling(self):
+        """A bulk import of one tenant does not hold back the requests of another ::"""
+        with StandInServer(faults=Faults(latency=0.01)) as server:
+            with ShipdayPool(max_in_flight=2, base_url=server.url) as pool:
+                bulk = threading.Thread(target=lambda: list(pool.get(BULK_KEY).OrderService.insert_orders(
+                    [make_order(number) for number in range(30)], max_in_flight=10)))
+                bulk.start()
+                while pool.scheduler.get_stats()['waiting'] < 8:
+                    time.sleep(0.001)
+                sent = len(server.requests)
+                pool.get(DISPATCH_KEY).OrderService.get_orders()
+                bulk.join()
+            methods = [method for method, path in server.requests]
+        assert methods.count('POST') == 30
+        # Only the two requests in flight and the one queued bulk request with the same tag go first
+        assert methods.index('GET') <= sent + 3
+
+    def test_async(self):
+        """Async tenants share the pool scheduler ::"""
+        pytest.importorskip('aiohttp')
+        from shipday import AsyncShipday, AsyncShipdayPool
+
+        async def run(url):
+            async with AsyncShipdayPool(max_in_flight=1, base_url=url) as pool:
+                tenant = pool.get(BULK_KEY)
+                assert type(tenant) is AsyncShipday and pool.get(BULK_KEY) is tenant
+                results = await asyncio.gather(pool.get(BULK_KEY).CarrierService.get_carriers(),
+                                               pool.get(DISPATCH_KEY).OrderService.get_orders())
+                return results, pool.scheduler.get_stats()
+
+        with StandInServer() as server:
+            results, stats = asyncio.run(run(server.url))
+        assert results == [[], []]
+        assert stats['in_flight'] == 0 and stats['flows'] == 2
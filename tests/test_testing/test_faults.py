@@ -0,0 +1,64 @@
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.testing import Faults, constant, uniform, exponential, lognormal
+
+
+class TestFaults:
+    """Stand-in Faults"""
+
+    def test_no_faults(self):
+        """Lets every request through by default ::"""
+        faults = Faults()
+        assert all(fault.status is None and fault.latency == 0 for fault in (faults.next() for _ in range(100)))
+
+    def test_rate_limit_bursts(self):
+        """Rejects the first requests of every window with 429 ::"""
+        faults = Faults(rate_limit_every=5, rate_limit_burst=2, retry_after=0.5)
+        statuses = [faults.next().status for _ in range(10)]
+        assert statuses == [429, 429, None, None, None] * 2
+        assert faults.next().retry_after == 0.5
+
+    def test_error_rate(self):
+        """Fails roughly error_rate of the requests with a 5xx status ::"""
+        faults = Faults(error_rate=0.3, error_statuses=(502, 503), seed=7)
+        statuses = [faults.next().status for _ in range(2000)]
+        failed = [status for status in statuses if status is not None]
+        assert set(failed) == {502, 503}
+        assert 0.25 < len(failed) / len(statuses) < 0.35
+
+    def test_seeded(self):
+        """Repeats the same faults for the same seed ::"""
+        first, second = Faults(error_rate=0.5, latency=uniform(0, 1), seed=1), \
+            Faults(error_rate=0.5, latency=uniform(0, 1), seed=1)
+        assert [repr(first.next()) for _ in range(20)] == [repr(second.next()) for _ in range(20)]
+
+    @pytest.mark.parametrize('latency, low, high', [
+        (0.25, 0.25, 0.25),
+        (constant(0.1), 0.1, 0.1),
+        (uniform(0.1, 0.2), 0.1, 0.2),
+        (exponential(0.05), 0, float('inf')),
+        (lognormal(0.05), 0, float('inf')),
+    ])
+    def test_latency(self, latency, low, high):
+        """Draws latencies from the given distribution ::"""
+        faults = Faults(latency=latency, slow_body=latency, seed=3)
+        for _ in range(50):
+            fault = faults.next()
+            assert low <= fault.latency <= high
+            assert low <= fault.slow_body <= high
+
+    @pytest.mark.parametrize('kwargs', [
+        {'error_rate': 1.5},
+        {'error_rate': '0.1'},
+        {'error_statuses': (404,)},
+        {'error_statuses': ()},
+        {'rate_limit_every': 2, 'rate_limit_burst': 3},
+        {'rate_limit_every': -1},
+        {'latency': -1},
+        {'latency': 'slow'},
+    ])
+    def test_invalid(self, kwargs):
+        """Throws exception for invalid fault settings ::"""
+        with pytest.raises(ShipdayException):
+            Faults(**kwargs)
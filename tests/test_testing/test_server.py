@@ -0,0 +1,83 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+
+from shipday import Shipday
+from shipday.carrier import CarrierRequest
+from shipday.exceptions import ShipdayRateLimitException
+from shipday.httpclient.retry_policy import RetryPolicy
+from shipday.httpclient.shipdayclient import ShipdayClient
+from shipday.order import Order, Customer, Pickup, Address
+from shipday.testing import Faults, StandInServer
+
+API_KEY = '1234567890'
+
+
+def get_order(number: str) -> Order:
+    return Order(order_number=number, customer=Customer(name='John', address=Address(street='Dhaka'),
+                                                        phone_number='+1234567890'),
+                 pickup=Pickup(name='Popeyes', address=Address(street='Banani')))
+
+
+class TestStandInServer:
+    """Stand-in Server"""
+
+    def test_services(self):
+        """Serves the order, carrier and on-demand endpoints ::"""
+        with StandInServer() as server, Shipday(api_key=API_KEY, base_url=server.url) as shipday:
+            assert shipday.OrderService.insert_order(get_order('100'))['orderId'] == 1
+            assert shipday.CarrierService.add_carrier(CarrierRequest(name='Bob', email='bob@shipday.com',
+                                                                     phone_number='+1'))['id'] == 1
+            shipday.OrderService.assign_order(1, 1)
+            assert [order.order_status for order in shipday.OrderService.get_orders(lazy=True)] == ['ASSIGNED']
+            assert shipday.OnDemandDeliveryService.assign(order_id=1, service_name='Uber')['status'] == 'ASSIGNED'
+            assert list(shipday.OrderService.iter_orders(fields=['orderNumber'])) == [{'orderNumber': '100'}]
+        assert server.requests[0] == ('POST', '/orders/')
+
+    def test_unauthorized(self):
+        """Rejects requests without basic authorization ::"""
+        with StandInServer() as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url)
+            client._headers = {}
+            assert client.get('orders/')['errorCode'] == 401
+
+    def test_rate_limit_burst(self):
+        """Sends 429 with Retry-After during a burst ::"""
+        with StandInServer(faults=Faults(rate_limit_every=3, rate_limit_burst=1, retry_after=2)) as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url)
+            with pytest.raises(ShipdayRateLimitException) as error:
+                client.get('orders/')
+            assert error.value.retry_after == 2
+            assert client.get('orders/') == []
+
+    def test_retries_injected_failures(self):
+        """Retries through injected 5xx responses ::"""
+        orders = [{'orderId': 1, 'orderNumber': '100'}]
+        with StandInServer(orders=orders, faults=Faults(error_rate=0.5, error_statuses=(503,), seed=4)) as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url, retry_policy=RetryPolicy(max_attempts=10))
+            with mock.patch('time.sleep'):
+                assert all(client.get('orders/') == orders for _ in range(10))
+            assert len(server.requests) > 10
+
+    def test_latency_and_slow_body(self):
+        """Delays the response and trickles the body ::"""
+        with StandInServer(faults=Faults(latency=0.05, slow_body=0.1)) as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url)
+            started = time.monotonic()
+            assert client.get('carriers/') == []
+            assert time.monotonic() - started >= 0.15
+
+    def test_async_client(self):
+        """Works with the async client ::"""
+        pytest.importorskip('aiohttp')
+        from shipday import AsyncShipday
+
+        async def run(url):
+            async with AsyncShipday(api_key=API_KEY, base_url=url) as shipday:
+                await shipday.OrderService.insert_order(get_order('100'))
+                return await shipday.OrderService.get_order('100')
+
+        with StandInServer() as server:
+            assert asyncio.run(run(server.url))[0]['orderId'] == 1
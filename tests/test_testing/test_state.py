@@ -0,0 +1,85 @@
+import pytest
+
+from shipday.testing import StandInState
+
+ORDER = {'orderNumber': '100', 'customerName': 'John', 'customerAddress': 'Dhaka', 'customerPhoneNumber': '+1',
+         'restaurantName': 'Popeyes', 'restaurantAddress': 'Banani', 'orderItem': [{'name': 'Tea'}],
+         'tips': 1.0, 'totalOrderCost': 20.0}
+
+
+class TestStandInState:
+    """Stand-in State"""
+
+    def test_insert_and_get(self):
+        """Stores inserted orders in the nested API shape ::"""
+        state = StandInState()
+        assert state.handle('POST', 'orders/', ORDER) == (
+            200, {'success': True, 'orderId': 1, 'response': 'Order inserted'})
+        status, orders = state.handle('GET', '/orders/')
+        assert status == 200
+        assert orders[0]['customer']['name'] == 'John'
+        assert orders[0]['restaurant']['address'] == 'Banani'
+        assert orders[0]['costing']['totalCost'] == 20.0
+        assert state.handle('GET', 'orders/100')[1] == orders
+        assert state.handle('GET', 'orders/200')[1] == []
+
+    def test_edit_assign_delete(self):
+        """Edits, assigns and deletes stored orders ::"""
+        state = StandInState(carriers=[{'name': 'Bob'}])
+        state.handle('POST', 'orders/', ORDER)
+        assert state.handle('PUT', 'order/edit/1', dict(ORDER, customerName='Jane'))[0] == 200
+        assert state.handle('PUT', 'orders/assign/1/1', {})[0] == 200
+        order = state.orders[1]
+        assert order['customer']['name'] == 'Jane'
+        assert order['assignedCarrier']['name'] == 'Bob'
+        assert order['orderStatus'] == {'orderState': 'ASSIGNED'}
+        assert state.handle('DELETE', 'orders/1')[0] == 200
+        assert state.handle('DELETE', 'orders/1')[0] == 404
+
+    @pytest.mark.parametrize('payload, expected', [
+        ({}, [1, 2, 3, 4, 5]),
+        ({'startCursor': 2, 'endCursor': 3}, [2, 3]),
+        ({'startCursor': 5, 'endCursor': 9}, [5]),
+        ({'orderStatus': 'ASSIGNED'}, [1]),
+        ({'startTime': '2022-05-02T00:00:00', 'endTime': '2022-05-03T23:00:00'}, [2, 3]),
+    ])
+    def test_query(self, payload, expected):
+        """Filters by status and time and pages with cursors ::"""
+        orders = [{'orderId': day, 'orderStatus': {'orderState': 'ASSIGNED' if day == 1 else 'ACTIVE'},
+                   'activityLog': {'placementTime': '2022-05-0{}T12:00:00+00:00'.format(day)}} for day in range(1, 6)]
+        status, result = StandInState(orders=orders).handle('POST', 'orders/query/', payload)
+        assert status == 200
+        assert [order['orderId'] for order in result] == expected
+
+    def test_carriers(self):
+        """Adds, lists and deletes carriers ::"""
+        state = StandInState()
+        assert state.handle('POST', 'carriers/', {'name': 'Bob', 'email': 'bob@shipday.com'})[1]['id'] == 1
+        assert state.handle('GET', 'carriers/')[1][0]['name'] == 'Bob'
+        assert state.handle('DELETE', 'carriers/1')[0] == 200
+        assert state.handle('GET', 'carriers/')[1] == []
+
+    def test_on_demand(self):
+        """Assigns, describes and cancels on-demand deliveries ::"""
+        state = StandInState(orders=[{'orderId': 7}], services=['Uber'])
+        assert state.handle('GET', 'on-demand/services')[1] == [{'name': 'Uber', 'Uber': True}]
+        assert state.handle('GET', 'on-demand/estimate/7')[1][0]['name'] == 'Uber'
+        assert state.handle('POST', 'third-party/availability', {})[1][0]['available'] is True
+        assert state.handle('POST', 'on-demand/assign', {'orderId': 7, 'name': 'DoorDash'})[0] == 400
+        assert state.handle('POST', 'on-demand/assign', {'orderId': 7, 'name': 'Uber'})[1]['status'] == 'ASSIGNED'
+        assert state.handle('GET', 'on-demand/details/7')[1]['name'] == 'Uber'
+        assert state.handle('POST', 'on-demand/cancel/7', {})[0] == 200
+        assert state.handle('GET', 'on-demand/details/7')[0] == 404
+
+    @pytest.mark.parametrize('method, path, payload', [
+        ('GET', 'unknown/', None),
+        ('PATCH', 'orders/', None),
+        ('POST', 'orders/', {}),
+        ('PUT', 'order/edit/9', {}),
+        ('GET', 'on-demand/estimate/9', None),
+    ])
+    def test_errors(self, method, path, payload):
+        """Answers unknown routes and invalid requests with an error body ::"""
+        status, body = StandInState().handle(method, path, payload)
+        assert status >= 400
+        assert body['errorCode'] == status
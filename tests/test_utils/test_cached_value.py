@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.utils.cached_value import CachedValue, AsyncCachedValue
+
+
+class Loader:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.calls
+
+
+class TestCachedValue:
+    """Cached Value"""
+
+    @pytest.mark.parametrize('ttl, stale_ttl', [(-1, 0), (1, -1), ('1', 0), (None, 0)])
+    def test_invalid_ttl(self, ttl, stale_ttl):
+        """Throws exception if ttl is negative or not a number ::"""
+        with pytest.raises(ShipdayException, match='must not be negative'):
+            CachedValue(Loader(), ttl, stale_ttl)
+
+    def test_zero_ttl(self):
+        """Accepts a zero ttl, every read loads ::"""
+        loader = Loader()
+        cache = CachedValue(loader, ttl=0)
+        cache.get()
+        cache.get()
+        assert loader.calls == 2
+
+    def test_ttl(self):
+        """Loads once per ttl ::"""
+        loader = Loader()
+        cache = CachedValue(loader, ttl=10)
+        with mock.patch('time.monotonic', return_value=100.0):
+            assert [cache.get(), cache.get()] == [1, 1]
+        with mock.patch('time.monotonic', return_value=111.0):
+            assert cache.get() == 2
+
+    def test_invalidate(self):
+        """Loads again after invalidate ::"""
+        loader = Loader()
+        cache = CachedValue(loader, ttl=10)
+        cache.get()
+        cache.invalidate()
+        assert cache.get() == 2
+
+    def test_stale_while_revalidate(self):
+        """Serves the stale value while refreshing in the background ::"""
+        loader = Loader()
+        cache = CachedValue(loader, ttl=10, stale_ttl=10)
+        with mock.patch('time.monotonic', return_value=100.0):
+            cache.get()
+        with mock.patch('time.monotonic', return_value=115.0):
+            assert cache.get() == 1
+            for _ in range(100):
+                if cache._loaded_at == 115.0:
+                    break
+                time.sleep(0.01)
+            assert cache.get() == 2
+
+    def test_single_flight(self):
+        """Concurrent callers share a single load ::"""
+        loader = Loader(delay=0.05)
+        cache = CachedValue(loader, ttl=10)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [1] * 10
+        assert loader.calls == 1
+
+    def test_async_single_flight(self):
+        """Concurrent tasks share a single load ::"""
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def run():
+            cache = AsyncCachedValue(loader, ttl=10)
+            return await asyncio.gather(*[cache.get() for _ in range(10)])
+
+        assert asyncio.run(run()) == [1] * 10
+        assert len(calls) == 1
@@ -0,0 +1,71 @@
+import sys
+from datetime import datetime
+
+import pytest
+
+from shipday.carrier import CarrierRequest
+from shipday.exceptions import ShipdayException
+from shipday.order import Address, Customer, Pickup, OrderItem, OrderCost, Order
+from shipday.utils.fields import Field, TypedField, NumberField, ListField
+
+
+class Model:
+    __slots__ = ('_plain', '_name', '_note', '_count', '_price', '_items', '_when')
+
+    plain = Field()
+    name = TypedField(str, 'Name is not a string')
+    note = TypedField(str, 'Note is not a string', optional=True)
+    count = NumberField('Count must be a positive integer', minimum=1, types=int)
+    price = NumberField('Price must be a positive number', convert=float)
+    items = ListField(int, 'Items must be a list', 'Items must be integers')
+    time = TypedField(datetime, 'Time must be a datetime', optional=True, slot='_when')
+
+
+class TestFields:
+    """Typed Fields"""
+
+    def test_read_write(self):
+        """Stores values in the backing slot ::"""
+        model = Model()
+        model.plain = object
+        model.name = 'name'
+        model.note = None
+        model.count = 3
+        model.price = 2
+        model.items = [1, 2]
+        model.time = datetime(2022, 1, 1)
+        assert (model._plain, model._name, model._note, model._count, model._items) == (object, 'name', None, 3, [1, 2])
+        assert model.price == 2.0 and type(model.price) is float
+        assert model._when == model.time == datetime(2022, 1, 1)
+
+    @pytest.mark.parametrize('field, value', [
+        ('name', None), ('name', 1), ('note', 1), ('count', 0), ('count', 1.0), ('count', True), ('price', -1),
+        ('price', '1'), ('items', None), ('items', (1,)), ('items', [1, '2']), ('time', '2022-01-01'),
+    ])
+    def test_invalid_value(self, field, value):
+        """Throws exception if the value does not match the field ::"""
+        model = Model()
+        with pytest.raises(ShipdayException):
+            setattr(model, field, value)
+
+    def test_unset(self):
+        """Unset fields raise AttributeError ::"""
+        with pytest.raises(AttributeError):
+            Model().name
+
+    def test_class_access(self):
+        """Returns the descriptor on class access ::"""
+        assert isinstance(Model.name, TypedField)
+        assert Model.time.slot == '_when'
+
+    @pytest.mark.parametrize('model', [
+        Address(street='Jefferson St'), Customer(name='customer'), Pickup(name='pickup'),
+        OrderItem(name='Pizza', unit_price=2, quantity=1), OrderCost(tips=1.0), Order(orderNumber='1'),
+        CarrierRequest(name='carrier'),
+    ])
+    def test_models_are_slotted(self, model):
+        """Models do not carry a per instance dictionary ::"""
+        assert not hasattr(model, '__dict__')
+        with pytest.raises(AttributeError):
+            model.unknown_attribute = 1
+        assert sys.getsizeof(model) < 128
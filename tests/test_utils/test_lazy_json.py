@@ -0,0 +1,150 @@
+import json
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.utils import lazy_json
+from shipday.utils.lazy_json import LazyObject, ArrayParser, iter_array, iter_members, iter_stream, skip_value
+
+BODY = json.dumps({
+    'orderId': 7,
+    'note': 'has "quotes", [brackets] and {braces}',
+    'nested': {'list': [1, {'a': [2, 3]}], 'empty': {}},
+    'escaped\\key': True,
+    'unicode': 'café',
+    'missing': None,
+}).encode('utf-8')
+
+
+class TestLazyJson:
+    """Lazy JSON scanner"""
+
+    @pytest.mark.parametrize('value', ['1', '-1.5e3', 'true', 'null', '"a,b]"', '[]', '{}', '[1, [2, {"a": "]"}]]',
+                                       '{"a": {"b": "}"}}'])
+    def test_skip_value(self, value):
+        """Finds the end of a single value ::"""
+        buffer = (value + ', 0').encode('utf-8')
+        assert skip_value(buffer, 0) == len(value)
+
+    def test_iter_array(self):
+        """Yields the span of every array element ::"""
+        buffer = b' [ {"a": 1} , "x", [2] ] '
+        assert [buffer[start:end] for start, end in iter_array(buffer)] == [b'{"a": 1}', b'"x"', b'[2]']
+        assert list(iter_array(b'[ ]')) == []
+
+    def test_iter_members(self):
+        """Yields the key and value span of every object member ::"""
+        members = {key: json.loads(BODY[start:end]) for key, start, end in iter_members(BODY)}
+        assert members == json.loads(BODY)
+
+    @pytest.mark.parametrize('buffer', [b'', b'{', b'[1, 2', b'{"a" 1}', b'{"a": 1 "b": 2}', b'[1 2]', b'{1: 2}'])
+    def test_malformed(self, buffer):
+        """Throws exception on malformed input ::"""
+        with pytest.raises(ShipdayException):
+            list(iter_members(buffer)) if buffer.startswith(b'{') else list(iter_array(buffer))
+
+    def test_lazy_object(self):
+        """Decodes members on access ::"""
+        view = LazyObject(BODY)
+        assert view.get('orderId') == 7
+        assert view['note'] == 'has "quotes", [brackets] and {braces}'
+        assert view.get('unicode') == 'café'
+        assert view.get('escaped\\key') is True
+        assert view.get('missing', 'default') is None
+        assert view.get('absent', 'default') == 'default'
+        assert 'nested' in view and 'absent' not in view
+        with pytest.raises(KeyError):
+            view['absent']
+
+    def test_scans_incrementally(self):
+        """Only scans as far as the requested member ::"""
+        view = LazyObject(BODY)
+        view.get('orderId')
+        assert list(view._spans) == ['orderId']
+        assert view.keys() == list(json.loads(BODY))
+
+    def test_nested_object(self):
+        """Nested objects share the parent buffer ::"""
+        view = LazyObject(BODY)
+        nested = view.get_object('nested')
+        assert nested._buffer is BODY
+        assert nested.get('list') == [1, {'a': [2, 3]}]
+        assert nested.get_object('empty').keys() == []
+        assert view.get_object('orderId') is None
+        assert view.get_object('absent') is None
+
+    def test_to_dict(self):
+        """Decodes the whole object ::"""
+        view = LazyObject(BODY).get_object('nested')
+        assert view.to_dict() == {'list': [1, {'a': [2, 3]}], 'empty': {}}
+        assert json.loads(view.get_raw()) == view.to_dict()
+
+    def test_decoded_object(self):
+        """Wraps an already decoded object with the same interface ::"""
+        view = LazyObject(json.loads(BODY))
+        assert view.get('orderId') == 7 and view['unicode'] == 'café'
+        assert view.get('absent', 'default') == 'default'
+        assert 'nested' in view and 'absent' not in view
+        assert view.keys() == list(json.loads(BODY))
+        assert view.get_object('nested').get_object('empty').keys() == []
+        assert view.get_object('orderId') is None
+        assert json.loads(view.get_raw()) == view.to_dict() == json.loads(BODY)
+        with pytest.raises(KeyError):
+            view['absent']
+
+
+ARRAY = json.dumps([
+    {'orderId': 1, 'note': 'has ] and "quotes"', 'items': [{'a': 1}], 'total': 12.5},
+    {'orderId': 22, 'note': 'café', 'items': [], 'total': -3},
+    'text', 1234, None, [1, [2]], {},
+], indent=1).encode('utf-8')
+
+
+class TestArrayParser:
+    """Incremental array parser"""
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, len(ARRAY)])
+    def test_chunks(self, chunk_size):
+        """Yields the same elements however the body is split ::"""
+        chunks = [ARRAY[i:i + chunk_size] for i in range(0, len(ARRAY), chunk_size)]
+        assert list(iter_stream(chunks)) == json.loads(ARRAY)
+
+    def test_incremental(self):
+        """Yields elements as soon as they are complete ::"""
+        parser = ArrayParser()
+        assert parser.feed(b'[{"a": 1}, {"b"') == [{'a': 1}]
+        assert parser.feed(b': 2}, 12') == [{'b': 2}]
+        assert parser.feed(b'3') == []
+        assert parser.feed(b']') == [123]
+        assert parser.close() == []
+
+    def test_scans_long_element_once(self, monkeypatch):
+        """Carries on scanning a long element from where the previous chunk stopped ::"""
+        body = json.dumps([{'items': [{'name': 'item [{}]'.format(i)} for i in range(500)]}]).encode('utf-8')
+        scanned = []
+        skip = lazy_json._SKIP
+
+        class CountingSkip:
+            @staticmethod
+            def match(buffer, pos):
+                match = skip.match(buffer, pos)
+                scanned.append(match.end() - pos)
+                return match
+
+        monkeypatch.setattr(lazy_json, '_SKIP', CountingSkip)
+        chunks = [body[i:i + 16] for i in range(0, len(body), 16)]
+        assert list(iter_stream(chunks)) == json.loads(body)
+        assert sum(scanned) < 2 * len(body)
+
+    def test_projection(self):
+        """Keeps only the projected keys of object elements ::"""
+        chunks = [ARRAY[i:i + 5] for i in range(0, len(ARRAY), 5)]
+        elements = list(iter_stream(chunks, fields=['orderId', 'total']))
+        assert elements[:2] == [{'orderId': 1, 'total': 12.5}, {'orderId': 22, 'total': -3}]
+        assert elements[2:] == ['text', 1234, None, [1, [2]], {}]
+
+    @pytest.mark.parametrize('body', [b'', b'{"a": 1}', b'[1, 2', b'[1 2]', b'[1,]', b'[,1]', b'["open', b'[1] 2'])
+    def test_malformed(self, body):
+        """Throws exception for malformed or truncated bodies ::"""
+        with pytest.raises(ShipdayException):
+            list(iter_stream([body]))
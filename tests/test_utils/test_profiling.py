@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from contextvars import copy_context
+
+import pytest
+
+from shipday import Shipday
+from shipday.carrier import CarrierRequest
+from shipday.httpclient.retry_policy import RetryPolicy
+from shipday.httpclient.shipdayclient import ShipdayClient
+from shipday.order import Address, Customer, Order, OrderCost, OrderItem, Pickup
+from shipday.testing import Faults, StandInServer
+from shipday.utils.profiling import Profiler, ProfiledService, NULL_PHASE, get_phase, get_profiler, profiled
+
+API_KEY = '1234567890'
+
+
+def make_order(number: int) -> Order:
+    address = Address(street='Hacker way', city='California', zip='94025')
+    return Order(order_number=str(number),
+                 customer=Customer(name='customer', address=address, email='customer@shipday.com',
+                                   phone_number='+1343523423'),
+                 pickup=Pickup(name='pickup', address=address, phone_number='+134343534'),
+                 order_items=[OrderItem(name='Item', unit_price=2.5, quantity=2)],
+                 order_cost=OrderCost(total=5.0))
+
+
+class Service:
+    def work(self, seconds):
+        with get_phase('network'):
+            time.sleep(seconds)
+        return seconds
+
+    def pages(self, count):
+        for page in range(count):
+            with get_phase('decode'):
+                yield page
+
+    async def work_async(self, seconds):
+        with get_phase('wait'):
+            await asyncio.sleep(seconds)
+        return seconds
+
+
+class TestProfiling:
+    """Profiling"""
+
+    def test_off_by_default(self):
+        """Phases are no-ops outside a profiled call ::"""
+        assert get_phase('network') is NULL_PHASE
+        assert profiled('validate')(lambda value: value * 2)(21) == 42
+        assert get_profiler(None) is None and get_profiler(False) is None
+        assert isinstance(get_profiler(True), Profiler)
+
+    def test_exclusive_phases(self):
+        """Charges time to the innermost phase only ::"""
+        profiler = Profiler()
+        with profiler.call('call'):
+            with profiler.phase('build'):
+                time.sleep(0.02)
+                with profiler.phase('encode'):
+                    time.sleep(0.03)
+        report = profiler.report()['call']
+        assert report['calls'] == 1
+        assert list(report['phases']) == ['build', 'encode', 'sdk']
+        assert 0.02 <= report['phases']['build']['time'] < 0.045
+        assert report['phases']['encode']['time'] >= 0.03
+        assert report['phases']['build']['count'] == report['phases']['encode']['count'] == 1
+        assert report['time'] == pytest.approx(sum(phase['time'] for phase in report['phases'].values()))
+
+    def test_nested_calls(self):
+        """A call made inside another call belongs to the outer one ::"""
+        profiler = Profiler()
+        with profiler.call('outer'):
+            with profiler.call('inner'):
+                with profiler.phase('network'):
+                    pass
+        assert set(profiler.report()) == {'outer'}
+        profiler.reset()
+        assert profiler.report() == {}
+
+    def test_threads(self):
+        """Workers started from a profiled call report their phases to it ::"""
+        profiler = Profiler()
+
+        def work():
+            with get_phase('network'):
+                time.sleep(0.01)
+
+        with profiler.call('call'):
+            threads = [threading.Thread(target=copy_context().run, args=(work,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        network = profiler.report()['call']['phases']['network']
+        assert network['count'] == 4
+        assert network['time'] >= 0.04
+
+    def test_service(self):
+        """Reports each public method of a service, iterators are profiled while consumed ::"""
+        profiler = Profiler()
+        service = ProfiledService(Service(), profiler)
+        assert service.work(0.01) == 0.01
+        assert list(service.pages(3)) == [0, 1, 2]
+        report = profiler.report()
+        assert report['Service.work']['calls'] == 1
+        assert report['Service.work']['phases']['network']['time'] >= 0.01
+        assert report['Service.pages']['calls'] == 1
+        assert report['Service.pages']['phases']['decode']['count'] == 3
+        assert 'Service.work' in profiler.format()
+
+    def test_async_service(self):
+        """Profiles coroutines, concurrent tasks keep their own phases ::"""
+        profiler = Profiler()
+        service = ProfiledService(Service(), profiler)
+
+        async def run():
+            return await asyncio.gather(*[service.work_async(0.01) for _ in range(3)])
+
+        assert asyncio.run(run()) == [0.01, 0.01, 0.01]
+        report = profiler.report()['Service.work_async']
+        assert report['calls'] == 3
+        assert report['phases']['wait']['count'] == 3
+
+    def test_memory(self):
+        """Records allocations per phase ::"""
+        profiler = Profiler(memory=True)
+        try:
+            with profiler.call('call'):
+                with profiler.phase('build'):
+                    data = [bytearray(1024) for _ in range(100)]
+            assert profiler.report()['call']['phases']['build']['memory'] >= 100 * 1024
+            assert data
+        finally:
+            profiler.close()
+
+    def test_models(self):
+        """Validation and body building are reported as phases ::"""
+        profiler = Profiler()
+        order, carrier = make_order(1), CarrierRequest(name='carrier', email='c@shipday.com', phone_number='+1')
+        with profiler.call('call'):
+            order.verify()
+            order.get_body()
+            carrier.get_body()
+        phases = profiler.report()['call']['phases']
+        assert phases['validate']['count'] == 2
+        assert phases['build']['count'] == 2
+
+    def test_client(self):
+        """Requests outside a profiled service are reported per endpoint ::"""
+        profiler = Profiler()
+        with StandInServer() as server:
+            client = ShipdayClient(api_key=API_KEY, base_url=server.url, profiler=profiler)
+            client.get('orders/')
+            client.post('carriers/', {'name': 'carrier'})
+            client.delete('carriers/1')
+            client.close()
+        report = profiler.report()
+        assert set(report) == {'GET orders/', 'POST carriers/', 'DELETE carriers/{carrier_id}'}
+        assert set(report['POST carriers/']['phases']) == {'encode', 'network', 'decode', 'sdk'}
+
+    def test_shipday(self):
+        """Breaks service methods down by phase, including rate limit waits ::"""
+        with StandInServer(faults=Faults(rate_limit_every=100, rate_limit_burst=1, retry_after=0)) as server:
+            with Shipday(api_key=API_KEY, base_url=server.url, profiler=True,
+                         retry_policy=RetryPolicy(backoff_base=0.01)) as shipday:
+                assert isinstance(shipday.OrderService, ProfiledService)
+                shipday.OrderService.insert_order(make_order(1))
+                results = list(shipday.OrderService.insert_orders([make_order(2), make_order(3)], max_in_flight=2))
+                assert all(result.exception is None for result in results)
+                shipday.OrderService.get_orders()
+                report = shipday.profiler.report()
+        assert set(report) == {'OrderService.insert_order', 'OrderService.insert_orders', 'OrderService.get_orders'}
+        insert = report['OrderService.insert_order']['phases']
+        assert {'validate', 'build', 'encode', 'wait', 'network', 'decode'} <= set(insert)
+        assert insert['network']['count'] == 2
+        assert report['OrderService.insert_orders']['phases']['network']['count'] == 2
+        assert report['OrderService.get_orders']['phases']['decode']['count'] == 1
+
+    def test_async_shipday(self):
+        """Profiles the async services ::"""
+        pytest.importorskip('aiohttp')
+        from shipday import AsyncShipday
+
+        async def run(url):
+            async with AsyncShipday(api_key=API_KEY, base_url=url, profiler=True) as shipday:
+                await shipday.OrderService.insert_order(make_order(1))
+                await shipday.CarrierService.get_carriers()
+                return shipday.profiler.report()
+
+        with StandInServer() as server:
+            report = asyncio.run(run(server.url))
+        assert set(report) == {'AsyncOrderService.insert_order', 'AsyncCarrierService.get_carriers'}
+        assert {'validate', 'build', 'encode', 'wait', 'network', 'decode'} \
+            <= set(report['AsyncOrderService.insert_order']['phases'])
@@ -0,0 +1,140 @@
+import asyncio
+import io
+import json
+import threading
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+import pytest
+import requests
+
+from shipday.exceptions import ShipdayException
+from shipday.webhooks import AsyncEventQueue, AsyncWebhookApp, EventQueue, WebhookApp
+
+TOKEN = 'webhook-token'
+BODY = json.dumps({'event': 'ORDER_COMPLETED', 'order_status': 'ALREADY_DELIVERED',
+                   'order': {'id': 1, 'order_number': '99'}}).encode('utf-8')
+
+
+class Collector:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, batch):
+        self.events.extend(batch)
+
+    async def handle_async(self, batch):
+        self.events.extend(batch)
+
+
+def call_wsgi(app, method='POST', body=BODY, token=TOKEN) -> tuple:
+    environ = {'REQUEST_METHOD': method, 'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body)}
+    if token is not None:
+        environ['HTTP_TOKEN'] = token
+    started = {}
+    response = b''.join(app(environ, lambda status, headers: started.update(status=status, headers=headers)))
+    return int(started['status'].split()[0]), json.loads(response)['status'], dict(started['headers'])
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class TestWebhookApp:
+    """Webhook App"""
+
+    @pytest.mark.parametrize('token', [None, '', [], ['token', None]])
+    def test_token_required(self, token):
+        """Throws exception without a token ::"""
+        with pytest.raises(ShipdayException):
+            WebhookApp(EventQueue(Collector()), token=token)
+
+    @pytest.mark.parametrize('method, body, token, expected', [
+        ('GET', b'', TOKEN, (405, 'method not allowed')),
+        ('POST', BODY, None, (401, 'unauthorized')),
+        ('POST', BODY, 'wrong-token', (401, 'unauthorized')),
+        ('POST', b'{"event": ', TOKEN, (400, 'malformed')),
+        ('POST', b'{"event": "' + b'x' * 2048 + b'"}', TOKEN, (413, 'too large')),
+    ])
+    def test_rejects(self, method, body, token, expected):
+        """Rejects requests that are not authenticated order events ::"""
+        collector = Collector()
+        app = WebhookApp(EventQueue(collector), token=TOKEN, max_body_size=1024)
+        assert call_wsgi(app, method, body, token)[:2] == expected
+        app.queue.stop()
+        assert collector.events == []
+
+    def test_accepts(self):
+        """Queues events once and acknowledges redeliveries ::"""
+        collector = Collector()
+        app = WebhookApp(EventQueue(collector, max_wait=0), token=['old-token', TOKEN])
+        assert call_wsgi(app)[:2] == (200, 'accepted')
+        assert call_wsgi(app, token='old-token')[:2] == (200, 'duplicate')
+        app.queue.stop()
+        assert [(event.event, event.order_id) for event in collector.events] == [('ORDER_COMPLETED', 1)]
+
+    def test_busy(self):
+        """Asks for a redelivery when the queue is full and accepts it later ::"""
+        app = WebhookApp(EventQueue(Collector(), max_size=1), token=TOKEN)
+        app.queue.stop()
+        app.queue.put('blocking')
+        assert call_wsgi(app) == (503, 'busy', {'Content-Type': 'application/json', 'Content-Length': '18',
+                                                'Retry-After': '1'})
+        app.queue._queue.get_nowait()
+        assert call_wsgi(app)[:2] == (200, 'accepted')
+
+    def test_wsgi_server(self):
+        """Receives events over HTTP ::"""
+        collector = Collector()
+        app = WebhookApp(EventQueue(collector, max_wait=0), token=TOKEN)
+        server = make_server('127.0.0.1', 0, app, handler_class=QuietHandler)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:{}/'.format(server.server_port)
+            response = requests.post(url, data=BODY, headers={'token': TOKEN})
+            assert (response.status_code, response.json()) == (200, {'status': 'accepted'})
+            assert requests.post(url, data=BODY).status_code == 401
+        finally:
+            server.shutdown()
+            server.server_close()
+        app.queue.stop()
+        assert len(collector.events) == 1
+
+    def test_asgi(self):
+        """Receives events as an ASGI app ::"""
+        collector = Collector()
+        app = AsyncWebhookApp(AsyncEventQueue(collector.handle_async, max_wait=0), token=TOKEN)
+
+        async def call(messages, scope):
+            sent, messages = [], list(messages)
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                sent.append(message)
+
+            await app(scope, receive, send)
+            return sent
+
+        async def post(chunks, token=TOKEN):
+            headers = [(b'token', token.encode('latin-1'))]
+            messages = [{'type': 'http.request', 'body': chunk, 'more_body': index < len(chunks) - 1}
+                        for index, chunk in enumerate(chunks)]
+            sent = await call(messages, {'type': 'http', 'method': 'POST', 'headers': headers})
+            return sent[0]['status'], json.loads(sent[1]['body'])['status']
+
+        async def run():
+            lifespan = await call([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}], {'type': 'lifespan'})
+            assert [message['type'] for message in lifespan] == ['lifespan.startup.complete',
+                                                                 'lifespan.shutdown.complete']
+            results = [await post([BODY[:10], BODY[10:]]), await post([BODY]), await post([BODY], token='wrong'),
+                       await post([b'x' * (2 * 1024 * 1024)])]
+            await app.queue.join()
+            await app.queue.stop()
+            return results
+
+        assert asyncio.run(run()) == [(200, 'accepted'), (200, 'duplicate'), (401, 'unauthorized'),
+                                      (413, 'too large')]
+        assert [event.order_number for event in collector.events] == ['99']
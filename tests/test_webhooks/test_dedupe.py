@@ -0,0 +1,44 @@
+from unittest import mock
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.webhooks import Deduplicator
+
+
+class TestDeduplicator:
+    """Deduplicator"""
+
+    @pytest.mark.parametrize('max_size, ttl', [(0, None), ('10', None), (10, 0), (10, '1')])
+    def test_invalid_options(self, max_size, ttl):
+        """Throws exception if max size or ttl are invalid ::"""
+        with pytest.raises(ShipdayException):
+            Deduplicator(max_size, ttl)
+
+    def test_add(self):
+        """Reports keys that were seen before ::"""
+        deduplicator = Deduplicator()
+        assert [deduplicator.add('a'), deduplicator.add('b'), deduplicator.add('a')] == [True, True, False]
+        assert 'a' in deduplicator and 'c' not in deduplicator
+        deduplicator.discard('a')
+        assert deduplicator.add('a') is True
+        assert deduplicator.get_stats() == {'size': 2, 'duplicates': 1, 'evictions': 0}
+
+    def test_bounded(self):
+        """Forgets the oldest keys beyond max size ::"""
+        deduplicator = Deduplicator(max_size=3)
+        for key in 'abcd':
+            deduplicator.add(key)
+        assert len(deduplicator) == 3
+        assert 'a' not in deduplicator
+        assert deduplicator.get_stats()['evictions'] == 1
+
+    def test_ttl(self):
+        """Forgets keys after the ttl ::"""
+        deduplicator = Deduplicator(ttl=60)
+        with mock.patch('time.monotonic', return_value=100.0):
+            assert deduplicator.add('a') is True
+        with mock.patch('time.monotonic', return_value=159.0):
+            assert deduplicator.add('a') is False
+        with mock.patch('time.monotonic', return_value=161.0):
+            assert deduplicator.add('a') is True
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.webhooks import AsyncEventQueue, EventQueue
+
+
+class Handler:
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.release.wait()
+        time.sleep(self.delay)
+        self.batches.append(list(batch))
+        if self.error is not None:
+            raise self.error
+
+    async def handle_async(self, batch):
+        await asyncio.sleep(self.delay)
+        self.batches.append(list(batch))
+        if self.error is not None:
+            raise self.error
+
+
+class TestEventQueue:
+    """Event Queue"""
+
+    @pytest.mark.parametrize('options', [{'max_size': 0}, {'batch_size': 0}, {'max_wait': -1}, {'workers': 0}])
+    def test_invalid_options(self, options):
+        """Throws exception if an option is invalid ::"""
+        with pytest.raises(ShipdayException):
+            EventQueue(Handler(), **options)
+
+    def test_batches(self):
+        """Hands events over in batches of at most batch size ::"""
+        handler = Handler()
+        handler.release.clear()
+        events = EventQueue(handler, batch_size=4, max_wait=0.01).start()
+        assert all(events.put(number) for number in range(10))
+        handler.release.set()
+        events.join()
+        events.stop()
+        assert [number for batch in handler.batches for number in batch] == list(range(10))
+        assert max(len(batch) for batch in handler.batches) == 4
+        assert events.get_stats() == {'size': 0, 'accepted': 10, 'rejected': 0, 'handled': 10, 'failed': 0,
+                                      'batches': len(handler.batches)}
+
+    def test_backpressure(self):
+        """Rejects events once the queue is full ::"""
+        handler = Handler()
+        handler.release.clear()
+        events = EventQueue(handler, max_size=2, batch_size=1).start()
+        events.put('first')
+        while events.get_stats()['size']:
+            time.sleep(0.001)
+        assert [events.put('second'), events.put('third'), events.put('fourth')] == [True, True, False]
+        assert events.get_stats()['rejected'] == 1
+        handler.release.set()
+        events.stop()
+        assert handler.batches == [['first'], ['second'], ['third']]
+
+    def test_errors(self):
+        """Reports batches the handler failed on and keeps going ::"""
+        errors = []
+        events = EventQueue(Handler(error=ValueError('Handler failed')), on_error=lambda batch, e: errors.append(
+            (batch, str(e))), max_wait=0).start()
+        events.put('event')
+        events.join()
+        events.put('next')
+        events.stop()
+        assert errors == [(['event'], 'Handler failed'), (['next'], 'Handler failed')]
+        assert events.get_stats()['failed'] == 2
+
+    def test_async(self):
+        """Batches events on the event loop ::"""
+        handler, errors = Handler(), []
+
+        async def run():
+            events = AsyncEventQueue(handler.handle_async, batch_size=3, max_size=5, max_wait=0.01).start()
+            accepted = [events.put(number) for number in range(6)]
+            await events.join()
+            await events.stop()
+            return accepted, events.get_stats()
+
+        accepted, stats = asyncio.run(run())
+        assert accepted == [True] * 5 + [False]
+        assert [number for batch in handler.batches for number in batch] == list(range(5))
+        assert handler.batches[0] == [0, 1, 2]
+        assert (stats['handled'], stats['rejected']) == (5, 1)
@@ -0,0 +1,51 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from shipday.exceptions import ShipdayException
+from shipday.order import OrderStatus
+from shipday.webhooks import OrderEvent, parse_event
+
+
+def make_body(**fields) -> bytes:
+    payload = {'event': 'ORDER_ONTHEWAY', 'order_status': 'PICKED_UP', 'timestamp': 1617213012371,
+               'order': {'id': 7063, 'order_number': '99', 'customer': {'name': 'Customer'}},
+               'carrier': {'id': 3, 'name': 'Carrier', 'phoneNumber': '+1234'}}
+    payload.update(fields)
+    return json.dumps(payload).encode('utf-8')
+
+
+class TestOrderEvent:
+    """Order Event"""
+
+    def test_fields(self):
+        """Reads the event, status, order and carrier ::"""
+        event = parse_event(make_body())
+        assert type(event) is OrderEvent
+        assert event.event == 'ORDER_ONTHEWAY'
+        assert event.order_status == OrderStatus.PICKED_UP and event.is_known_status
+        assert event.timestamp == datetime(2021, 3, 31, 17, 50, 12, 371000, tzinfo=timezone.utc)
+        assert (event.order_id, event.order_number) == (7063, '99')
+        assert event.order.customer.name == 'Customer'
+        assert event.carrier.phone_number == '+1234'
+
+    def test_api_names(self):
+        """Also reads the field names used by the API responses ::"""
+        event = parse_event(make_body(order_status=None, orderStatus='ACTIVE', timestamp='2022-05-04T13:30:00+00:00',
+                                      order={'orderId': 5, 'orderNumber': '7'}))
+        assert (event.order_status, event.order_id, event.order_number) == ('ACTIVE', 5, '7')
+        assert event.timestamp == datetime(2022, 5, 4, 13, 30, tzinfo=timezone.utc)
+        assert parse_event(make_body(order_status='NEW_STATE')).is_known_status is False
+
+    def test_key(self):
+        """Identical payloads have the same key ::"""
+        assert parse_event(make_body()).key == parse_event(make_body()).key
+        assert parse_event(make_body()).key != parse_event(make_body(order_status='ALREADY_DELIVERED')).key
+
+    @pytest.mark.parametrize('body', [b'', b'[]', b'"event"', b'{"event": "ORDER_ONTHEWAY", "order": {"id": 1',
+                                      b'{"event" "ORDER_ONTHEWAY"}'])
+    def test_malformed(self, body):
+        """Throws exception if the body is not a complete JSON object ::"""
+        with pytest.raises(ShipdayException):
+            parse_event(body)